@@ -0,0 +1,67 @@
+"""
+Autenticación
+=============
+Identidad del usuario a partir del token de acceso (Authorization: Bearer).
+
+El token se valida en local (firma HMAC, caducidad y lista de revocación del
+proceso), sin consultar la base de datos. El último acceso se anota en
+registro_accesos y se escribe por lotes (ver routers/autenticacion.py).
+"""
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Any, Dict, Optional
+import os
+import secrets
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_autenticacion"))
+from gestor_autenticacion import FirmadorTokens, registro_accesos, validar_token, TIPO_ACCESO
+
+# Secreto de firma de los tokens: debe ser el mismo en todos los procesos de la API
+AUTH_SECRETO = os.getenv("AUTH_SECRETO")
+if not AUTH_SECRETO:
+    AUTH_SECRETO = secrets.token_urlsafe(32)
+    if os.getenv("TESTING", "false").lower() != "true":
+        print("⚠️  AUTH_SECRETO no está definido: se usa uno aleatorio y las sesiones no sobreviven a un reinicio")
+
+firmador = FirmadorTokens(
+    AUTH_SECRETO,
+    duracion_acceso=int(os.getenv("AUTH_ACCESO_MINUTOS", "15")) * 60,
+    duracion_refresco=int(os.getenv("AUTH_REFRESCO_DIAS", "7")) * 24 * 3600
+)
+
+registro_accesos.intervalo_segundos = float(os.getenv("AUTH_INTERVALO_ACCESO_SEGUNDOS", "60"))
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _no_autenticado(detalle: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detalle,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def token_actual(
+    credenciales: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)
+) -> Dict[str, Any]:
+    """
+    Dependency que devuelve los datos del token de acceso (401 si falta o no es válido).
+    """
+    if credenciales is None:
+        raise _no_autenticado("Se requiere un usuario identificado")
+    datos, error = validar_token(credenciales.credentials, firmador, TIPO_ACCESO)
+    if error:
+        raise _no_autenticado(error)
+    registro_accesos.registrar(datos["sub"])
+    return datos
+
+
+async def usuario_actual(datos: Dict[str, Any] = Depends(token_actual)) -> str:
+    """
+    Dependency que devuelve el ID del usuario que hace la petición.
+    """
+    return datos["sub"]
@@ -0,0 +1,69 @@
+"""
+Autorización por roles
+======================
+Dependencias de FastAPI que protegen las rutas según los permisos
+(recurso, accion) de los roles del usuario (GestorPermisos).
+
+Con la máscara del usuario en caché la comprobación es una búsqueda en
+diccionario: la BD de usuarios solo se consulta al vencer el TTL o tras
+una invalidación.
+
+La identidad del usuario sale del token de acceso (ver autenticacion.py).
+"""
+from fastapi import Depends, HTTPException, status
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.autenticacion import usuario_actual
+from api.dependencies import AsyncUsuariosSessionLocal
+from db.usuarios.models import Usuario, Rol, Permiso
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_permisos"))
+from gestor_permisos import GestorPermisosAsync, cache_permisos, instalar_invalidacion, TTL_SEGUNDOS
+
+MODELOS = {
+    'Usuario': Usuario,
+    'Rol': Rol,
+    'Permiso': Permiso
+}
+
+# Vigencia de las máscaras en caché (cambios hechos fuera del ORM o en otro proceso)
+cache_permisos.ttl_segundos = float(os.getenv("PERMISOS_TTL_SEGUNDOS", str(TTL_SEGUNDOS)))
+
+# Los cambios de roles y permisos hechos con el ORM invalidan la caché al confirmarse
+instalar_invalidacion(MODELOS)
+
+gestor_permisos = GestorPermisosAsync(AsyncUsuariosSessionLocal, MODELOS, cache=cache_permisos)
+
+
+async def exigir_permiso(id_usuario: str, recurso: str, accion: str) -> None:
+    """
+    Lanza 403 si el usuario no tiene el permiso (recurso, accion).
+    Para rutas cuyo permiso depende del cuerpo de la petición.
+    """
+    permitido, error = await gestor_permisos.tiene_permiso(id_usuario, recurso, accion)
+    if error:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=error)
+    if not permitido:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"No tiene permiso para {accion} {recurso}"
+        )
+
+
+def requiere_permiso(recurso: str, accion: str):
+    """
+    Crea una dependency que exige el permiso (recurso, accion) al usuario actual.
+    Devuelve el id del usuario.
+
+    Uso:
+        @router.post("/", dependencies=[Depends(requiere_permiso("capitulo", "crear"))])
+    """
+    async def verificar(id_usuario: str = Depends(usuario_actual)) -> str:
+        await exigir_permiso(id_usuario, recurso, accion)
+        return id_usuario
+
+    return verificar
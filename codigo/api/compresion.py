@@ -0,0 +1,226 @@
+"""
+Negociación de Content-Encoding
+===============================
+Elige, según la cabecera Accept-Encoding del cliente, en qué codificación
+enviar un cuerpo que el servidor ya tiene comprimido de antemano.
+
+MiddlewareCompresion comprime al vuelo las demás respuestas de texto (JSON,
+HTML, NDJSON...) con Brotli (si está instalado el módulo brotli) o gzip.
+No toca las que ya llevan Content-Encoding (versiones publicadas), las
+respuestas de rangos ni los tipos que ya van comprimidos (imágenes, vídeo).
+"""
+import asyncio
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin él solo se comprime con gzip
+    brotli = None
+
+
+# Codificaciones al vuelo, de mejor a peor
+CODIFICACIONES_AL_VUELO = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Niveles pensados para comprimir en cada petición, no una sola vez
+NIVEL_GZIP = 6
+CALIDAD_BROTLI = 4
+
+# Cuerpos más pequeños no se comprimen: la cabecera gzip y la CPU no compensan
+TAMANO_MINIMO = 1024
+
+# Cuerpos mayores se comprimen fuera del event loop
+TAMANO_HILO = 256 * 1024
+
+TIPOS_COMPRIMIBLES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def _preferencias(accept_encoding: str) -> Dict[str, float]:
+    """{codificación: q} de una cabecera Accept-Encoding."""
+    preferencias = {}
+    for elemento in accept_encoding.split(","):
+        nombre, *parametros = elemento.split(";")
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            clave, _, valor = parametro.partition("=")
+            if clave.strip().lower() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        preferencias[nombre] = q
+    return preferencias
+
+
+def codificaciones_aceptadas(accept_encoding: Optional[str], disponibles: Sequence[str]) -> List[str]:
+    """
+    Codificaciones de 'disponibles' que acepta el cliente, de más a menos
+    preferida (q descendente; a igual q, el orden de 'disponibles').
+    'identity' no se incluye: es siempre la última opción.
+
+    Args:
+        accept_encoding: Cabecera Accept-Encoding (None si no la envía)
+        disponibles: Codificaciones que tiene el servidor, de mejor a peor
+    """
+    if not accept_encoding:
+        return []
+
+    preferencias = _preferencias(accept_encoding)
+    comodin = preferencias.get("*", 0.0)
+    calidades = [(preferencias.get(codificacion, comodin), codificacion) for codificacion in disponibles]
+    # sorted es estable: a igual q se conserva el orden del servidor
+    return [codificacion for q, codificacion in sorted(calidades, key=lambda c: -c[0]) if q > 0]
+
+
+def _comprimible(tipo: str) -> bool:
+    """True si el tipo MIME es texto que merece comprimirse."""
+    tipo = tipo.split(";", 1)[0].strip().lower()
+    return tipo.startswith(TIPOS_COMPRIMIBLES) or tipo.endswith("+json")
+
+
+class _Compresor:
+    """Compresor incremental de una codificación (misma interfaz para gzip y br)."""
+
+    def __init__(self, codificacion: str):
+        if codificacion == "br":
+            self._objeto = brotli.Compressor(quality=CALIDAD_BROTLI)
+            self._comprimir = self._objeto.process
+            self._terminar = self._objeto.finish
+        else:
+            # wbits=31: formato gzip (cabecera y CRC), no zlib
+            self._objeto = zlib.compressobj(NIVEL_GZIP, zlib.DEFLATED, 31)
+            self._comprimir = self._objeto.compress
+            self._terminar = self._objeto.flush
+
+    def comprimir(self, datos: bytes) -> bytes:
+        return self._comprimir(datos)
+
+    def terminar(self) -> bytes:
+        return self._terminar()
+
+    def todo(self, datos: bytes) -> bytes:
+        return self._comprimir(datos) + self._terminar()
+
+
+class MiddlewareCompresion:
+    """
+    Middleware ASGI que comprime las respuestas según Accept-Encoding.
+
+    Un cuerpo de un solo mensaje se comprime si llega a 'minimo' bytes; una
+    respuesta por trozos (StreamingResponse) se comprime trozo a trozo.
+    El ETag fuerte pasa a débil: los bytes enviados ya no son los mismos.
+
+    Attributes:
+        minimo: Tamaño mínimo, en bytes, de un cuerpo para comprimirlo
+        codificaciones: Codificaciones que ofrece el servidor, de mejor a peor
+    """
+
+    def __init__(self, app: ASGIApp, minimo: int = TAMANO_MINIMO,
+                 codificaciones: Sequence[str] = CODIFICACIONES_AL_VUELO):
+        self.app = app
+        self.minimo = minimo
+        self.codificaciones = tuple(codificaciones)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        aceptadas = codificaciones_aceptadas(Headers(scope=scope).get("accept-encoding"), self.codificaciones)
+        if not aceptadas:
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = aceptadas[0]
+        inicio: Optional[Message] = None
+        compresor: Optional[_Compresor] = None
+        pasar = False
+
+        async def enviar(mensaje: Message) -> None:
+            nonlocal inicio, compresor, pasar
+            if pasar:
+                await send(mensaje)
+                return
+
+            if mensaje["type"] == "http.response.start":
+                cabeceras = Headers(raw=mensaje["headers"])
+                if self._elegible(mensaje["status"], cabeceras):
+                    # Se decide con el primer trozo del cuerpo
+                    inicio = mensaje
+                    return
+                pasar = True
+                if _comprimible(cabeceras.get("content-type", "")) and "content-encoding" not in cabeceras:
+                    MutableHeaders(raw=mensaje["headers"]).add_vary_header("Accept-Encoding")
+                await send(mensaje)
+                return
+
+            if mensaje["type"] != "http.response.body":
+                # Otras extensiones (zerocopy...): la respuesta sale tal cual
+                pasar = True
+                if inicio is not None:
+                    await send(inicio)
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if compresor is None:
+                cabeceras = MutableHeaders(raw=inicio["headers"])
+                cabeceras.add_vary_header("Accept-Encoding")
+                if not mas and len(cuerpo) < self.minimo:
+                    pasar = True
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+
+                compresor = _Compresor(codificacion)
+                cabeceras["Content-Encoding"] = codificacion
+                etag = cabeceras.get("etag")
+                if etag and not etag.startswith("W/"):
+                    cabeceras["ETag"] = f"W/{etag}"
+
+                if not mas:
+                    if len(cuerpo) >= TAMANO_HILO:
+                        cuerpo = await asyncio.to_thread(compresor.todo, cuerpo)
+                    else:
+                        cuerpo = compresor.todo(cuerpo)
+                    cabeceras["Content-Length"] = str(len(cuerpo))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": cuerpo, "more_body": False})
+                    return
+
+                del cabeceras["Content-Length"]
+                await send(inicio)
+
+            comprimido = compresor.comprimir(cuerpo)
+            if not mas:
+                comprimido += compresor.terminar()
+            if comprimido or not mas:
+                await send({"type": "http.response.body", "body": comprimido, "more_body": mas})
+
+        await self.app(scope, receive, enviar)
+
+    @staticmethod
+    def _elegible(estado: int, cabeceras: Headers) -> bool:
+        """True si la respuesta puede comprimirse (según su estado y cabeceras)."""
+        if estado < 200 or estado in (204, 206, 304):
+            return False
+        if "content-encoding" in cabeceras or "content-range" in cabeceras or "accept-ranges" in cabeceras:
+            return False
+        if "no-transform" in cabeceras.get("cache-control", "").lower():
+            return False
+        return _comprimible(cabeceras.get("content-type", ""))
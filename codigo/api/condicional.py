@@ -0,0 +1,101 @@
+"""
+Peticiones condicionales HTTP (ETag / Last-Modified)
+=====================================================
+Utilidades para responder 304 Not Modified a If-None-Match / If-Modified-Since
+usando fecha_modificacion de las filas, sin serializar el recurso completo.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+
+def calcular_etag(*partes) -> str:
+    """
+    Construye un ETag débil a partir de los valores que identifican la versión
+    del recurso (ids, fechas de modificación, orden, ...).
+    Es débil porque el cuerpo puede viajar comprimido o sin comprimir.
+    """
+    huella = hashlib.sha1("|".join(str(parte) for parte in partes).encode("utf-8"))
+    return f'W/"{huella.hexdigest()}"'
+
+
+def _como_utc(fecha: datetime) -> datetime:
+    """Las fechas se guardan en UTC sin zona horaria (datetime.utcnow)."""
+    if fecha.tzinfo is None:
+        return fecha.replace(tzinfo=timezone.utc)
+    return fecha.astimezone(timezone.utc)
+
+
+def ultima_modificacion(fechas: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    """Devuelve la fecha más reciente ignorando valores nulos."""
+    fechas = [_como_utc(fecha) for fecha in fechas if fecha is not None]
+    return max(fechas) if fechas else None
+
+
+def validadores_contenidos(recurso: str, id_capitulo: str, version: tuple) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag y Last-Modified de un capítulo con sus contenidos a partir de su
+    versión (fecha del capítulo y (id_contenido, fecha) de cada bloque en orden).
+    Se calculan igual desde la consulta de versión que desde lo servido.
+    """
+    fecha_capitulo, contenidos = version
+    etag = calcular_etag(recurso, id_capitulo, fecha_capitulo, *contenidos)
+    return etag, ultima_modificacion([fecha_capitulo] + [fecha for _, fecha in contenidos])
+
+
+def cabeceras_validacion(etag: str, modificado: Optional[datetime]) -> Dict[str, str]:
+    """
+    Cabeceras de validación para la respuesta.
+    'no-cache' obliga al navegador a revalidar, lo que permite responder 304.
+    """
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    if modificado is not None:
+        cabeceras["Last-Modified"] = format_datetime(_como_utc(modificado).replace(microsecond=0), usegmt=True)
+    return cabeceras
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    """Comparación débil de ETags (RFC 7232, sección 2.3.2)."""
+    if if_none_match.strip() == "*":
+        return True
+
+    propio = etag[2:] if etag.startswith("W/") else etag
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == propio:
+            return True
+    return False
+
+
+def no_modificado(request: Request, etag: str, modificado: Optional[datetime]) -> bool:
+    """
+    Indica si el cliente ya tiene la versión actual del recurso.
+    If-None-Match tiene prioridad sobre If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _coincide_etag(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modificado is None:
+        return False
+
+    try:
+        fecha_cliente = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if fecha_cliente.tzinfo is None:
+        fecha_cliente = fecha_cliente.replace(tzinfo=timezone.utc)
+
+    # Last-Modified tiene resolución de segundos
+    return _como_utc(modificado).replace(microsecond=0) <= fecha_cliente
+
+
+def respuesta_no_modificado(cabeceras: Dict[str, str]) -> Response:
+    """Respuesta 304 sin cuerpo con las cabeceras de validación."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
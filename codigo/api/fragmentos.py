@@ -0,0 +1,60 @@
+"""
+Plantillas y caché de fragmentos HTML
+=====================================
+Páginas renderizadas en el servidor: las plantillas se compilan una vez al
+arrancar (precompilar_plantillas) y el HTML de cada bloque de contenido se
+guarda en caché con la clave (id_contenido, fecha_modificacion). Editar un
+bloque cambia su fecha y, con ella, la clave: no hace falta invalidar nada;
+las versiones viejas salen por LRU/TTL.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from jinja2 import Environment
+from markupsafe import Markup
+
+
+CLAVE_FRAGMENTO = "fragmento:{}:{}:{}"
+
+PLANTILLA_BLOQUE = "_bloque.html"
+
+
+def precompilar_plantillas(entorno: Environment) -> List[str]:
+    """
+    Compila todas las plantillas del directorio y las deja en la caché del
+    entorno: la primera visita no paga el análisis de Jinja.
+
+    Returns:
+        Nombres de las plantillas compiladas
+    """
+    nombres = entorno.list_templates(extensions=["html"])
+    for nombre in nombres:
+        entorno.get_template(nombre)
+    return nombres
+
+
+def renderizar_bloques(
+    entorno: Environment,
+    contenidos: Iterable[Dict[str, Any]],
+    cache=None,
+    plantilla: str = PLANTILLA_BLOQUE
+) -> List[Markup]:
+    """
+    HTML de cada bloque, desde la caché de fragmentos si ya se renderizó esa
+    versión del bloque.
+
+    Args:
+        entorno: Entorno de Jinja2 (Jinja2Templates.env)
+        contenidos: Bloques como diccionarios (JSON de la versión publicada)
+        cache: Caché de fragmentos (paquete cache_lectura) o None
+        plantilla: Plantilla de un bloque
+    """
+    bloques = []
+    for contenido in contenidos:
+        clave = CLAVE_FRAGMENTO.format(plantilla, contenido["id_contenido"], contenido.get("fecha_modificacion"))
+        html: Optional[str] = cache.obtener(clave) if cache is not None else None
+        if html is None:
+            html = entorno.get_template(plantilla).render(contenido=contenido)
+            if cache is not None:
+                cache.guardar(clave, html)
+        bloques.append(Markup(html))
+    return bloques
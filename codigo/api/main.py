@@ -2,12 +2,17 @@
 API REST con FastAPI para el Sistema de Libro Interactivo
 ===========================================================
 """
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import asyncio
+import json
+import os
 import sys
 from pathlib import Path
 
@@ -16,12 +21,87 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from api.routers.capitulos import router as capitulos_router
 from api.routers.contenidos import router as contenidos_router
+from api.routers.admin import router as admin_router
+from api.routers.busqueda import router as busqueda_router
+from api.routers.evaluaciones import router as evaluaciones_router
+from api.routers.evaluaciones import volcado_periodico, volcar_respuestas_pendientes
+from api.routers.autenticacion import router as autenticacion_router
+from api.routers.exportacion import router as exportacion_router
+from api.routers.medios import router as medios_router, archivos_router as medios_archivos_router
+from api.routers.autenticacion import volcado_accesos_periodico, volcar_accesos_pendientes
+from api.routers.capitulos import MODELOS_PUBLICACION, GestorPublicacionAsync
+from api.dependencies import (
+    engine, async_engine, evaluaciones_engine, evaluaciones_async_engine,
+    usuarios_engine, usuarios_async_engine, SessionLocal, EvaluacionesSessionLocal, UsuariosSessionLocal,
+    procesador_imagenes, get_db, get_cache_fragmentos, Cache
+)
+from api.compresion import MiddlewareCompresion
+from api.condicional import cabeceras_validacion, no_modificado, respuesta_no_modificado
+from api.fragmentos import precompilar_plantillas, renderizar_bloques
+from api import metricas
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Progreso de estudiantes por eventos (cruza las tres BD de la API)
+PROGRESO_INCREMENTAL = os.getenv("PROGRESO_INCREMENTAL", "false").lower() == "true"
+PROGRESO_INTERVALO_SEGUNDOS = float(os.getenv("PROGRESO_INTERVALO_SEGUNDOS", "30"))
+
+# Volver a leer las plantillas si cambian en disco (solo en desarrollo: cada
+# render comprueba la fecha del archivo)
+PLANTILLAS_RECARGAR = os.getenv("PLANTILLAS_RECARGAR", "false").lower() == "true"
+
+# Respuestas más pequeñas (en bytes) se envían sin comprimir
+COMPRESION_MINIMO = int(os.getenv("COMPRESION_MINIMO", "1024"))
+
+
+async def progreso_periodico():
+    """Tarea de fondo: recalcula el progreso de los estudiantes encolados."""
+    from api.routers.evaluaciones import MODELOS
+    from db import recalcular_progreso  # añade paquetes/progreso_estudiantes al path
+    from progreso_estudiantes import instalar_progreso_incremental
+
+    instalar_progreso_incremental(MODELOS)
+    while True:
+        await asyncio.sleep(PROGRESO_INTERVALO_SEGUNDOS)
+        try:
+            # Sesiones síncronas de las tres BD de la API
+            _, error = await asyncio.to_thread(
+                recalcular_progreso.procesar_cola, SessionLocal, UsuariosSessionLocal, EvaluacionesSessionLocal
+            )
+        except Exception as e:
+            error = str(e)
+        if error:
+            # Los estudiantes siguen en la cola y se reintentan en la siguiente vuelta
+            print(f"⚠️  No se pudo recalcular el progreso de estudiantes: {error}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Compila las plantillas al arrancar. Vuelca periódicamente el buffer de
+    respuestas y los últimos accesos, y los vacía al apagar. Al apagar también
+    detiene el pool de derivados de imagen.
+    """
+    precompilar_plantillas(templates.env)
+    tareas = [asyncio.create_task(volcado_periodico()), asyncio.create_task(volcado_accesos_periodico())]
+    if PROGRESO_INCREMENTAL:
+        tareas.append(asyncio.create_task(progreso_periodico()))
+    yield
+    for tarea in tareas:
+        tarea.cancel()
+        with suppress(asyncio.CancelledError):
+            await tarea
+    await volcar_respuestas_pendientes()
+    await volcar_accesos_pendientes()
+    await asyncio.to_thread(procesador_imagenes.cerrar)
+
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title="Libro Interactivo API",
     description="API REST para gestión de capítulos y contenidos de biología",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -33,37 +113,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión gzip/Brotli negociada con Accept-Encoding (dentro de las métricas:
+# su latencia incluye comprimir y el tamaño medido es el enviado)
+app.add_middleware(MiddlewareCompresion, minimo=COMPRESION_MINIMO)
+
+# Métricas por ruta (latencia, SQL, filas, tamaño) expuestas en /metrics
+metricas.instalar_eventos_sql(
+    engine, async_engine.sync_engine,
+    evaluaciones_engine, evaluaciones_async_engine.sync_engine,
+    usuarios_engine, usuarios_async_engine.sync_engine
+)
+app.add_middleware(metricas.MiddlewareMetricas)
+
 # Configurar templates (usar path absoluto)
 template_dir = Path(__file__).parent / "templates"
 templates = Jinja2Templates(directory=str(template_dir))
+templates.env.auto_reload = PLANTILLAS_RECARGAR
 
 # Incluir routers de API
 app.include_router(capitulos_router, prefix="/api")
 app.include_router(contenidos_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
+app.include_router(busqueda_router, prefix="/api")
+app.include_router(evaluaciones_router, prefix="/api")
+app.include_router(autenticacion_router, prefix="/api")
+app.include_router(exportacion_router, prefix="/api")
+app.include_router(medios_router, prefix="/api")
+app.include_router(medios_archivos_router)
 
 # Ruta principal - Página de inicio
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Página principal con botones"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 
 @app.get("/crear-capitulo", response_class=HTMLResponse)
 async def crear_capitulo_page(request: Request):
     """Página para crear capítulo"""
-    return templates.TemplateResponse("crear_capitulo.html", {"request": request})
+    return templates.TemplateResponse(request, "crear_capitulo.html")
 
 
 @app.get("/ver-capitulos", response_class=HTMLResponse)
 async def ver_capitulos_page(request: Request):
     """Página para ver capítulos"""
-    return templates.TemplateResponse("ver_capitulos.html", {"request": request})
+    return templates.TemplateResponse(request, "ver_capitulos.html")
+
+
+@app.get("/leer/{capitulo_id}", response_class=HTMLResponse)
+async def leer_capitulo_page(
+    capitulo_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    cache_fragmentos: Optional[Cache] = Depends(get_cache_fragmentos)
+):
+    """
+    Página de lectura de un capítulo, renderizada en el servidor a partir de
+    su versión publicada vigente: el HTML llega completo en la primera
+    respuesta, sin JavaScript ni más peticiones. Cada bloque sale de la caché
+    de fragmentos mientras no cambie su fecha_modificacion.
+    """
+    gestor = GestorPublicacionAsync(db, MODELOS_PUBLICACION)
+    publicacion, error = await gestor.obtener_publicacion(capitulo_id)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    cabeceras = cabeceras_validacion(f'W/"leer-{publicacion["huella"]}"', publicacion["fecha_publicacion"])
+    if no_modificado(request, cabeceras["ETag"], publicacion["fecha_publicacion"]):
+        return respuesta_no_modificado(cabeceras)
+    
+    resultado, error = await gestor.obtener_cuerpo(capitulo_id, publicacion["version"])
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    capitulo = json.loads(resultado[0])
+    bloques = renderizar_bloques(templates.env, capitulo.pop("contenidos"), cache_fragmentos)
+    return templates.TemplateResponse(
+        request, "leer_capitulo.html", {"capitulo": capitulo, "bloques": bloques}, headers=cabeceras
+    )
 
 
 @app.get("/gestionar-contenidos", response_class=HTMLResponse)
 async def gestionar_contenidos_page(request: Request):
     """Página para gestionar contenidos (texto, imagen, video, 3D)"""
-    return templates.TemplateResponse("gestionar_contenidos.html", {"request": request})
+    return templates.TemplateResponse(request, "gestionar_contenidos.html")
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/health")
@@ -0,0 +1,258 @@
+"""
+Métricas de rendimiento por petición
+====================================
+Middleware ASGI que mide, por plantilla de ruta (p. ej.
+/api/contenidos/capitulo/{id_capitulo}):
+- latencia de la petición
+- número de sentencias SQL y tiempo en SQL (eventos before/after_cursor_execute)
+- filas cargadas por el ORM
+- tamaño de la respuesta
+
+Se exporta en formato de texto de Prometheus en /metrics. Una ruta que cae en
+N+1 se detecta porque crece su histograma de sentencias SQL por petición.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.routing import replace_params
+
+
+# ===== Tipos de métrica =====
+
+class Contador:
+    """Contador de Prometheus con etiquetas."""
+
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valores: Tuple[str, ...], cantidad: float = 1) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + cantidad
+
+    def exportar(self) -> Iterable[str]:
+        with self._lock:
+            for valores, total in sorted(self._valores.items()):
+                yield f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(total)}"
+
+
+class Histograma:
+    """Histograma de Prometheus con etiquetas y límites fijos."""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...], limites: Tuple[float, ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        # valores de etiquetas -> [conteos por límite..., suma, total]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores: Tuple[str, ...], valor: float) -> None:
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [0] * len(self.limites) + [0.0, 0]
+            for indice, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[indice] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def exportar(self) -> Iterable[str]:
+        with self._lock:
+            for valores, serie in sorted(self._series.items()):
+                for limite, conteo in zip(self.limites, serie):
+                    etiquetas = _etiquetas(self.etiquetas + ("le",), valores + (_numero(limite),))
+                    yield f"{self.nombre}_bucket{etiquetas} {conteo}"
+                etiquetas = _etiquetas(self.etiquetas + ("le",), valores + ("+Inf",))
+                yield f"{self.nombre}_bucket{etiquetas} {serie[-1]}"
+                yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {_numero(serie[-2])}"
+                yield f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {serie[-1]}"
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: Tuple[str, ...]) -> str:
+    if not nombres:
+        return ""
+    pares = []
+    for nombre, valor in zip(nombres, valores):
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+# ===== Métricas del servicio =====
+
+ETIQUETAS_RUTA = ("metodo", "ruta")
+
+peticiones_total = Contador(
+    "libro_http_peticiones_total", "Peticiones HTTP atendidas",
+    ETIQUETAS_RUTA + ("estado",)
+)
+duracion_peticion = Histograma(
+    "libro_http_duracion_segundos", "Latencia de la petición",
+    ETIQUETAS_RUTA, (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+sentencias_sql = Histograma(
+    "libro_sql_sentencias_por_peticion", "Sentencias SQL ejecutadas por petición",
+    ETIQUETAS_RUTA, (0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+duracion_sql = Histograma(
+    "libro_sql_duracion_segundos", "Tiempo total en SQL por petición",
+    ETIQUETAS_RUTA, (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+filas_cargadas = Histograma(
+    "libro_orm_filas_por_peticion", "Filas cargadas por el ORM por petición",
+    ETIQUETAS_RUTA, (0, 1, 10, 50, 100, 500, 1000, 5000)
+)
+tamano_respuesta = Histograma(
+    "libro_http_respuesta_bytes", "Tamaño del cuerpo de la respuesta",
+    ETIQUETAS_RUTA, (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+
+METRICAS = [peticiones_total, duracion_peticion, sentencias_sql, duracion_sql, filas_cargadas, tamano_respuesta]
+
+
+def exportar() -> str:
+    """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)."""
+    lineas = []
+    for metrica in METRICAS:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        lineas.extend(metrica.exportar())
+    return "\n".join(lineas) + "\n"
+
+
+# ===== Medición de la petición en curso =====
+
+class MedicionPeticion:
+    """Acumuladores de la petición en curso."""
+
+    __slots__ = ("sentencias", "tiempo_sql", "filas")
+
+    def __init__(self):
+        self.sentencias = 0
+        self.tiempo_sql = 0.0
+        self.filas = 0
+
+
+# Las sesiones asíncronas ejecutan el SQL en greenlets que heredan el contexto
+_peticion_actual: ContextVar[Optional[MedicionPeticion]] = ContextVar("peticion_actual", default=None)
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _peticion_actual.get() is not None:
+        conn.info.setdefault("inicio_sentencias", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    medicion = _peticion_actual.get()
+    if medicion is None:
+        return
+    inicios = conn.info.get("inicio_sentencias")
+    if inicios:
+        medicion.tiempo_sql += time.perf_counter() - inicios.pop()
+    medicion.sentencias += 1
+
+
+def _al_cargar(session, instancia):
+    medicion = _peticion_actual.get()
+    if medicion is not None:
+        medicion.filas += 1
+
+
+def instalar_eventos_sql(*motores: Engine) -> None:
+    """
+    Registra los eventos que cuentan sentencias, tiempo SQL y filas cargadas.
+    Para un AsyncEngine se pasa su sync_engine. Es idempotente.
+    """
+    for motor in motores:
+        if not event.contains(motor, "before_cursor_execute", _antes_de_ejecutar):
+            event.listen(motor, "before_cursor_execute", _antes_de_ejecutar)
+            event.listen(motor, "after_cursor_execute", _despues_de_ejecutar)
+
+    if not event.contains(Session, "loaded_as_persistent", _al_cargar):
+        event.listen(Session, "loaded_as_persistent", _al_cargar)
+
+
+def _plantilla_ruta(scope) -> str:
+    """
+    Plantilla de la ruta atendida (/api/capitulos/{capitulo_id}); las rutas
+    no encontradas se agrupan para no crear una serie por URL.
+    """
+    ruta = scope.get("route")
+    plantilla = getattr(ruta, "path", None)
+    if plantilla is None:
+        return "sin_ruta"
+
+    # route.path lleva el prefijo de su router (/media) pero no el de
+    # include_router (/api). Ese prefijo es lo que precede en la URL a la
+    # ruta con sus parámetros sustituidos: fijo para cada ruta, nunca parte
+    # de un parámetro {x:path}.
+    try:
+        concreta, _ = replace_params(ruta.path_format, ruta.param_convertors, dict(scope.get("path_params", {})))
+    except (AttributeError, KeyError, TypeError):
+        return plantilla
+    if not scope["path"].endswith(concreta):
+        return plantilla
+    return scope["path"][:len(scope["path"]) - len(concreta)] + plantilla
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que registra las métricas de cada petición HTTP.
+
+    Attributes:
+        excluir: Rutas que no se miden (p. ej. el propio /metrics)
+    """
+
+    def __init__(self, app, excluir: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.excluir = set(excluir)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.excluir:
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionPeticion()
+        token = _peticion_actual.set(medicion)
+        respuesta = {"estado": 500, "bytes": 0}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                respuesta["estado"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body":
+                respuesta["bytes"] += len(mensaje.get("body", b""))
+            await send(mensaje)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            _peticion_actual.reset(token)
+
+            etiquetas = (scope["method"], _plantilla_ruta(scope))
+            peticiones_total.incrementar(etiquetas + (str(respuesta["estado"]),))
+            duracion_peticion.observar(etiquetas, duracion)
+            sentencias_sql.observar(etiquetas, medicion.sentencias)
+            duracion_sql.observar(etiquetas, medicion.tiempo_sql)
+            filas_cargadas.observar(etiquetas, medicion.filas)
+            tamano_respuesta.observar(etiquetas, respuesta["bytes"])
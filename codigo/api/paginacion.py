@@ -0,0 +1,27 @@
+"""
+Paginación por cursor
+=====================
+Cabeceras de navegación para los listados paginados por cursor (keyset).
+El cuerpo de la respuesta sigue siendo la lista, para no romper clientes.
+"""
+from typing import Dict, Optional
+
+from fastapi import Request
+
+
+def cabeceras_paginacion(request: Request, siguiente_cursor: Optional[str]) -> Dict[str, str]:
+    """
+    Cabeceras con el cursor de la página siguiente.
+    Link (RFC 8288) conserva los filtros de la petición y reemplaza el cursor.
+
+    Returns:
+        Dict vacío si no hay más páginas
+    """
+    if siguiente_cursor is None:
+        return {}
+
+    url = request.url.include_query_params(cursor=siguiente_cursor).remove_query_params("skip")
+    return {
+        "Link": f'<{url}>; rel="next"',
+        "X-Next-Cursor": siguiente_cursor,
+    }
@@ -0,0 +1,85 @@
+"""
+Proyecciones de los listados (fields= / view=summary)
+=====================================================
+Un listado puede pedir solo algunos campos: ?fields=titulo,numero o la vista
+resumida ?view=summary. Los gestores cargan solo esas columnas (load_only), así
+que cuerpo_texto o introduccion no se leen de la base de datos, no se hidratan
+en el ORM y no viajan en la respuesta. El identificador se incluye siempre.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+VISTA_RESUMEN = "summary"
+
+PATRON_VISTA = "^(full|summary)$"
+
+
+def campos_pedidos(
+    fields: Optional[str],
+    view: Optional[str],
+    esquema: Type[BaseModel],
+    resumen: Sequence[str]
+) -> Tuple[Optional[List[str]], Optional[str]]:
+    """
+    Campos que pide el cliente, con el identificador (el primer campo del
+    esquema) siempre delante.
+
+    Args:
+        fields: Parámetro fields= (nombres separados por comas) o None
+        view: Parámetro view= ('full', 'summary') o None
+        esquema: Schema parcial del recurso (sus campos son los permitidos)
+        resumen: Campos de la vista resumida
+
+    Returns:
+        Tupla (campos, None); campos es None si se pide el recurso completo.
+        Tupla (None, mensaje_error) si algún campo no existe
+    """
+    if fields is not None and view == VISTA_RESUMEN:
+        return None, "Usa 'fields' o 'view=summary', no ambos"
+
+    if fields is not None:
+        nombres = [nombre.strip() for nombre in fields.split(",") if nombre.strip()]
+        if not nombres:
+            return None, "'fields' no indica ningún campo"
+    elif view == VISTA_RESUMEN:
+        nombres = list(resumen)
+    else:
+        return None, None
+
+    permitidos = list(esquema.model_fields)
+    desconocidos = [nombre for nombre in nombres if nombre not in permitidos]
+    if desconocidos:
+        return None, f"Campos no válidos: {', '.join(desconocidos)}. Permitidos: {', '.join(permitidos)}"
+
+    return list(dict.fromkeys([permitidos[0], *nombres])), None
+
+
+@lru_cache(maxsize=None)
+def _adaptador(esquema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[esquema])
+
+
+def respuesta_parcial(
+    filas: Iterable,
+    campos: Sequence[str],
+    esquema: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Respuesta JSON con solo 'campos' de cada fila. Lee únicamente esos
+    atributos: los demás no están cargados (load_only).
+
+    Args:
+        filas: Filas ORM devueltas por el gestor
+        campos: Campos pedidos (de campos_pedidos)
+        esquema: Schema parcial con el que se validan y serializan
+        headers: Cabeceras extra (p. ej. las de paginación)
+    """
+    adaptador = _adaptador(esquema)
+    datos = [{campo: getattr(fila, campo) for campo in campos} for fila in filas]
+    cuerpo = adaptador.dump_json(adaptador.validate_python(datos), exclude_unset=True)
+    return Response(content=cuerpo, media_type="application/json", headers=headers)
@@ -0,0 +1,164 @@
+"""
+Peticiones de rangos HTTP (Range / If-Range)
+=============================================
+Respuestas 206 Partial Content para archivos del disco: el reproductor de
+vídeo salta a cualquier punto y los visores 3D cargan el modelo por partes
+sin descargar el archivo entero.
+
+El archivo se envía sin pasar por Python cuando el servidor ASGI admite la
+extensión http.response.zerocopy (sendfile); si no, se proyecta en memoria
+(mmap) y se envía por trozos sin llamadas a read().
+"""
+import asyncio
+import mmap
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+# Bytes por mensaje cuando el archivo se envía desde el mmap
+TAMANO_TROZO = 1024 * 1024
+
+
+class RangoNoSatisfacible(ValueError):
+    """El rango pedido empieza después del final del archivo (416)."""
+
+
+def interpretar_rango(cabecera: Optional[str], tamano: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta una cabecera Range de un solo rango de bytes.
+
+    Returns:
+        (inicio, fin) con fin exclusivo, o None si la petición debe responderse
+        entera: sin Range, con otra unidad, mal formada o con varios rangos
+        (RFC 9110, 14.2: el servidor puede ignorar Range)
+
+    Raises:
+        RangoNoSatisfacible: Si el rango queda fuera del archivo
+    """
+    if not cabecera:
+        return None
+    unidad, _, especificacion = cabecera.partition("=")
+    if unidad.strip().lower() != "bytes" or "," in especificacion:
+        return None
+
+    inicio_texto, guion, fin_texto = especificacion.strip().partition("-")
+    inicio_texto, fin_texto = inicio_texto.strip(), fin_texto.strip()
+    if not guion or not (inicio_texto or fin_texto):
+        return None
+    if not (inicio_texto or "0").isdigit() or not (fin_texto or "0").isdigit():
+        return None
+
+    if not inicio_texto:
+        # Sufijo: los últimos N bytes
+        sufijo = int(fin_texto)
+        if sufijo == 0 or tamano == 0:
+            raise RangoNoSatisfacible(tamano)
+        return max(tamano - sufijo, 0), tamano
+
+    inicio = int(inicio_texto)
+    fin = int(fin_texto) + 1 if fin_texto else tamano
+    if fin_texto and fin <= inicio:
+        return None
+    if inicio >= tamano:
+        raise RangoNoSatisfacible(tamano)
+    return inicio, min(fin, tamano)
+
+
+def rango_vigente(request: Request, etag: str, ultima_modificacion: str) -> bool:
+    """
+    Indica si se debe atender el Range según If-Range: solo si el cliente
+    tiene la versión actual (ETag fuerte exacto o la misma Last-Modified).
+    Sin If-Range, siempre.
+    """
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"'):
+        return if_range == etag
+    if if_range.startswith("W/"):
+        return False
+    try:
+        parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    return if_range == ultima_modificacion
+
+
+def fecha_http(marca_tiempo: float) -> str:
+    """Fecha en formato HTTP (Last-Modified)."""
+    return formatdate(marca_tiempo, usegmt=True)
+
+
+class RespuestaArchivo(Response):
+    """
+    Respuesta con el archivo completo (200) o un rango suyo (206).
+
+    Args:
+        ruta: Archivo a enviar
+        tamano: Tamaño del archivo (de un os.stat ya hecho)
+        rango: (inicio, fin) con fin exclusivo, o None para el archivo entero
+        headers: Cabeceras extra (ETag, Last-Modified, Cache-Control...)
+        media_type: Tipo MIME del archivo
+    """
+
+    def __init__(
+        self,
+        ruta: os.PathLike,
+        tamano: int,
+        rango: Optional[Tuple[int, int]] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+    ) -> None:
+        self.ruta = ruta
+        self.inicio, self.fin = rango if rango is not None else (0, tamano)
+        self.status_code = 206 if rango is not None else 200
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        self.headers["content-length"] = str(self.fin - self.inicio)
+        if rango is not None:
+            self.headers["content-range"] = f"bytes {self.inicio}-{self.fin - 1}/{tamano}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self.fin == self.inicio:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        archivo = await asyncio.to_thread(open, self.ruta, "rb")
+        try:
+            if "http.response.zerocopy" in scope.get("extensions", {}):
+                await self._enviar_zerocopy(send, archivo)
+            else:
+                await self._enviar_mmap(send, archivo)
+        finally:
+            archivo.close()
+
+    async def _enviar_zerocopy(self, send: Send, archivo) -> None:
+        # El servidor copia del archivo al socket en el kernel (sendfile)
+        await send({
+            "type": "http.response.zerocopy",
+            "file": archivo,
+            "offset": self.inicio,
+            "count": self.fin - self.inicio,
+            "more_body": False,
+        })
+
+    async def _enviar_mmap(self, send: Send, archivo) -> None:
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as proyeccion:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                proyeccion.madvise(mmap.MADV_SEQUENTIAL)
+            posicion = self.inicio
+            while posicion < self.fin:
+                siguiente = min(posicion + TAMANO_TROZO, self.fin)
+                # Copiar del mmap puede esperar al disco (fallos de página): fuera del event loop
+                trozo = await asyncio.to_thread(proyeccion.__getitem__, slice(posicion, siguiente))
+                posicion = siguiente
+                await send({"type": "http.response.body", "body": trozo, "more_body": posicion < self.fin})
@@ -0,0 +1,40 @@
+"""
+Router para endpoints de Administración
+Estadísticas internas del servicio (caché de lectura, pools de conexiones)
+"""
+from fastapi import APIRouter, Depends
+from typing import Optional
+import sys
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.dependencies import get_cache, Cache
+from db.motores import registro
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Administración"]
+)
+
+
+@router.get("/cache")
+async def estadisticas_cache(cache: Optional[Cache] = Depends(get_cache)):
+    """
+    Contadores de aciertos, fallos e invalidaciones de la caché de lectura
+    """
+    if cache is None:
+        return {"backend": "ninguno"}
+    
+    return cache.estadisticas()
+
+
+@router.get("/pool")
+async def estadisticas_pool():
+    """
+    Estado de los pools de conexiones de cada engine del proceso:
+    conexiones en uso/libres, overflow, espera media y máxima por una
+    conexión y peticiones que agotaron el tiempo de espera
+    """
+    return registro.estadisticas()
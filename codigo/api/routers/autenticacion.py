@@ -0,0 +1,115 @@
+"""
+Router para Autenticación
+Inicio de sesión, refresco y cierre de sesión con GestorAutenticacion.
+El último acceso de los usuarios se escribe por lotes en segundo plano.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+import asyncio
+import sys
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.autenticacion import firmador, token_actual
+from api.dependencies import get_usuarios_db, AsyncUsuariosSessionLocal
+from api.schemas.autenticacion import LoginRequest, RefrescarRequest, CerrarSesionRequest, TokensResponse
+from db.usuarios.models import Usuario
+
+# Importar el gestor
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_autenticacion"))
+from gestor_autenticacion import GestorAutenticacionAsync, registro_accesos, ERROR_SATURADO
+
+router = APIRouter(
+    prefix="/auth",
+    tags=["Autenticación"]
+)
+
+MODELOS = {
+    'Usuario': Usuario
+}
+
+
+def _error(error: str) -> HTTPException:
+    if error == ERROR_SATURADO:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=error, headers={"Retry-After": "1"}
+        )
+    if error.startswith("Error al"):
+        return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error)
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED, detail=error, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def volcar_accesos_pendientes() -> tuple:
+    """Escribe los últimos accesos anotados en el registro del proceso."""
+    async with AsyncUsuariosSessionLocal() as db:
+        return await GestorAutenticacionAsync(db, MODELOS, firmador).volcar_accesos()
+
+
+async def volcado_accesos_periodico():
+    """Tarea de fondo: escribe ultimo_acceso cada intervalo en un solo UPDATE."""
+    while True:
+        await asyncio.sleep(registro_accesos.intervalo_segundos)
+        # Si falla, los accesos vuelven al registro y se reintentan en la siguiente vuelta
+        await volcar_accesos_pendientes()
+
+
+@router.post("/login", response_model=TokensResponse)
+async def login(
+    credenciales: LoginRequest,
+    db: AsyncSession = Depends(get_usuarios_db)
+):
+    """
+    Iniciar sesión con email y contraseña.
+
+    Devuelve un token de acceso (cabecera Authorization: Bearer) y uno de
+    refresco para renovarlo en /auth/refresh.
+    """
+    resultado, error = await GestorAutenticacionAsync(db, MODELOS, firmador).login(
+        credenciales.email, credenciales.password
+    )
+
+    if error:
+        raise _error(error)
+
+    return resultado
+
+
+@router.post("/refresh", response_model=TokensResponse)
+async def refrescar(
+    datos: RefrescarRequest,
+    db: AsyncSession = Depends(get_usuarios_db)
+):
+    """
+    Cambiar un token de refresco por un par nuevo. Cada token de refresco
+    sirve una sola vez.
+    """
+    resultado, error = await GestorAutenticacionAsync(db, MODELOS, firmador).refrescar(datos.refresh_token)
+
+    if error:
+        raise _error(error)
+
+    return resultado
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def cerrar_sesion(
+    datos: Optional[CerrarSesionRequest] = None,
+    token: Dict[str, Any] = Depends(token_actual),
+    db: AsyncSession = Depends(get_usuarios_db)
+):
+    """
+    Cerrar sesión: revoca el token de acceso actual y, si se envía, el de refresco.
+    """
+    _, error = await GestorAutenticacionAsync(db, MODELOS, firmador).cerrar_sesion(
+        token, datos.refresh_token if datos else None
+    )
+
+    if error:
+        raise _error(error)
+
+    return None
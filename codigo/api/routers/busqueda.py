@@ -0,0 +1,55 @@
+"""
+Router para la Búsqueda de texto completo
+Usa GestorBusqueda sobre capítulos y bloques de texto
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+import sys
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.dependencies import get_db
+from api.schemas.busqueda import BusquedaResponse
+
+# Importar el gestor
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_busqueda"))
+from gestor_busqueda import GestorBusquedaAsync
+
+router = APIRouter(
+    prefix="/buscar",
+    tags=["Búsqueda"]
+)
+
+
+@router.get("", response_model=BusquedaResponse)
+async def buscar(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar"),
+    tipo: Optional[Literal['capitulo', 'texto']] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Buscar en capítulos (título, tema, introducción) y bloques de texto.
+    Resultados ordenados por relevancia, con los términos resaltados con <mark>.
+    """
+    gestor = GestorBusquedaAsync(db)
+    resultado, error = await gestor.buscar(q, tipo=tipo, limit=limit, offset=offset)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    resultados, total = resultado
+    return BusquedaResponse(
+        consulta=q,
+        total=total,
+        limit=limit,
+        offset=offset,
+        resultados=resultados
+    )
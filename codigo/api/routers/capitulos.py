@@ -2,37 +2,91 @@
 Router para endpoints de Capítulos
 Versión refactorizada: Usa el GestorCapitulo para toda la lógica de negocio
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, List, Optional
 import sys
 from pathlib import Path
 
 # Añadir el directorio padre al path para imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from api.dependencies import get_db
-from api.schemas.capitulo import CapituloCreate, CapituloResponse, CapituloUpdate
-from db.contenido.models import Capitulo
+from api.dependencies import get_db, get_cache, Cache
+from api.autorizacion import requiere_permiso
+from api.paginacion import cabeceras_paginacion
+from api.proyeccion import PATRON_VISTA, campos_pedidos, respuesta_parcial
+from api.compresion import codificaciones_aceptadas
+from api.condicional import (
+    calcular_etag,
+    cabeceras_validacion,
+    no_modificado,
+    respuesta_no_modificado,
+    validadores_contenidos,
+)
+from api.schemas.capitulo import (
+    CapituloCreate,
+    CapituloResponse,
+    CapituloUpdate,
+    CapituloConContenidosResponse,
+    CapituloParcialResponse,
+    PublicacionResponse,
+    VersionPublicadaResponse,
+)
+from api.schemas.contenido import ContenidoResponse
+from db.contenido.models import (
+    Contenido,
+    Texto,
+    Imagen,
+    Video,
+    Objeto3D,
+    Capitulo,
+    UnionCapituloContenido,
+    PublicacionCapitulo
+)
 
-# Importar el gestor
+# Importar los gestores
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_capitulo"))
-from gestor_capitulo import GestorCapitulo
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_contenido"))
+from gestor_capitulo import GestorCapituloAsync
+from gestor_contenido import GestorContenidoAsync, version_contenidos
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "publicacion_capitulos"))
+from publicacion_capitulos import GestorPublicacionAsync, CODIFICACIONES
 
 router = APIRouter(
     prefix="/capitulos",
     tags=["Capítulos"]
 )
 
+MODELOS_PUBLICACION = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido,
+    'PublicacionCapitulo': PublicacionCapitulo
+}
+
+# Campos de view=summary (selectores de capítulo en la interfaz)
+CAMPOS_RESUMEN = ("id_capitulo", "numero", "titulo", "tema", "estado")
+
+# Las versiones anteriores no cambian nunca
+CACHE_VERSION_PUBLICADA = "private, max-age=31536000, immutable"
 
-@router.post("/", response_model=CapituloResponse, status_code=status.HTTP_201_CREATED)
-def crear_capitulo(capitulo: CapituloCreate, db: Session = Depends(get_db)):
+
+@router.post("/", response_model=CapituloResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("capitulo", "crear"))])
+async def crear_capitulo(
+    capitulo: CapituloCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
-    Crear un nuevo capítulo usando el GestorCapitulo
+    Crear un nuevo capítulo usando el GestorCapitulo.
+    Si se crea en estado PUBLICADO se publica su primera versión (cabecera
+    X-Version-Publicacion); si la publicación falla, el capítulo no se crea.
     """
-    gestor = GestorCapitulo(db, Capitulo)
+    gestor = GestorCapituloAsync(db, Capitulo, cache=cache)
     
-    resultado, error = gestor.crear_capitulo(
+    resultado, error = await gestor.crear_capitulo(
         numero=capitulo.numero,
         titulo=capitulo.titulo,
         tema=capitulo.tema,
@@ -46,31 +100,98 @@ def crear_capitulo(capitulo: CapituloCreate, db: Session = Depends(get_db)):
             detail=error
         )
     
+    if resultado.estado == "PUBLICADO":
+        id_capitulo = resultado.id_capitulo
+        publicacion = await _publicar_o_deshacer(db, id_capitulo, lambda: gestor.eliminar_capitulo(id_capitulo))
+        response.headers["X-Version-Publicacion"] = str(publicacion["version"])
+    
     return resultado
 
 
 @router.get("/", response_model=List[CapituloResponse])
-def listar_capitulos(
+async def listar_capitulos(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     tema: str = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = Query(None, pattern=PATRON_VISTA),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
 ):
     """
-    Listar todos los capítulos usando el GestorCapitulo
+    Listar todos los capítulos usando el GestorCapitulo.
+    Pagina por cursor sobre 'numero': la cabecera Link (rel="next") y
+    X-Next-Cursor indican la página siguiente. 'skip' se mantiene por compatibilidad.
+
+    - **fields**: campos a devolver, separados por comas (id_capitulo va siempre)
+    - **view**: 'summary' devuelve solo id_capitulo, numero, titulo, tema y estado
     """
-    gestor = GestorCapitulo(db, Capitulo)
-    capitulos = gestor.listar_capitulos(skip=skip, limit=limit, tema=tema)
+    campos, error = campos_pedidos(fields, view, CapituloParcialResponse, CAMPOS_RESUMEN)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    gestor = GestorCapituloAsync(db, Capitulo, cache=cache)
+    
+    if skip and not cursor:
+        capitulos = await gestor.listar_capitulos(skip=skip, limit=limit, tema=tema, campos=campos)
+        if campos:
+            return respuesta_parcial(capitulos, campos, CapituloParcialResponse)
+        return capitulos
+    
+    resultado, error = await gestor.listar_capitulos_por_cursor(
+        cursor=cursor, limit=limit, tema=tema, campos=campos
+    )
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    capitulos, siguiente_cursor = resultado
+    if campos:
+        return respuesta_parcial(
+            capitulos, campos, CapituloParcialResponse,
+            headers=cabeceras_paginacion(request, siguiente_cursor)
+        )
+    response.headers.update(cabeceras_paginacion(request, siguiente_cursor))
     return capitulos
 
 
 @router.get("/{capitulo_id}", response_model=CapituloResponse)
-def obtener_capitulo(capitulo_id: str, db: Session = Depends(get_db)):
+async def obtener_capitulo(
+    capitulo_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
-    Obtener un capítulo por ID usando el GestorCapitulo
+    Obtener un capítulo por ID usando el GestorCapitulo.
+    Responde 304 a If-None-Match/If-Modified-Since sin cargar la introducción.
     """
-    gestor = GestorCapitulo(db, Capitulo)
-    capitulo, error = gestor.obtener_capitulo_por_id(capitulo_id)
+    gestor = GestorCapituloAsync(db, Capitulo, cache=cache)
+    modificado, error = await gestor.obtener_version_capitulo(capitulo_id)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    etag = calcular_etag("capitulo", capitulo_id, modificado)
+    cabeceras = cabeceras_validacion(etag, modificado)
+    if no_modificado(request, etag, modificado):
+        return respuesta_no_modificado(cabeceras)
+    
+    capitulo, error = await gestor.obtener_capitulo_por_id(capitulo_id)
     
     if error:
         raise HTTPException(
@@ -78,24 +199,92 @@ def obtener_capitulo(capitulo_id: str, db: Session = Depends(get_db)):
             detail=error
         )
     
+    response.headers.update(cabeceras)
     return capitulo
 
 
-@router.put("/{capitulo_id}", response_model=CapituloResponse)
-def actualizar_capitulo(
+@router.get("/{capitulo_id}/completo", response_model=CapituloConContenidosResponse)
+async def obtener_capitulo_completo(
+    capitulo_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Obtener un capítulo con sus contenidos ordenados en una sola petición.
+    El número de consultas es fijo, sin importar la cantidad de bloques.
+    Responde 304 si el capítulo, sus uniones y sus contenidos no cambiaron.
+    """
+    modelos = {
+        'Contenido': Contenido,
+        'Texto': Texto,
+        'Imagen': Imagen,
+        'Video': Video,
+        'Objeto3D': Objeto3D,
+        'Capitulo': Capitulo,
+        'UnionCapituloContenido': UnionCapituloContenido
+    }
+    
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    version, error = await gestor.obtener_version_contenidos_de_capitulo(capitulo_id)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    etag, modificado = validadores_contenidos("capitulo_completo", capitulo_id, version)
+    if no_modificado(request, etag, modificado):
+        return respuesta_no_modificado(cabeceras_validacion(etag, modificado))
+    
+    resultado, error = await gestor.obtener_capitulo_con_contenidos(capitulo_id, version)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    # Los validadores salen de lo que se sirve, no de la consulta de versión
+    capitulo, contenidos = resultado
+    response.headers.update(cabeceras_validacion(
+        *validadores_contenidos("capitulo_completo", capitulo_id, version_contenidos(capitulo, contenidos))
+    ))
+    respuesta = CapituloConContenidosResponse.model_validate(capitulo)
+    respuesta.contenidos = [ContenidoResponse.model_validate(c) for c in contenidos]
+    return respuesta
+
+
+@router.put("/{capitulo_id}", response_model=CapituloResponse,
+            dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def actualizar_capitulo(
     capitulo_id: str,
     capitulo_update: CapituloUpdate,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
 ):
     """
-    Actualizar un capítulo usando el GestorCapitulo
+    Actualizar un capítulo usando el GestorCapitulo.
+    Si se pasa a estado PUBLICADO se publica una versión para los lectores
+    (cabecera X-Version-Publicacion); si la publicación falla, el capítulo
+    vuelve a sus valores anteriores.
     """
-    gestor = GestorCapitulo(db, Capitulo)
+    gestor = GestorCapituloAsync(db, Capitulo, cache=cache)
     
     # Convertir a diccionario solo los campos proporcionados
     update_data = capitulo_update.model_dump(exclude_unset=True)
+    publica = update_data.get("estado") == "PUBLICADO"
+    
+    anteriores = None
+    if publica:
+        actual, _ = await gestor.obtener_capitulo_por_id(capitulo_id)
+        if actual is not None:
+            anteriores = {campo: getattr(actual, campo) for campo in update_data}
     
-    resultado, error = gestor.actualizar_capitulo(capitulo_id, update_data)
+    resultado, error = await gestor.actualizar_capitulo(capitulo_id, update_data)
     
     if error:
         raise HTTPException(
@@ -103,16 +292,27 @@ def actualizar_capitulo(
             detail=error
         )
     
+    if publica:
+        publicacion = await _publicar_o_deshacer(
+            db, capitulo_id, lambda: gestor.actualizar_capitulo(capitulo_id, anteriores)
+        )
+        response.headers["X-Version-Publicacion"] = str(publicacion["version"])
+    
     return resultado
 
 
-@router.delete("/{capitulo_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_capitulo(capitulo_id: str, db: Session = Depends(get_db)):
+@router.delete("/{capitulo_id}", status_code=status.HTTP_204_NO_CONTENT,
+               dependencies=[Depends(requiere_permiso("capitulo", "eliminar"))])
+async def eliminar_capitulo(
+    capitulo_id: str,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
     Eliminar un capítulo usando el GestorCapitulo
     """
-    gestor = GestorCapitulo(db, Capitulo)
-    exito, error = gestor.eliminar_capitulo(capitulo_id)
+    gestor = GestorCapituloAsync(db, Capitulo, cache=cache)
+    exito, error = await gestor.eliminar_capitulo(capitulo_id)
     
     if not exito:
         raise HTTPException(
@@ -121,3 +321,192 @@ def eliminar_capitulo(capitulo_id: str, db: Session = Depends(get_db)):
         )
     
     return None
+
+
+# ===== Versiones publicadas =====
+
+def _estado_error_publicacion(error: str) -> int:
+    if "no encontrad" in error:
+        return status.HTTP_404_NOT_FOUND
+    if "no está publicado" in error or "a la vez" in error:
+        return status.HTTP_409_CONFLICT
+    if error.startswith("Error al"):
+        return status.HTTP_500_INTERNAL_SERVER_ERROR
+    return status.HTTP_400_BAD_REQUEST
+
+
+async def _publicar(db: AsyncSession, capitulo_id: str) -> dict:
+    """Guarda una versión publicada del capítulo (ya en estado PUBLICADO)."""
+    publicacion, error = await GestorPublicacionAsync(db, MODELOS_PUBLICACION).publicar(capitulo_id)
+    
+    if error:
+        raise HTTPException(status_code=_estado_error_publicacion(error), detail=error)
+    
+    return publicacion
+
+
+async def _publicar_o_deshacer(
+    db: AsyncSession,
+    capitulo_id: str,
+    deshacer: Callable[[], Awaitable[Any]]
+) -> dict:
+    """
+    Publica un capítulo que se acaba de pasar a PUBLICADO. Si la publicación
+    falla, deshace ese cambio antes de propagar el error: el capítulo no queda
+    publicado sin una versión para los lectores.
+    """
+    try:
+        return await _publicar(db, capitulo_id)
+    except HTTPException:
+        await deshacer()
+        raise
+
+
+async def _respuesta_publicada(
+    request: Request,
+    gestor: GestorPublicacionAsync,
+    capitulo_id: str,
+    publicacion: dict,
+    cache_control: str
+) -> Response:
+    """
+    Respuesta con los bytes guardados de una versión publicada, en la
+    codificación que acepte el cliente. El ETag es débil porque el mismo
+    JSON viaja en gzip, Brotli o sin comprimir.
+    """
+    cabeceras = cabeceras_validacion(f'W/"{publicacion["huella"]}"', publicacion["fecha_publicacion"])
+    cabeceras["Cache-Control"] = cache_control
+    cabeceras["Vary"] = "Accept-Encoding"
+    cabeceras["X-Version-Publicacion"] = str(publicacion["version"])
+    if no_modificado(request, cabeceras["ETag"], publicacion["fecha_publicacion"]):
+        return respuesta_no_modificado(cabeceras)
+    
+    codificaciones = codificaciones_aceptadas(request.headers.get("accept-encoding"), CODIFICACIONES)
+    resultado, error = await gestor.obtener_cuerpo(capitulo_id, publicacion["version"], codificaciones)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    cuerpo, codificacion = resultado
+    if codificacion != "identity":
+        cabeceras["Content-Encoding"] = codificacion
+    return Response(content=cuerpo, media_type="application/json", headers=cabeceras)
+
+
+@router.get("/{capitulo_id}/publicado")
+async def leer_capitulo_publicado(
+    capitulo_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Versión publicada vigente del capítulo, para los lectores: el JSON de
+    /completo compilado al publicar, enviado tal cual (ya comprimido) sin
+    consultar los contenidos. 404 si el capítulo no está PUBLICADO o aún no
+    tiene versiones.
+    """
+    gestor = GestorPublicacionAsync(db, MODELOS_PUBLICACION)
+    publicacion, error = await gestor.obtener_publicacion(capitulo_id)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    return await _respuesta_publicada(request, gestor, capitulo_id, publicacion, "no-cache")
+
+
+@router.post("/{capitulo_id}/publicar", response_model=PublicacionResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def publicar_capitulo(
+    capitulo_id: str,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Publica (o republica) el capítulo: lo pasa a PUBLICADO si hace falta y
+    guarda una versión nueva con su contenido actual. Si nada cambió desde
+    la versión vigente responde 200 con ella. Si la publicación falla, el
+    capítulo vuelve a su estado anterior.
+    """
+    gestor_capitulo = GestorCapituloAsync(db, Capitulo, cache=cache)
+    capitulo, error = await gestor_capitulo.obtener_capitulo_por_id(capitulo_id)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    estado_anterior = capitulo.estado
+    if estado_anterior != "PUBLICADO":
+        _, error = await gestor_capitulo.cambiar_estado(capitulo_id, "PUBLICADO")
+        if error:
+            raise HTTPException(status_code=_estado_error_publicacion(error), detail=error)
+        publicacion = await _publicar_o_deshacer(
+            db, capitulo_id, lambda: gestor_capitulo.cambiar_estado(capitulo_id, estado_anterior)
+        )
+    else:
+        publicacion = await _publicar(db, capitulo_id)
+    if not publicacion["nueva"]:
+        response.status_code = status.HTTP_200_OK
+    return publicacion
+
+
+@router.get("/{capitulo_id}/publicaciones", response_model=List[VersionPublicadaResponse],
+            dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def listar_publicaciones(
+    capitulo_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Historial de versiones publicadas del capítulo, de la más reciente a la
+    más antigua, con el tamaño de cada codificación.
+    """
+    versiones, error = await GestorPublicacionAsync(db, MODELOS_PUBLICACION).listar_versiones(capitulo_id)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    return versiones
+
+
+@router.get("/{capitulo_id}/publicaciones/{version}",
+            dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def leer_publicacion(
+    capitulo_id: str,
+    version: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Una versión concreta del capítulo, aunque ya no sea la vigente (para
+    revisarla antes de restaurarla). Cacheable para siempre: no cambia.
+    """
+    gestor = GestorPublicacionAsync(db, MODELOS_PUBLICACION)
+    publicacion, error = await gestor.obtener_publicacion(capitulo_id, version)
+    
+    if error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
+    
+    return await _respuesta_publicada(request, gestor, capitulo_id, publicacion, CACHE_VERSION_PUBLICADA)
+
+
+@router.post("/{capitulo_id}/publicaciones/{version}/restaurar", response_model=PublicacionResponse,
+             status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def restaurar_publicacion(
+    capitulo_id: str,
+    version: int,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Vuelve a una versión anterior: los lectores pasan a recibir sus bytes
+    como una versión nueva (con 'origen' = la restaurada). El historial no
+    se reescribe.
+    """
+    publicacion, error = await GestorPublicacionAsync(db, MODELOS_PUBLICACION).restaurar_version(capitulo_id, version)
+    
+    if error:
+        raise HTTPException(status_code=_estado_error_publicacion(error), detail=error)
+    
+    if not publicacion["nueva"]:
+        response.status_code = status.HTTP_200_OK
+    return publicacion
@@ -2,19 +2,41 @@
 Router para endpoints de Contenidos (Texto, Imagen, Video, Objeto3D)
 Versión refactorizada: Usa el GestorContenido para toda la lógica de negocio
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List, Union
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+import asyncio
 import sys
 from pathlib import Path
 
 # Añadir el directorio padre al path para imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from api.dependencies import get_db
+from api.dependencies import (
+    get_db, get_cache, Cache, get_almacen, AlmacenMedios,
+    get_procesador_imagenes, ProcesadorImagenes, AsyncSessionLocal
+)
+from api.autorizacion import exigir_permiso, requiere_permiso
+from api.paginacion import cabeceras_paginacion
+from api.proyeccion import PATRON_VISTA, campos_pedidos, respuesta_parcial
+from api.routers.medios import trozos_de, guardar_medio
+from api.condicional import (
+    calcular_etag,
+    cabeceras_validacion,
+    no_modificado,
+    respuesta_no_modificado,
+    validadores_contenidos,
+)
 from api.schemas.contenido import (
     ContenidoCreate, 
     ContenidoResponse,
+    ContenidoParcialResponse,
+    ImportacionContenidos,
+    ImportacionResponse,
+    ReordenarContenidos,
+    MoverContenido,
+    OrdenCapituloResponse,
+    MovimientoResponse,
 )
 from db.contenido.models import (
     Contenido, 
@@ -28,18 +50,75 @@ from db.contenido.models import (
 
 # Importar el gestor
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_contenido"))
-from gestor_contenido import GestorContenido
+from gestor_contenido import GestorContenidoAsync, version_contenidos
 
 router = APIRouter(
     prefix="/contenidos",
     tags=["Contenidos"]
 )
 
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+# Campos de view=summary (selectores de contenido en la interfaz)
+CAMPOS_RESUMEN = ("id_contenido", "tipo", "tema")
 
-@router.post("/", response_model=ContenidoResponse, status_code=status.HTTP_201_CREATED)
-def crear_contenido(contenido: ContenidoCreate, db: Session = Depends(get_db)):
+
+async def generar_derivados(
+    procesador: ProcesadorImagenes,
+    id_contenido: str,
+    clave: str,
+    cache: Optional[Cache] = None
+) -> tuple:
     """
-    Crear un nuevo contenido (texto, imagen, video u objeto 3D) usando el GestorContenido
+    Genera las versiones responsive de la imagen 'clave' en el pool de
+    procesos y las guarda en el contenido. Abre su propia sesión: se llama
+    también como tarea de fondo, cuando la de la petición ya está cerrada.
+    """
+    derivados, error = await procesador.procesar_async(clave)
+    if error:
+        return None, error
+    async with AsyncSessionLocal() as db:
+        gestor = GestorContenidoAsync(db, MODELOS, cache=cache)
+        return await gestor.guardar_derivados(
+            id_contenido, derivados["ancho"], derivados["alto"], derivados["marcador"], derivados["derivados"]
+        )
+
+
+async def generar_derivados_en_segundo_plano(
+    procesador: ProcesadorImagenes,
+    id_contenido: str,
+    clave: str,
+    cache: Optional[Cache] = None
+) -> None:
+    """Tarea de fondo tras crear una imagen: el contenido ya existe sin derivados."""
+    _, error = await generar_derivados(procesador, id_contenido, clave, cache)
+    if error:
+        # La imagen se sirve igualmente con url_archivo; se puede reintentar con POST /{id}/derivados
+        print(f"⚠️  No se pudieron generar los derivados de {id_contenido}: {error}")
+
+
+@router.post("/", response_model=ContenidoResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("contenido", "crear"))])
+async def crear_contenido(
+    contenido: ContenidoCreate,
+    tareas: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache),
+    almacen: AlmacenMedios = Depends(get_almacen),
+    procesador: ProcesadorImagenes = Depends(get_procesador_imagenes)
+):
+    """
+    Crear un nuevo contenido (texto, imagen, video u objeto 3D) usando el GestorContenido.
+    Si es una imagen del almacén de medios, sus derivados se generan después
+    de responder.
     """
     modelos = {
         'Contenido': Contenido,
@@ -51,9 +130,9 @@ def crear_contenido(contenido: ContenidoCreate, db: Session = Depends(get_db)):
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
     
-    resultado, error = gestor.crear_contenido(
+    resultado, error = await gestor.crear_contenido(
         tipo=contenido.tipo,
         tema=contenido.tema,
         cuerpo_texto=contenido.cuerpo_texto,
@@ -68,20 +147,151 @@ def crear_contenido(contenido: ContenidoCreate, db: Session = Depends(get_db)):
             detail=error
         )
     
+    clave = almacen.clave_de_url(resultado.url_archivo) if resultado.tipo == "imagen" else None
+    if clave:
+        tareas.add_task(generar_derivados_en_segundo_plano, procesador, resultado.id_contenido, clave, cache)
+    
     return resultado
 
 
+@router.post("/subir", response_model=ContenidoResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("contenido", "crear"))])
+async def crear_contenido_con_archivo(
+    tareas: BackgroundTasks,
+    tipo: str = Form(..., description="imagen, video u objeto3d"),
+    tema: str = Form(..., min_length=1, max_length=100),
+    archivo: UploadFile = File(...),
+    formato: Optional[str] = Form(None, description="Por defecto, la extensión del archivo"),
+    duracion: Optional[float] = Form(None),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache),
+    almacen: AlmacenMedios = Depends(get_almacen),
+    procesador: ProcesadorImagenes = Depends(get_procesador_imagenes)
+):
+    """
+    Crear un contenido de imagen, video u objeto 3D subiendo su archivo
+    (multipart/form-data) en lugar de indicar url_archivo. El archivo se
+    guarda por trozos en el almacén de medios; si ya existía uno idéntico
+    se reutiliza. Los derivados de las imágenes se generan después de responder.
+    """
+    if tipo not in ("imagen", "video", "objeto3d"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Solo se pueden subir archivos para imagen, video u objeto3d, no para {tipo}"
+        )
+
+    medio = await guardar_medio(almacen, trozos_de(archivo), archivo.filename)
+
+    modelos = {
+        'Contenido': Contenido,
+        'Texto': Texto,
+        'Imagen': Imagen,
+        'Video': Video,
+        'Objeto3D': Objeto3D,
+        'Capitulo': Capitulo,
+        'UnionCapituloContenido': UnionCapituloContenido
+    }
+    
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    
+    resultado, error = await gestor.crear_contenido(
+        tipo=tipo,
+        tema=tema,
+        url_archivo=medio["url"],
+        formato=formato or Path(medio["clave"]).suffix.lstrip(".") or None,
+        duracion=duracion
+    )
+    
+    if error:
+        # Un archivo recién subido no lo usa ningún otro contenido
+        if not medio["duplicado"]:
+            await asyncio.to_thread(almacen.eliminar, medio["clave"])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    if tipo == "imagen":
+        tareas.add_task(generar_derivados_en_segundo_plano, procesador, resultado.id_contenido, medio["clave"], cache)
+    
+    return resultado
+
+
+@router.post("/importar", response_model=ImportacionResponse, status_code=status.HTTP_201_CREATED)
+async def importar_contenidos(
+    importacion: ImportacionContenidos,
+    id_usuario: str = Depends(requiere_permiso("contenido", "crear")),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Importar muchos bloques de contenido (y asignarlos a capítulos) en una sola
+    transacción. Si algún bloque no es válido no se crea ninguno.
+    Asignar bloques a capítulos exige además el permiso de /asignar.
+    """
+    asigna = importacion.id_capitulo is not None or any(
+        bloque.id_capitulo is not None or bloque.orden is not None for bloque in importacion.bloques
+    )
+    if asigna:
+        await exigir_permiso(id_usuario, "capitulo", "actualizar")
+    
+    modelos = {
+        'Contenido': Contenido,
+        'Texto': Texto,
+        'Imagen': Imagen,
+        'Video': Video,
+        'Objeto3D': Objeto3D,
+        'Capitulo': Capitulo,
+        'UnionCapituloContenido': UnionCapituloContenido
+    }
+    
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    
+    ids, error = await gestor.importar_contenidos(
+        [bloque.model_dump() for bloque in importacion.bloques],
+        id_capitulo=importacion.id_capitulo
+    )
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    return ImportacionResponse(total=len(ids), ids=ids)
+
+
 @router.get("/", response_model=List[ContenidoResponse])
-def listar_contenidos(
+async def listar_contenidos(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     tipo: str = None,
     tema: str = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = Query(None, pattern=PATRON_VISTA),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
 ):
     """
-    Listar todos los contenidos con filtros opcionales usando el GestorContenido
+    Listar todos los contenidos con filtros opcionales usando el GestorContenido.
+    Pagina por cursor sobre (fecha_creacion, id_contenido): la cabecera Link
+    (rel="next") y X-Next-Cursor indican la página siguiente.
+    'skip' se mantiene por compatibilidad.
+
+    - **fields**: campos a devolver, separados por comas (id_contenido va siempre)
+    - **view**: 'summary' devuelve solo id_contenido, tipo y tema (sin cuerpo_texto)
     """
+    campos, error = campos_pedidos(fields, view, ContenidoParcialResponse, CAMPOS_RESUMEN)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
     modelos = {
         'Contenido': Contenido,
         'Texto': Texto,
@@ -92,15 +302,45 @@ def listar_contenidos(
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    contenidos = gestor.listar_contenidos(skip=skip, limit=limit, tipo=tipo, tema=tema)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    
+    if skip and not cursor:
+        contenidos = await gestor.listar_contenidos(skip=skip, limit=limit, tipo=tipo, tema=tema, campos=campos)
+        if campos:
+            return respuesta_parcial(contenidos, campos, ContenidoParcialResponse)
+        return contenidos
+    
+    resultado, error = await gestor.listar_contenidos_por_cursor(
+        cursor=cursor, limit=limit, tipo=tipo, tema=tema, campos=campos
+    )
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    contenidos, siguiente_cursor = resultado
+    if campos:
+        return respuesta_parcial(
+            contenidos, campos, ContenidoParcialResponse,
+            headers=cabeceras_paginacion(request, siguiente_cursor)
+        )
+    response.headers.update(cabeceras_paginacion(request, siguiente_cursor))
     return contenidos
 
 
 @router.get("/{id_contenido}", response_model=ContenidoResponse)
-def obtener_contenido(id_contenido: str, db: Session = Depends(get_db)):
+async def obtener_contenido(
+    id_contenido: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
-    Obtener un contenido por su ID usando el GestorContenido
+    Obtener un contenido por su ID usando el GestorContenido.
+    Responde 304 a If-None-Match/If-Modified-Since sin cargar cuerpo_texto.
     """
     modelos = {
         'Contenido': Contenido,
@@ -112,8 +352,8 @@ def obtener_contenido(id_contenido: str, db: Session = Depends(get_db)):
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    contenido, error = gestor.obtener_contenido_por_id(id_contenido)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    modificado, error = await gestor.obtener_version_contenido(id_contenido)
     
     if error:
         raise HTTPException(
@@ -121,11 +361,70 @@ def obtener_contenido(id_contenido: str, db: Session = Depends(get_db)):
             detail=error
         )
     
+    etag = calcular_etag("contenido", id_contenido, modificado)
+    cabeceras = cabeceras_validacion(etag, modificado)
+    if no_modificado(request, etag, modificado):
+        return respuesta_no_modificado(cabeceras)
+    
+    contenido, error = await gestor.obtener_contenido_por_id(id_contenido)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    response.headers.update(cabeceras)
     return contenido
 
 
-@router.delete("/{id_contenido}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_contenido(id_contenido: str, db: Session = Depends(get_db)):
+@router.post("/{id_contenido}/derivados", response_model=ContenidoResponse,
+             dependencies=[Depends(requiere_permiso("contenido", "actualizar"))])
+async def regenerar_derivados(
+    id_contenido: str,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache),
+    almacen: AlmacenMedios = Depends(get_almacen),
+    procesador: ProcesadorImagenes = Depends(get_procesador_imagenes)
+):
+    """
+    (Re)generar las versiones responsive y el marcador de una imagen del
+    almacén de medios y esperar a que estén guardados.
+    """
+    gestor = GestorContenidoAsync(db, MODELOS, cache=cache)
+    contenido, error = await gestor.obtener_contenido_por_id(id_contenido)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    clave = almacen.clave_de_url(contenido.url_archivo) if contenido.tipo == "imagen" else None
+    if not clave:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El contenido {id_contenido} no es una imagen del almacén de medios"
+        )
+    
+    resultado, error = await generar_derivados(procesador, id_contenido, clave, cache)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR if error.startswith("Error al") else status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    return resultado
+
+
+@router.delete("/{id_contenido}", status_code=status.HTTP_204_NO_CONTENT,
+               dependencies=[Depends(requiere_permiso("contenido", "eliminar"))])
+async def eliminar_contenido(
+    id_contenido: str,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
     Eliminar un contenido usando el GestorContenido
     """
@@ -139,8 +438,8 @@ def eliminar_contenido(id_contenido: str, db: Session = Depends(get_db)):
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    exito, error = gestor.eliminar_contenido(id_contenido)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    exito, error = await gestor.eliminar_contenido(id_contenido)
     
     if not exito:
         raise HTTPException(
@@ -152,12 +451,14 @@ def eliminar_contenido(id_contenido: str, db: Session = Depends(get_db)):
 
 
 # Endpoints para asignar contenidos a capítulos
-@router.post("/asignar", status_code=status.HTTP_201_CREATED)
-def asignar_contenido_a_capitulo(
+@router.post("/asignar", status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def asignar_contenido_a_capitulo(
     id_capitulo: str,
     id_contenido: str,
     orden: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
 ):
     """
     Asignar un contenido a un capítulo con un orden específico usando el GestorContenido
@@ -172,8 +473,8 @@ def asignar_contenido_a_capitulo(
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    union, error = gestor.asignar_contenido_a_capitulo(id_capitulo, id_contenido, orden)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    union, error = await gestor.asignar_contenido_a_capitulo(id_capitulo, id_contenido, orden)
     
     if error:
         status_code = status.HTTP_404_NOT_FOUND if "no encontrado" in error else status.HTTP_400_BAD_REQUEST
@@ -189,9 +490,16 @@ def asignar_contenido_a_capitulo(
 
 
 @router.get("/capitulo/{id_capitulo}", response_model=List[ContenidoResponse])
-def listar_contenidos_de_capitulo(id_capitulo: str, db: Session = Depends(get_db)):
+async def listar_contenidos_de_capitulo(
+    id_capitulo: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
     """
-    Listar todos los contenidos de un capítulo específico, ordenados usando el GestorContenido
+    Listar todos los contenidos de un capítulo específico, ordenados usando el GestorContenido.
+    Responde 304 si las uniones y los contenidos del capítulo no cambiaron.
     """
     modelos = {
         'Contenido': Contenido,
@@ -203,8 +511,20 @@ def listar_contenidos_de_capitulo(id_capitulo: str, db: Session = Depends(get_db
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    contenidos, error = gestor.listar_contenidos_de_capitulo(id_capitulo)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    version, error = await gestor.obtener_version_contenidos_de_capitulo(id_capitulo)
+    
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error
+        )
+    
+    etag, modificado = validadores_contenidos("contenidos_capitulo", id_capitulo, version)
+    if no_modificado(request, etag, modificado):
+        return respuesta_no_modificado(cabeceras_validacion(etag, modificado))
+    
+    resultado, error = await gestor.obtener_capitulo_con_contenidos(id_capitulo, version)
     
     if error:
         raise HTTPException(
@@ -212,14 +532,79 @@ def listar_contenidos_de_capitulo(id_capitulo: str, db: Session = Depends(get_db
             detail=error
         )
     
+    # Los validadores salen de lo que se sirve, no de la consulta de versión
+    capitulo, contenidos = resultado
+    response.headers.update(cabeceras_validacion(
+        *validadores_contenidos("contenidos_capitulo", id_capitulo, version_contenidos(capitulo, contenidos))
+    ))
     return contenidos
 
 
-@router.delete("/desasignar/{id_capitulo}/{id_contenido}", status_code=status.HTTP_204_NO_CONTENT)
-def desasignar_contenido_de_capitulo(
+def _estado_error_orden(error: str) -> int:
+    if "no encontrado" in error:
+        return status.HTTP_404_NOT_FOUND
+    if "no coinciden" in error:
+        return status.HTTP_409_CONFLICT
+    if error.startswith("Error al"):
+        return status.HTTP_500_INTERNAL_SERVER_ERROR
+    return status.HTTP_400_BAD_REQUEST
+
+
+@router.put("/capitulo/{id_capitulo}/orden", response_model=OrdenCapituloResponse,
+            dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def reordenar_contenidos_de_capitulo(
+    id_capitulo: str,
+    reordenacion: ReordenarContenidos,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Aplicar un orden completo a los contenidos de un capítulo en una sola
+    transacción. 409 si la lista no coincide con los contenidos actuales
+    (otro editor asignó o quitó alguno).
+    """
+    gestor = GestorContenidoAsync(db, MODELOS, cache=cache)
+    ordenes, error = await gestor.reordenar_contenidos(id_capitulo, reordenacion.ids)
+    
+    if error:
+        raise HTTPException(status_code=_estado_error_orden(error), detail=error)
+    
+    return OrdenCapituloResponse(
+        id_capitulo=id_capitulo,
+        contenidos=[{"id_contenido": id_contenido, "orden": orden} for id_contenido, orden in ordenes]
+    )
+
+
+@router.post("/capitulo/{id_capitulo}/mover", response_model=MovimientoResponse,
+             dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def mover_contenido_de_capitulo(
+    id_capitulo: str,
+    movimiento: MoverContenido,
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Mover un contenido justo detrás de otro del mismo capítulo (o al
+    principio). Normalmente solo cambia el 'orden' del contenido movido.
+    """
+    gestor = GestorContenidoAsync(db, MODELOS, cache=cache)
+    resultado, error = await gestor.mover_contenido(
+        id_capitulo, movimiento.id_contenido, despues_de=movimiento.despues_de
+    )
+    
+    if error:
+        raise HTTPException(status_code=_estado_error_orden(error), detail=error)
+    
+    return resultado
+
+
+@router.delete("/desasignar/{id_capitulo}/{id_contenido}", status_code=status.HTTP_204_NO_CONTENT,
+               dependencies=[Depends(requiere_permiso("capitulo", "actualizar"))])
+async def desasignar_contenido_de_capitulo(
     id_capitulo: str,
     id_contenido: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
 ):
     """
     Desasignar un contenido de un capítulo usando el GestorContenido
@@ -234,8 +619,8 @@ def desasignar_contenido_de_capitulo(
         'UnionCapituloContenido': UnionCapituloContenido
     }
     
-    gestor = GestorContenido(db, modelos)
-    exito, error = gestor.desasignar_contenido_de_capitulo(id_capitulo, id_contenido)
+    gestor = GestorContenidoAsync(db, modelos, cache=cache)
+    exito, error = await gestor.desasignar_contenido_de_capitulo(id_capitulo, id_contenido)
     
     if not exito:
         raise HTTPException(
@@ -0,0 +1,220 @@
+"""
+Router para Evaluaciones
+Guardado continuo de respuestas (GestorRespuestas), calificación de intentos
+(GestorCalificacion) y estadísticas para docentes (GestorAnaliticaEvaluacion,
+leídas de las tablas de resumen)
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import asyncio
+import sys
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.dependencies import get_evaluaciones_db, AsyncEvaluacionesSessionLocal
+from api.schemas.evaluacion import (
+    GuardarRespuestas, GuardarRespuestasResponse, IntentoCalificadoResponse, RecalificacionResponse, EstadisticasEvaluacionResponse
+)
+from db.evaluaciones.models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta,
+    ResumenEvaluacion, ResumenTramo, ResumenPregunta, ResumenOpcion
+)
+
+# Importar los gestores
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_calificacion"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "analitica_evaluacion"))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "gestor_respuestas"))
+from gestor_calificacion import GestorCalificacionAsync
+from gestor_respuestas import GestorRespuestasAsync, buffer_respuestas
+from analitica_evaluacion import GestorAnaliticaEvaluacionAsync, instalar_resumen_incremental
+
+router = APIRouter(
+    prefix="/evaluaciones",
+    tags=["Evaluaciones"]
+)
+
+MODELOS = {
+    'Evaluacion': Evaluacion,
+    'Pregunta': Pregunta,
+    'Opcion': Opcion,
+    'Intento': Intento,
+    'Respuesta': Respuesta,
+    'ResumenEvaluacion': ResumenEvaluacion,
+    'ResumenTramo': ResumenTramo,
+    'ResumenPregunta': ResumenPregunta,
+    'ResumenOpcion': ResumenOpcion
+}
+
+# Los intentos que pasan a COMPLETADO actualizan el resumen en su misma transacción
+instalar_resumen_incremental(MODELOS)
+
+
+def _codigo_error(error: str) -> int:
+    if "no encontrad" in error:
+        return status.HTTP_404_NOT_FOUND
+    if "no está en progreso" in error:
+        return status.HTTP_409_CONFLICT
+    return status.HTTP_400_BAD_REQUEST
+
+
+def _intento_calificado(intento) -> IntentoCalificadoResponse:
+    return IntentoCalificadoResponse(
+        id_intento=intento.id_intento,
+        id_evaluacion=intento.id_evaluacion,
+        id_estudiante=intento.id_estudiante,
+        estado=intento.estado.value,
+        puntos_obtenidos=intento.puntos_obtenidos,
+        puntos_totales=intento.puntos_totales,
+        porcentaje=intento.porcentaje,
+        aprobado=intento.aprobado,
+        fecha_finalizacion=intento.fecha_finalizacion
+    )
+
+
+async def volcar_respuestas_pendientes(solo_vencidas: bool = False) -> tuple:
+    """Escribe las respuestas del buffer del proceso (todas o, si han vencido, las pendientes)."""
+    async with AsyncEvaluacionesSessionLocal() as db:
+        gestor = GestorRespuestasAsync(db, MODELOS)
+        return await (gestor.volcar_vencidos() if solo_vencidas else gestor.volcar())
+
+
+async def volcado_periodico():
+    """Tarea de fondo: vuelca el buffer aunque no lleguen más guardados."""
+    while True:
+        await asyncio.sleep(buffer_respuestas.intervalo_segundos)
+        # Si falla, las respuestas vuelven al buffer y se reintentan en la siguiente vuelta
+        await volcar_respuestas_pendientes(solo_vencidas=True)
+
+
+@router.put(
+    "/intentos/{id_intento}/respuestas",
+    response_model=GuardarRespuestasResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def guardar_respuestas(
+    id_intento: str,
+    datos: GuardarRespuestas,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Guardar un lote de respuestas de un intento en progreso.
+
+    Cada respuesta sustituye a la anterior de la misma pregunta. Se aceptan en
+    un buffer y se escriben en bloque (por tamaño, por tiempo o al entregar).
+    """
+    resultado, error = await GestorRespuestasAsync(db, MODELOS).guardar_respuestas(
+        id_intento,
+        [respuesta.model_dump() for respuesta in datos.respuestas],
+        datos.tiempo_transcurrido_segundos
+    )
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return resultado
+
+
+@router.post("/intentos/{id_intento}/entregar", response_model=IntentoCalificadoResponse)
+async def entregar_intento(
+    id_intento: str,
+    datos: Optional[GuardarRespuestas] = None,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Entregar un intento: guarda las últimas respuestas, vuelca las pendientes
+    y lo califica
+    """
+    _, error = await GestorRespuestasAsync(db, MODELOS).entregar(
+        id_intento,
+        [respuesta.model_dump() for respuesta in datos.respuestas] if datos else None,
+        datos.tiempo_transcurrido_segundos if datos else None
+    )
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    intento, error = await GestorCalificacionAsync(db, MODELOS).calificar_intento(id_intento)
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return _intento_calificado(intento)
+
+
+@router.post("/intentos/{id_intento}/calificar", response_model=IntentoCalificadoResponse)
+async def calificar_intento(
+    id_intento: str,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Calificar un intento (y darlo por finalizado si seguía en progreso)
+    """
+    # Las respuestas que sigan en el buffer deben contar en la nota
+    _, error = await GestorRespuestasAsync(db, MODELOS).volcar(id_intento)
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    gestor = GestorCalificacionAsync(db, MODELOS)
+    intento, error = await gestor.calificar_intento(id_intento)
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return _intento_calificado(intento)
+
+
+@router.post("/{id_evaluacion}/recalificar", response_model=RecalificacionResponse)
+async def recalificar_evaluacion(
+    id_evaluacion: str,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Recalificar todos los intentos completados tras cambiar la clave de respuestas
+    y reconstruir el resumen de estadísticas
+    """
+    intentos, error = await GestorCalificacionAsync(db, MODELOS).recalificar_evaluacion(id_evaluacion)
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    _, error = await GestorAnaliticaEvaluacionAsync(db, MODELOS).reconstruir_resumen(id_evaluacion)
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return RecalificacionResponse(id_evaluacion=id_evaluacion, intentos=intentos)
+
+
+@router.get("/{id_evaluacion}/estadisticas", response_model=EstadisticasEvaluacionResponse)
+async def obtener_estadisticas(
+    id_evaluacion: str,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Distribución de porcentajes, tasa de aprobación, dificultad y discriminación
+    por pregunta y frecuencia de cada opción (intentos completados)
+    """
+    estadisticas, error = await GestorAnaliticaEvaluacionAsync(db, MODELOS).obtener_estadisticas(id_evaluacion)
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return estadisticas
+
+
+@router.post("/{id_evaluacion}/estadisticas/reconstruir", response_model=RecalificacionResponse)
+async def reconstruir_estadisticas(
+    id_evaluacion: str,
+    db: AsyncSession = Depends(get_evaluaciones_db)
+):
+    """
+    Recalcular desde cero el resumen de estadísticas de una evaluación
+    """
+    intentos, error = await GestorAnaliticaEvaluacionAsync(db, MODELOS).reconstruir_resumen(id_evaluacion)
+
+    if error:
+        raise HTTPException(status_code=_codigo_error(error), detail=error)
+
+    return RecalificacionResponse(id_evaluacion=id_evaluacion, intentos=intentos)
@@ -0,0 +1,105 @@
+"""
+Router para Exportación e Importación del catálogo de contenido
+Vuelca capítulos, contenidos y uniones como NDJSON o CSV en streaming
+(opcionalmente en gzip) y carga un volcado por lotes.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import sys
+import tempfile
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.dependencies import AsyncSessionLocal, get_db, get_cache, Cache
+from api.autorizacion import requiere_permiso
+from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido
+
+# Importar el gestor
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "exportacion_contenido"))
+from exportacion_contenido import GestorExportacionAsync, TIPOS_MIME
+
+router = APIRouter(
+    prefix="/exportacion",
+    tags=["Exportación"]
+)
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+PATRON_FORMATO = "^(ndjson|csv)$"
+
+# El cuerpo de una importación se guarda en memoria hasta este tamaño y a partir de ahí en disco
+MAX_IMPORTACION_EN_MEMORIA = 8 * 1024 * 1024
+
+
+async def _volcado(formato: str, comprimir: bool):
+    """
+    Genera el volcado con su propia sesión: la respuesta se sigue enviando
+    cuando el endpoint ya ha devuelto, así que no puede usar la de get_db.
+    """
+    async with AsyncSessionLocal() as db:
+        async for bloque in GestorExportacionAsync(db, MODELOS).exportar(formato, comprimir):
+            yield bloque
+
+
+@router.get("/", dependencies=[Depends(requiere_permiso("contenido", "exportar"))])
+async def exportar_contenido(
+    formato: str = Query("ndjson", pattern=PATRON_FORMATO),
+    gzip: bool = False
+):
+    """
+    Exportar el catálogo completo (capítulos, contenidos y uniones) en streaming.
+
+    - **formato**: ndjson (un objeto JSON por línea) o csv
+    - **gzip**: comprimir el volcado sobre la marcha (archivo .gz)
+    """
+    nombre = f"contenido.{formato}"
+    tipo = TIPOS_MIME[formato]
+    if gzip:
+        nombre, tipo = f"{nombre}.gz", "application/gzip"
+
+    return StreamingResponse(
+        _volcado(formato, gzip),
+        media_type=tipo,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
+
+@router.post("/importar", status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("contenido", "importar"))])
+async def importar_contenido(
+    request: Request,
+    formato: str = Query("ndjson", pattern=PATRON_FORMATO),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[Cache] = Depends(get_cache)
+):
+    """
+    Importar un volcado generado por GET /exportacion/ (cuerpo de la petición,
+    en claro o en gzip). Se insertan todas las filas o ninguna.
+
+    Devuelve el número de filas insertadas por tabla.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=MAX_IMPORTACION_EN_MEMORIA) as archivo:
+        async for trozo in request.stream():
+            archivo.write(trozo)
+        archivo.seek(0)
+        totales, error = await GestorExportacionAsync(db, MODELOS).importar(archivo, formato)
+
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR if error.startswith("Error al") else status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+
+    # Los capítulos en caché no incluyen lo importado
+    if cache is not None:
+        cache.limpiar()
+
+    return totales
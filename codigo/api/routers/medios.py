@@ -0,0 +1,112 @@
+"""
+Router para Medios
+Subida por trozos de imágenes, vídeos y objetos 3D al almacén de medios
+(deduplicados por SHA-256) y, con el backend local, su descarga en /media
+con peticiones de rangos (206 Partial Content).
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, status
+from typing import Any, AsyncIterator, Dict, Optional
+import asyncio
+import mimetypes
+from datetime import datetime, timezone
+import sys
+from pathlib import Path
+
+# Añadir el directorio padre al path para imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.dependencies import get_almacen, AlmacenMedios
+from api.autorizacion import requiere_permiso
+from api.schemas.medio import MedioResponse
+from api.condicional import no_modificado, respuesta_no_modificado
+from api.rangos import RangoNoSatisfacible, RespuestaArchivo, fecha_http, interpretar_rango, rango_vigente
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "paquetes" / "almacen_medios"))
+from almacen_medios import AlmacenLocal, ArchivoDemasiadoGrande, TAMANO_TROZO
+
+router = APIRouter(
+    prefix="/medios",
+    tags=["Medios"]
+)
+
+# Descarga de los archivos del almacén local (fuera de /api: son las URLs públicas)
+archivos_router = APIRouter(
+    prefix="/media",
+    tags=["Medios"]
+)
+
+
+async def trozos_de(archivo: UploadFile) -> AsyncIterator[bytes]:
+    """Lee un archivo subido por trozos de TAMANO_TROZO."""
+    while trozo := await archivo.read(TAMANO_TROZO):
+        yield trozo
+
+
+async def guardar_medio(almacen: AlmacenMedios, flujo, nombre_archivo: Optional[str]) -> Dict[str, Any]:
+    """Guarda una subida en el almacén; 413 si supera el tamaño máximo."""
+    try:
+        return await almacen.guardar_async(flujo, nombre_archivo)
+    except ArchivoDemasiadoGrande as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+
+@router.post("/", response_model=MedioResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(requiere_permiso("contenido", "crear"))])
+async def subir_medio(
+    request: Request,
+    nombre: str = Query(..., min_length=1, max_length=255, description="Nombre del archivo (para la extensión)"),
+    almacen: AlmacenMedios = Depends(get_almacen)
+):
+    """
+    Subir un archivo como cuerpo de la petición, sin multipart: se escribe
+    por trozos a medida que llega. La URL devuelta sirve como url_archivo
+    al crear el contenido.
+    """
+    return await guardar_medio(almacen, request.stream(), nombre)
+
+
+@archivos_router.api_route("/{clave:path}", methods=["GET", "HEAD"])
+async def descargar_medio(
+    clave: str,
+    request: Request,
+    almacen: AlmacenMedios = Depends(get_almacen)
+):
+    """
+    Descargar un archivo del almacén local (con S3 las URLs apuntan al bucket).
+
+    Atiende Range de un solo rango con 206 Partial Content (416 si queda fuera
+    del archivo) y If-Range. El ETag es fuerte: la clave es el hash del
+    contenido, que no cambia nunca.
+    """
+    if not isinstance(almacen, AlmacenLocal):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medio no encontrado")
+    try:
+        ruta = almacen.ruta(clave)
+        estado = await asyncio.to_thread(ruta.stat)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Medio no encontrado")
+
+    etag = f'"{ruta.stem}"'
+    ultima_modificacion = fecha_http(estado.st_mtime)
+    cabeceras = {
+        "ETag": etag,
+        "Last-Modified": ultima_modificacion,
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if no_modificado(request, etag, datetime.fromtimestamp(estado.st_mtime, timezone.utc)):
+        return respuesta_no_modificado(cabeceras)
+
+    rango = None
+    if rango_vigente(request, etag, ultima_modificacion):
+        try:
+            rango = interpretar_rango(request.headers.get("range"), estado.st_size)
+        except RangoNoSatisfacible:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{estado.st_size}", "Accept-Ranges": "bytes"}
+            )
+
+    return RespuestaArchivo(
+        ruta, estado.st_size, rango, headers=cabeceras,
+        media_type=mimetypes.guess_type(ruta.name)[0]
+    )
@@ -1,13 +1,58 @@
 """
 Schemas Pydantic para validación de datos
 """
-from .capitulo import CapituloCreate, CapituloResponse, CapituloUpdate
-from .contenido import ContenidoCreate, ContenidoResponse
+from .capitulo import (
+    CapituloCreate, CapituloResponse, CapituloUpdate, CapituloConContenidosResponse,
+    CapituloParcialResponse, PublicacionResponse, VersionPublicadaResponse
+)
+from .contenido import (
+    ContenidoCreate, ContenidoResponse, ContenidoParcialResponse, DerivadoImagen,
+    BloqueImportacion, ImportacionContenidos, ImportacionResponse,
+    ReordenarContenidos, MoverContenido, PosicionContenido, OrdenCapituloResponse, MovimientoResponse
+)
+from .busqueda import ResultadoBusqueda, BusquedaResponse
+from .evaluacion import (
+    RespuestaEntrada, GuardarRespuestas, GuardarRespuestasResponse,
+    IntentoCalificadoResponse, RecalificacionResponse, TramoDistribucion,
+    OpcionEstadistica, PreguntaEstadistica, EstadisticasEvaluacionResponse
+)
+from .autenticacion import LoginRequest, RefrescarRequest, CerrarSesionRequest, TokensResponse
+from .medio import MedioResponse
 
 __all__ = [
     'CapituloCreate',
     'CapituloResponse',
     'CapituloUpdate',
+    'CapituloConContenidosResponse',
+    'CapituloParcialResponse',
+    'PublicacionResponse',
+    'VersionPublicadaResponse',
     'ContenidoCreate',
     'ContenidoResponse',
+    'ContenidoParcialResponse',
+    'DerivadoImagen',
+    'BloqueImportacion',
+    'ImportacionContenidos',
+    'ImportacionResponse',
+    'ReordenarContenidos',
+    'MoverContenido',
+    'PosicionContenido',
+    'OrdenCapituloResponse',
+    'MovimientoResponse',
+    'ResultadoBusqueda',
+    'BusquedaResponse',
+    'RespuestaEntrada',
+    'GuardarRespuestas',
+    'GuardarRespuestasResponse',
+    'IntentoCalificadoResponse',
+    'RecalificacionResponse',
+    'TramoDistribucion',
+    'OpcionEstadistica',
+    'PreguntaEstadistica',
+    'EstadisticasEvaluacionResponse',
+    'LoginRequest',
+    'RefrescarRequest',
+    'CerrarSesionRequest',
+    'TokensResponse',
+    'MedioResponse',
 ]
@@ -0,0 +1,30 @@
+"""
+Schemas para Autenticación (inicio de sesión y tokens)
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class LoginRequest(BaseModel):
+    """Credenciales del usuario"""
+    email: str = Field(..., min_length=3, max_length=255)
+    password: str = Field(..., min_length=1, max_length=128)
+
+
+class RefrescarRequest(BaseModel):
+    """Token de refresco a cambiar por un par nuevo"""
+    refresh_token: str
+
+
+class CerrarSesionRequest(BaseModel):
+    """Token de refresco a revocar junto con el de acceso (opcional)"""
+    refresh_token: Optional[str] = None
+
+
+class TokensResponse(BaseModel):
+    """Par de tokens emitido al iniciar sesión o refrescar"""
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int                 # Segundos de vigencia del token de acceso
+    id_usuario: str
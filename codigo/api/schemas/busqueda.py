@@ -0,0 +1,24 @@
+"""
+Schemas para Búsqueda
+"""
+from pydantic import BaseModel
+from typing import List, Optional, Literal
+
+
+class ResultadoBusqueda(BaseModel):
+    """Un capítulo o bloque de texto encontrado"""
+    tipo: Literal['capitulo', 'texto']
+    id: str
+    titulo: Optional[str] = None     # HTML escapado con los términos en <mark> (solo capítulos)
+    tema: str
+    fragmento: Optional[str] = None  # Extracto en HTML escapado con los términos en <mark>
+    puntuacion: float                # Relevancia (mayor es más relevante)
+
+
+class BusquedaResponse(BaseModel):
+    """Schema de respuesta de la búsqueda"""
+    consulta: str
+    total: int
+    limit: int
+    offset: int
+    resultados: List[ResultadoBusqueda]
@@ -2,9 +2,11 @@
 Schemas para Capítulo
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from .contenido import ContenidoResponse
+
 
 class CapituloBase(BaseModel):
     """Campos base de Capítulo"""
@@ -36,3 +38,44 @@ class CapituloResponse(CapituloBase):
     
     class Config:
         from_attributes = True  # Permite crear desde objetos ORM
+
+
+class CapituloParcialResponse(BaseModel):
+    """
+    Schema de respuesta de capítulo con solo los campos pedidos
+    (fields= / view=summary). Se serializa sin los campos no pedidos.
+    """
+    id_capitulo: str
+    titulo: Optional[str] = None
+    numero: Optional[int] = None
+    introduccion: Optional[str] = None
+    tema: Optional[str] = None
+    estado: Optional[str] = None
+    fecha_creacion: Optional[datetime] = None
+    fecha_modificacion: Optional[datetime] = None
+
+
+class CapituloConContenidosResponse(CapituloResponse):
+    """Schema de respuesta de capítulo con sus contenidos ordenados"""
+    contenidos: List[ContenidoResponse] = []
+
+
+class PublicacionResponse(BaseModel):
+    """Schema de respuesta de una versión publicada de un capítulo"""
+    version: int
+    fecha_publicacion: datetime
+    huella: str = Field(..., description="SHA-256 del JSON publicado")
+    origen: Optional[int] = Field(None, description="Versión restaurada, si es una vuelta atrás")
+    nueva: bool = Field(True, description="False si el capítulo no cambió y se devolvió la versión vigente")
+
+
+class VersionPublicadaResponse(BaseModel):
+    """Schema de una versión en el historial de publicaciones"""
+    version: int
+    fecha_publicacion: datetime
+    huella: str
+    origen: Optional[int] = None
+    tamano: int
+    tamano_gzip: int
+    tamano_br: Optional[int] = None
+    vigente: bool
@@ -2,7 +2,7 @@
 Schemas para Contenido
 """
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import datetime
 
 
@@ -21,6 +21,33 @@ class ContenidoCreate(ContenidoBase):
     duracion: Optional[float] = None    # Para video
 
 
+class BloqueImportacion(ContenidoCreate):
+    """Bloque de contenido dentro de una importación masiva"""
+    id_capitulo: Optional[str] = None   # Capítulo destino (si difiere del general)
+    orden: Optional[int] = None         # Si falta, se agrega al final del capítulo
+
+
+class ImportacionContenidos(BaseModel):
+    """Schema para importar muchos contenidos en una sola petición"""
+    id_capitulo: Optional[str] = Field(None, description="Capítulo destino de los bloques que no indican uno")
+    bloques: List[BloqueImportacion] = Field(..., min_length=1, max_length=10000)
+
+
+class ImportacionResponse(BaseModel):
+    """Schema de respuesta de una importación masiva"""
+    total: int
+    ids: List[str]
+
+
+class DerivadoImagen(BaseModel):
+    """Versión responsive de una imagen"""
+    ancho: int
+    alto: int
+    formato: str
+    url: str
+    tamano: int
+
+
 class ContenidoResponse(ContenidoBase):
     """Schema de respuesta de contenido"""
     id_contenido: str
@@ -28,8 +55,60 @@ class ContenidoResponse(ContenidoBase):
     url_archivo: Optional[str] = None
     formato: Optional[str] = None
     duracion: Optional[float] = None
+    ancho: Optional[int] = None                        # Para imagen, con derivados generados
+    alto: Optional[int] = None
+    marcador: Optional[str] = None
+    derivados: Optional[List[DerivadoImagen]] = None
     fecha_creacion: Optional[datetime] = None
     fecha_modificacion: Optional[datetime] = None
     
     class Config:
         from_attributes = True
+
+
+class ContenidoParcialResponse(BaseModel):
+    """
+    Schema de respuesta de contenido con solo los campos pedidos
+    (fields= / view=summary). Se serializa sin los campos no pedidos.
+    """
+    id_contenido: str
+    tipo: Optional[str] = None
+    tema: Optional[str] = None
+    cuerpo_texto: Optional[str] = None
+    url_archivo: Optional[str] = None
+    formato: Optional[str] = None
+    duracion: Optional[float] = None
+    ancho: Optional[int] = None
+    alto: Optional[int] = None
+    marcador: Optional[str] = None
+    derivados: Optional[List[DerivadoImagen]] = None
+    fecha_creacion: Optional[datetime] = None
+    fecha_modificacion: Optional[datetime] = None
+
+
+class ReordenarContenidos(BaseModel):
+    """Schema para aplicar un orden completo a los contenidos de un capítulo"""
+    ids: List[str] = Field(..., description="Todos los contenidos del capítulo, en el orden deseado")
+
+
+class MoverContenido(BaseModel):
+    """Schema para mover un contenido dentro de su capítulo"""
+    id_contenido: str
+    despues_de: Optional[str] = Field(None, description="Contenido que quedará delante (null: al principio)")
+
+
+class PosicionContenido(BaseModel):
+    """Posición de un contenido dentro de un capítulo"""
+    id_contenido: str
+    orden: int
+
+
+class OrdenCapituloResponse(BaseModel):
+    """Schema de respuesta de una reordenación"""
+    id_capitulo: str
+    contenidos: List[PosicionContenido]
+
+
+class MovimientoResponse(PosicionContenido):
+    """Schema de respuesta de un movimiento"""
+    renumerado: bool = Field(..., description="Si hubo que renumerar el capítulo por falta de hueco")
@@ -0,0 +1,87 @@
+"""
+Schemas para Evaluaciones (respuestas, calificación y estadísticas)
+"""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class RespuestaEntrada(BaseModel):
+    """Respuesta del estudiante a una pregunta (sustituye a la anterior)"""
+    id_pregunta: str
+    id_opcion_seleccionada: Optional[str] = None   # Opción múltiple / verdadero-falso
+    respuesta_texto: Optional[str] = None          # Respuesta corta / ensayo
+
+
+class GuardarRespuestas(BaseModel):
+    """Lote de respuestas de un intento en progreso"""
+    respuestas: List[RespuestaEntrada] = Field(default_factory=list, max_length=500)
+    tiempo_transcurrido_segundos: Optional[int] = Field(None, ge=0)
+
+
+class GuardarRespuestasResponse(BaseModel):
+    """Respuestas aceptadas en el buffer y escritas en el último volcado"""
+    id_intento: str
+    aceptadas: int
+    pendientes: int
+    volcadas: int
+
+
+class IntentoCalificadoResponse(BaseModel):
+    """Resultado de calificar un intento"""
+    id_intento: str
+    id_evaluacion: str
+    id_estudiante: str
+    estado: str
+    puntos_obtenidos: float
+    puntos_totales: float
+    porcentaje: float
+    aprobado: bool
+    fecha_finalizacion: Optional[datetime] = None
+
+
+class RecalificacionResponse(BaseModel):
+    """Intentos recalificados o contados al reconstruir el resumen"""
+    id_evaluacion: str
+    intentos: int
+
+
+class TramoDistribucion(BaseModel):
+    """Intentos cuyo porcentaje cae en [desde, hasta)"""
+    desde: float
+    hasta: float
+    intentos: int
+
+
+class OpcionEstadistica(BaseModel):
+    """Veces que se eligió una opción"""
+    id_opcion: str
+    texto: str
+    es_correcta: bool
+    selecciones: int
+    frecuencia: float                       # Sobre las respuestas a la pregunta
+
+
+class PreguntaEstadistica(BaseModel):
+    """Estadísticas de una pregunta"""
+    id_pregunta: str
+    orden: int
+    enunciado: str
+    tipo: str
+    respondidas: int
+    correctas: int
+    dificultad: Optional[float] = None      # Proporción de intentos que aciertan
+    discriminacion: Optional[float] = None  # Correlación punto-biserial con el porcentaje
+    opciones: List[OpcionEstadistica] = []
+
+
+class EstadisticasEvaluacionResponse(BaseModel):
+    """Estadísticas de los intentos completados de una evaluación"""
+    id_evaluacion: str
+    intentos: int
+    aprobados: int
+    tasa_aprobacion: Optional[float] = None
+    porcentaje_medio: Optional[float] = None
+    desviacion_tipica: Optional[float] = None
+    distribucion: List[TramoDistribucion]
+    preguntas: List[PreguntaEstadistica]
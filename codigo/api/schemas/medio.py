@@ -0,0 +1,14 @@
+"""
+Schemas para Medios (archivos de imágenes, vídeos y objetos 3D)
+"""
+from pydantic import BaseModel
+
+
+class MedioResponse(BaseModel):
+    """Archivo guardado en el almacén de medios"""
+    clave: str                      # <2 primeros caracteres del hash>/<sha256><extensión>
+    url: str
+    sha256: str
+    tamano: int                     # Bytes
+    tipo_mime: str
+    duplicado: bool                 # True si ya existía un archivo idéntico
@@ -0,0 +1,536 @@
+"""
+Benchmark de Carga de la API
+============================
+Siembra un volumen configurable de datos (capítulos × bloques × asignaciones)
+con los modelos de db.contenido.models y recorre todos los endpoints de
+api/routers/capitulos.py y api/routers/contenidos.py con clientes concurrentes.
+
+Por escenario informa latencia p50/p95/p99, peticiones por segundo y
+sentencias SQL por petición (leídas de /metrics). Los resultados se guardan
+como línea base en JSON y una ejecución posterior se compara contra ella:
+una regresión termina con código de salida 1.
+
+Funciona contra un archivo SQLite local propio; no necesita servicios externos.
+
+Uso (desde codigo/):
+    python -m benchmarks.carga --guardar benchmarks/baselines/base.json
+    python -m benchmarks.carga --comparar benchmarks/baselines/base.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RAIZ = Path(__file__).parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+# ===== Siembra de datos =====
+
+def sembrar(session, capitulos: int, bloques: int, asignaciones: int = 1) -> Dict[str, List[str]]:
+    """
+    Crea capítulos publicados, bloques de texto y sus asignaciones.
+
+    Args:
+        session: Sesión síncrona de SQLAlchemy
+        capitulos: Número de capítulos
+        bloques: Bloques de texto por capítulo
+        asignaciones: Capítulos a los que se asigna cada bloque (el suyo y los siguientes)
+
+    Returns:
+        Dict con los ids sembrados: 'capitulos' y 'contenidos'
+    """
+    from db.contenido.models import Capitulo, Texto, UnionCapituloContenido
+
+    ids_capitulos = [str(uuid.uuid4()) for _ in range(capitulos)]
+    ids_contenidos = []
+    uniones = []
+
+    for indice, id_capitulo in enumerate(ids_capitulos):
+        session.add(Capitulo(
+            id_capitulo=id_capitulo,
+            titulo=f"Capítulo {indice + 1}",
+            numero=indice + 1,
+            introduccion=f"Introducción del capítulo {indice + 1} sobre la célula y sus organelos. " * 5,
+            tema=f"Tema {indice % 10}",
+            estado="PUBLICADO"
+        ))
+
+    for indice, id_capitulo in enumerate(ids_capitulos):
+        for orden in range(bloques):
+            id_contenido = str(uuid.uuid4())
+            ids_contenidos.append(id_contenido)
+            session.add(Texto(
+                id_contenido=id_contenido,
+                tema=f"Tema {indice % 10}",
+                cuerpo_texto=f"Bloque {orden + 1} del capítulo {indice + 1}. " * 20
+            ))
+            for desplazamiento in range(min(asignaciones, capitulos)):
+                destino = ids_capitulos[(indice + desplazamiento) % capitulos]
+                uniones.append(UnionCapituloContenido(
+                    id_capitulo=destino,
+                    id_contenido=id_contenido,
+                    orden=desplazamiento * bloques + orden + 1
+                ))
+
+    session.flush()
+    session.add_all(uniones)
+    session.commit()
+
+    return {"capitulos": ids_capitulos, "contenidos": ids_contenidos}
+
+
+ID_USUARIO_BENCHMARK = "usr-benchmark"
+
+
+def sembrar_editor(session) -> Dict[str, str]:
+    """
+    Crea un usuario con permisos de escritura sobre capítulos y contenidos
+    (los escenarios de escritura los exigen).
+
+    Args:
+        session: Sesión síncrona de la BD de usuarios
+
+    Returns:
+        Cabeceras HTTP con un token de acceso del usuario
+    """
+    from api.autenticacion import firmador
+    from db.usuarios.models import Usuario, Rol, Permiso, TipoUsuario
+
+    rol = Rol(nombre="Editor benchmark", permisos=[
+        Permiso(nombre=f"{recurso}.{accion}", recurso=recurso, accion=accion)
+        for recurso in ("capitulo", "contenido")
+        for accion in ("crear", "actualizar", "eliminar")
+    ])
+    session.add(Usuario(
+        id_usuario=ID_USUARIO_BENCHMARK, email="benchmark@libro.local", password_hash="-",
+        nombre="Benchmark", apellido="Carga", tipo_usuario=TipoUsuario.DOCENTE, roles=[rol]
+    ))
+    session.commit()
+    return {"Authorization": f"Bearer {firmador.emitir(ID_USUARIO_BENCHMARK)['token']}"}
+
+
+# ===== Escenarios =====
+
+class Escenario:
+    """
+    Un endpoint a medir.
+
+    Attributes:
+        nombre: Identificador del escenario en el informe y la línea base
+        metodo: Método HTTP
+        ruta: Plantilla de ruta, tal como la etiqueta /metrics
+        peticion: Función (datos, i) -> (url, kwargs de httpx) para la petición i
+        estado: Código de estado esperado
+        al_responder: Función opcional (datos, respuesta) para guardar lo creado
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        metodo: str,
+        ruta: str,
+        peticion: Callable[[Dict[str, Any], int], Tuple[str, Dict[str, Any]]],
+        estado: int = 200,
+        al_responder: Optional[Callable[[Dict[str, Any], Any], None]] = None
+    ):
+        self.nombre = nombre
+        self.metodo = metodo
+        self.ruta = ruta
+        self.peticion = peticion
+        self.estado = estado
+        self.al_responder = al_responder
+
+
+def _ciclico(lista: List[str], i: int) -> str:
+    return lista[i % len(lista)]
+
+
+def _guardar(clave: str, campo: str) -> Callable[[Dict[str, Any], Any], None]:
+    def guardar(datos, respuesta):
+        datos.setdefault(clave, []).append(respuesta.json()[campo])
+    return guardar
+
+
+# Las lecturas van primero; las escrituras borran lo que ellas mismas crean
+ESCENARIOS = [
+    Escenario(
+        "listar_capitulos", "GET", "/api/capitulos/",
+        lambda d, i: ("/api/capitulos/", {"params": {"limit": 20}})
+    ),
+    Escenario(
+        "obtener_capitulo", "GET", "/api/capitulos/{capitulo_id}",
+        lambda d, i: (f"/api/capitulos/{_ciclico(d['capitulos'], i)}", {})
+    ),
+    Escenario(
+        "capitulo_completo", "GET", "/api/capitulos/{capitulo_id}/completo",
+        lambda d, i: (f"/api/capitulos/{_ciclico(d['capitulos'], i)}/completo", {})
+    ),
+    Escenario(
+        "listar_contenidos", "GET", "/api/contenidos/",
+        lambda d, i: ("/api/contenidos/", {"params": {"limit": 50}})
+    ),
+    Escenario(
+        "obtener_contenido", "GET", "/api/contenidos/{id_contenido}",
+        lambda d, i: (f"/api/contenidos/{_ciclico(d['contenidos'], i)}", {})
+    ),
+    Escenario(
+        "contenidos_de_capitulo", "GET", "/api/contenidos/capitulo/{id_capitulo}",
+        lambda d, i: (f"/api/contenidos/capitulo/{_ciclico(d['capitulos'], i)}", {})
+    ),
+    Escenario(
+        "crear_capitulo", "POST", "/api/capitulos/",
+        lambda d, i: ("/api/capitulos/", {"json": {
+            "titulo": f"Capítulo de carga {i}",
+            "numero": 1_000_000 + i,
+            "tema": "Carga",
+            "estado": "BORRADOR"
+        }}),
+        estado=201, al_responder=_guardar("capitulos_creados", "id_capitulo")
+    ),
+    Escenario(
+        "actualizar_capitulo", "PUT", "/api/capitulos/{capitulo_id}",
+        lambda d, i: (f"/api/capitulos/{_ciclico(d['capitulos'], i)}", {"json": {"titulo": f"Capítulo actualizado {i}"}})
+    ),
+    Escenario(
+        "eliminar_capitulo", "DELETE", "/api/capitulos/{capitulo_id}",
+        lambda d, i: (f"/api/capitulos/{d['capitulos_creados'][i]}", {}),
+        estado=204
+    ),
+    Escenario(
+        "crear_contenido", "POST", "/api/contenidos/",
+        lambda d, i: ("/api/contenidos/", {"json": {
+            "tipo": "texto",
+            "tema": "Carga",
+            "cuerpo_texto": f"Bloque de carga {i}"
+        }}),
+        estado=201, al_responder=_guardar("contenidos_creados", "id_contenido")
+    ),
+    Escenario(
+        "importar_contenidos", "POST", "/api/contenidos/importar",
+        lambda d, i: ("/api/contenidos/importar", {"json": {"bloques": [
+            {"tipo": "texto", "tema": "Carga", "cuerpo_texto": f"Importado {i}.{n}"}
+            for n in range(10)
+        ]}}),
+        estado=201
+    ),
+    Escenario(
+        "asignar_contenido", "POST", "/api/contenidos/asignar",
+        lambda d, i: ("/api/contenidos/asignar", {"params": {
+            "id_capitulo": _ciclico(d["capitulos"], i),
+            "id_contenido": d["contenidos_creados"][i],
+            "orden": 1_000_000 + i
+        }}),
+        estado=201
+    ),
+    Escenario(
+        "desasignar_contenido", "DELETE", "/api/contenidos/desasignar/{id_capitulo}/{id_contenido}",
+        lambda d, i: (f"/api/contenidos/desasignar/{_ciclico(d['capitulos'], i)}/{d['contenidos_creados'][i]}", {}),
+        estado=204
+    ),
+    Escenario(
+        "eliminar_contenido", "DELETE", "/api/contenidos/{id_contenido}",
+        lambda d, i: (f"/api/contenidos/{d['contenidos_creados'][i]}", {}),
+        estado=204
+    ),
+]
+
+
+# ===== Medición =====
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (p entre 0 y 100)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    rango = max(1, -(-len(ordenados) * p // 100))
+    return ordenados[int(rango) - 1]
+
+
+_LINEA_METRICA = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+_ETIQUETA = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def leer_sentencias(texto: str) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """
+    Extrae de /metrics la suma y el número de observaciones del histograma
+    libro_sql_sentencias_por_peticion por (método, ruta).
+    """
+    series: Dict[Tuple[str, str], List[float]] = {}
+    for linea in texto.splitlines():
+        coincidencia = _LINEA_METRICA.match(linea)
+        if not coincidencia or not coincidencia.group(1).startswith("libro_sql_sentencias_por_peticion_"):
+            continue
+        sufijo = coincidencia.group(1).rsplit("_", 1)[1]
+        if sufijo not in ("sum", "count"):
+            continue
+        etiquetas = dict(_ETIQUETA.findall(coincidencia.group(2)))
+        serie = series.setdefault((etiquetas["metodo"], etiquetas["ruta"]), [0.0, 0.0])
+        serie[0 if sufijo == "sum" else 1] = float(coincidencia.group(3))
+    return {clave: (suma, conteo) for clave, (suma, conteo) in series.items()}
+
+
+async def _medir_escenario(cliente, escenario: Escenario, datos: Dict[str, Any], peticiones: int, concurrencia: int) -> Dict[str, Any]:
+    latencias: List[float] = []
+    errores = 0
+    indices = itertools.count()
+
+    async def trabajador():
+        nonlocal errores
+        for i in indices:
+            if i >= peticiones:
+                return
+            try:
+                url, argumentos = escenario.peticion(datos, i)
+            except (IndexError, KeyError):
+                # Falta lo que debía crear un escenario anterior que falló
+                errores += 1
+                continue
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(escenario.metodo, url, **argumentos)
+            latencias.append(time.perf_counter() - inicio)
+            if respuesta.status_code != escenario.estado:
+                errores += 1
+            elif escenario.al_responder is not None:
+                escenario.al_responder(datos, respuesta)
+
+    antes = leer_sentencias((await cliente.get("/metrics")).text)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+    despues = leer_sentencias((await cliente.get("/metrics")).text)
+
+    clave = (escenario.metodo, escenario.ruta)
+    suma_antes, conteo_antes = antes.get(clave, (0.0, 0.0))
+    suma_despues, conteo_despues = despues.get(clave, (0.0, 0.0))
+    medidas = conteo_despues - conteo_antes
+
+    return {
+        "metodo": escenario.metodo,
+        "ruta": escenario.ruta,
+        "peticiones": len(latencias),
+        "errores": errores,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 3),
+        "media_ms": round(sum(latencias) / len(latencias) * 1000, 3) if latencias else 0.0,
+        "peticiones_por_segundo": round(len(latencias) / duracion, 2) if duracion else 0.0,
+        "consultas_por_peticion": round((suma_despues - suma_antes) / medidas, 2) if medidas else None,
+    }
+
+
+async def ejecutar(
+    app,
+    datos: Dict[str, Any],
+    peticiones: int = 200,
+    concurrencia: int = 8,
+    calentamiento: int = 5,
+    escenarios: Optional[List[Escenario]] = None,
+    cabeceras: Optional[Dict[str, str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Ejecuta los escenarios en orden contra la aplicación ASGI.
+
+    Args:
+        app: Aplicación FastAPI
+        datos: Ids sembrados (ver sembrar); se amplía con lo que crean los escenarios
+        peticiones: Peticiones por escenario
+        concurrencia: Clientes concurrentes
+        calentamiento: Peticiones previas, no medidas, de cada escenario de lectura
+        escenarios: Escenarios a ejecutar (por defecto, ESCENARIOS)
+        cabeceras: Cabeceras de todas las peticiones (identidad del usuario, ver sembrar_editor)
+
+    Returns:
+        Dict nombre de escenario -> resultados
+    """
+    import httpx
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", headers=cabeceras) as cliente:
+        for escenario in escenarios or ESCENARIOS:
+            if escenario.metodo == "GET":
+                for i in range(calentamiento):
+                    url, argumentos = escenario.peticion(datos, i)
+                    await cliente.request(escenario.metodo, url, **argumentos)
+            resultados[escenario.nombre] = await _medir_escenario(cliente, escenario, datos, peticiones, concurrencia)
+    return resultados
+
+
+# ===== Línea base =====
+
+def comparar(base: Dict[str, Any], actual: Dict[str, Any], tolerancia: float = 0.25) -> List[str]:
+    """
+    Compara una ejecución con la línea base.
+
+    La latencia p95 puede crecer y las peticiones por segundo bajar hasta la
+    tolerancia indicada (las medidas de tiempo tienen ruido). Las sentencias SQL
+    por petición son deterministas: cualquier aumento es una regresión (N+1).
+
+    Returns:
+        Lista de regresiones encontradas (vacía si no hay)
+    """
+    regresiones = []
+
+    if base.get("configuracion") != actual.get("configuracion"):
+        regresiones.append(
+            f"La configuración difiere de la línea base: {base.get('configuracion')} != {actual.get('configuracion')}"
+        )
+        return regresiones
+
+    for nombre, previo in base["escenarios"].items():
+        medido = actual["escenarios"].get(nombre)
+        if medido is None:
+            regresiones.append(f"{nombre}: escenario ausente")
+            continue
+
+        if medido["errores"] > previo["errores"]:
+            regresiones.append(f"{nombre}: errores {previo['errores']} -> {medido['errores']}")
+        if medido["p95_ms"] > previo["p95_ms"] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: p95 {previo['p95_ms']} ms -> {medido['p95_ms']} ms")
+        if medido["peticiones_por_segundo"] < previo["peticiones_por_segundo"] * (1 - tolerancia):
+            regresiones.append(
+                f"{nombre}: peticiones/s {previo['peticiones_por_segundo']} -> {medido['peticiones_por_segundo']}"
+            )
+        consultas_previas = previo.get("consultas_por_peticion")
+        consultas = medido.get("consultas_por_peticion")
+        if consultas_previas is not None and consultas is not None and consultas > consultas_previas + 0.5:
+            regresiones.append(f"{nombre}: consultas/petición {consultas_previas} -> {consultas}")
+
+    return regresiones
+
+
+def _imprimir(resultados: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'Escenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'pet/s':>10}{'SQL/pet':>9}{'errores':>9}")
+    for nombre, r in resultados.items():
+        consultas = "-" if r["consultas_por_peticion"] is None else r["consultas_por_peticion"]
+        print(
+            f"{nombre:<24}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}"
+            f"{r['peticiones_por_segundo']:>10}{consultas:>9}{r['errores']:>9}"
+        )
+
+
+# ===== Línea de comandos =====
+
+def _borrar_db(ruta_db: Path) -> None:
+    for sufijo in ("", "-wal", "-shm"):
+        archivo = ruta_db.with_name(ruta_db.name + sufijo)
+        if archivo.exists():
+            archivo.unlink()
+
+
+def _ruta_usuarios(ruta_db: Path) -> Path:
+    return ruta_db.with_name(f"{ruta_db.stem}_usuarios{ruta_db.suffix}")
+
+
+def _preparar_entorno(ruta_db: Path, con_cache: bool) -> None:
+    """La API debe leer estas variables antes de importarse."""
+    _borrar_db(ruta_db)
+    _borrar_db(_ruta_usuarios(ruta_db))
+    os.environ["TESTING"] = "false"
+    os.environ["USE_SQLITE"] = "false"
+    os.environ["DATABASE_URL_CONTENIDO"] = f"sqlite:///{ruta_db}"
+    os.environ["DATABASE_URL_USUARIOS"] = f"sqlite:///{_ruta_usuarios(ruta_db)}"
+    os.environ.pop("DATABASE_URL_CONTENIDO_ASYNC", None)
+    os.environ.pop("DATABASE_URL_USUARIOS_ASYNC", None)
+    if not con_cache:
+        os.environ["CACHE_BACKEND"] = "ninguno"
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de carga y latencia de la API")
+    parser.add_argument("--capitulos", type=int, default=100, help="Capítulos sembrados (100)")
+    parser.add_argument("--bloques", type=int, default=20, help="Bloques de texto por capítulo (20)")
+    parser.add_argument("--asignaciones", type=int, default=1, help="Capítulos a los que se asigna cada bloque (1)")
+    parser.add_argument("--peticiones", type=int, default=200, help="Peticiones por escenario (200)")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Clientes concurrentes (8)")
+    parser.add_argument("--calentamiento", type=int, default=5, help="Peticiones no medidas por lectura (5)")
+    parser.add_argument("--sin-cache", action="store_true", help="Desactivar la caché de lectura")
+    parser.add_argument("--db", type=Path, default=RAIZ / "data" / "benchmark.db", help="Archivo SQLite del benchmark")
+    parser.add_argument("--conservar", action="store_true", help="No borrar el archivo SQLite al terminar")
+    parser.add_argument("--guardar", type=Path, help="Guardar los resultados como línea base JSON")
+    parser.add_argument("--comparar", type=Path, help="Comparar con una línea base JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Empeoramiento admitido en latencia y pet/s (0.25)")
+    args = parser.parse_args(argumentos)
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    _preparar_entorno(args.db, con_cache=not args.sin_cache)
+
+    from api.main import app
+    from api.dependencies import SessionLocal, engine, UsuariosSessionLocal, usuarios_engine
+    from db.contenido.models import Capitulo
+    from db.usuarios.models import Usuario
+    from db.motores import registro
+
+    Capitulo.metadata.create_all(bind=engine)
+    Usuario.metadata.create_all(bind=usuarios_engine)
+
+    try:
+        print(f"🌱 Sembrando {args.capitulos} capítulos × {args.bloques} bloques × {args.asignaciones} asignaciones...")
+        session = SessionLocal()
+        try:
+            datos = sembrar(session, args.capitulos, args.bloques, args.asignaciones)
+        finally:
+            session.close()
+        session = UsuariosSessionLocal()
+        try:
+            cabeceras = sembrar_editor(session)
+        finally:
+            session.close()
+
+        print(f"🚀 {args.peticiones} peticiones por escenario, {args.concurrencia} clientes concurrentes\n")
+        resultados = asyncio.run(ejecutar(
+            app, datos,
+            peticiones=args.peticiones,
+            concurrencia=args.concurrencia,
+            calentamiento=args.calentamiento,
+            cabeceras=cabeceras
+        ))
+    finally:
+        registro.cerrar_todos()
+        if not args.conservar:
+            _borrar_db(args.db)
+            _borrar_db(_ruta_usuarios(args.db))
+
+    _imprimir(resultados)
+
+    ejecucion = {
+        "configuracion": {
+            "capitulos": args.capitulos,
+            "bloques": args.bloques,
+            "asignaciones": args.asignaciones,
+            "peticiones": args.peticiones,
+            "concurrencia": args.concurrencia,
+            "cache": not args.sin_cache,
+        },
+        "escenarios": resultados,
+    }
+
+    if args.guardar:
+        args.guardar.parent.mkdir(parents=True, exist_ok=True)
+        args.guardar.write_text(json.dumps(ejecucion, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Línea base guardada en {args.guardar}")
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        regresiones = comparar(base, ejecucion, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones frente a {args.comparar}:")
+            for regresion in regresiones:
+                print(f"   - {regresion}")
+            return 1
+        print(f"\n✅ Sin regresiones frente a {args.comparar}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Benchmark de Serialización de Respuestas
+========================================
+Mide cuánto cuesta convertir List[ContenidoResponse] en los bytes de la
+respuesta (N bloques de texto con cuerpo_texto completo) por cada camino
+que puede tomar FastAPI, y cuánto ocupan y tardan esos bytes comprimidos
+con los niveles de MiddlewareCompresion.
+
+Caminos de serialización (todos validan primero con el response_model):
+- jsonable_encoder: jsonable_encoder + json.dumps (JSONResponse sin response_model)
+- json.dumps: model_dump + json.dumps (response_class=JSONResponse)
+- orjson: model_dump + orjson.dumps (response_class=ORJSONResponse)
+- dump_json: TypeAdapter.dump_json de Pydantic, el que usa FastAPI con
+  response_model y la clase de respuesta por defecto (los endpoints de listado)
+
+No necesita base de datos ni servicios externos.
+
+Uso (desde codigo/):
+    python -m benchmarks.serializacion --bloques 1000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+RAIZ = Path(__file__).parent.parent
+sys.path.insert(0, str(RAIZ))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from api.compresion import CODIFICACIONES_AL_VUELO, _Compresor
+from api.schemas import ContenidoResponse
+
+try:
+    import orjson
+except ImportError:  # Opcional: sin él no se mide ese camino
+    orjson = None
+
+
+PARRAFO = (
+    "La célula es la unidad estructural y funcional de los seres vivos. "
+    "Su membrana plasmática regula el intercambio de sustancias con el medio. "
+)
+
+LISTA_CONTENIDOS = TypeAdapter(List[ContenidoResponse])
+
+
+def generar_bloques(bloques: int, parrafos: int = 20) -> List[Dict[str, Any]]:
+    """
+    Bloques de texto como los devuelve GestorContenido (diccionarios).
+
+    Args:
+        bloques: Número de bloques
+        parrafos: Repeticiones de PARRAFO en cada cuerpo_texto
+    """
+    ahora = datetime.now(timezone.utc)
+    return [
+        {
+            "id_contenido": str(uuid.uuid4()),
+            "tipo": "texto",
+            "tema": f"Tema {indice + 1}",
+            "cuerpo_texto": PARRAFO * parrafos,
+            "fecha_creacion": ahora,
+            "fecha_modificacion": ahora,
+        }
+        for indice in range(bloques)
+    ]
+
+
+def caminos() -> Dict[str, Callable[[Any], bytes]]:
+    """Funciones que convierten la lista ya validada en el cuerpo de la respuesta."""
+    resultado = {
+        "jsonable_encoder": lambda valor: json.dumps(
+            jsonable_encoder(valor), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8"),
+        "json.dumps": lambda valor: json.dumps(
+            LISTA_CONTENIDOS.dump_python(valor, mode="json"), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8"),
+    }
+    if orjson is not None:
+        resultado["orjson"] = lambda valor: orjson.dumps(LISTA_CONTENIDOS.dump_python(valor, mode="json"))
+    resultado["dump_json"] = LISTA_CONTENIDOS.dump_json
+    return resultado
+
+
+def _medir(funcion: Callable[[], Any], repeticiones: int) -> float:
+    """Mediana, en milisegundos, de 'repeticiones' llamadas (tras una de calentamiento)."""
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def medir_serializacion(datos: List[Dict[str, Any]], repeticiones: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Tiempo de validar y serializar 'datos' por cada camino.
+
+    Returns:
+        {camino: {'ms': mediana, 'bytes': tamaño del cuerpo}}
+    """
+    resultados = {}
+    for nombre, serializar in caminos().items():
+        def ciclo(serializar=serializar):
+            return serializar(LISTA_CONTENIDOS.validate_python(datos))
+        resultados[nombre] = {"ms": round(_medir(ciclo, repeticiones), 2), "bytes": len(ciclo())}
+    return resultados
+
+
+def medir_compresion(cuerpo: bytes, repeticiones: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Tamaño y tiempo de comprimir 'cuerpo' con cada codificación al vuelo.
+
+    Returns:
+        {codificacion: {'ms': mediana, 'bytes': tamaño comprimido}}
+    """
+    resultados = {"identity": {"ms": 0.0, "bytes": len(cuerpo)}}
+    for codificacion in CODIFICACIONES_AL_VUELO:
+        def ciclo(codificacion=codificacion):
+            return _Compresor(codificacion).todo(cuerpo)
+        resultados[codificacion] = {"ms": round(_medir(ciclo, repeticiones), 2), "bytes": len(ciclo())}
+    return resultados
+
+
+def _imprimir(titulo: str, resultados: Dict[str, Dict[str, float]], referencia: str) -> None:
+    """Tabla de resultados; la última columna compara tiempo o tamaño con 'referencia'."""
+    por_tamano = resultados[referencia]["ms"] == 0
+    columna = "tamaño" if por_tamano else "velocidad"
+    print(f"{titulo:<20}{'ms':>10}{'bytes':>12}{columna:>12}")
+    base = resultados[referencia]
+    for nombre, resultado in resultados.items():
+        if por_tamano:
+            factor = f"{resultado['bytes'] / base['bytes']:.1%}"
+        else:
+            factor = f"{base['ms'] / resultado['ms']:.1f}x"
+        print(f"{nombre:<20}{resultado['ms']:>10.2f}{resultado['bytes']:>12}{factor:>12}")
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de serialización y compresión de List[ContenidoResponse]")
+    parser.add_argument("--bloques", type=int, default=1000, help="Bloques de texto en la lista (1000)")
+    parser.add_argument("--parrafos", type=int, default=20, help="Párrafos por cuerpo_texto (20)")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Repeticiones medidas por camino (20)")
+    parser.add_argument("--guardar", type=Path, help="Guardar los resultados en JSON")
+    args = parser.parse_args(argumentos)
+
+    datos = generar_bloques(args.bloques, args.parrafos)
+    print(f"📦 {args.bloques} bloques de texto, {args.repeticiones} repeticiones por camino\n")
+
+    serializacion = medir_serializacion(datos, args.repeticiones)
+    _imprimir("Serialización", serializacion, "jsonable_encoder")
+
+    cuerpo = LISTA_CONTENIDOS.dump_json(LISTA_CONTENIDOS.validate_python(datos))
+    compresion = medir_compresion(cuerpo, args.repeticiones)
+    print()
+    _imprimir("Compresión", compresion, "identity")
+
+    if args.guardar:
+        args.guardar.parent.mkdir(parents=True, exist_ok=True)
+        args.guardar.write_text(json.dumps({
+            "configuracion": {"bloques": args.bloques, "parrafos": args.parrafos},
+            "serializacion": serializacion,
+            "compresion": compresion,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 Resultados guardados en {args.guardar}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
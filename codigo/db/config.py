@@ -2,13 +2,19 @@
 Configuración de Bases de Datos
 ================================
 Configuración de conexiones a las 3 bases de datos MySQL en AWS RDS.
+Los engines se obtienen del registro del proceso (db/motores.py), que
+configura los pools según las variables de entorno DB_*.
 """
 
 import os
-from sqlalchemy import create_engine
+import sys
+from pathlib import Path
 from sqlalchemy.orm import sessionmaker, declarative_base
 from typing import Optional
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from db.motores import obtener_motor
+
 
 class DatabaseConfig:
     """Configuración centralizada de las 3 bases de datos."""
@@ -69,12 +75,7 @@ def init_contenido_db(echo: bool = False):
     """Inicializa la base de datos de Contenido."""
     global contenido_engine, ContenidoSession
     
-    contenido_engine = create_engine(
-        DatabaseConfig.get_contenido_url(),
-        echo=echo,
-        pool_pre_ping=True,
-        pool_recycle=3600
-    )
+    contenido_engine = obtener_motor("contenido", DatabaseConfig.get_contenido_url(), echo=echo)
     ContenidoSession = sessionmaker(bind=contenido_engine)
     return contenido_engine
 
@@ -83,12 +84,7 @@ def init_usuarios_db(echo: bool = False):
     """Inicializa la base de datos de Usuarios."""
     global usuarios_engine, UsuariosSession
     
-    usuarios_engine = create_engine(
-        DatabaseConfig.get_usuarios_url(),
-        echo=echo,
-        pool_pre_ping=True,
-        pool_recycle=3600
-    )
+    usuarios_engine = obtener_motor("usuarios", DatabaseConfig.get_usuarios_url(), echo=echo)
     UsuariosSession = sessionmaker(bind=usuarios_engine)
     return usuarios_engine
 
@@ -97,12 +93,7 @@ def init_evaluaciones_db(echo: bool = False):
     """Inicializa la base de datos de Evaluaciones."""
     global evaluaciones_engine, EvaluacionesSession
     
-    evaluaciones_engine = create_engine(
-        DatabaseConfig.get_evaluaciones_url(),
-        echo=echo,
-        pool_pre_ping=True,
-        pool_recycle=3600
-    )
+    evaluaciones_engine = obtener_motor("evaluaciones", DatabaseConfig.get_evaluaciones_url(), echo=echo)
     EvaluacionesSession = sessionmaker(bind=evaluaciones_engine)
     return evaluaciones_engine
 
@@ -3,7 +3,7 @@ Paquete de Modelos de Base de Datos - Contenido
 ================================================
 """
 
-from .models import Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+from .models import Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido, PublicacionCapitulo
 
 __all__ = [
     'Contenido',
@@ -12,5 +12,6 @@ __all__ = [
     'Video',
     'Objeto3D',
     'Capitulo',
-    'UnionCapituloContenido'
+    'UnionCapituloContenido',
+    'PublicacionCapitulo'
 ]
@@ -1,11 +1,14 @@
 """
 Modelos SQLAlchemy para la Base de Datos de Contenido
 ======================================================
-Tablas: capitulos, contenidos, union_capitulo_contenido
+Tablas: capitulos, contenidos, union_capitulo_contenido, publicaciones_capitulo
 """
 
-from sqlalchemy import Column, String, Integer, Text, Float, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, String, Integer, Text, Float, JSON, LargeBinary, ForeignKey, Index, UniqueConstraint, DDL, event
+)
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from sqlalchemy import DateTime
 import uuid
@@ -34,6 +37,12 @@ class Capitulo(BaseContenido):
     
     # Relaciones
     uniones = relationship("UnionCapituloContenido", back_populates="capitulo", cascade="all, delete-orphan")
+    publicaciones = relationship("PublicacionCapitulo", back_populates="capitulo", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Búsqueda de texto completo en MySQL (en SQLite se usa FTS5, ver abajo)
+        Index('ft_capitulo', 'titulo', 'tema', 'introduccion', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     
     def __repr__(self):
         return f"<Capitulo(id={self.id_capitulo}, num={self.numero}, titulo='{self.titulo}')>"
@@ -59,6 +68,10 @@ class Contenido(BaseContenido):
     # Para Imagen
     url_archivo = Column(String(500), nullable=True)  # URL de S3
     formato = Column(String(20), nullable=True)
+    ancho = Column(Integer, nullable=True)  # Píxeles del original
+    alto = Column(Integer, nullable=True)
+    marcador = Column(Text, nullable=True)  # Miniatura desenfocada (data URI)
+    derivados = Column(JSON, nullable=True)  # [{ancho, alto, formato, url, tamano}]
     
     # Para Video
     duracion = Column(Float, nullable=True)  # En segundos
@@ -66,6 +79,13 @@ class Contenido(BaseContenido):
     # Relaciones
     uniones = relationship("UnionCapituloContenido", back_populates="contenido", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Paginación por cursor (keyset) ordenada por fecha de creación
+        Index('idx_contenido_fecha_id', 'fecha_creacion', 'id_contenido'),
+        # Búsqueda de texto completo en MySQL (en SQLite se usa FTS5, ver abajo)
+        Index('ft_contenido', 'tema', 'cuerpo_texto', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+    
     __mapper_args__ = {
         'polymorphic_on': tipo,
         'polymorphic_identity': 'contenido'
@@ -140,3 +160,152 @@ class UnionCapituloContenido(BaseContenido):
     
     def __repr__(self):
         return f"<UnionCapituloContenido(capitulo={self.id_capitulo}, contenido={self.id_contenido}, orden={self.orden})>"
+
+
+class PublicacionCapitulo(BaseContenido):
+    """
+    Tabla: publicaciones_capitulo
+    Versiones publicadas de un capítulo: el capítulo con sus contenidos ya
+    ordenados, serializado a JSON y comprimido (paquete publicacion_capitulos).
+    Las filas no se modifican nunca; la versión vigente es la de número mayor.
+    """
+    __tablename__ = 'publicaciones_capitulo'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    id_capitulo = Column(String(36), ForeignKey('capitulos.id_capitulo', ondelete='CASCADE'), nullable=False)
+    version = Column(Integer, nullable=False)
+    fecha_publicacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    huella = Column(String(64), nullable=False)  # SHA-256 del JSON
+    origen = Column(Integer, nullable=True)  # Versión restaurada, si es una vuelta atrás
+    
+    # Cuerpos precalculados; diferidos para no leerlos al listar versiones.
+    # En MySQL, BLOB se queda en 64 KB: LONGBLOB
+    cuerpo_json = deferred(Column(LargeBinary().with_variant(LONGBLOB, 'mysql'), nullable=False))
+    cuerpo_gzip = deferred(Column(LargeBinary().with_variant(LONGBLOB, 'mysql'), nullable=False))
+    cuerpo_br = deferred(Column(LargeBinary().with_variant(LONGBLOB, 'mysql'), nullable=True))  # Sin brotli, NULL
+    
+    # Relaciones
+    capitulo = relationship("Capitulo", back_populates="publicaciones")
+    
+    __table_args__ = (
+        # Dos publicaciones simultáneas no pueden obtener el mismo número
+        UniqueConstraint('id_capitulo', 'version', name='uq_publicacion_capitulo_version'),
+    )
+    
+    def __repr__(self):
+        return f"<PublicacionCapitulo(capitulo={self.id_capitulo}, version={self.version})>"
+
+
+# ============================================================================
+# Búsqueda de texto completo en SQLite (FTS5)
+# ============================================================================
+# Tablas FTS5 sobre capitulos y contenidos (solo bloques de texto),
+# sincronizadas con triggers: cualquier escritura (ORM, inserción masiva o SQL
+# directo) mantiene el índice al día.
+#
+# Las filas del índice no pueden usar el rowid de capitulos/contenidos: su clave
+# primaria es un UUID de texto, así que el rowid es implícito y VACUUM puede
+# renumerarlo. Cada tabla *_fts_claves asigna a cada UUID una clave INTEGER
+# PRIMARY KEY estable, que es el rowid de su fila en el índice.
+
+DDL_BUSQUEDA_CAPITULOS = [
+    """CREATE TABLE IF NOT EXISTS capitulos_fts_claves (
+        clave INTEGER PRIMARY KEY,
+        id_capitulo VARCHAR(36) NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS capitulos_fts USING fts5(
+        titulo, tema, introduccion,
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS capitulos_fts_ai AFTER INSERT ON capitulos BEGIN
+        INSERT OR IGNORE INTO capitulos_fts_claves(id_capitulo) VALUES (new.id_capitulo);
+        INSERT INTO capitulos_fts(rowid, titulo, tema, introduccion)
+        SELECT clave, new.titulo, new.tema, new.introduccion
+        FROM capitulos_fts_claves WHERE id_capitulo = new.id_capitulo;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS capitulos_fts_ad AFTER DELETE ON capitulos BEGIN
+        DELETE FROM capitulos_fts WHERE rowid = (
+            SELECT clave FROM capitulos_fts_claves WHERE id_capitulo = old.id_capitulo
+        );
+        DELETE FROM capitulos_fts_claves WHERE id_capitulo = old.id_capitulo;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS capitulos_fts_au AFTER UPDATE OF titulo, tema, introduccion ON capitulos BEGIN
+        UPDATE capitulos_fts SET titulo = new.titulo, tema = new.tema, introduccion = new.introduccion
+        WHERE rowid = (SELECT clave FROM capitulos_fts_claves WHERE id_capitulo = new.id_capitulo);
+    END""",
+]
+
+DDL_BUSQUEDA_CONTENIDOS = [
+    """CREATE TABLE IF NOT EXISTS contenidos_fts_claves (
+        clave INTEGER PRIMARY KEY,
+        id_contenido VARCHAR(36) NOT NULL UNIQUE
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contenidos_fts USING fts5(
+        tema, cuerpo_texto,
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS contenidos_fts_ai AFTER INSERT ON contenidos
+    WHEN new.tipo = 'texto' BEGIN
+        INSERT OR IGNORE INTO contenidos_fts_claves(id_contenido) VALUES (new.id_contenido);
+        INSERT INTO contenidos_fts(rowid, tema, cuerpo_texto)
+        SELECT clave, new.tema, new.cuerpo_texto
+        FROM contenidos_fts_claves WHERE id_contenido = new.id_contenido;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS contenidos_fts_ad AFTER DELETE ON contenidos BEGIN
+        DELETE FROM contenidos_fts WHERE rowid = (
+            SELECT clave FROM contenidos_fts_claves WHERE id_contenido = old.id_contenido
+        );
+        DELETE FROM contenidos_fts_claves WHERE id_contenido = old.id_contenido;
+    END""",
+    # Un solo trigger (quitar y volver a indexar) para no depender del orden
+    # en que SQLite dispara varios triggers del mismo evento
+    """CREATE TRIGGER IF NOT EXISTS contenidos_fts_au AFTER UPDATE OF tipo, tema, cuerpo_texto ON contenidos BEGIN
+        DELETE FROM contenidos_fts WHERE rowid = (
+            SELECT clave FROM contenidos_fts_claves WHERE id_contenido = old.id_contenido
+        );
+        INSERT OR IGNORE INTO contenidos_fts_claves(id_contenido)
+        SELECT new.id_contenido WHERE new.tipo = 'texto';
+        INSERT INTO contenidos_fts(rowid, tema, cuerpo_texto)
+        SELECT clave, new.tema, new.cuerpo_texto
+        FROM contenidos_fts_claves WHERE id_contenido = new.id_contenido AND new.tipo = 'texto';
+    END""",
+]
+
+# Índices creados por versiones anteriores (contenido externo sobre el rowid
+# implícito), que la migración elimina antes de crear los actuales
+SQL_ELIMINAR_BUSQUEDA = [
+    f"DROP TRIGGER IF EXISTS {trigger}"
+    for trigger in (
+        "capitulos_fts_ai", "capitulos_fts_ad", "capitulos_fts_au",
+        "contenidos_fts_ai", "contenidos_fts_ad", "contenidos_fts_au",
+        "contenidos_fts_au_borrar", "contenidos_fts_au_insertar",
+    )
+] + [
+    f"DROP TABLE IF EXISTS {tabla}"
+    for tabla in ("capitulos_fts", "capitulos_fts_claves", "contenidos_fts", "contenidos_fts_claves")
+]
+
+# Repoblar los índices desde las tablas (bases SQLite creadas antes del FTS5)
+SQL_RECONSTRUIR_BUSQUEDA = [
+    "DELETE FROM capitulos_fts",
+    "INSERT OR IGNORE INTO capitulos_fts_claves(id_capitulo) SELECT id_capitulo FROM capitulos",
+    """INSERT INTO capitulos_fts(rowid, titulo, tema, introduccion)
+    SELECT k.clave, c.titulo, c.tema, c.introduccion
+    FROM capitulos c JOIN capitulos_fts_claves k ON k.id_capitulo = c.id_capitulo""",
+    "DELETE FROM contenidos_fts",
+    """INSERT OR IGNORE INTO contenidos_fts_claves(id_contenido)
+    SELECT id_contenido FROM contenidos WHERE tipo = 'texto'""",
+    """INSERT INTO contenidos_fts(rowid, tema, cuerpo_texto)
+    SELECT k.clave, t.tema, t.cuerpo_texto
+    FROM contenidos t JOIN contenidos_fts_claves k ON k.id_contenido = t.id_contenido
+    WHERE t.tipo = 'texto'""",
+]
+
+for _tabla, _sentencias, _fts in (
+    (Capitulo.__table__, DDL_BUSQUEDA_CAPITULOS, 'capitulos_fts'),
+    (Contenido.__table__, DDL_BUSQUEDA_CONTENIDOS, 'contenidos_fts'),
+):
+    for _sentencia in _sentencias:
+        event.listen(_tabla, "after_create", DDL(_sentencia).execute_if(dialect='sqlite'))
+    for _eliminar in (_fts, f"{_fts}_claves"):
+        event.listen(_tabla, "before_drop", DDL(f"DROP TABLE IF EXISTS {_eliminar}").execute_if(dialect='sqlite'))
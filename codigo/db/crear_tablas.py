@@ -76,6 +76,7 @@ def create_evaluaciones_tables():
     print("  - opciones")
     print("  - intentos")
     print("  - respuestas")
+    print("  - resumen_evaluaciones, resumen_tramos, resumen_preguntas, resumen_opciones")
     print()
 
 
@@ -3,12 +3,19 @@ Paquete de Modelos de Base de Datos - Evaluaciones
 ===================================================
 """
 
-from .models import Evaluacion, Pregunta, Opcion, Intento, Respuesta
+from .models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta,
+    ResumenEvaluacion, ResumenTramo, ResumenPregunta, ResumenOpcion
+)
 
 __all__ = [
     'Evaluacion',
     'Pregunta',
     'Opcion',
     'Intento',
-    'Respuesta'
+    'Respuesta',
+    'ResumenEvaluacion',
+    'ResumenTramo',
+    'ResumenPregunta',
+    'ResumenOpcion'
 ]
@@ -2,9 +2,11 @@
 Modelos SQLAlchemy para la Base de Datos de Evaluaciones
 =========================================================
 Tablas: evaluaciones, preguntas, opciones, intentos, respuestas
+Resúmenes materializados: resumen_evaluaciones, resumen_tramos,
+resumen_preguntas, resumen_opciones
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Float, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Float, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -140,7 +142,7 @@ class Intento(BaseEvaluaciones):
     __tablename__ = 'intentos'
     
     id_intento = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), nullable=False)
+    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), nullable=False, index=True)
     id_estudiante = Column(String(36), nullable=False, index=True)  # Referencia a BD Usuarios
     
     # Estado del intento
@@ -195,5 +197,86 @@ class Respuesta(BaseEvaluaciones):
     intento = relationship("Intento", back_populates="respuestas")
     pregunta = relationship("Pregunta", back_populates="respuestas")
     
+    # Una respuesta por pregunta e intento: clave de los upserts del guardado
+    # continuo (gestor_respuestas); también sirve de índice por id_intento
+    __table_args__ = (
+        Index('uq_respuesta_intento_pregunta', 'id_intento', 'id_pregunta', unique=True),
+    )
+    
     def __repr__(self):
         return f"<Respuesta(id={self.id_respuesta}, correcta={self.es_correcta}, puntos={self.puntos_obtenidos})>"
+
+
+# ===== Resúmenes materializados =====
+# Se actualizan de forma incremental cuando un intento pasa a COMPLETADO
+# (paquete analitica_evaluacion), para que las estadísticas no recorran respuestas.
+
+class ResumenEvaluacion(BaseEvaluaciones):
+    """
+    Tabla: resumen_evaluaciones
+    Agregados de los intentos completados de una evaluación.
+    """
+    __tablename__ = 'resumen_evaluaciones'
+    
+    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), primary_key=True)
+    
+    intentos = Column(Integer, nullable=False, default=0)
+    aprobados = Column(Integer, nullable=False, default=0)
+    suma_porcentaje = Column(Float, nullable=False, default=0.0)
+    suma_porcentaje_cuadrado = Column(Float, nullable=False, default=0.0)  # Para la desviación típica
+    
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ResumenEvaluacion(evaluacion={self.id_evaluacion}, intentos={self.intentos}, aprobados={self.aprobados})>"
+
+
+class ResumenTramo(BaseEvaluaciones):
+    """
+    Tabla: resumen_tramos
+    Distribución de porcentajes por tramos de 10 puntos (0 = [0, 10), 9 = [90, 100]).
+    """
+    __tablename__ = 'resumen_tramos'
+    
+    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), primary_key=True)
+    tramo = Column(Integer, primary_key=True)
+    intentos = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ResumenTramo(evaluacion={self.id_evaluacion}, tramo={self.tramo}, intentos={self.intentos})>"
+
+
+class ResumenPregunta(BaseEvaluaciones):
+    """
+    Tabla: resumen_preguntas
+    Aciertos por pregunta. suma_porcentaje_correctas permite calcular la
+    discriminación (correlación punto-biserial) sin volver a leer respuestas.
+    """
+    __tablename__ = 'resumen_preguntas'
+    
+    id_pregunta = Column(String(36), ForeignKey('preguntas.id_pregunta', ondelete='CASCADE'), primary_key=True)
+    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), nullable=False, index=True)
+    
+    respondidas = Column(Integer, nullable=False, default=0)
+    correctas = Column(Integer, nullable=False, default=0)
+    suma_porcentaje_correctas = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<ResumenPregunta(pregunta={self.id_pregunta}, correctas={self.correctas}/{self.respondidas})>"
+
+
+class ResumenOpcion(BaseEvaluaciones):
+    """
+    Tabla: resumen_opciones
+    Veces que se eligió cada opción.
+    """
+    __tablename__ = 'resumen_opciones'
+    
+    id_opcion = Column(String(36), ForeignKey('opciones.id_opcion', ondelete='CASCADE'), primary_key=True)
+    id_pregunta = Column(String(36), ForeignKey('preguntas.id_pregunta', ondelete='CASCADE'), nullable=False)
+    id_evaluacion = Column(String(36), ForeignKey('evaluaciones.id_evaluacion', ondelete='CASCADE'), nullable=False, index=True)
+    
+    selecciones = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ResumenOpcion(opcion={self.id_opcion}, selecciones={self.selecciones})>"
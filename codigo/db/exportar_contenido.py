@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Exportar / importar el catálogo de contenido
+============================================
+Vuelca capítulos, contenidos y uniones de la BD de contenido (sesión de
+db/config.py) como NDJSON o CSV, en streaming, y carga un volcado por lotes.
+
+El formato y la compresión se deducen de la extensión del archivo
+(.ndjson, .csv, con .gz opcional) salvo que se indiquen.
+
+Uso:
+    python db/exportar_contenido.py exportar contenido.ndjson.gz
+    python db/exportar_contenido.py exportar --formato csv > contenido.csv
+    python db/exportar_contenido.py importar contenido.ndjson.gz
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "exportacion_contenido"))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from db.config import get_contenido_session
+from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido
+from exportacion_contenido import GestorExportacion, FORMATOS, TAMANO_LOTE
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+def _formato(archivo, formato) -> str:
+    """Formato indicado o, si no, el de la extensión del archivo (ndjson por defecto)."""
+    if formato:
+        return formato
+    if archivo and archivo.removesuffix(".gz").endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def exportar(args) -> int:
+    formato = _formato(args.archivo, args.formato)
+    comprimir = args.gzip or bool(args.archivo and args.archivo.endswith(".gz"))
+
+    sesion = get_contenido_session()
+    salida = open(args.archivo, "wb") if args.archivo else sys.stdout.buffer
+    try:
+        for bloque in GestorExportacion(sesion, MODELOS, args.lote).exportar(formato, comprimir):
+            salida.write(bloque)
+    finally:
+        if args.archivo:
+            salida.close()
+        sesion.close()
+
+    if args.archivo:
+        print(f"✅ Catálogo exportado en {args.archivo}", file=sys.stderr)
+    return 0
+
+
+def importar(args) -> int:
+    sesion = get_contenido_session()
+    try:
+        with open(args.archivo, "rb") as entrada:
+            totales, error = GestorExportacion(sesion, MODELOS, args.lote).importar(
+                entrada, _formato(args.archivo, args.formato)
+            )
+    finally:
+        sesion.close()
+
+    if error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+
+    for tabla, filas in totales.items():
+        print(f"✅ {tabla}: {filas} filas importadas", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta o importa el catálogo de contenido")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    exportar_parser = subparsers.add_parser("exportar", help="Vuelca el catálogo (por defecto a la salida estándar)")
+    exportar_parser.add_argument("archivo", nargs="?", help="Archivo de destino (.ndjson, .csv, con .gz opcional)")
+    exportar_parser.add_argument("--gzip", action="store_true", help="Comprimir aunque el archivo no acabe en .gz")
+    exportar_parser.set_defaults(funcion=exportar)
+
+    importar_parser = subparsers.add_parser("importar", help="Carga un volcado (gzip se detecta solo)")
+    importar_parser.add_argument("archivo", help="Volcado generado con 'exportar'")
+    importar_parser.set_defaults(funcion=importar)
+
+    for subparser in (exportar_parser, importar_parser):
+        subparser.add_argument("--formato", choices=FORMATOS, help="ndjson o csv (por defecto, según la extensión)")
+        subparser.add_argument("--lote", type=int, default=TAMANO_LOTE, help=f"Filas por lote (por defecto {TAMANO_LOTE})")
+
+    args = parser.parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Migración: Columnas de derivados de imagen en contenidos
+=========================================================
+Agrega ancho, alto, marcador y derivados (versiones responsive generadas
+por el paquete derivados_imagen) a la tabla contenidos.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect, text
+
+load_dotenv()
+
+COLUMNAS = [
+    ("ancho", "INTEGER NULL"),
+    ("alto", "INTEGER NULL"),
+    ("marcador", "TEXT NULL"),
+    ("derivados", "JSON NULL"),
+]
+
+
+def migrar_derivados_imagen():
+    """Agrega las columnas que falten a la tabla contenidos."""
+    
+    print("=" * 60)
+    print("  MIGRACIÓN: Derivados de imagen en contenidos")
+    print("=" * 60)
+    print()
+    
+    database_url = os.getenv("DATABASE_URL_CONTENIDO")
+    if not database_url:
+        print("❌ DATABASE_URL_CONTENIDO no está definida")
+        return False
+    
+    print(f"📦 Conectando a base de datos...")
+    
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+        existentes = {c["name"] for c in inspect(engine).get_columns("contenidos")}
+        pendientes = [(nombre, tipo) for nombre, tipo in COLUMNAS if nombre not in existentes]
+        
+        if not pendientes:
+            print("⚠️  Las columnas de derivados ya existen")
+            print("✅ No se requiere migración")
+            return True
+        
+        with engine.connect() as conn:
+            for nombre, tipo in pendientes:
+                print(f"➕ Agregando columna '{nombre}'...")
+                conn.execute(text(f"ALTER TABLE contenidos ADD COLUMN {nombre} {tipo}"))
+            conn.commit()
+            print("✅ Columnas agregadas exitosamente")
+        
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+        
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+    
+    if not migrar_derivados_imagen():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
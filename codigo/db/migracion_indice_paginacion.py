@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Migración: Índice para paginación por cursor de contenidos
+===========================================================
+Crea idx_contenido_fecha_id (fecha_creacion, id_contenido) en la tabla
+contenidos. La paginación de capítulos usa el índice único de 'numero'.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+load_dotenv()
+
+
+def migrar_indice_paginacion():
+    """Crea el índice de paginación si no existe."""
+    
+    print("=" * 60)
+    print("  MIGRACIÓN: Índice de paginación en contenidos")
+    print("=" * 60)
+    print()
+    
+    database_url = os.getenv("DATABASE_URL_CONTENIDO")
+    if not database_url:
+        print("❌ DATABASE_URL_CONTENIDO no está definida")
+        return False
+    
+    print(f"📦 Conectando a base de datos...")
+    
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+        
+        with engine.connect() as conn:
+            check_query = text("""
+                SELECT COUNT(*) as count
+                FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE()
+                AND TABLE_NAME = 'contenidos'
+                AND INDEX_NAME = 'idx_contenido_fecha_id'
+            """)
+            
+            if conn.execute(check_query).scalar():
+                print("⚠️  El índice idx_contenido_fecha_id ya existe")
+                print("✅ No se requiere migración")
+                return True
+            
+            print("🔍 Creando índice idx_contenido_fecha_id...")
+            conn.execute(text("""
+                CREATE INDEX idx_contenido_fecha_id
+                ON contenidos(fecha_creacion, id_contenido)
+            """))
+            conn.commit()
+            print("✅ Índice creado exitosamente")
+        
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+        
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+    
+    if not migrar_indice_paginacion():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
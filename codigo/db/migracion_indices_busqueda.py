@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Migración: Índices de búsqueda de texto completo
+=================================================
+- MySQL: crea los índices FULLTEXT ft_capitulo y ft_contenido.
+- SQLite: crea las tablas FTS5 y sus triggers (sustituyendo los de versiones
+  anteriores) y las repuebla con los datos existentes.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+from db.contenido.models import (
+    DDL_BUSQUEDA_CAPITULOS,
+    DDL_BUSQUEDA_CONTENIDOS,
+    SQL_ELIMINAR_BUSQUEDA,
+    SQL_RECONSTRUIR_BUSQUEDA,
+)
+
+load_dotenv()
+
+INDICES_FULLTEXT = {
+    "ft_capitulo": "CREATE FULLTEXT INDEX ft_capitulo ON capitulos(titulo, tema, introduccion)",
+    "ft_contenido": "CREATE FULLTEXT INDEX ft_contenido ON contenidos(tema, cuerpo_texto)",
+}
+
+
+def migrar_mysql(conn):
+    """Crea los índices FULLTEXT que falten."""
+    for nombre, sentencia in INDICES_FULLTEXT.items():
+        existe = conn.execute(text("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME = :nombre
+        """), {"nombre": nombre}).scalar()
+        
+        if existe:
+            print(f"⚠️  El índice {nombre} ya existe")
+            continue
+        
+        print(f"🔍 Creando índice {nombre}...")
+        conn.execute(text(sentencia))
+        print(f"✅ Índice {nombre} creado")
+
+
+def migrar_sqlite(conn):
+    """Crea las tablas FTS5 y sus triggers, y las repuebla."""
+    print("🧹 Eliminando índices FTS5 anteriores...")
+    for sentencia in SQL_ELIMINAR_BUSQUEDA:
+        conn.execute(text(sentencia))
+    
+    print("🔍 Creando tablas FTS5 y triggers...")
+    for sentencia in DDL_BUSQUEDA_CAPITULOS + DDL_BUSQUEDA_CONTENIDOS:
+        conn.execute(text(sentencia))
+    
+    print("📝 Indexando capítulos y bloques de texto existentes...")
+    for sentencia in SQL_RECONSTRUIR_BUSQUEDA:
+        conn.execute(text(sentencia))
+    print("✅ Índices FTS5 listos")
+
+
+def migrar_indices_busqueda():
+    """Aplica la migración según el motor de la base de contenido."""
+    
+    print("=" * 60)
+    print("  MIGRACIÓN: Índices de búsqueda de texto completo")
+    print("=" * 60)
+    print()
+    
+    database_url = os.getenv("DATABASE_URL_CONTENIDO")
+    if not database_url:
+        print("❌ DATABASE_URL_CONTENIDO no está definida")
+        return False
+    
+    print(f"📦 Conectando a base de datos...")
+    
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+        
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                migrar_sqlite(conn)
+            else:
+                migrar_mysql(conn)
+        
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+        
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+    
+    if not migrar_indices_busqueda():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
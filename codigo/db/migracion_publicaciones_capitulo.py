@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Migración: Versiones publicadas de capítulos
+============================================
+- Crea la tabla publicaciones_capitulo.
+- Publica la versión 1 de los capítulos que ya están en estado PUBLICADO,
+  para que /api/capitulos/{id}/publicado los sirva desde el principio.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "publicacion_capitulos"))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido, PublicacionCapitulo
+from publicacion_capitulos import GestorPublicacion
+
+load_dotenv()
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido,
+    'PublicacionCapitulo': PublicacionCapitulo
+}
+
+
+def migrar_publicaciones_capitulo():
+    """Crea la tabla de publicaciones y publica los capítulos ya publicados."""
+
+    print("=" * 60)
+    print("  MIGRACIÓN: Versiones publicadas de capítulos")
+    print("=" * 60)
+    print()
+
+    database_url = os.getenv("DATABASE_URL_CONTENIDO")
+    if not database_url:
+        print("❌ DATABASE_URL_CONTENIDO no está definida")
+        return False
+
+    print(f"📦 Conectando a base de datos...")
+
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+
+        print("📋 Creando tabla publicaciones_capitulo...")
+        PublicacionCapitulo.__table__.create(engine, checkfirst=True)
+
+        with Session(engine) as session:
+            gestor = GestorPublicacion(session, MODELOS)
+            ids = session.scalars(
+                select(Capitulo.id_capitulo).where(Capitulo.estado == "PUBLICADO")
+            ).all()
+            print(f"📝 Publicando {len(ids)} capítulos...")
+            for id_capitulo in ids:
+                publicacion, error = gestor.publicar(id_capitulo)
+                if error:
+                    raise RuntimeError(error)
+                estado = "nueva" if publicacion["nueva"] else "sin cambios"
+                print(f"   {id_capitulo}: versión {publicacion['version']} ({estado})")
+
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+
+    if not migrar_publicaciones_capitulo():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Migración: Una respuesta por pregunta e intento
+================================================
+- Elimina las respuestas duplicadas de un mismo (id_intento, id_pregunta),
+  conservando la más reciente.
+- Crea el índice único uq_respuesta_intento_pregunta, clave de los upserts
+  del guardado continuo de respuestas.
+- Elimina ix_respuestas_id_intento si existe (el índice único lo cubre).
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, delete, func, inspect, select, text
+
+from db.evaluaciones.models import Respuesta
+
+load_dotenv()
+
+INDICE_UNICO = "uq_respuesta_intento_pregunta"
+INDICE_REDUNDANTE = "ix_respuestas_id_intento"
+
+
+def eliminar_duplicados(conn):
+    """Deja una sola respuesta (la más reciente) por intento y pregunta."""
+    tabla = Respuesta.__table__
+    grupos = conn.execute(
+        select(tabla.c.id_intento, tabla.c.id_pregunta)
+        .group_by(tabla.c.id_intento, tabla.c.id_pregunta)
+        .having(func.count() > 1)
+    ).all()
+    if not grupos:
+        print("✅ No hay respuestas duplicadas")
+        return
+
+    print(f"🧹 Eliminando duplicados de {len(grupos)} preguntas...")
+    eliminadas = 0
+    for id_intento, id_pregunta in grupos:
+        ids = conn.execute(
+            select(tabla.c.id_respuesta)
+            .where(tabla.c.id_intento == id_intento, tabla.c.id_pregunta == id_pregunta)
+            .order_by(tabla.c.fecha_respuesta.desc(), tabla.c.id_respuesta.desc())
+        ).scalars().all()
+        conn.execute(delete(tabla).where(tabla.c.id_respuesta.in_(ids[1:])))
+        eliminadas += len(ids) - 1
+    print(f"✅ {eliminadas} respuestas duplicadas eliminadas")
+
+
+def migrar_respuestas_unicas():
+    """Crea el índice único sobre (id_intento, id_pregunta)."""
+
+    print("=" * 60)
+    print("  MIGRACIÓN: Una respuesta por pregunta e intento")
+    print("=" * 60)
+    print()
+
+    database_url = os.getenv("DATABASE_URL_EVALUACIONES")
+    if not database_url:
+        print("❌ DATABASE_URL_EVALUACIONES no está definida")
+        return False
+
+    print(f"📦 Conectando a base de datos...")
+
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+
+        with engine.begin() as conn:
+            existentes = {indice["name"] for indice in inspect(conn).get_indexes("respuestas")}
+
+            if INDICE_UNICO in existentes:
+                print(f"⚠️  El índice {INDICE_UNICO} ya existe")
+            else:
+                eliminar_duplicados(conn)
+                print(f"🔍 Creando índice {INDICE_UNICO}...")
+                indice = next(i for i in Respuesta.__table__.indexes if i.name == INDICE_UNICO)
+                indice.create(conn)
+                print(f"✅ Índice {INDICE_UNICO} creado")
+
+            if INDICE_REDUNDANTE in existentes:
+                print(f"🗑️  Eliminando índice {INDICE_REDUNDANTE}...")
+                if engine.dialect.name == "mysql":
+                    conn.execute(text(f"DROP INDEX {INDICE_REDUNDANTE} ON respuestas"))
+                else:
+                    conn.execute(text(f"DROP INDEX {INDICE_REDUNDANTE}"))
+                print(f"✅ Índice {INDICE_REDUNDANTE} eliminado")
+
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+
+    if not migrar_respuestas_unicas():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
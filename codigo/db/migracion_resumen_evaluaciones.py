@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Migración: Resumen de estadísticas de evaluaciones
+===================================================
+- Crea el índice de intentos.id_evaluacion (respuestas.id_intento lo cubre
+  uq_respuesta_intento_pregunta, ver migracion_respuestas_unicas.py).
+- Crea las tablas resumen_evaluaciones, resumen_tramos, resumen_preguntas y resumen_opciones.
+- Rellena el resumen de cada evaluación con los intentos ya completados.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "analitica_evaluacion"))
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+from db.evaluaciones.models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta,
+    ResumenEvaluacion, ResumenTramo, ResumenPregunta, ResumenOpcion
+)
+from analitica_evaluacion import GestorAnaliticaEvaluacion
+
+load_dotenv()
+
+MODELOS = {
+    'Evaluacion': Evaluacion,
+    'Pregunta': Pregunta,
+    'Opcion': Opcion,
+    'Intento': Intento,
+    'Respuesta': Respuesta,
+    'ResumenEvaluacion': ResumenEvaluacion,
+    'ResumenTramo': ResumenTramo,
+    'ResumenPregunta': ResumenPregunta,
+    'ResumenOpcion': ResumenOpcion
+}
+
+
+def crear_indices(conn):
+    """Crea los índices de intentos que recorre el resumen."""
+    tabla = Intento.__table__
+    existentes = {indice["name"] for indice in inspect(conn).get_indexes(tabla.name)}
+    for indice in tabla.indexes:
+        if indice.name in existentes:
+            print(f"⚠️  El índice {indice.name} ya existe")
+            continue
+        print(f"🔍 Creando índice {indice.name}...")
+        indice.create(conn)
+        print(f"✅ Índice {indice.name} creado")
+
+
+def migrar_resumen_evaluaciones():
+    """Crea las tablas de resumen y las rellena."""
+
+    print("=" * 60)
+    print("  MIGRACIÓN: Resumen de estadísticas de evaluaciones")
+    print("=" * 60)
+    print()
+
+    database_url = os.getenv("DATABASE_URL_EVALUACIONES")
+    if not database_url:
+        print("❌ DATABASE_URL_EVALUACIONES no está definida")
+        return False
+
+    print(f"📦 Conectando a base de datos...")
+
+    try:
+        engine = create_engine(database_url, pool_pre_ping=True)
+
+        with engine.begin() as conn:
+            crear_indices(conn)
+
+            print("📋 Creando tablas de resumen...")
+            for modelo in (ResumenEvaluacion, ResumenTramo, ResumenPregunta, ResumenOpcion):
+                modelo.__table__.create(conn, checkfirst=True)
+
+        with Session(engine) as session:
+            gestor = GestorAnaliticaEvaluacion(session, MODELOS)
+            ids = session.scalars(select(Evaluacion.id_evaluacion)).all()
+            print(f"📝 Calculando el resumen de {len(ids)} evaluaciones...")
+            for id_evaluacion in ids:
+                intentos, error = gestor.reconstruir_resumen(id_evaluacion)
+                if error:
+                    raise RuntimeError(error)
+                print(f"   {id_evaluacion}: {intentos} intentos")
+
+        print("\n" + "=" * 60)
+        print("  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE")
+        print("=" * 60)
+
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Error durante la migración: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    print()
+
+    if not migrar_resumen_evaluaciones():
+        print("\n❌ La migración falló. Revisa los errores arriba.")
+        sys.exit(1)
@@ -0,0 +1,303 @@
+"""
+Registro de Motores de Base de Datos
+====================================
+Un único engine (y su pool de conexiones) por base de datos y por proceso,
+compartido por la API, db/config.py y los scripts de mantenimiento.
+
+Configuración por variables de entorno. Cada clave admite un valor general
+(DB_POOL_SIZE) y uno por base de datos que tiene prioridad (DB_CONTENIDO_POOL_SIZE):
+
+    DB_POOL_SIZE            Conexiones permanentes del pool (5)
+    DB_MAX_OVERFLOW         Conexiones extra bajo carga (10)
+    DB_POOL_TIMEOUT         Segundos de espera por una conexión libre (30)
+    DB_POOL_RECYCLE         Segundos antes de reciclar una conexión (3600)
+    DB_POOL_PRE_PING        Validar cada conexión al tomarla del pool: true|false (true)
+    DB_STATEMENT_TIMEOUT_MS Límite por sentencia en MySQL (max_execution_time), 0 = sin límite
+    SQLITE_JOURNAL_MODE     WAL | DELETE | ... (WAL)
+    SQLITE_SYNCHRONOUS      OFF | NORMAL | FULL (NORMAL)
+    SQLITE_MMAP_SIZE        Bytes de E/S mapeada en memoria (268435456)
+    SQLITE_BUSY_TIMEOUT_MS  Espera ante bloqueos de escritura (5000)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class _PoolMedido:
+    """
+    Mezcla para pools con cola: mide cuánto espera cada petición de conexión
+    y cuántas agotan el tiempo de espera (pool exhausto).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estadisticas_espera = {
+            "peticiones": 0,
+            "espera_total_s": 0.0,
+            "espera_max_s": 0.0,
+            "timeouts": 0,
+        }
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.estadisticas_espera["timeouts"] += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            datos = self.estadisticas_espera
+            datos["peticiones"] += 1
+            datos["espera_total_s"] += espera
+            datos["espera_max_s"] = max(datos["espera_max_s"], espera)
+
+    def recreate(self):
+        nuevo = super().recreate()
+        nuevo.estadisticas_espera = self.estadisticas_espera
+        return nuevo
+
+
+class QueuePoolMedido(_PoolMedido, QueuePool):
+    """QueuePool con estadísticas de espera."""
+
+
+class AsyncAdaptedQueuePoolMedido(_PoolMedido, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool con estadísticas de espera."""
+
+
+def _entorno(nombre: str, clave: str, defecto: str) -> str:
+    """Lee DB_<NOMBRE>_<CLAVE>, luego DB_<CLAVE>, luego el valor por defecto."""
+    especifica = os.getenv(f"DB_{nombre.upper()}_{clave}")
+    if especifica is not None:
+        return especifica
+    return os.getenv(f"DB_{clave}", defecto)
+
+
+def configuracion_pool(nombre: str) -> Dict[str, Any]:
+    """
+    Parámetros del pool para la base de datos indicada, según el entorno.
+
+    Args:
+        nombre: Nombre lógico de la base de datos ('contenido', 'usuarios', ...)
+
+    Returns:
+        Dict con pool_size, max_overflow, pool_timeout, pool_recycle,
+        pool_pre_ping y statement_timeout_ms
+    """
+    return {
+        "pool_size": int(_entorno(nombre, "POOL_SIZE", "5")),
+        "max_overflow": int(_entorno(nombre, "MAX_OVERFLOW", "10")),
+        "pool_timeout": float(_entorno(nombre, "POOL_TIMEOUT", "30")),
+        "pool_recycle": int(_entorno(nombre, "POOL_RECYCLE", "3600")),
+        "pool_pre_ping": _entorno(nombre, "POOL_PRE_PING", "true").lower() == "true",
+        "statement_timeout_ms": int(_entorno(nombre, "STATEMENT_TIMEOUT_MS", "0")),
+    }
+
+
+def pragmas_sqlite() -> Dict[str, str]:
+    """PRAGMAs aplicados a cada conexión SQLite nueva."""
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", "268435456"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    }
+
+
+def _es_memoria(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+class RegistroMotores:
+    """
+    Registro de engines del proceso. Cada nombre lógico se crea una sola vez;
+    las siguientes llamadas devuelven el mismo engine y, por tanto, el mismo pool.
+
+    Attributes:
+        motores: Engines registrados por nombre
+    """
+
+    def __init__(self):
+        self.motores: Dict[str, Union[Engine, AsyncEngine]] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, nombre: str, url: str, echo: bool = False) -> Engine:
+        """
+        Devuelve el engine síncrono registrado con ese nombre, creándolo si no existe.
+
+        Args:
+            nombre: Nombre lógico ('contenido', 'usuarios', 'evaluaciones')
+            url: URL de conexión
+            echo: Mostrar el SQL emitido
+        """
+        return self._obtener(nombre, url, echo, asincrono=False)
+
+    def obtener_async(self, nombre: str, url: str, echo: bool = False) -> AsyncEngine:
+        """
+        Devuelve el engine asíncrono registrado con ese nombre, creándolo si no existe.
+        La configuración del pool es la de la base de datos 'nombre' sin el sufijo '_async'.
+        """
+        return self._obtener(nombre, url, echo, asincrono=True)
+
+    def _obtener(self, nombre: str, url: str, echo: bool, asincrono: bool):
+        with self._lock:
+            motor = self.motores.get(nombre)
+            if motor is not None:
+                if motor.url.render_as_string(hide_password=False) != make_url(url).render_as_string(hide_password=False):
+                    raise ValueError(f"El motor '{nombre}' ya está registrado con otra URL")
+                return motor
+
+            motor = self._crear(nombre, url, echo, asincrono)
+            self.motores[nombre] = motor
+            return motor
+
+    def _crear(self, nombre: str, url: str, echo: bool, asincrono: bool):
+        url_motor = make_url(url)
+        base = nombre[:-len("_async")] if nombre.endswith("_async") else nombre
+        config = configuracion_pool(base)
+        es_sqlite = url_motor.get_backend_name() == "sqlite"
+
+        argumentos: Dict[str, Any] = {"echo": echo, "pool_pre_ping": config["pool_pre_ping"]}
+        if es_sqlite and not asincrono:
+            argumentos["connect_args"] = {"check_same_thread": False}
+
+        # SQLite en memoria usa su propio pool de una sola conexión
+        if not _es_memoria(url_motor):
+            argumentos.update(
+                poolclass=AsyncAdaptedQueuePoolMedido if asincrono else QueuePoolMedido,
+                pool_size=config["pool_size"],
+                max_overflow=config["max_overflow"],
+                pool_timeout=config["pool_timeout"],
+                pool_recycle=config["pool_recycle"],
+            )
+
+        if asincrono:
+            motor = create_async_engine(url, **argumentos)
+            motor_sync = motor.sync_engine
+        else:
+            motor = motor_sync = create_engine(url, **argumentos)
+
+        if es_sqlite:
+            _instalar_pragmas(motor_sync, pragmas_sqlite())
+        elif url_motor.get_backend_name() == "mysql" and config["statement_timeout_ms"] > 0:
+            _instalar_timeout_mysql(motor_sync, config["statement_timeout_ms"])
+
+        _instalar_contadores(motor_sync)
+        return motor
+
+    def estadisticas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Estado y contadores del pool de cada engine registrado.
+
+        Returns:
+            Dict nombre -> {pool, tamaño, en_uso, libres, overflow, conexiones_creadas,
+            checkouts, invalidaciones, esperas (peticiones, espera media/máxima en ms, timeouts)}
+        """
+        return {nombre: _estadisticas_motor(motor) for nombre, motor in list(self.motores.items())}
+
+    def cerrar_todos(self) -> None:
+        """
+        Cierra las conexiones de los pools síncronos y vacía el registro.
+        Los pools asíncronos se descartan sin cerrar sus conexiones (cerrarlas
+        requiere el event loop que las creó; usar 'await motor.dispose()').
+        """
+        with self._lock:
+            for motor in self.motores.values():
+                if isinstance(motor, AsyncEngine):
+                    motor.sync_engine.dispose(close=False)
+                else:
+                    motor.dispose()
+            self.motores.clear()
+
+
+def _instalar_pragmas(motor: Engine, pragmas: Dict[str, str]) -> None:
+    """Aplica los PRAGMAs de SQLite a cada conexión nueva."""
+    @event.listens_for(motor, "connect")
+    def aplicar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, valor in pragmas.items():
+            if valor:
+                cursor.execute(f"PRAGMA {pragma}={valor}")
+        cursor.close()
+
+
+def _instalar_timeout_mysql(motor: Engine, milisegundos: int) -> None:
+    """Limita la duración de las consultas SELECT de cada conexión (MySQL 5.7+)."""
+    @event.listens_for(motor, "connect")
+    def aplicar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET SESSION max_execution_time = {int(milisegundos)}")
+        cursor.close()
+
+
+def _instalar_contadores(motor: Engine) -> None:
+    """Cuenta conexiones creadas, checkouts e invalidaciones del pool."""
+    contadores = {"conexiones_creadas": 0, "checkouts": 0, "invalidaciones": 0}
+    motor.contadores_pool = contadores
+
+    @event.listens_for(motor, "connect")
+    def al_conectar(dbapi_connection, connection_record):
+        contadores["conexiones_creadas"] += 1
+
+    @event.listens_for(motor, "checkout")
+    def al_tomar(dbapi_connection, connection_record, connection_proxy):
+        contadores["checkouts"] += 1
+
+    @event.listens_for(motor, "invalidate")
+    def al_invalidar(dbapi_connection, connection_record, exception):
+        contadores["invalidaciones"] += 1
+
+
+def _estadisticas_motor(motor: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    motor_sync = motor.sync_engine if isinstance(motor, AsyncEngine) else motor
+    pool = motor_sync.pool
+
+    datos: Dict[str, Any] = {
+        "dialecto": motor_sync.dialect.name,
+        "pool": type(pool).__name__,
+        **getattr(motor_sync, "contadores_pool", {}),
+    }
+
+    if isinstance(pool, QueuePool):
+        datos.update(
+            tamaño=pool.size(),
+            en_uso=pool.checkedout(),
+            libres=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+
+    espera: Optional[Dict[str, Any]] = getattr(pool, "estadisticas_espera", None)
+    if espera is not None:
+        peticiones = espera["peticiones"]
+        datos["esperas"] = {
+            "peticiones": peticiones,
+            "espera_media_ms": round(espera["espera_total_s"] * 1000 / peticiones, 3) if peticiones else 0.0,
+            "espera_max_ms": round(espera["espera_max_s"] * 1000, 3),
+            "timeouts": espera["timeouts"],
+        }
+
+    return datos
+
+
+# Registro compartido por todo el proceso
+registro = RegistroMotores()
+
+
+def obtener_motor(nombre: str, url: str, echo: bool = False) -> Engine:
+    """Atajo a registro.obtener."""
+    return registro.obtener(nombre, url, echo=echo)
+
+
+def obtener_motor_async(nombre: str, url: str, echo: bool = False) -> AsyncEngine:
+    """Atajo a registro.obtener_async."""
+    return registro.obtener_async(nombre, url, echo=echo)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Recalcular el progreso de los estudiantes
+=========================================
+Actualiza capitulos_completados, progreso_general y ultimo_capitulo_visto de
+la tabla estudiantes cruzando las tres bases de datos (sesiones de db/config.py,
+o las de la API en procesar_cola).
+
+Uso:
+    python db/recalcular_progreso.py                      # reconstrucción completa
+    python db/recalcular_progreso.py --estudiantes ID...  # solo esos estudiantes
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "progreso_estudiantes"))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from db.config import get_contenido_session, get_usuarios_session, get_evaluaciones_session
+from db.contenido.models import Capitulo
+from db.evaluaciones.models import Evaluacion, Intento
+from db.usuarios.models import Estudiante
+from progreso_estudiantes import GestorProgreso
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Evaluacion': Evaluacion,
+    'Intento': Intento,
+    'Estudiante': Estudiante
+}
+
+
+def _ejecutar(metodo: str, *args, sesion_contenido=get_contenido_session,
+              sesion_usuarios=get_usuarios_session, sesion_evaluaciones=get_evaluaciones_session) -> tuple:
+    """Abre las tres sesiones, llama al método de GestorProgreso y las cierra."""
+    contenido, usuarios, evaluaciones = sesion_contenido(), sesion_usuarios(), sesion_evaluaciones()
+    try:
+        return getattr(GestorProgreso(contenido, usuarios, evaluaciones, MODELOS), metodo)(*args)
+    finally:
+        contenido.close()
+        usuarios.close()
+        evaluaciones.close()
+
+
+def procesar_cola(sesion_contenido=get_contenido_session, sesion_usuarios=get_usuarios_session,
+                  sesion_evaluaciones=get_evaluaciones_session) -> tuple:
+    """
+    Recalcula los estudiantes encolados por instalar_progreso_incremental.
+    La API pasa sus propias fábricas de sesiones de las tres BD: sus motores
+    ya están registrados con las URLs de la API y los de db/config.py no
+    podrían registrarse con otras.
+    """
+    return _ejecutar(
+        'procesar_pendientes',
+        sesion_contenido=sesion_contenido, sesion_usuarios=sesion_usuarios,
+        sesion_evaluaciones=sesion_evaluaciones
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recalcula el progreso de los estudiantes")
+    parser.add_argument("--estudiantes", nargs="+", metavar="ID", help="IDs de Estudiante (por defecto, todos)")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("  PROGRESO DE ESTUDIANTES")
+    print("=" * 60)
+
+    if args.estudiantes:
+        resultado, error = _ejecutar('recalcular_estudiantes', args.estudiantes)
+    else:
+        resultado, error = _ejecutar('recalcular_todos')
+
+    if error:
+        print(f"❌ {error}")
+        return 1
+
+    print(f"✅ {resultado['estudiantes']} estudiantes revisados, {resultado['actualizados']} actualizados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
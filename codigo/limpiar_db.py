@@ -5,13 +5,13 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from db.motores import obtener_motor
 from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido
 
 # Conexión a la BD de desarrollo
 DATABASE_URL = "sqlite:///./data/contenido.db"
-engine = create_engine(DATABASE_URL)
+engine = obtener_motor("contenido", DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
 def limpiar_todo():
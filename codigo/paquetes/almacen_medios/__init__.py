@@ -0,0 +1,15 @@
+"""
+Paquete almacen_medios
+======================
+"""
+
+from .almacen_medios import (
+    AlmacenMedios, AlmacenLocal, AlmacenS3, ArchivoDemasiadoGrande,
+    crear_almacen_desde_entorno, normalizar_extension, clave_derivada, TAMANO_TROZO
+)
+
+__all__ = [
+    'AlmacenMedios', 'AlmacenLocal', 'AlmacenS3', 'ArchivoDemasiadoGrande',
+    'crear_almacen_desde_entorno', 'normalizar_extension', 'clave_derivada', 'TAMANO_TROZO'
+]
+__version__ = '0.1.0'
@@ -0,0 +1,358 @@
+"""
+Almacén de Medios
+=================
+Archivos de los contenidos (imágenes, vídeos, objetos 3D) con dos backends
+intercambiables:
+- AlmacenLocal: un directorio del disco (desarrollo y tests).
+- AlmacenS3: cualquier cliente compatible con S3 (head_object, upload_fileobj,
+  get_object, delete_object): AWS, MinIO, etc.
+
+Las subidas llegan por trozos y se escriben en un temporal mientras se
+calcula su SHA-256, así que un vídeo de varios GB nunca está entero en
+memoria. La clave final es el propio hash (direccionamiento por contenido):
+si ya existe un archivo con el mismo hash se descarta el temporal y se
+reutiliza el existente.
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, AsyncIterable, BinaryIO, Dict, Iterable, Optional
+
+
+# Tamaño de los trozos al leer una subida
+TAMANO_TROZO = 1024 * 1024
+
+# Clave de un archivo: dos primeros caracteres del hash / hash + extensión.
+# Los derivados (p. ej. versiones reducidas de una imagen) van junto al
+# original con un sufijo: ab/abcdef…-640w.webp
+PATRON_CLAVE = re.compile(r"[0-9a-f]{2}/[0-9a-f]{64}(-[a-z0-9]{1,16})?(\.[a-z0-9]{1,10})?")
+
+
+class ArchivoDemasiadoGrande(ValueError):
+    """La subida supera el tamaño máximo del almacén."""
+
+
+def normalizar_extension(nombre_archivo: Optional[str]) -> str:
+    """Extensión en minúsculas con punto ('' si no tiene o no es válida)."""
+    extension = Path(nombre_archivo or "").suffix.lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,10}", extension) else ""
+
+
+def clave_para(sha256: str, extension: str = "") -> str:
+    return f"{sha256[:2]}/{sha256}{extension}"
+
+
+def clave_derivada(clave: str, sufijo: str, extension: str) -> str:
+    """Clave de un archivo derivado de otro, junto a él: ab/abcdef….png -> ab/abcdef…-640w.webp"""
+    directorio, nombre = clave.split("/", 1)
+    return f"{directorio}/{nombre[:64]}-{sufijo}{extension}"
+
+
+class _Receptor:
+    """Escribe los trozos de una subida en un archivo temporal y calcula su hash."""
+
+    def __init__(self, archivo: BinaryIO, max_bytes: Optional[int]):
+        self.archivo = archivo
+        self.max_bytes = max_bytes
+        self.hash = hashlib.sha256()
+        self.tamano = 0
+
+    def escribir(self, trozo: bytes) -> None:
+        self.tamano += len(trozo)
+        if self.max_bytes is not None and self.tamano > self.max_bytes:
+            raise ArchivoDemasiadoGrande(f"El archivo supera el tamaño máximo de {self.max_bytes} bytes")
+        self.hash.update(trozo)
+        self.archivo.write(trozo)
+
+
+class AlmacenMedios:
+    """
+    Interfaz común de los backends de medios.
+
+    Attributes:
+        url_base: Prefijo de las URLs públicas de los archivos
+        max_bytes: Tamaño máximo de una subida (None: sin límite)
+    """
+
+    nombre_backend = "base"
+
+    def __init__(self, url_base: str, max_bytes: Optional[int] = None):
+        self.url_base = url_base.rstrip("/")
+        self.max_bytes = max_bytes
+
+    def url(self, clave: str) -> str:
+        """URL pública del archivo."""
+        return f"{self.url_base}/{clave}"
+
+    def clave_derivada(self, clave: str, sufijo: str, extension: str) -> str:
+        """Clave de un archivo derivado de 'clave' (ver clave_derivada)."""
+        return clave_derivada(clave, sufijo, extension)
+
+    def clave_de_url(self, url: Optional[str]) -> Optional[str]:
+        """Clave de un archivo de este almacén a partir de su URL (None si es externa)."""
+        if not url or not url.startswith(self.url_base + "/"):
+            return None
+        clave = url[len(self.url_base) + 1:]
+        return clave if PATRON_CLAVE.fullmatch(clave) else None
+
+    def guardar(self, flujo: Iterable[bytes], nombre_archivo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Guarda un archivo que llega por trozos.
+
+        Args:
+            flujo: Iterable de bytes (p. ej. iter(lambda: f.read(TAMANO_TROZO), b""))
+            nombre_archivo: Nombre original, solo para la extensión y el tipo MIME
+
+        Returns:
+            dict: clave, url, sha256, tamano, tipo_mime y duplicado (True si ya existía)
+
+        Raises:
+            ArchivoDemasiadoGrande: Si supera max_bytes
+        """
+        temporal = self._temporal()
+        try:
+            receptor = _Receptor(temporal, self.max_bytes)
+            for trozo in flujo:
+                receptor.escribir(trozo)
+            return self._confirmar(temporal, receptor, nombre_archivo)
+        finally:
+            self._descartar(temporal)
+
+    async def guardar_async(self, flujo: AsyncIterable[bytes], nombre_archivo: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Versión asíncrona de guardar(): la escritura en disco y la subida
+        final se hacen en el pool de hilos, fuera del event loop.
+        """
+        temporal = await asyncio.to_thread(self._temporal)
+        try:
+            receptor = _Receptor(temporal, self.max_bytes)
+            async for trozo in flujo:
+                await asyncio.to_thread(receptor.escribir, trozo)
+            return await asyncio.to_thread(self._confirmar, temporal, receptor, nombre_archivo)
+        finally:
+            await asyncio.to_thread(self._descartar, temporal)
+
+    def _confirmar(self, temporal: BinaryIO, receptor: _Receptor, nombre_archivo: Optional[str]) -> Dict[str, Any]:
+        sha256 = receptor.hash.hexdigest()
+        clave = clave_para(sha256, normalizar_extension(nombre_archivo))
+        tipo_mime = mimetypes.guess_type(nombre_archivo or clave)[0] or "application/octet-stream"
+        temporal.flush()
+        duplicado = self.existe(clave)
+        if not duplicado:
+            self._publicar(temporal, clave, tipo_mime)
+        return {
+            "clave": clave,
+            "url": self.url(clave),
+            "sha256": sha256,
+            "tamano": receptor.tamano,
+            "tipo_mime": tipo_mime,
+            "duplicado": duplicado,
+        }
+
+    def escribir(self, clave: str, datos: bytes, tipo_mime: Optional[str] = None) -> None:
+        """
+        Escribe un archivo pequeño ya en memoria con una clave dada
+        (derivados de otro archivo). Sustituye al que hubiera.
+        """
+        if not PATRON_CLAVE.fullmatch(clave):
+            raise ValueError(f"Clave de medio no válida: {clave}")
+        temporal = self._temporal()
+        try:
+            temporal.write(datos)
+            temporal.flush()
+            self._publicar(temporal, clave, tipo_mime or mimetypes.guess_type(clave)[0] or "application/octet-stream")
+        finally:
+            self._descartar(temporal)
+
+    # ----- Operaciones de cada backend -----
+
+    def existe(self, clave: str) -> bool:
+        raise NotImplementedError
+
+    def abrir(self, clave: str) -> BinaryIO:
+        """Abre el archivo para lectura (FileNotFoundError si no existe)."""
+        raise NotImplementedError
+
+    def eliminar(self, clave: str) -> bool:
+        raise NotImplementedError
+
+    def _temporal(self) -> BinaryIO:
+        raise NotImplementedError
+
+    def _publicar(self, temporal: BinaryIO, clave: str, tipo_mime: str) -> None:
+        raise NotImplementedError
+
+    def _descartar(self, temporal: BinaryIO) -> None:
+        temporal.close()
+
+
+class AlmacenLocal(AlmacenMedios):
+    """
+    Backend en un directorio local. Los temporales se crean en el mismo
+    sistema de archivos (directorio/.tmp) para publicarlos con un rename atómico.
+
+    Attributes:
+        directorio: Raíz del almacén
+    """
+
+    nombre_backend = "local"
+
+    def __init__(self, directorio, url_base: str = "/media", max_bytes: Optional[int] = None):
+        super().__init__(url_base, max_bytes)
+        self.directorio = Path(directorio)
+        (self.directorio / ".tmp").mkdir(parents=True, exist_ok=True)
+
+    def ruta(self, clave: str) -> Path:
+        """Ruta del archivo en disco (ValueError si la clave no es válida)."""
+        if not PATRON_CLAVE.fullmatch(clave):
+            raise ValueError(f"Clave de medio no válida: {clave}")
+        return self.directorio / clave
+
+    def existe(self, clave: str) -> bool:
+        return self.ruta(clave).is_file()
+
+    def abrir(self, clave: str) -> BinaryIO:
+        return open(self.ruta(clave), "rb")
+
+    def eliminar(self, clave: str) -> bool:
+        try:
+            self.ruta(clave).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _temporal(self) -> BinaryIO:
+        return tempfile.NamedTemporaryFile(dir=self.directorio / ".tmp", delete=False)
+
+    def _publicar(self, temporal: BinaryIO, clave: str, tipo_mime: str) -> None:
+        destino = self.ruta(clave)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporal.close()
+        os.replace(temporal.name, destino)
+
+    def _descartar(self, temporal: BinaryIO) -> None:
+        temporal.close()
+        try:
+            os.unlink(temporal.name)
+        except FileNotFoundError:
+            pass  # ya publicado
+
+
+class AlmacenS3(AlmacenMedios):
+    """
+    Backend compatible con S3. La subida se acumula en un temporal del disco
+    (no en memoria) y solo se envía si el hash no está ya en el bucket;
+    upload_fileobj la trocea en partes (multipart) si es grande.
+
+    Attributes:
+        cliente: Cliente con head_object, upload_fileobj, get_object y delete_object
+        bucket: Nombre del bucket
+        prefijo: Prefijo de las claves dentro del bucket
+    """
+
+    nombre_backend = "s3"
+
+    def __init__(self, cliente, bucket: str, url_base: str, prefijo: str = "", max_bytes: Optional[int] = None):
+        # Las URLs públicas incluyen el prefijo: url_base apunta a la raíz del bucket
+        self.prefijo = f"{prefijo.strip('/')}/" if prefijo.strip("/") else ""
+        super().__init__(url_base.rstrip("/") + "/" + self.prefijo, max_bytes)
+        self.cliente = cliente
+        self.bucket = bucket
+
+    @classmethod
+    def desde_entorno(cls, bucket: str, url_base: str, prefijo: str = "", endpoint: Optional[str] = None,
+                      region: Optional[str] = None, max_bytes: Optional[int] = None) -> "AlmacenS3":
+        """
+        Crea el almacén con un cliente de boto3 (credenciales de AWS_ACCESS_KEY_ID /
+        AWS_SECRET_ACCESS_KEY). Requiere el paquete 'boto3'; endpoint permite usar
+        un servicio compatible (MinIO, etc.).
+        """
+        import boto3
+        cliente = boto3.client("s3", endpoint_url=endpoint, region_name=region)
+        return cls(cliente, bucket, url_base, prefijo=prefijo, max_bytes=max_bytes)
+
+    def existe(self, clave: str) -> bool:
+        try:
+            self.cliente.head_object(Bucket=self.bucket, Key=self.prefijo + clave)
+            return True
+        except Exception as e:
+            if _codigo_error(e) in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def abrir(self, clave: str) -> BinaryIO:
+        try:
+            return self.cliente.get_object(Bucket=self.bucket, Key=self.prefijo + clave)["Body"]
+        except Exception as e:
+            if _codigo_error(e) in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(clave) from e
+            raise
+
+    def eliminar(self, clave: str) -> bool:
+        if not self.existe(clave):
+            return False
+        self.cliente.delete_object(Bucket=self.bucket, Key=self.prefijo + clave)
+        return True
+
+    def _temporal(self) -> BinaryIO:
+        return tempfile.TemporaryFile()
+
+    def _publicar(self, temporal: BinaryIO, clave: str, tipo_mime: str) -> None:
+        temporal.seek(0)
+        self.cliente.upload_fileobj(
+            temporal, self.bucket, self.prefijo + clave,
+            ExtraArgs={"ContentType": tipo_mime}
+        )
+
+
+def _codigo_error(error: Exception) -> Optional[str]:
+    """Código de un ClientError de botocore (sin importar botocore)."""
+    respuesta = getattr(error, "response", None)
+    if isinstance(respuesta, dict):
+        return str(respuesta.get("Error", {}).get("Code"))
+    return None
+
+
+def crear_almacen_desde_entorno(directorio_por_defecto) -> AlmacenMedios:
+    """
+    Construye el almacén de medios según las variables de entorno.
+
+    MEDIOS_BACKEND: 'local' (por defecto) o 's3'
+    MEDIOS_DIRECTORIO: raíz del almacén local (por defecto, directorio_por_defecto)
+    MEDIOS_URL_BASE: prefijo de las URLs (por defecto '/media' en local)
+    MEDIOS_MAX_MB: tamaño máximo de una subida (por defecto 2048)
+    MEDIOS_S3_BUCKET (o AWS_S3_BUCKET_NAME), MEDIOS_S3_PREFIJO, MEDIOS_S3_ENDPOINT:
+        bucket, prefijo de las claves y endpoint de un servicio compatible con S3
+    AWS_REGION: región del bucket
+
+    Returns:
+        Instancia de AlmacenMedios
+    """
+    backend = os.getenv("MEDIOS_BACKEND", "local").lower()
+    max_bytes = int(float(os.getenv("MEDIOS_MAX_MB", "2048")) * 1024 * 1024)
+
+    if backend == "local":
+        return AlmacenLocal(
+            os.getenv("MEDIOS_DIRECTORIO") or directorio_por_defecto,
+            url_base=os.getenv("MEDIOS_URL_BASE", "/media"),
+            max_bytes=max_bytes
+        )
+    if backend == "s3":
+        bucket = os.getenv("MEDIOS_S3_BUCKET") or os.getenv("AWS_S3_BUCKET_NAME")
+        if not bucket:
+            raise ValueError("MEDIOS_S3_BUCKET es obligatorio con MEDIOS_BACKEND=s3")
+        return AlmacenS3.desde_entorno(
+            bucket,
+            url_base=os.getenv("MEDIOS_URL_BASE", f"https://{bucket}.s3.amazonaws.com"),
+            prefijo=os.getenv("MEDIOS_S3_PREFIJO", ""),
+            endpoint=os.getenv("MEDIOS_S3_ENDPOINT") or None,
+            region=os.getenv("AWS_REGION") or None,
+            max_bytes=max_bytes
+        )
+
+    raise ValueError(f"MEDIOS_BACKEND no válido: {backend}")
@@ -0,0 +1,27 @@
+"""
+Setup para el paquete almacen_medios
+====================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-almacen-medios',
+    version='0.1.0',
+    description='Almacén de medios (disco local o S3) con subidas por trozos y deduplicación SHA-256',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[],
+    extras_require={
+        's3': ['boto3>=1.28.0'],
+    },
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
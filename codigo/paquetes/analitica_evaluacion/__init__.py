@@ -0,0 +1,11 @@
+"""
+Paquete analitica_evaluacion
+============================
+"""
+
+from .analitica_evaluacion import (
+    GestorAnaliticaEvaluacion, GestorAnaliticaEvaluacionAsync, instalar_resumen_incremental
+)
+
+__all__ = ['GestorAnaliticaEvaluacion', 'GestorAnaliticaEvaluacionAsync', 'instalar_resumen_incremental']
+__version__ = '0.1.0'
@@ -0,0 +1,428 @@
+"""
+Analítica de Evaluaciones
+=========================
+Estadísticas de los intentos completados de una evaluación: distribución de
+porcentajes, tasa de aprobación, dificultad y discriminación de cada pregunta
+y frecuencia de elección de cada opción.
+
+Las estadísticas se leen de tablas de resumen materializadas
+(resumen_evaluaciones, resumen_tramos, resumen_preguntas, resumen_opciones).
+Cuando un intento pasa a COMPLETADO se suman sus aportes con agregados SQL
+(GROUP BY) sobre sus propias respuestas; el panel nunca recorre la tabla
+respuestas completa. reconstruir_resumen recalcula una evaluación desde cero.
+
+La discriminación es la correlación punto-biserial entre acertar la pregunta
+y el porcentaje del intento; se obtiene de sumas que se pueden acumular
+(n, Σy, Σy², aciertos y Σy de los que aciertan).
+"""
+
+import math
+from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, delete, event, func, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Tramos de 10 puntos porcentuales; el último incluye el 100 %
+TRAMOS = 10
+
+
+def _insertar_o_sumar(conexion, tabla, filas: List[Dict[str, Any]], claves, sumar, reemplazar=()) -> None:
+    """
+    Inserta las filas o, si la clave ya existe, suma las columnas 'sumar'
+    y sobrescribe las de 'reemplazar' (upsert en una sola sentencia).
+    """
+    if not filas:
+        return
+
+    dialecto = conexion.dialect.name
+    if dialecto == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        sentencia = insert(tabla)
+        sentencia = sentencia.on_duplicate_key_update({
+            **{columna: tabla.c[columna] + sentencia.inserted[columna] for columna in sumar},
+            **{columna: sentencia.inserted[columna] for columna in reemplazar},
+        })
+    else:
+        if dialecto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        sentencia = insert(tabla)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={
+                **{columna: tabla.c[columna] + sentencia.excluded[columna] for columna in sumar},
+                **{columna: sentencia.excluded[columna] for columna in reemplazar},
+            }
+        )
+
+    conexion.execute(sentencia, filas)
+
+
+class GestorAnaliticaEvaluacion:
+    """
+    Gestor de las estadísticas de evaluaciones y de sus tablas de resumen.
+
+    Attributes:
+        db: Sesión de base de datos SQLAlchemy (BD de evaluaciones)
+    """
+
+    def __init__(self, db: Session, modelos: Dict):
+        """
+        Inicializa el gestor de analítica.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con las clases 'Evaluacion', 'Pregunta', 'Opcion', 'Intento',
+                'Respuesta', 'ResumenEvaluacion', 'ResumenTramo', 'ResumenPregunta' y 'ResumenOpcion'
+        """
+        self.db = db
+        self.Evaluacion = modelos['Evaluacion']
+        self.Pregunta = modelos['Pregunta']
+        self.Opcion = modelos['Opcion']
+        self.Intento = modelos['Intento']
+        self.Respuesta = modelos['Respuesta']
+        self.ResumenEvaluacion = modelos['ResumenEvaluacion']
+        self.ResumenTramo = modelos['ResumenTramo']
+        self.ResumenPregunta = modelos['ResumenPregunta']
+        self.ResumenOpcion = modelos['ResumenOpcion']
+
+    # ===== Agregados =====
+
+    def _agregados(self, conexion, filtro) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Calcula con GROUP BY los aportes de los intentos que cumplen 'filtro'
+        a cada tabla de resumen.
+        """
+        I, R, O = self.Intento, self.Respuesta, self.Opcion
+        porcentaje = func.coalesce(I.porcentaje, 0.0)
+        acierto = R.es_correcta.is_(True)
+        ahora = datetime.utcnow()
+
+        evaluaciones = [
+            {
+                "id_evaluacion": fila.id_evaluacion,
+                "intentos": fila.intentos,
+                "aprobados": fila.aprobados or 0,
+                "suma_porcentaje": fila.suma or 0.0,
+                "suma_porcentaje_cuadrado": fila.suma_cuadrado or 0.0,
+                "fecha_actualizacion": ahora,
+            }
+            for fila in conexion.execute(
+                select(
+                    I.id_evaluacion,
+                    func.count().label("intentos"),
+                    func.sum(case((I.aprobado.is_(True), 1), else_=0)).label("aprobados"),
+                    func.sum(porcentaje).label("suma"),
+                    func.sum(porcentaje * porcentaje).label("suma_cuadrado"),
+                ).where(filtro).group_by(I.id_evaluacion)
+            )
+        ]
+
+        tramo = case(
+            *((porcentaje < (indice + 1) * 100 / TRAMOS, indice) for indice in range(TRAMOS - 1)),
+            else_=TRAMOS - 1
+        ).label("tramo")
+        tramos = [
+            {"id_evaluacion": fila.id_evaluacion, "tramo": fila.tramo, "intentos": fila.intentos}
+            for fila in conexion.execute(
+                select(I.id_evaluacion, tramo, func.count().label("intentos"))
+                .where(filtro).group_by(I.id_evaluacion, tramo)
+            )
+        ]
+
+        preguntas = [
+            {
+                "id_pregunta": fila.id_pregunta,
+                "id_evaluacion": fila.id_evaluacion,
+                "respondidas": fila.respondidas,
+                "correctas": fila.correctas or 0,
+                "suma_porcentaje_correctas": fila.suma_correctas or 0.0,
+            }
+            for fila in conexion.execute(
+                select(
+                    I.id_evaluacion,
+                    R.id_pregunta,
+                    func.count().label("respondidas"),
+                    func.sum(case((acierto, 1), else_=0)).label("correctas"),
+                    func.sum(case((acierto, porcentaje), else_=0.0)).label("suma_correctas"),
+                )
+                .join(I, I.id_intento == R.id_intento)
+                .where(filtro)
+                .group_by(I.id_evaluacion, R.id_pregunta)
+            )
+        ]
+
+        opciones = [
+            {
+                "id_opcion": fila.id_opcion,
+                "id_pregunta": fila.id_pregunta,
+                "id_evaluacion": fila.id_evaluacion,
+                "selecciones": fila.selecciones,
+            }
+            for fila in conexion.execute(
+                select(I.id_evaluacion, O.id_pregunta, O.id_opcion, func.count().label("selecciones"))
+                .select_from(R)
+                .join(I, I.id_intento == R.id_intento)
+                .join(O, O.id_opcion == R.id_opcion_seleccionada)
+                .where(filtro)
+                .group_by(I.id_evaluacion, O.id_pregunta, O.id_opcion)
+            )
+        ]
+
+        return {"evaluaciones": evaluaciones, "tramos": tramos, "preguntas": preguntas, "opciones": opciones}
+
+    def _sumar(self, conexion, agregados: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Suma los aportes a las tablas de resumen."""
+        _insertar_o_sumar(
+            conexion, self.ResumenEvaluacion.__table__, agregados["evaluaciones"],
+            claves=("id_evaluacion",),
+            sumar=("intentos", "aprobados", "suma_porcentaje", "suma_porcentaje_cuadrado"),
+            reemplazar=("fecha_actualizacion",)
+        )
+        _insertar_o_sumar(
+            conexion, self.ResumenTramo.__table__, agregados["tramos"],
+            claves=("id_evaluacion", "tramo"), sumar=("intentos",)
+        )
+        _insertar_o_sumar(
+            conexion, self.ResumenPregunta.__table__, agregados["preguntas"],
+            claves=("id_pregunta",), sumar=("respondidas", "correctas", "suma_porcentaje_correctas")
+        )
+        _insertar_o_sumar(
+            conexion, self.ResumenOpcion.__table__, agregados["opciones"],
+            claves=("id_opcion",), sumar=("selecciones",)
+        )
+
+    def acumular_intentos(self, conexion, ids_intentos: List[str]) -> None:
+        """
+        Suma al resumen los intentos recién completados. Se ejecuta en la
+        transacción del llamador (ver instalar_resumen_incremental).
+        """
+        if ids_intentos:
+            self._sumar(conexion, self._agregados(conexion, self.Intento.id_intento.in_(ids_intentos)))
+
+    def _rehacer(self, conexion, id_evaluacion: str) -> int:
+        """Borra y recalcula el resumen de una evaluación. Devuelve los intentos contados."""
+        for modelo in (self.ResumenOpcion, self.ResumenPregunta, self.ResumenTramo, self.ResumenEvaluacion):
+            conexion.execute(delete(modelo).where(modelo.id_evaluacion == id_evaluacion))
+
+        completado = self.Intento.__table__.c.estado.type.enum_class.COMPLETADO
+        agregados = self._agregados(
+            conexion,
+            (self.Intento.id_evaluacion == id_evaluacion) & (self.Intento.estado == completado)
+        )
+        self._sumar(conexion, agregados)
+        return sum(fila["intentos"] for fila in agregados["evaluaciones"])
+
+    def reconstruir_resumen(self, id_evaluacion: str) -> tuple:
+        """
+        Recalcula desde cero el resumen de una evaluación (p. ej. tras recalificarla).
+
+        Args:
+            id_evaluacion: ID de la evaluación
+
+        Returns:
+            tuple: (número de intentos completados, None) o (None, mensaje_error)
+        """
+        if self.db.get(self.Evaluacion, id_evaluacion) is None:
+            return None, f"Evaluación con ID '{id_evaluacion}' no encontrada"
+
+        try:
+            intentos = self._rehacer(self.db.connection(), id_evaluacion)
+            self.db.commit()
+            return intentos, None
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al reconstruir el resumen: {str(e)}"
+
+    # ===== Lectura =====
+
+    @staticmethod
+    def _discriminacion(n: int, suma: float, suma_cuadrado: float, correctas: int, suma_correctas: float) -> Optional[float]:
+        """Correlación punto-biserial entre acertar la pregunta y el porcentaje del intento."""
+        if n < 2 or correctas in (0, n):
+            return None
+        media = suma / n
+        varianza = suma_cuadrado / n - media * media
+        if varianza <= 1e-9:
+            return None
+        p = correctas / n
+        media_aciertan = suma_correctas / correctas
+        media_fallan = (suma - suma_correctas) / (n - correctas)
+        return round((media_aciertan - media_fallan) / math.sqrt(varianza) * math.sqrt(p * (1 - p)), 4)
+
+    def obtener_estadisticas(self, id_evaluacion: str) -> tuple:
+        """
+        Estadísticas de una evaluación leídas de las tablas de resumen.
+
+        Args:
+            id_evaluacion: ID de la evaluación
+
+        Returns:
+            tuple: (dict de estadísticas, None) o (None, mensaje_error)
+        """
+        if self.db.get(self.Evaluacion, id_evaluacion) is None:
+            return None, f"Evaluación con ID '{id_evaluacion}' no encontrada"
+
+        resumen = self.db.get(self.ResumenEvaluacion, id_evaluacion)
+        n = resumen.intentos if resumen else 0
+        suma = resumen.suma_porcentaje if resumen else 0.0
+        suma_cuadrado = resumen.suma_porcentaje_cuadrado if resumen else 0.0
+        media = suma / n if n else None
+        desviacion = math.sqrt(max(suma_cuadrado / n - media * media, 0.0)) if n else None
+
+        por_tramo = dict(self.db.execute(
+            select(self.ResumenTramo.tramo, self.ResumenTramo.intentos)
+            .where(self.ResumenTramo.id_evaluacion == id_evaluacion)
+        ).all())
+        ancho = 100 / TRAMOS
+        distribucion = [
+            {"desde": indice * ancho, "hasta": (indice + 1) * ancho, "intentos": por_tramo.get(indice, 0)}
+            for indice in range(TRAMOS)
+        ]
+
+        P, RP = self.Pregunta, self.ResumenPregunta
+        filas_preguntas = self.db.execute(
+            select(P.id_pregunta, P.orden, P.enunciado, P.tipo, RP.respondidas, RP.correctas, RP.suma_porcentaje_correctas)
+            .outerjoin(RP, RP.id_pregunta == P.id_pregunta)
+            .where(P.id_evaluacion == id_evaluacion)
+            .order_by(P.orden)
+        ).all()
+
+        O, RO = self.Opcion, self.ResumenOpcion
+        opciones_por_pregunta: Dict[str, List[Any]] = {}
+        for fila in self.db.execute(
+            select(O.id_pregunta, O.id_opcion, O.texto, O.es_correcta, RO.selecciones)
+            .join(P, P.id_pregunta == O.id_pregunta)
+            .outerjoin(RO, RO.id_opcion == O.id_opcion)
+            .where(P.id_evaluacion == id_evaluacion)
+            .order_by(O.orden)
+        ):
+            opciones_por_pregunta.setdefault(fila.id_pregunta, []).append(fila)
+
+        preguntas = []
+        for fila in filas_preguntas:
+            tipo = getattr(fila.tipo, "value", fila.tipo)
+            respondidas = fila.respondidas or 0
+            correctas = fila.correctas or 0
+            calificable = tipo != "ensayo" and n > 0
+            preguntas.append({
+                "id_pregunta": fila.id_pregunta,
+                "orden": fila.orden,
+                "enunciado": fila.enunciado,
+                "tipo": tipo,
+                "respondidas": respondidas,
+                "correctas": correctas,
+                # Índice de dificultad: proporción de intentos que aciertan
+                "dificultad": round(correctas / n, 4) if calificable else None,
+                "discriminacion": (
+                    self._discriminacion(n, suma, suma_cuadrado, correctas, fila.suma_porcentaje_correctas or 0.0)
+                    if calificable else None
+                ),
+                "opciones": [
+                    {
+                        "id_opcion": opcion.id_opcion,
+                        "texto": opcion.texto,
+                        "es_correcta": bool(opcion.es_correcta),
+                        "selecciones": opcion.selecciones or 0,
+                        "frecuencia": round((opcion.selecciones or 0) / respondidas, 4) if respondidas else 0.0,
+                    }
+                    for opcion in opciones_por_pregunta.get(fila.id_pregunta, [])
+                ],
+            })
+
+        return {
+            "id_evaluacion": id_evaluacion,
+            "intentos": n,
+            "aprobados": resumen.aprobados if resumen else 0,
+            "tasa_aprobacion": round(resumen.aprobados / n, 4) if n else None,
+            "porcentaje_medio": round(media, 2) if media is not None else None,
+            "desviacion_tipica": round(desviacion, 2) if desviacion is not None else None,
+            "distribucion": distribucion,
+            "preguntas": preguntas,
+        }, None
+
+
+# ===== Actualización incremental =====
+
+_instalados = set()
+
+
+def instalar_resumen_incremental(modelos: Dict) -> None:
+    """
+    Registra un evento after_flush que mantiene el resumen al día:
+    - un intento que pasa a COMPLETADO suma sus aportes;
+    - un intento ya completado cuya calificación cambia rehace el resumen de su evaluación.
+    Es idempotente. Las recalificaciones masivas (UPDATE sin flush) deben
+    llamar después a reconstruir_resumen.
+    """
+    Intento = modelos['Intento']
+    if Intento in _instalados:
+        return
+    _instalados.add(Intento)
+    completado = Intento.__table__.c.estado.type.enum_class.COMPLETADO
+
+    def al_volcar(session, contexto):
+        completados, alterados = [], set()
+        for objeto in chain(session.new, session.dirty):
+            if not isinstance(objeto, Intento) or objeto.estado != completado:
+                continue
+            atributos = inspect(objeto).attrs
+            estado = atributos.estado.history
+            if estado.added and completado not in (estado.deleted or ()):
+                completados.append(objeto)
+            elif atributos.porcentaje.history.has_changes() or atributos.aprobado.history.has_changes():
+                alterados.add(objeto.id_evaluacion)
+
+        if not completados and not alterados:
+            return
+
+        gestor = GestorAnaliticaEvaluacion(session, modelos)
+        conexion = session.connection()
+        gestor.acumular_intentos(
+            conexion,
+            [intento.id_intento for intento in completados if intento.id_evaluacion not in alterados]
+        )
+        for id_evaluacion in alterados:
+            gestor._rehacer(conexion, id_evaluacion)
+
+    event.listen(Session, "after_flush", al_volcar)
+
+
+class GestorAnaliticaEvaluacionAsync:
+    """
+    Versión asíncrona del GestorAnaliticaEvaluacion para los endpoints de la API.
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Dict con las clases de los modelos de evaluaciones
+    """
+
+    def __init__(self, db: AsyncSession, modelos: Dict):
+        """
+        Inicializa el gestor asíncrono de analítica.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelos: Dict con las clases de los modelos de evaluaciones y sus resúmenes
+        """
+        self.db = db
+        self.modelos = modelos
+
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        def llamar(sesion: Session):
+            return getattr(GestorAnaliticaEvaluacion(sesion, self.modelos), metodo)(*args, **kwargs)
+
+        return await self.db.run_sync(llamar)
+
+    async def obtener_estadisticas(self, id_evaluacion: str) -> tuple:
+        """Ver GestorAnaliticaEvaluacion.obtener_estadisticas."""
+        return await self._ejecutar('obtener_estadisticas', id_evaluacion)
+
+    async def reconstruir_resumen(self, id_evaluacion: str) -> tuple:
+        """Ver GestorAnaliticaEvaluacion.reconstruir_resumen."""
+        return await self._ejecutar('reconstruir_resumen', id_evaluacion)
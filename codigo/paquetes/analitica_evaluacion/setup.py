@@ -0,0 +1,26 @@
+"""
+Setup para el paquete analitica_evaluacion
+==========================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-analitica-evaluacion',
+    version='0.1.0',
+    description='Estadísticas de evaluaciones con resúmenes materializados',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[
+        'sqlalchemy>=2.0'
+    ],
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
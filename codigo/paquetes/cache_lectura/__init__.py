@@ -0,0 +1,9 @@
+"""
+Paquete cache_lectura
+=====================
+"""
+
+from .cache_lectura import Cache, CacheLRU, CacheRedis, crear_cache_desde_entorno
+
+__all__ = ['Cache', 'CacheLRU', 'CacheRedis', 'crear_cache_desde_entorno']
+__version__ = '0.1.0'
@@ -0,0 +1,319 @@
+"""
+Caché de Lectura
+================
+Caché read-through para las lecturas frecuentes de capítulos y contenidos.
+Dos backends intercambiables:
+- CacheLRU: en memoria del proceso, con expiración por TTL.
+- CacheRedis: cualquier cliente compatible con Redis (get/set/delete/scan_iter).
+
+Los valores guardados deben ser serializables a JSON (dicts, listas, fechas).
+
+Cada invalidación avanza la generación de la caché. Una lectura que empezó
+antes de una escritura pasa la generación que vio a guardar(): si entretanto
+hubo una invalidación, su copia (ya vieja) no se guarda.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class Cache:
+    """
+    Interfaz común de los backends de caché.
+    Lleva los contadores de aciertos, fallos e invalidaciones y la
+    generación (avanza con cada invalidación).
+
+    Attributes:
+        ttl_segundos: Tiempo de vida de cada entrada
+        aciertos: Lecturas resueltas desde la caché
+        fallos: Lecturas que tuvieron que ir a la base de datos
+        invalidaciones: Entradas eliminadas por escrituras
+    """
+
+    nombre_backend = "base"
+
+    def __init__(self, ttl_segundos: int = 300):
+        self.ttl_segundos = ttl_segundos
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self._lock_contadores = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """
+        Devuelve el valor asociado a la clave, o None si no existe o expiró.
+        """
+        valor = self._leer(clave)
+        with self._lock_contadores:
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        return valor
+
+    def generacion(self) -> int:
+        """Generación actual; leerla antes de consultar la base de datos."""
+        raise NotImplementedError
+
+    def guardar(self, clave: str, valor: Any, generacion: Optional[int] = None) -> None:
+        """
+        Guarda un valor con el TTL configurado.
+
+        Args:
+            clave: Clave de la entrada
+            valor: Valor serializable a JSON
+            generacion: Generación leída antes de obtener 'valor'. Si hubo una
+                        invalidación desde entonces, no se guarda (None: siempre)
+        """
+        if generacion is None:
+            self._escribir(clave, valor)
+        else:
+            self._escribir_si_generacion(clave, valor, generacion)
+
+    def invalidar(self, *claves: str) -> None:
+        """Elimina las claves indicadas."""
+        borradas = self._borrar(claves)
+        with self._lock_contadores:
+            self.invalidaciones += borradas
+
+    def invalidar_prefijo(self, prefijo: str) -> None:
+        """Elimina todas las claves que comienzan con el prefijo."""
+        borradas = self._borrar_prefijo(prefijo)
+        with self._lock_contadores:
+            self.invalidaciones += borradas
+
+    def limpiar(self) -> None:
+        """Vacía la caché (no reinicia los contadores)."""
+        raise NotImplementedError
+
+    def reiniciar_estadisticas(self) -> None:
+        """Pone los contadores a cero."""
+        with self._lock_contadores:
+            self.aciertos = 0
+            self.fallos = 0
+            self.invalidaciones = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            Dict con backend, aciertos, fallos, invalidaciones y tasa_aciertos
+        """
+        lecturas = self.aciertos + self.fallos
+        return {
+            "backend": self.nombre_backend,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "invalidaciones": self.invalidaciones,
+            "tasa_aciertos": round(self.aciertos / lecturas, 4) if lecturas else 0.0,
+        }
+
+    def _leer(self, clave: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def _escribir(self, clave: str, valor: Any) -> None:
+        raise NotImplementedError
+
+    def _escribir_si_generacion(self, clave: str, valor: Any, generacion: int) -> None:
+        raise NotImplementedError
+
+    def _borrar(self, claves) -> int:
+        raise NotImplementedError
+
+    def _borrar_prefijo(self, prefijo: str) -> int:
+        raise NotImplementedError
+
+
+class CacheLRU(Cache):
+    """
+    Caché en memoria del proceso con política LRU y expiración por TTL.
+
+    Attributes:
+        max_entradas: Número máximo de entradas antes de desalojar la menos usada
+    """
+
+    nombre_backend = "lru"
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: int = 300):
+        super().__init__(ttl_segundos)
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0
+
+    def generacion(self) -> int:
+        return self._generacion
+
+    def _leer(self, clave: str) -> Optional[Any]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+
+            expira, valor = entrada
+            if expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+
+            self._entradas.move_to_end(clave)
+            return valor
+
+    def _escribir(self, clave: str, valor: Any) -> None:
+        with self._lock:
+            self._insertar(clave, valor)
+
+    def _escribir_si_generacion(self, clave: str, valor: Any, generacion: int) -> None:
+        with self._lock:
+            if generacion == self._generacion:
+                self._insertar(clave, valor)
+
+    def _insertar(self, clave: str, valor: Any) -> None:
+        # Con self._lock tomado
+        self._entradas[clave] = (time.monotonic() + self.ttl_segundos, valor)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+
+    def _borrar(self, claves) -> int:
+        with self._lock:
+            self._generacion += 1
+            return sum(1 for clave in claves if self._entradas.pop(clave, None) is not None)
+
+    def _borrar_prefijo(self, prefijo: str) -> int:
+        with self._lock:
+            self._generacion += 1
+            claves = [clave for clave in self._entradas if clave.startswith(prefijo)]
+            for clave in claves:
+                del self._entradas[clave]
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        datos = super().estadisticas()
+        datos["entradas"] = len(self._entradas)
+        datos["max_entradas"] = self.max_entradas
+        return datos
+
+
+def _codificar(valor: Any) -> Any:
+    """Convierte fechas a un formato JSON reversible."""
+    if isinstance(valor, datetime):
+        return {"$fecha": valor.isoformat()}
+    raise TypeError(f"Tipo no serializable en caché: {type(valor).__name__}")
+
+
+def _decodificar(objeto: Dict[str, Any]) -> Any:
+    """Restaura las fechas codificadas por _codificar."""
+    if len(objeto) == 1 and "$fecha" in objeto:
+        return datetime.fromisoformat(objeto["$fecha"])
+    return objeto
+
+
+class CacheRedis(Cache):
+    """
+    Caché sobre un servidor compatible con Redis.
+    Comparte las entradas y la generación entre todos los procesos de la API.
+
+    Attributes:
+        cliente: Cliente con métodos get, set(ex=), delete, incr y scan_iter(match=)
+        espacio: Prefijo aplicado a todas las claves
+    """
+
+    nombre_backend = "redis"
+
+    def __init__(self, cliente, ttl_segundos: int = 300, espacio: str = "libro:"):
+        super().__init__(ttl_segundos)
+        self.cliente = cliente
+        self.espacio = espacio
+        self._clave_generacion = f"{espacio}$generacion"
+
+    def generacion(self) -> int:
+        return int(self.cliente.get(self._clave_generacion) or 0)
+
+    @classmethod
+    def desde_url(cls, url: str, ttl_segundos: int = 300) -> "CacheRedis":
+        """
+        Crea la caché conectándose a Redis. Requiere el paquete 'redis'.
+        """
+        import redis
+        return cls(redis.Redis.from_url(url), ttl_segundos=ttl_segundos)
+
+    def _leer(self, clave: str) -> Optional[Any]:
+        datos = self.cliente.get(self.espacio + clave)
+        if datos is None:
+            return None
+        return json.loads(datos, object_hook=_decodificar)
+
+    def _escribir(self, clave: str, valor: Any) -> None:
+        datos = json.dumps(valor, default=_codificar)
+        self.cliente.set(self.espacio + clave, datos, ex=self.ttl_segundos)
+
+    def _escribir_si_generacion(self, clave: str, valor: Any, generacion: int) -> None:
+        if self.generacion() != generacion:
+            return
+        self._escribir(clave, valor)
+        # Otro proceso pudo invalidar entre la comprobación y el set: las
+        # invalidaciones avanzan la generación antes de borrar, así que si
+        # ahora es otra, la entrada recién escrita se borra.
+        if self.generacion() != generacion:
+            self.cliente.delete(self.espacio + clave)
+
+    def _avanzar_generacion(self) -> None:
+        self.cliente.incr(self._clave_generacion)
+
+    def _borrar(self, claves) -> int:
+        self._avanzar_generacion()
+        if not claves:
+            return 0
+        return self.cliente.delete(*[self.espacio + clave for clave in claves])
+
+    def _borrar_prefijo(self, prefijo: str) -> int:
+        self._avanzar_generacion()
+        claves = list(self.cliente.scan_iter(match=f"{self.espacio}{prefijo}*"))
+        if not claves:
+            return 0
+        return self.cliente.delete(*claves)
+
+    def limpiar(self) -> None:
+        self._avanzar_generacion()
+        claves = [
+            clave for clave in self.cliente.scan_iter(match=f"{self.espacio}*")
+            if clave not in (self._clave_generacion, self._clave_generacion.encode())
+        ]
+        if claves:
+            self.cliente.delete(*claves)
+
+
+def crear_cache_desde_entorno() -> Optional[Cache]:
+    """
+    Construye la caché según las variables de entorno.
+
+    CACHE_BACKEND: 'memoria' (por defecto), 'redis' o 'ninguno'
+    CACHE_TTL_SEGUNDOS: TTL de las entradas (por defecto 300)
+    CACHE_MAX_ENTRADAS: tamaño del LRU en memoria (por defecto 1024)
+    REDIS_URL: URL del servidor Redis
+
+    Returns:
+        Instancia de Cache, o None si la caché está desactivada
+    """
+    backend = os.getenv("CACHE_BACKEND", "memoria").lower()
+    ttl = int(os.getenv("CACHE_TTL_SEGUNDOS", "300"))
+
+    if backend == "ninguno":
+        return None
+    if backend == "redis":
+        return CacheRedis.desde_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl_segundos=ttl)
+    if backend == "memoria":
+        return CacheLRU(max_entradas=int(os.getenv("CACHE_MAX_ENTRADAS", "1024")), ttl_segundos=ttl)
+
+    raise ValueError(f"CACHE_BACKEND no válido: {backend}")
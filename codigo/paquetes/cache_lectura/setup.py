@@ -0,0 +1,27 @@
+"""
+Setup para el paquete cache_lectura
+===================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-cache-lectura',
+    version='0.1.0',
+    description='Caché de lectura (LRU en memoria o Redis) para capítulos y contenidos',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[],
+    extras_require={
+        'redis': ['redis>=5.0.0'],
+    },
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
@@ -0,0 +1,11 @@
+"""
+Paquete derivados_imagen
+========================
+"""
+
+from .derivados_imagen import (
+    ProcesadorImagenes, generar_derivados, ANCHOS, FORMATOS, TIPOS_MIME
+)
+
+__all__ = ['ProcesadorImagenes', 'generar_derivados', 'ANCHOS', 'FORMATOS', 'TIPOS_MIME']
+__version__ = '0.1.0'
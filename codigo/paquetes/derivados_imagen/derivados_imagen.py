@@ -0,0 +1,247 @@
+"""
+Derivados de Imágenes
+=====================
+Versiones de una imagen subida para servir a cada pantalla la más pequeña
+que le sirva:
+
+- Versiones reducidas a los anchos de ANCHOS (sin ampliar nunca el original)
+  en el formato base (JPEG, o PNG si la imagen tiene transparencia) y en
+  cada formato de FORMATOS (WebP y AVIF, los que admita el Pillow instalado;
+  AVIF necesita Pillow 11.2 o posterior).
+- Un marcador: miniatura desenfocada de ANCHO_MARCADOR píxeles como data
+  URI, para pintar algo mientras llega la imagen.
+
+Redimensionar y codificar (sobre todo AVIF) es trabajo de CPU: generar_derivados
+se ejecuta en un pool de procesos propio (ProcesadorImagenes), nunca en los
+workers de la API. Los derivados se guardan en el almacén de medios junto al
+original (ab/abcdef…-640w.webp).
+"""
+
+import asyncio
+import base64
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from PIL import Image, ImageFilter, ImageOps, UnidentifiedImageError, features
+
+
+@lru_cache(maxsize=None)
+def formato_disponible(formato: str) -> bool:
+    """True si el Pillow instalado sabe codificar 'formato' (avif solo desde 11.2)."""
+    with warnings.catch_warnings():
+        # Un Pillow que no conoce el formato avisa de "Unknown feature"
+        warnings.simplefilter("ignore")
+        return bool(features.check(formato))
+
+
+ANCHOS = (320, 640, 1024, 1600)
+FORMATOS = tuple(formato for formato in ("webp", "avif") if formato_disponible(formato))
+ANCHO_MARCADOR = 16
+
+OPCIONES = {
+    "jpeg": {"quality": 82, "optimize": True, "progressive": True},
+    "png": {"optimize": True},
+    "webp": {"quality": 80, "method": 4},
+    "avif": {"quality": 55, "speed": 8},
+}
+
+TIPOS_MIME = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+EXTENSIONES = {"jpeg": ".jpg", "png": ".png", "webp": ".webp", "avif": ".avif"}
+
+# Procesos del pool por defecto
+PROCESOS = 2
+
+# Orientaciones EXIF que intercambian ancho y alto
+_ROTACIONES = (5, 6, 7, 8)
+
+
+def _codificar(imagen: Image.Image, formato: str) -> bytes:
+    salida = io.BytesIO()
+    imagen.save(salida, formato.upper(), **OPCIONES[formato])
+    return salida.getvalue()
+
+
+def generar_derivados(ruta: str, anchos: Sequence[int] = ANCHOS, formatos: Sequence[str] = FORMATOS) -> Dict[str, Any]:
+    """
+    Genera los derivados de la imagen de 'ruta'. Pensada para ejecutarse en
+    otro proceso: recibe una ruta y devuelve solo datos serializables. Los
+    formatos que el Pillow instalado no sabe codificar se omiten.
+
+    Returns:
+        dict: ancho, alto (del original ya orientado), marcador (data URI) y
+              derivados (lista de {ancho, alto, formato, datos}, de menor a mayor)
+
+    Raises:
+        ValueError: Si el archivo no es una imagen válida
+    """
+    try:
+        with Image.open(ruta) as original:
+            ancho, alto = original.size
+            if original.getexif().get(0x0112) in _ROTACIONES:
+                ancho, alto = alto, ancho
+            objetivos = sorted({min(a, ancho) for a in anchos})
+            # JPEG: decodificar ya reducido (1/2, 1/4, 1/8) si basta para el mayor derivado
+            original.draft("RGB", (objetivos[-1], objetivos[-1]))
+            imagen = ImageOps.exif_transpose(original)
+            imagen.load()
+    except FileNotFoundError:
+        raise
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"No es una imagen válida: {e}")
+
+    formatos = [formato for formato in formatos if formato_disponible(formato)]
+    transparente = imagen.mode in ("RGBA", "LA", "PA") or "transparency" in imagen.info
+    imagen = imagen.convert("RGBA" if transparente else "RGB")
+    base = "png" if transparente else "jpeg"
+
+    derivados = []
+    # De mayor a menor: cada versión se reduce a partir de la anterior
+    fuente = imagen
+    for objetivo in reversed(objetivos):
+        tamano = (objetivo, max(1, round(alto * objetivo / ancho)))
+        fuente = fuente.resize(tamano, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for formato in (base, *formatos):
+            derivados.append({
+                "ancho": tamano[0],
+                "alto": tamano[1],
+                "formato": formato,
+                "datos": _codificar(fuente, formato),
+            })
+
+    miniatura = fuente.resize(
+        (ANCHO_MARCADOR, max(1, round(alto * ANCHO_MARCADOR / ancho))), Image.Resampling.BILINEAR
+    ).filter(ImageFilter.GaussianBlur(1))
+    marcador = base64.b64encode(_codificar(miniatura, "webp")).decode("ascii")
+
+    derivados.sort(key=lambda d: (d["ancho"], d["formato"]))
+    return {
+        "ancho": ancho,
+        "alto": alto,
+        "marcador": f"data:image/webp;base64,{marcador}",
+        "derivados": derivados,
+    }
+
+
+def _mensaje_error(error: Exception, clave: str) -> str:
+    if isinstance(error, ValueError):
+        return str(error)
+    if isinstance(error, FileNotFoundError):
+        return f"El archivo {clave} no está en el almacén de medios"
+    return f"Error al generar los derivados de la imagen: {str(error)}"
+
+
+@contextmanager
+def _copia_local(almacen, clave: str) -> Iterator[str]:
+    """Ruta en disco del original: la del almacén local o una copia temporal."""
+    if hasattr(almacen, "ruta"):
+        yield str(almacen.ruta(clave))
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(clave)[1]) as copia:
+        with almacen.abrir(clave) as origen:
+            shutil.copyfileobj(origen, copia)
+        copia.flush()
+        yield copia.name
+
+
+class ProcesadorImagenes:
+    """
+    Genera los derivados de las imágenes del almacén de medios en un pool
+    de procesos y los guarda junto al original.
+
+    Attributes:
+        almacen: Almacén de medios (paquete almacen_medios)
+        procesos: Tamaño del pool, que se crea en el primer uso
+        anchos, formatos: Ver ANCHOS y FORMATOS
+    """
+
+    def __init__(self, almacen, procesos: int = PROCESOS,
+                 anchos: Sequence[int] = ANCHOS, formatos: Sequence[str] = FORMATOS):
+        self.almacen = almacen
+        self.procesos = procesos
+        self.anchos = tuple(anchos)
+        self.formatos = tuple(formatos)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: los procesos no heredan hilos ni conexiones del proceso de la API
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def cerrar(self) -> None:
+        """Detiene el pool (al apagar la aplicación)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def procesar(self, clave: str) -> tuple:
+        """
+        Genera y guarda los derivados de la imagen con clave 'clave'.
+
+        Returns:
+            tuple: ({ancho, alto, marcador, derivados: [{ancho, alto, formato, url, tamano}]}, None)
+                   si tiene éxito, (None, mensaje_error) si falla
+        """
+        try:
+            with _copia_local(self.almacen, clave) as ruta:
+                resultado = self.pool.submit(generar_derivados, ruta, self.anchos, self.formatos).result()
+            return self._guardar(clave, resultado), None
+        except Exception as e:
+            return None, _mensaje_error(e, clave)
+
+    async def procesar_async(self, clave: str) -> tuple:
+        """
+        Versión asíncrona de procesar(): espera al pool de procesos sin
+        bloquear el event loop; la copia del original y la escritura de los
+        derivados van al pool de hilos.
+        """
+        loop = asyncio.get_running_loop()
+        copia = _copia_local(self.almacen, clave)
+        try:
+            ruta = await asyncio.to_thread(copia.__enter__)
+            try:
+                resultado = await loop.run_in_executor(
+                    self.pool, generar_derivados, ruta, self.anchos, self.formatos
+                )
+            finally:
+                await asyncio.to_thread(copia.__exit__, None, None, None)
+            return await asyncio.to_thread(self._guardar, clave, resultado), None
+        except Exception as e:
+            return None, _mensaje_error(e, clave)
+
+    def _guardar(self, clave: str, resultado: Dict[str, Any]) -> Dict[str, Any]:
+        derivados: List[Dict[str, Any]] = []
+        for derivado in resultado["derivados"]:
+            clave_nueva = self.almacen.clave_derivada(clave, f"{derivado['ancho']}w", EXTENSIONES[derivado["formato"]])
+            self.almacen.escribir(clave_nueva, derivado["datos"], TIPOS_MIME[derivado["formato"]])
+            derivados.append({
+                "ancho": derivado["ancho"],
+                "alto": derivado["alto"],
+                "formato": derivado["formato"],
+                "url": self.almacen.url(clave_nueva),
+                "tamano": len(derivado["datos"]),
+            })
+        return {
+            "ancho": resultado["ancho"],
+            "alto": resultado["alto"],
+            "marcador": resultado["marcador"],
+            "derivados": derivados,
+        }
@@ -0,0 +1,27 @@
+"""
+Setup para el paquete derivados_imagen
+======================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-derivados-imagen',
+    version='0.1.0',
+    description='Versiones responsive (WebP/AVIF) y marcador desenfocado de las imágenes del almacén de medios',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[
+        'libro-almacen-medios>=0.1.0',
+        'pillow>=11.2',
+    ],
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
@@ -0,0 +1,13 @@
+"""
+Paquete exportacion_contenido
+=============================
+"""
+
+from .exportacion_contenido import (
+    GestorExportacion, GestorExportacionAsync, FORMATOS, TIPOS_MIME, TAMANO_LOTE
+)
+
+__all__ = [
+    'GestorExportacion', 'GestorExportacionAsync', 'FORMATOS', 'TIPOS_MIME', 'TAMANO_LOTE'
+]
+__version__ = '0.1.0'
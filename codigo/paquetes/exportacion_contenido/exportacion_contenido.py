@@ -0,0 +1,344 @@
+"""
+Exportación e Importación del Contenido
+=======================================
+Vuelca el catálogo completo (capitulos, contenidos y union_capitulo_contenido)
+como NDJSON o CSV y lo vuelve a cargar.
+
+La exportación recorre cada tabla con una sola consulta Core en modo
+streaming (yield_per: cursor de servidor en MySQL/PostgreSQL) y va
+entregando bloques de bytes, opcionalmente comprimidos con gzip sobre la
+marcha; la memoria no depende del tamaño del catálogo. No se cargan
+objetos ORM, así que el identity map de la sesión no crece.
+
+Formato (una fila por registro, tablas en orden de dependencias):
+
+- NDJSON: un objeto JSON por línea con la clave "tabla" y las columnas
+  de la fila. Las fechas van en ISO 8601.
+- CSV: cabecera con "tabla" y la unión de las columnas de las tres tablas;
+  cada fila deja vacías las columnas que no son de su tabla. Un campo vacío
+  se importa como NULL (NDJSON es el formato sin pérdidas).
+
+La importación lee el volcado línea a línea y lo inserta por lotes de
+TAMANO_LOTE filas (un INSERT executemany por lote) en una sola transacción:
+si algo falla no se importa nada.
+"""
+
+import csv
+import gzip
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import JSON, DateTime, Float, Integer, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+FORMATOS = ("ndjson", "csv")
+
+# Filas por lote al leer (yield_per) y al insertar
+TAMANO_LOTE = 1000
+
+# Bytes de texto acumulados antes de entregar (y comprimir) un bloque
+TAMANO_BLOQUE = 64 * 1024
+
+TIPOS_MIME = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _valor_exportado(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _valor_csv(valor: Any) -> Any:
+    # Las columnas JSON van serializadas en una sola celda
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, separators=(",", ":"))
+    return _valor_exportado(valor)
+
+
+def _convertidor(columna, formato: str):
+    """Función que pasa un valor leído del volcado al tipo de la columna."""
+    if isinstance(columna.type, JSON):
+        # En NDJSON el valor ya llega deserializado
+        return json.loads if formato == "csv" else None
+    if isinstance(columna.type, DateTime):
+        return datetime.fromisoformat
+    if isinstance(columna.type, Integer):
+        return int
+    if isinstance(columna.type, Float):
+        return float
+    return None
+
+
+class _Codificador:
+    """Convierte filas de las tablas en líneas NDJSON o CSV."""
+
+    def __init__(self, formato: str, tablas: Dict[str, Any]):
+        self.formato = formato
+        self.columnas = ["tabla"]
+        for tabla in tablas.values():
+            self.columnas.extend(c.name for c in tabla.columns if c.name not in self.columnas)
+        self._buffer = io.StringIO()
+        self._escritor = csv.writer(self._buffer, lineterminator="\n")
+
+    def cabecera(self) -> str:
+        if self.formato == "csv":
+            return self._csv(self.columnas)
+        return ""
+
+    def linea(self, nombre: str, fila: Dict[str, Any]) -> str:
+        if self.formato == "csv":
+            return self._csv([nombre if c == "tabla" else _valor_csv(fila.get(c)) for c in self.columnas])
+        registro = {"tabla": nombre}
+        registro.update((c, _valor_exportado(v)) for c, v in fila.items())
+        return json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _csv(self, valores: List[Any]) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._escritor.writerow(valores)
+        return self._buffer.getvalue()
+
+
+class _Empaquetador:
+    """Acumula texto en bloques de TAMANO_BLOQUE bytes y los comprime si se pide."""
+
+    def __init__(self, comprimir: bool, inicio: str = ""):
+        # wbits=31: cabecera y cola gzip
+        self._compresor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None
+        self._partes: List[str] = [inicio]
+        self._tamano = len(inicio)
+
+    def agregar(self, texto: str) -> Optional[bytes]:
+        self._partes.append(texto)
+        self._tamano += len(texto)
+        if self._tamano < TAMANO_BLOQUE:
+            return None
+        return self._vaciar()
+
+    def terminar(self) -> bytes:
+        bloque = self._vaciar()
+        if self._compresor is not None:
+            bloque += self._compresor.flush()
+        return bloque
+
+    def _vaciar(self) -> bytes:
+        datos = "".join(self._partes).encode("utf-8")
+        self._partes, self._tamano = [], 0
+        if self._compresor is not None:
+            return self._compresor.compress(datos)
+        return datos
+
+
+class GestorExportacion:
+    """
+    Gestor de la exportación e importación del catálogo de contenido.
+
+    Attributes:
+        db: Sesión de base de datos SQLAlchemy (BD de contenido)
+        tablas: Tablas a volcar, en orden de dependencias
+        tamano_lote: Filas por lote al leer y al insertar
+    """
+
+    def __init__(self, db: Session, modelos: Dict, tamano_lote: int = TAMANO_LOTE):
+        """
+        Inicializa el gestor de exportación.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con las clases 'Capitulo', 'Contenido' y 'UnionCapituloContenido'
+            tamano_lote: Filas por lote
+        """
+        self.db = db
+        self.tablas = _tablas(modelos)
+        self.tamano_lote = tamano_lote
+
+    # ===== Exportación =====
+
+    def exportar(self, formato: str = "ndjson", comprimir: bool = False) -> Iterator[bytes]:
+        """
+        Genera el volcado como bloques de bytes.
+
+        Args:
+            formato: 'ndjson' o 'csv'
+            comprimir: Si es True, los bloques forman un archivo gzip
+
+        Yields:
+            bytes: Siguiente bloque del volcado
+        """
+        codificador, empaquetador = _preparar(formato, self.tablas, comprimir)
+        for nombre, tabla in self.tablas.items():
+            for fila in self.db.execute(_consulta(tabla, self.tamano_lote)):
+                bloque = empaquetador.agregar(codificador.linea(nombre, fila._mapping))
+                if bloque:
+                    yield bloque
+        yield empaquetador.terminar()
+
+    # ===== Importación =====
+
+    def importar(self, archivo: BinaryIO, formato: str = "ndjson") -> Tuple[Optional[Dict[str, int]], Optional[str]]:
+        """
+        Carga un volcado generado por exportar() en una sola transacción.
+
+        Args:
+            archivo: Archivo binario con seek (se detecta si viene en gzip)
+            formato: 'ndjson' o 'csv'
+
+        Returns:
+            tuple: ({tabla: filas insertadas}, None) si tiene éxito, (None, mensaje_error) si falla
+        """
+        if formato not in FORMATOS:
+            return None, f"Formato no soportado: {formato}. Debe ser uno de {', '.join(FORMATOS)}"
+
+        totales = {nombre: 0 for nombre in self.tablas}
+        convertidores = {
+            nombre: {c.name: _convertidor(c, formato) for c in tabla.columns}
+            for nombre, tabla in self.tablas.items()
+        }
+        texto = None
+        try:
+            texto = io.TextIOWrapper(_descomprimido(archivo), encoding="utf-8", newline="")
+            actual, lote = None, []
+            for numero, (nombre, registro) in enumerate(_registros(texto, formato), start=1):
+                if nombre not in self.tablas:
+                    raise ValueError(f"tabla desconocida '{nombre}' en el registro {numero}")
+                if nombre != actual or len(lote) >= self.tamano_lote:
+                    # Cambio de tabla: los padres se insertan antes que sus hijos
+                    self._insertar(actual, lote, totales)
+                    actual, lote = nombre, []
+                lote.append(_fila(registro, convertidores[nombre], formato))
+            self._insertar(actual, lote, totales)
+            self.db.commit()
+            return totales, None
+        except IntegrityError as e:
+            self.db.rollback()
+            return None, f"El volcado choca con datos existentes: {e.orig}"
+        except (ValueError, TypeError, csv.Error, UnicodeDecodeError, EOFError, gzip.BadGzipFile) as e:
+            self.db.rollback()
+            return None, f"Volcado no válido: {e}"
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al importar el contenido: {str(e)}"
+        finally:
+            if texto is not None:
+                texto.detach()
+
+    def _insertar(self, nombre: Optional[str], lote: List[Dict[str, Any]], totales: Dict[str, int]) -> None:
+        if not lote:
+            return
+        self.db.execute(insert(self.tablas[nombre]), lote)
+        totales[nombre] += len(lote)
+
+
+class GestorExportacionAsync:
+    """
+    Versión asíncrona del GestorExportacion.
+
+    La exportación usa AsyncSession.stream (cursor de servidor a través del
+    driver asíncrono); la importación delega en GestorExportacion con
+    AsyncSession.run_sync.
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Diccionario con las clases de modelos
+        tamano_lote: Filas por lote al leer y al insertar
+    """
+
+    def __init__(self, db: AsyncSession, modelos: Dict, tamano_lote: int = TAMANO_LOTE):
+        self.db = db
+        self.modelos = modelos
+        self.tablas = _tablas(modelos)
+        self.tamano_lote = tamano_lote
+
+    async def exportar(self, formato: str = "ndjson", comprimir: bool = False) -> AsyncIterator[bytes]:
+        """Genera el volcado como bloques de bytes (ver GestorExportacion.exportar)."""
+        codificador, empaquetador = _preparar(formato, self.tablas, comprimir)
+        for nombre, tabla in self.tablas.items():
+            resultado = await self.db.stream(_consulta(tabla, self.tamano_lote))
+            async for fila in resultado:
+                bloque = empaquetador.agregar(codificador.linea(nombre, fila._mapping))
+                if bloque:
+                    yield bloque
+        yield empaquetador.terminar()
+
+    async def importar(self, archivo: BinaryIO, formato: str = "ndjson") -> tuple:
+        """Carga un volcado (ver GestorExportacion.importar)."""
+        def llamar(sesion: Session):
+            return GestorExportacion(sesion, self.modelos, self.tamano_lote).importar(archivo, formato)
+
+        return await self.db.run_sync(llamar)
+
+
+# ===== Funciones auxiliares =====
+
+def _tablas(modelos: Dict) -> Dict[str, Any]:
+    """Tablas del volcado por nombre, en orden de dependencias."""
+    return {
+        modelo.__table__.name: modelo.__table__
+        for modelo in (modelos['Capitulo'], modelos['Contenido'], modelos['UnionCapituloContenido'])
+    }
+
+
+def _preparar(formato: str, tablas: Dict[str, Any], comprimir: bool) -> tuple:
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}. Debe ser uno de {', '.join(FORMATOS)}")
+    codificador = _Codificador(formato, tablas)
+    return codificador, _Empaquetador(comprimir, inicio=codificador.cabecera())
+
+
+def _consulta(tabla, tamano_lote: int):
+    """SELECT de la tabla completa en orden de clave primaria, leído por lotes."""
+    return (
+        select(tabla)
+        .order_by(*tabla.primary_key.columns)
+        .execution_options(yield_per=tamano_lote)
+    )
+
+
+def _descomprimido(archivo: BinaryIO) -> BinaryIO:
+    """Devuelve el archivo tal cual o, si empieza por la firma gzip, un lector que lo descomprime."""
+    firma = archivo.read(2)
+    archivo.seek(0)
+    if firma == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=archivo, mode="rb")
+    return archivo
+
+
+def _registros(texto: io.TextIOWrapper, formato: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Recorre el volcado y devuelve (tabla, registro) sin leerlo entero."""
+    if formato == "csv":
+        for registro in csv.DictReader(texto):
+            yield registro.pop("tabla", None), registro
+        return
+
+    for linea in texto:
+        if not linea.strip():
+            continue
+        registro = json.loads(linea)
+        if not isinstance(registro, dict):
+            raise ValueError("cada línea debe ser un objeto JSON")
+        yield registro.pop("tabla", None), registro
+
+
+def _fila(registro: Dict[str, Any], convertidores: Dict[str, Any], formato: str) -> Dict[str, Any]:
+    """
+    Fila lista para el INSERT: todas las columnas de la tabla (las que faltan
+    valen NULL) con el tipo de la columna. Las claves ajenas a la tabla se ignoran.
+    """
+    fila = {}
+    for columna, convertir in convertidores.items():
+        valor = registro.get(columna)
+        if formato == "csv" and valor == "":
+            valor = None
+        if valor is not None and convertir is not None and isinstance(valor, str):
+            valor = convertir(valor)
+        fila[columna] = valor
+    return fila
@@ -0,0 +1,26 @@
+"""
+Setup para el paquete exportacion_contenido
+===========================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-exportacion-contenido',
+    version='0.1.0',
+    description='Exportación e importación en streaming del catálogo de contenido (NDJSON/CSV)',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[
+        'sqlalchemy>=2.0'
+    ],
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
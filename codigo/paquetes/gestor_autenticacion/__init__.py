@@ -0,0 +1,17 @@
+"""
+Paquete gestor_autenticacion
+============================
+"""
+
+from .gestor_autenticacion import (
+    GestorAutenticacion, GestorAutenticacionAsync, FirmadorTokens, ListaRevocacion, RegistroAccesos,
+    tokens_revocados, registro_accesos, pool_bcrypt, validar_token, hashear_password, verificar_password,
+    TIPO_ACCESO, TIPO_REFRESCO, ERROR_CREDENCIALES, ERROR_SATURADO
+)
+
+__all__ = [
+    'GestorAutenticacion', 'GestorAutenticacionAsync', 'FirmadorTokens', 'ListaRevocacion', 'RegistroAccesos',
+    'tokens_revocados', 'registro_accesos', 'pool_bcrypt', 'validar_token', 'hashear_password', 'verificar_password',
+    'TIPO_ACCESO', 'TIPO_REFRESCO', 'ERROR_CREDENCIALES', 'ERROR_SATURADO'
+]
+__version__ = '0.1.0'
@@ -0,0 +1,502 @@
+"""
+Gestor de Autenticación
+=======================
+Inicio de sesión contra Usuario.password_hash (bcrypt) y tokens firmados sin
+estado, de modo que validar una petición no consulta la base de datos.
+
+- Tokens: formato JWT (HS256, HMAC-SHA256 de la biblioteca estándar) con
+  sub (id_usuario), tipo (acceso | refresco), jti, iat y exp. Los de acceso
+  duran poco; los de refresco se rotan en cada uso.
+- bcrypt: la verificación es deliberadamente lenta, así que la versión
+  asíncrona la ejecuta en un pool de hilos propio y acotado (HILOS_BCRYPT);
+  una avalancha de inicios de sesión espera en ese pool sin ocupar el event
+  loop ni el thread pool por defecto. Con más de MAX_LOGINS_EN_ESPERA
+  esperando, se rechazan los nuevos.
+- Revocación: ListaRevocacion guarda en memoria los jti revocados (cierre de
+  sesión, refrescos ya usados) hasta que el token vence.
+- ultimo_acceso: RegistroAccesos anota como mucho un acceso por usuario cada
+  INTERVALO_ACCESO_SEGUNDOS y volcar_accesos() los escribe en un solo UPDATE.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+TIPO_ACCESO = "acceso"
+TIPO_REFRESCO = "refresco"
+
+# Vigencia de los tokens
+DURACION_ACCESO_SEGUNDOS = 15 * 60
+DURACION_REFRESCO_SEGUNDOS = 7 * 24 * 3600
+
+# Coste de bcrypt para los hashes nuevos
+RONDAS_BCRYPT = 12
+
+# Hilos dedicados a bcrypt e inicios de sesión que pueden esperar a la vez
+HILOS_BCRYPT = 4
+MAX_LOGINS_EN_ESPERA = 256
+
+# Como mucho una escritura de ultimo_acceso por usuario en este intervalo
+INTERVALO_ACCESO_SEGUNDOS = 60.0
+
+# Todos los fallos de credenciales dan el mismo mensaje (no revela si el email existe)
+ERROR_CREDENCIALES = "Credenciales inválidas"
+ERROR_SATURADO = "Demasiados inicios de sesión simultáneos, reintente en unos segundos"
+
+
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode("ascii")
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+# ===== Contraseñas =====
+
+def hashear_password(password: str, rondas: int = RONDAS_BCRYPT) -> str:
+    """Hash bcrypt de la contraseña (bcrypt solo admite hasta 72 bytes)."""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rondas)).decode("ascii")
+
+
+def verificar_password(password: str, password_hash: Optional[str]) -> bool:
+    """
+    Comprueba la contraseña contra el hash. Sin hash (usuario inexistente) se
+    verifica contra uno ficticio para que la respuesta tarde lo mismo.
+    """
+    try:
+        valido = bcrypt.checkpw(password.encode("utf-8"), (password_hash or _hash_ficticio()).encode("ascii"))
+        return valido and password_hash is not None
+    except ValueError:
+        # Hash corrupto o contraseña de más de 72 bytes
+        return False
+
+
+_ficticio: Optional[str] = None
+
+
+def _hash_ficticio() -> str:
+    global _ficticio
+    if _ficticio is None:
+        _ficticio = hashear_password(uuid.uuid4().hex)
+    return _ficticio
+
+
+# Pool del proceso para bcrypt (separado del thread pool por defecto)
+pool_bcrypt = ThreadPoolExecutor(max_workers=HILOS_BCRYPT, thread_name_prefix="bcrypt")
+
+
+# ===== Tokens =====
+
+class FirmadorTokens:
+    """
+    Emite y verifica tokens HS256. La verificación es local: firma, tipo y
+    caducidad, sin base de datos.
+    """
+
+    _CABECERA = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode("utf-8"))
+
+    def __init__(self, secreto: str, duracion_acceso: int = DURACION_ACCESO_SEGUNDOS,
+                 duracion_refresco: int = DURACION_REFRESCO_SEGUNDOS, reloj: Callable[[], float] = time.time):
+        if not secreto:
+            raise ValueError("El secreto de firma no puede estar vacío")
+        self._clave = secreto.encode("utf-8")
+        self.duraciones = {TIPO_ACCESO: duracion_acceso, TIPO_REFRESCO: duracion_refresco}
+        self._reloj = reloj
+
+    def _firma(self, contenido: str) -> str:
+        return _b64(hmac.new(self._clave, contenido.encode("ascii"), hashlib.sha256).digest())
+
+    def emitir(self, id_usuario: str, tipo: str = TIPO_ACCESO) -> Dict[str, Any]:
+        """
+        Emite un token.
+
+        Returns:
+            Dict con 'token' y los 'datos' firmados (sub, tipo, jti, iat, exp)
+        """
+        ahora = int(self._reloj())
+        datos = {
+            "sub": id_usuario,
+            "tipo": tipo,
+            "jti": uuid.uuid4().hex,
+            "iat": ahora,
+            "exp": ahora + self.duraciones[tipo],
+        }
+        contenido = f"{self._CABECERA}.{_b64(json.dumps(datos, separators=(',', ':')).encode('utf-8'))}"
+        return {"token": f"{contenido}.{self._firma(contenido)}", "datos": datos}
+
+    def verificar(self, token: str, tipo: str = TIPO_ACCESO) -> tuple:
+        """
+        Verifica firma, tipo y caducidad.
+
+        Returns:
+            tuple: (datos del token, None) o (None, mensaje_error)
+        """
+        partes = token.split(".")
+        # Solo se acepta la cabecera propia: nada de alg=none ni otros algoritmos.
+        # Un token válido es ASCII (base64url); el resto no llega a compare_digest.
+        if not token.isascii() or len(partes) != 3 or partes[0] != self._CABECERA:
+            return None, "Token mal formado"
+        contenido = f"{partes[0]}.{partes[1]}"
+        if not hmac.compare_digest(partes[2], self._firma(contenido)):
+            return None, "Firma del token inválida"
+        try:
+            datos = json.loads(_desde_b64(partes[1]))
+        except ValueError:
+            return None, "Token mal formado"
+        if datos.get("tipo") != tipo:
+            return None, "Tipo de token incorrecto"
+        if datos.get("exp", 0) <= self._reloj():
+            return None, "Token caducado"
+        return datos, None
+
+
+class ListaRevocacion:
+    """
+    jti revocados, en memoria del proceso. Cada entrada se descarta cuando su
+    token habría caducado, así que el tamaño lo acota el número de tokens vivos.
+    """
+
+    def __init__(self, reloj: Callable[[], float] = time.time):
+        self._revocados: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reloj = reloj
+        self._proxima_purga = 0.0
+
+    def revocar(self, jti: str, exp: float) -> bool:
+        """
+        Revoca el token. Devuelve False si ya estaba revocado (p. ej. un
+        token de refresco usado dos veces).
+        """
+        with self._lock:
+            self._purgar()
+            if jti in self._revocados:
+                return False
+            self._revocados[jti] = exp
+            return True
+
+    def revocado(self, jti: str) -> bool:
+        return jti in self._revocados
+
+    def _purgar(self) -> None:
+        ahora = self._reloj()
+        if ahora < self._proxima_purga:
+            return
+        self._revocados = {jti: exp for jti, exp in self._revocados.items() if exp > ahora}
+        self._proxima_purga = ahora + 60
+
+    def __len__(self) -> int:
+        return len(self._revocados)
+
+
+class RegistroAccesos:
+    """
+    Últimos accesos pendientes de escribir, con un máximo de uno por usuario
+    y por intervalo.
+    """
+
+    def __init__(self, intervalo_segundos: float = INTERVALO_ACCESO_SEGUNDOS, reloj: Callable[[], float] = time.time):
+        self.intervalo_segundos = intervalo_segundos
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._pendientes: Dict[str, datetime] = {}
+        self._anotados: Dict[str, float] = {}
+
+    def registrar(self, id_usuario: str) -> bool:
+        """Anota el acceso si el último anotado es más antiguo que el intervalo."""
+        ahora = self._reloj()
+        anotado = self._anotados.get(id_usuario)
+        if anotado is not None and ahora - anotado < self.intervalo_segundos:
+            return False
+        with self._lock:
+            self._anotados[id_usuario] = ahora
+            self._pendientes[id_usuario] = datetime.utcnow()
+        return True
+
+    def extraer(self) -> Dict[str, datetime]:
+        """Saca los accesos pendientes y olvida los anotados hace más de un intervalo."""
+        ahora = self._reloj()
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+            self._anotados = {
+                id_usuario: anotado for id_usuario, anotado in self._anotados.items()
+                if ahora - anotado < self.intervalo_segundos
+            }
+            return pendientes
+
+    def devolver(self, pendientes: Dict[str, datetime]) -> None:
+        """Vuelve a dejar pendientes los accesos de un volcado fallido (sin pisar otros más nuevos)."""
+        with self._lock:
+            for id_usuario, fecha in pendientes.items():
+                self._pendientes.setdefault(id_usuario, fecha)
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._pendientes)
+
+
+# Estado por defecto del proceso
+tokens_revocados = ListaRevocacion()
+registro_accesos = RegistroAccesos()
+
+
+def validar_token(token: str, firmador: FirmadorTokens, tipo: str = TIPO_ACCESO,
+                  revocados: Optional[ListaRevocacion] = None) -> tuple:
+    """
+    Valida un token sin consultar la base de datos: firma, tipo, caducidad y revocación.
+
+    Returns:
+        tuple: (datos del token, None) o (None, mensaje_error)
+    """
+    revocados = revocados if revocados is not None else tokens_revocados
+    datos, error = firmador.verificar(token, tipo)
+    if error:
+        return None, error
+    if revocados.revocado(datos["jti"]):
+        return None, "Token revocado"
+    return datos, None
+
+
+class GestorAutenticacion:
+    """
+    Gestor de autenticación.
+
+    Attributes:
+        db: Sesión de SQLAlchemy de la BD de usuarios
+        Usuario: Clase del modelo
+        firmador: Firmador de tokens
+        revocados: Lista de tokens revocados
+        accesos: Registro de últimos accesos
+    """
+
+    def __init__(self, db: Session, modelos: Dict, firmador: FirmadorTokens,
+                 revocados: Optional[ListaRevocacion] = None, accesos: Optional[RegistroAccesos] = None):
+        """
+        Inicializa el gestor de autenticación.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con la clase 'Usuario'
+            firmador: Firmador de tokens
+            revocados: Lista de revocación (por defecto, la del proceso)
+            accesos: Registro de accesos (por defecto, el del proceso)
+        """
+        self.db = db
+        self.Usuario = modelos['Usuario']
+        self.firmador = firmador
+        self.revocados = revocados if revocados is not None else tokens_revocados
+        self.accesos = accesos if accesos is not None else registro_accesos
+
+    # ===== Lectura =====
+
+    def credenciales(self, email: str) -> Optional[tuple]:
+        """(id_usuario, password_hash, activo) del usuario con ese email, o None."""
+        return self.db.execute(
+            select(self.Usuario.id_usuario, self.Usuario.password_hash, self.Usuario.activo)
+            .where(self.Usuario.email == email)
+        ).first()
+
+    def usuario_activo(self, id_usuario: str) -> bool:
+        return bool(self.db.execute(
+            select(self.Usuario.activo).where(self.Usuario.id_usuario == id_usuario)
+        ).scalar())
+
+    # ===== Tokens =====
+
+    def emitir_tokens(self, id_usuario: str) -> Dict[str, Any]:
+        """Par de tokens de acceso y refresco; cuenta como acceso del usuario."""
+        acceso = self.firmador.emitir(id_usuario, TIPO_ACCESO)
+        refresco = self.firmador.emitir(id_usuario, TIPO_REFRESCO)
+        self.accesos.registrar(id_usuario)
+        return {
+            "access_token": acceso["token"],
+            "refresh_token": refresco["token"],
+            "token_type": "bearer",
+            "expires_in": self.firmador.duraciones[TIPO_ACCESO],
+            "id_usuario": id_usuario,
+        }
+
+    def completar_login(self, fila: Optional[tuple], password_valido: bool) -> tuple:
+        """
+        Resultado del inicio de sesión una vez verificada la contraseña.
+
+        Returns:
+            tuple: (dict con los tokens, None) o (None, mensaje_error)
+        """
+        if fila is None or not password_valido or not fila.activo:
+            return None, ERROR_CREDENCIALES
+        return self.emitir_tokens(fila.id_usuario), None
+
+    def login(self, email: str, password: str) -> tuple:
+        """
+        Inicio de sesión síncrono (bcrypt en el hilo que llama).
+
+        Returns:
+            tuple: (dict con los tokens, None) o (None, mensaje_error)
+        """
+        try:
+            fila = self.credenciales(email)
+            return self.completar_login(fila, verificar_password(password, fila.password_hash if fila else None))
+        except Exception as e:
+            return None, f"Error al iniciar sesión: {str(e)}"
+
+    def refrescar(self, refresh_token: str) -> tuple:
+        """
+        Cambia un token de refresco por un par nuevo. El usado queda revocado:
+        presentarlo otra vez falla.
+
+        Returns:
+            tuple: (dict con los tokens, None) o (None, mensaje_error)
+        """
+        datos, error = validar_token(refresh_token, self.firmador, TIPO_REFRESCO, self.revocados)
+        if error:
+            return None, error
+        try:
+            if not self.usuario_activo(datos["sub"]):
+                return None, "Usuario no encontrado o inactivo"
+        except Exception as e:
+            return None, f"Error al refrescar la sesión: {str(e)}"
+        if not self.revocados.revocar(datos["jti"], datos["exp"]):
+            return None, "Token revocado"
+        return self.emitir_tokens(datos["sub"]), None
+
+    def cerrar_sesion(self, datos_acceso: Dict[str, Any], refresh_token: Optional[str] = None) -> tuple:
+        """
+        Revoca el token de acceso actual y, si se indica, el de refresco del mismo usuario.
+
+        Returns:
+            tuple: (True, None) o (None, mensaje_error)
+        """
+        if refresh_token:
+            datos, error = validar_token(refresh_token, self.firmador, TIPO_REFRESCO, self.revocados)
+            if error:
+                return None, error
+            if datos["sub"] != datos_acceso["sub"]:
+                return None, "El token de refresco es de otro usuario"
+            self.revocados.revocar(datos["jti"], datos["exp"])
+        self.revocados.revocar(datos_acceso["jti"], datos_acceso["exp"])
+        return True, None
+
+    # ===== Último acceso =====
+
+    def volcar_accesos(self) -> tuple:
+        """
+        Escribe los últimos accesos pendientes en un único UPDATE por lotes.
+        Si falla, vuelven al registro.
+
+        Returns:
+            tuple: (número de usuarios escritos, None) o (None, mensaje_error)
+        """
+        pendientes = self.accesos.extraer()
+        if not pendientes:
+            return 0, None
+
+        tabla = self.Usuario.__table__
+        sentencia = (
+            update(tabla)
+            .where(tabla.c.id_usuario == bindparam("b_id"))
+            # fecha_modificacion explícita para que no salte su onupdate: un acceso no modifica al usuario
+            .values(ultimo_acceso=bindparam("b_fecha"), fecha_modificacion=tabla.c.fecha_modificacion)
+        )
+        try:
+            self.db.execute(sentencia, [
+                {"b_id": id_usuario, "b_fecha": fecha} for id_usuario, fecha in pendientes.items()
+            ])
+            self.db.commit()
+            return len(pendientes), None
+        except Exception as e:
+            self.db.rollback()
+            self.accesos.devolver(pendientes)
+            return None, f"Error al guardar los últimos accesos: {str(e)}"
+
+
+class GestorAutenticacionAsync:
+    """
+    Versión asíncrona del GestorAutenticacion para los endpoints de la API.
+    bcrypt corre en pool_bcrypt, nunca en el event loop.
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Dict con las clases de los modelos de usuarios
+        firmador, revocados, accesos: Ver GestorAutenticacion
+        pool: Pool de hilos para bcrypt
+    """
+
+    # Inicios de sesión esperando a bcrypt en este proceso (solo se toca desde el event loop)
+    _en_espera = 0
+
+    def __init__(self, db: AsyncSession, modelos: Dict, firmador: FirmadorTokens,
+                 revocados: Optional[ListaRevocacion] = None, accesos: Optional[RegistroAccesos] = None,
+                 pool: Optional[ThreadPoolExecutor] = None, max_en_espera: int = MAX_LOGINS_EN_ESPERA):
+        """
+        Inicializa el gestor asíncrono de autenticación.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelos: Dict con la clase 'Usuario'
+            firmador: Firmador de tokens
+            revocados: Lista de revocación (por defecto, la del proceso)
+            accesos: Registro de accesos (por defecto, el del proceso)
+            pool: Pool de hilos para bcrypt (por defecto, pool_bcrypt)
+            max_en_espera: Inicios de sesión simultáneos antes de rechazar
+        """
+        self.db = db
+        self.modelos = modelos
+        self.firmador = firmador
+        self.revocados = revocados
+        self.accesos = accesos
+        self.pool = pool if pool is not None else pool_bcrypt
+        self.max_en_espera = max_en_espera
+
+    async def _ejecutar(self, metodo: str, *args):
+        def llamar(sesion: Session):
+            gestor = GestorAutenticacion(
+                sesion, self.modelos, self.firmador, revocados=self.revocados, accesos=self.accesos
+            )
+            return getattr(gestor, metodo)(*args)
+
+        return await self.db.run_sync(llamar)
+
+    async def login(self, email: str, password: str) -> tuple:
+        """Ver GestorAutenticacion.login; bcrypt en el pool acotado."""
+        if GestorAutenticacionAsync._en_espera >= self.max_en_espera:
+            return None, ERROR_SATURADO
+        GestorAutenticacionAsync._en_espera += 1
+        try:
+            fila = await self._ejecutar('credenciales', email)
+            # La sesión no se necesita mientras bcrypt trabaja: se devuelve la conexión
+            await self.db.close()
+            valido = await asyncio.get_running_loop().run_in_executor(
+                self.pool, verificar_password, password, fila.password_hash if fila else None
+            )
+        except Exception as e:
+            return None, f"Error al iniciar sesión: {str(e)}"
+        finally:
+            GestorAutenticacionAsync._en_espera -= 1
+        return await self._ejecutar('completar_login', fila, valido)
+
+    async def refrescar(self, refresh_token: str) -> tuple:
+        """Ver GestorAutenticacion.refrescar."""
+        return await self._ejecutar('refrescar', refresh_token)
+
+    async def cerrar_sesion(self, datos_acceso: Dict[str, Any], refresh_token: Optional[str] = None) -> tuple:
+        """Ver GestorAutenticacion.cerrar_sesion."""
+        return await self._ejecutar('cerrar_sesion', datos_acceso, refresh_token)
+
+    async def volcar_accesos(self) -> tuple:
+        """Ver GestorAutenticacion.volcar_accesos."""
+        return await self._ejecutar('volcar_accesos')
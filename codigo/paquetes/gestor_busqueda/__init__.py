@@ -0,0 +1,9 @@
+"""
+Paquete gestor_busqueda
+===============
+"""
+
+from .gestor_busqueda import GestorBusqueda, GestorBusquedaAsync
+
+__all__ = ['GestorBusqueda', 'GestorBusquedaAsync']
+__version__ = '0.1.0'
@@ -0,0 +1,294 @@
+"""
+Gestor de Búsqueda
+==================
+Búsqueda de texto completo sobre capítulos y bloques de texto.
+- MySQL: índices FULLTEXT (MATCH ... AGAINST en modo booleano).
+- SQLite: tablas FTS5 con claves enteras estables (bm25, highlight, snippet).
+
+Los índices se mantienen sincronizados en la propia base de datos
+(FULLTEXT en MySQL, triggers en SQLite), por lo que cualquier escritura
+sobre capitulos o contenidos queda indexada.
+"""
+
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+TIPOS_RESULTADO = ("capitulo", "texto")
+
+# Marcas de resaltado de los términos encontrados. titulo y fragmento son
+# HTML: el texto guardado se escapa y solo estas etiquetas quedan sin escapar
+INICIO_RESALTADO = "<mark>"
+FIN_RESALTADO = "</mark>"
+
+# Marcadores provisionales (caracteres de control) que se sustituyen por las
+# etiquetas después de escapar el texto
+_MARCA_INICIO = "\x02"
+_MARCA_FIN = "\x03"
+
+# Palabras aproximadas de cada fragmento
+PALABRAS_FRAGMENTO = 16
+
+# Máximo de términos considerados por búsqueda
+MAX_TERMINOS = 10
+
+
+def _terminos(consulta: str) -> List[str]:
+    """Extrae las palabras de la consulta, descartando operadores y símbolos."""
+    return [termino.lower() for termino in re.findall(r"\w+", consulta or "")][:MAX_TERMINOS]
+
+
+# ===== SQLite (FTS5) =====
+
+SQL_SQLITE_CAPITULOS = """
+    SELECT 'capitulo' AS tipo, c.id_capitulo AS id,
+           highlight(capitulos_fts, 0, :inicio, :fin) AS titulo, c.tema AS tema,
+           snippet(capitulos_fts, -1, :inicio, :fin, '…', :palabras) AS fragmento,
+           bm25(capitulos_fts, 10.0, 5.0, 1.0) AS rango
+    FROM capitulos_fts
+    JOIN capitulos_fts_claves k ON k.clave = capitulos_fts.rowid
+    JOIN capitulos c ON c.id_capitulo = k.id_capitulo
+    WHERE capitulos_fts MATCH :consulta
+"""
+
+SQL_SQLITE_TEXTOS = """
+    SELECT 'texto' AS tipo, t.id_contenido AS id,
+           NULL AS titulo, t.tema AS tema,
+           snippet(contenidos_fts, -1, :inicio, :fin, '…', :palabras) AS fragmento,
+           bm25(contenidos_fts, 5.0, 1.0) AS rango
+    FROM contenidos_fts
+    JOIN contenidos_fts_claves k ON k.clave = contenidos_fts.rowid
+    JOIN contenidos t ON t.id_contenido = k.id_contenido
+    WHERE contenidos_fts MATCH :consulta
+"""
+
+SQL_SQLITE_CONTAR = {
+    "capitulo": "SELECT COUNT(*) FROM capitulos_fts WHERE capitulos_fts MATCH :consulta",
+    "texto": "SELECT COUNT(*) FROM contenidos_fts WHERE contenidos_fts MATCH :consulta",
+}
+
+# ===== MySQL (FULLTEXT) =====
+
+SQL_MYSQL_CAPITULOS = """
+    SELECT 'capitulo' AS tipo, id_capitulo AS id, titulo, tema, introduccion AS cuerpo,
+           MATCH(titulo, tema, introduccion) AGAINST (:consulta IN BOOLEAN MODE) AS rango
+    FROM capitulos
+    WHERE MATCH(titulo, tema, introduccion) AGAINST (:consulta IN BOOLEAN MODE)
+"""
+
+SQL_MYSQL_TEXTOS = """
+    SELECT 'texto' AS tipo, id_contenido AS id, NULL AS titulo, tema, cuerpo_texto AS cuerpo,
+           MATCH(tema, cuerpo_texto) AGAINST (:consulta IN BOOLEAN MODE) AS rango
+    FROM contenidos
+    WHERE tipo = 'texto' AND MATCH(tema, cuerpo_texto) AGAINST (:consulta IN BOOLEAN MODE)
+"""
+
+SQL_MYSQL_CONTAR = {
+    "capitulo": """
+        SELECT COUNT(*) FROM capitulos
+        WHERE MATCH(titulo, tema, introduccion) AGAINST (:consulta IN BOOLEAN MODE)
+    """,
+    "texto": """
+        SELECT COUNT(*) FROM contenidos
+        WHERE tipo = 'texto' AND MATCH(tema, cuerpo_texto) AGAINST (:consulta IN BOOLEAN MODE)
+    """,
+}
+
+
+def _html(texto: Optional[str]) -> Optional[str]:
+    """Escapa el texto como HTML y convierte los marcadores en <mark>."""
+    if texto is None:
+        return None
+    return html.escape(texto).replace(_MARCA_INICIO, INICIO_RESALTADO).replace(_MARCA_FIN, FIN_RESALTADO)
+
+
+def _resaltar(texto: Optional[str], terminos: List[str]) -> Optional[str]:
+    """Marca (con los marcadores provisionales) las palabras que comienzan con alguno de los términos."""
+    if not texto:
+        return texto
+    patron = re.compile(r"\b(" + "|".join(re.escape(t) for t in terminos) + r")\w*", re.IGNORECASE)
+    return patron.sub(lambda m: f"{_MARCA_INICIO}{m.group(0)}{_MARCA_FIN}", texto)
+
+
+def _fragmento(texto: Optional[str], terminos: List[str]) -> Optional[str]:
+    """
+    Recorta el texto alrededor del primer término encontrado y lo resalta
+    (equivalente a snippet() de FTS5 para MySQL).
+    """
+    if not texto:
+        return texto
+
+    palabras = texto.split()
+    inicio = 0
+    for posicion, palabra in enumerate(palabras):
+        if any(palabra.lower().lstrip("¿¡(\"'").startswith(t) for t in terminos):
+            inicio = max(0, posicion - PALABRAS_FRAGMENTO // 4)
+            break
+
+    seleccion = palabras[inicio:inicio + PALABRAS_FRAGMENTO]
+    fragmento = " ".join(seleccion)
+    if inicio > 0:
+        fragmento = "…" + fragmento
+    if inicio + PALABRAS_FRAGMENTO < len(palabras):
+        fragmento += "…"
+    return _resaltar(fragmento, terminos)
+
+
+class GestorBusqueda:
+    """
+    Gestor para la búsqueda de texto completo en capítulos y bloques de texto.
+    
+    Attributes:
+        db: Sesión de SQLAlchemy
+    """
+    
+    def __init__(self, db: Session):
+        """
+        Inicializa el gestor de búsqueda.
+        
+        Args:
+            db: Sesión de SQLAlchemy
+        """
+        self.db = db
+    
+    def buscar(
+        self,
+        consulta: str,
+        tipo: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> tuple:
+        """
+        Busca en capítulos y bloques de texto, ordenando por relevancia.
+        Todas las palabras deben aparecer, completas o como prefijo.
+        
+        Args:
+            consulta: Texto a buscar
+            tipo: Restringir a 'capitulo' o 'texto' (None = ambos)
+            limit: Máximo de resultados a retornar
+            offset: Resultados a omitir (paginación)
+            
+        Returns:
+            Tupla ((resultados, total), None) si éxito. Cada resultado es un
+            dict con tipo, id, titulo, tema, fragmento y puntuacion; titulo y
+            fragmento son HTML escapado con los términos entre <mark>.
+            Tupla (None, mensaje_error) si la consulta no es válida
+        """
+        if tipo is not None and tipo not in TIPOS_RESULTADO:
+            return None, f"Tipo de resultado no válido: {tipo}"
+        
+        terminos = _terminos(consulta)
+        if not terminos:
+            return None, "La búsqueda debe contener al menos una palabra"
+        
+        tipos = [tipo] if tipo else list(TIPOS_RESULTADO)
+        
+        if self.db.get_bind().dialect.name == "sqlite":
+            return self._buscar_sqlite(terminos, tipos, limit, offset), None
+        return self._buscar_mysql(terminos, tipos, limit, offset), None
+    
+    def _buscar_sqlite(self, terminos: List[str], tipos: List[str], limit: int, offset: int) -> tuple:
+        """Búsqueda con FTS5: bm25 para el orden y snippet/highlight para el resaltado."""
+        # Cada término entre comillas (sin operadores FTS5) y como prefijo
+        consulta = " ".join(f'"{termino}"*' for termino in terminos)
+        consultas = {"capitulo": SQL_SQLITE_CAPITULOS, "texto": SQL_SQLITE_TEXTOS}
+        
+        sql = " UNION ALL ".join(consultas[tipo] for tipo in tipos)
+        filas = self.db.execute(
+            text(f"{sql} ORDER BY rango LIMIT :limit OFFSET :offset"),
+            {
+                "consulta": consulta,
+                "inicio": _MARCA_INICIO,
+                "fin": _MARCA_FIN,
+                "palabras": PALABRAS_FRAGMENTO,
+                "limit": limit,
+                "offset": offset
+            }
+        ).mappings().all()
+        
+        total = sum(
+            self.db.execute(text(SQL_SQLITE_CONTAR[tipo]), {"consulta": consulta}).scalar()
+            for tipo in tipos
+        )
+        
+        # bm25 es menor cuanto más relevante: se invierte el signo
+        resultados = [
+            self._resultado(fila, _html(fila["titulo"]), _html(fila["fragmento"]), -fila["rango"])
+            for fila in filas
+        ]
+        return resultados, total
+    
+    def _buscar_mysql(self, terminos: List[str], tipos: List[str], limit: int, offset: int) -> tuple:
+        """Búsqueda con FULLTEXT en modo booleano; el resaltado se hace en Python."""
+        # Todas las palabras requeridas (+) y como prefijo (*)
+        consulta = " ".join(f"+{termino}*" for termino in terminos)
+        consultas = {"capitulo": SQL_MYSQL_CAPITULOS, "texto": SQL_MYSQL_TEXTOS}
+        
+        sql = " UNION ALL ".join(consultas[tipo] for tipo in tipos)
+        filas = self.db.execute(
+            text(f"{sql} ORDER BY rango DESC LIMIT :limit OFFSET :offset"),
+            {"consulta": consulta, "limit": limit, "offset": offset}
+        ).mappings().all()
+        
+        total = sum(
+            self.db.execute(text(SQL_MYSQL_CONTAR[tipo]), {"consulta": consulta}).scalar()
+            for tipo in tipos
+        )
+        
+        resultados = [
+            self._resultado(
+                fila,
+                _html(_resaltar(fila["titulo"], terminos)),
+                _html(_fragmento(fila["cuerpo"], terminos)),
+                float(fila["rango"])
+            )
+            for fila in filas
+        ]
+        return resultados, total
+    
+    @staticmethod
+    def _resultado(fila, titulo, fragmento, puntuacion: float) -> Dict[str, Any]:
+        return {
+            "tipo": fila["tipo"],
+            "id": fila["id"],
+            "titulo": titulo,
+            "tema": fila["tema"],
+            "fragmento": fragmento,
+            "puntuacion": round(puntuacion, 4)
+        }
+
+
+class GestorBusquedaAsync:
+    """
+    Versión asíncrona del GestorBusqueda para los endpoints de la API.
+    
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+    """
+    
+    def __init__(self, db: AsyncSession):
+        """
+        Inicializa el gestor asíncrono de búsqueda.
+        
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+        """
+        self.db = db
+    
+    async def buscar(
+        self,
+        consulta: str,
+        tipo: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> tuple:
+        """Ver GestorBusqueda.buscar."""
+        def llamar(sesion: Session):
+            return GestorBusqueda(sesion).buscar(consulta, tipo=tipo, limit=limit, offset=offset)
+        
+        return await self.db.run_sync(llamar)
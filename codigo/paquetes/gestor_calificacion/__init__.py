@@ -0,0 +1,9 @@
+"""
+Paquete gestor_calificacion
+===========================
+"""
+
+from .gestor_calificacion import GestorCalificacion, GestorCalificacionAsync
+
+__all__ = ['GestorCalificacion', 'GestorCalificacionAsync']
+__version__ = '0.1.0'
@@ -0,0 +1,422 @@
+"""
+Gestor de Calificación
+======================
+Calificación automática de intentos de evaluación.
+
+La clave de respuestas de cada evaluación (opciones correctas y texto
+esperado por pregunta) se carga una sola vez y se guarda en caché; calificar
+un intento lee sus respuestas en una consulta, las puntúa en memoria y las
+escribe con un único UPDATE masivo.
+
+Las preguntas de ensayo no se califican automáticamente: conservan los
+puntos asignados por el docente y es_correcta queda sin tocar.
+"""
+
+import asyncio
+import threading
+import unicodedata
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+CLAVE_RESPUESTAS = "clave_respuestas:{}"
+
+TIPOS_OPCION = ("opcion_multiple", "verdadero_falso")
+TIPO_ENSAYO = "ensayo"
+
+# Intentos recalificados por lote (respuestas leídas y escritas juntas)
+TAMANO_LOTE_RECALIFICACION = 500
+
+
+def _normalizar(texto: Optional[str]) -> str:
+    """Compara respuestas cortas sin mayúsculas, tildes ni espacios sobrantes."""
+    if not texto:
+        return ""
+    sin_tildes = "".join(
+        caracter for caracter in unicodedata.normalize("NFKD", texto)
+        if not unicodedata.combining(caracter)
+    )
+    return " ".join(sin_tildes.casefold().split())
+
+
+class _CacheClaves:
+    """
+    Caché en memoria del proceso para las claves de respuestas (LRU acotado).
+    Tiene la misma interfaz que las cachés de cache_lectura, que pueden usarse
+    en su lugar para compartir las claves entre procesos.
+    """
+
+    def __init__(self, max_entradas: int = 256):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, *claves: str) -> None:
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+
+# Caché por defecto, compartida por todos los gestores del proceso
+claves_respuestas = _CacheClaves()
+
+# Evita que cientos de envíos simultáneos carguen la misma clave a la vez.
+# Son locks de asyncio (GestorCalificacionAsync): un threading.Lock tomado
+# dentro de run_sync bloquearía el event loop y, con él, a quien lo tiene.
+# Un lock desaparece cuando ya nadie lo espera
+_locks_carga: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _lock_carga(id_evaluacion: str) -> asyncio.Lock:
+    lock = _locks_carga.get(id_evaluacion)
+    if lock is None:
+        lock = _locks_carga[id_evaluacion] = asyncio.Lock()
+    return lock
+
+
+class GestorCalificacion:
+    """
+    Gestor de la calificación automática de intentos.
+
+    Attributes:
+        db: Sesión de base de datos SQLAlchemy (BD de evaluaciones)
+        Evaluacion, Pregunta, Opcion, Intento, Respuesta: Clases de los modelos
+        cache: Caché de las claves de respuestas
+    """
+
+    def __init__(self, db: Session, modelos: Dict, cache=None):
+        """
+        Inicializa el gestor de calificación.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con las clases 'Evaluacion', 'Pregunta', 'Opcion', 'Intento' y 'Respuesta'
+            cache: Caché para las claves de respuestas (por defecto, la del proceso)
+        """
+        self.db = db
+        self.Evaluacion = modelos['Evaluacion']
+        self.Pregunta = modelos['Pregunta']
+        self.Opcion = modelos['Opcion']
+        self.Intento = modelos['Intento']
+        self.Respuesta = modelos['Respuesta']
+        self.cache = cache if cache is not None else claves_respuestas
+
+    # ===== Clave de respuestas =====
+
+    def _cargar_clave(self, id_evaluacion: str) -> Optional[Dict[str, Any]]:
+        """Lee de la BD la configuración de la evaluación y la clave de cada pregunta."""
+        evaluacion = self.db.execute(
+            select(
+                self.Evaluacion.puntos_totales,
+                self.Evaluacion.calificacion_minima_aprobacion
+            ).where(self.Evaluacion.id_evaluacion == id_evaluacion)
+        ).first()
+        if evaluacion is None:
+            return None
+
+        preguntas: Dict[str, Dict[str, Any]] = {}
+        filas = self.db.execute(
+            select(
+                self.Pregunta.id_pregunta,
+                self.Pregunta.tipo,
+                self.Pregunta.puntos,
+                self.Pregunta.respuesta_correcta_texto
+            ).where(self.Pregunta.id_evaluacion == id_evaluacion)
+        )
+        for id_pregunta, tipo, puntos, texto in filas:
+            preguntas[id_pregunta] = {
+                "tipo": getattr(tipo, "value", tipo),
+                "puntos": puntos if puntos is not None else 1.0,
+                "opciones": [],
+                "texto": _normalizar(texto) if texto else None,
+            }
+
+        correctas = self.db.execute(
+            select(self.Opcion.id_pregunta, self.Opcion.id_opcion)
+            .join(self.Pregunta, self.Pregunta.id_pregunta == self.Opcion.id_pregunta)
+            .where(self.Pregunta.id_evaluacion == id_evaluacion, self.Opcion.es_correcta.is_(True))
+        )
+        for id_pregunta, id_opcion in correctas:
+            preguntas[id_pregunta]["opciones"].append(id_opcion)
+
+        return {
+            "puntos_totales": evaluacion.puntos_totales if evaluacion.puntos_totales is not None else 100.0,
+            "minimo_aprobacion": (
+                evaluacion.calificacion_minima_aprobacion
+                if evaluacion.calificacion_minima_aprobacion is not None else 60.0
+            ),
+            "puntos_preguntas": sum(pregunta["puntos"] for pregunta in preguntas.values()),
+            "preguntas": preguntas,
+        }
+
+    def obtener_clave(self, id_evaluacion: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve la clave de respuestas de una evaluación, desde la caché si está.
+
+        Returns:
+            Dict con puntos_totales, minimo_aprobacion, puntos_preguntas y
+            preguntas (id -> tipo, puntos, opciones correctas, texto normalizado),
+            o None si la evaluación no existe
+        """
+        clave_cache = CLAVE_RESPUESTAS.format(id_evaluacion)
+        clave = self.cache.obtener(clave_cache)
+        if clave is None:
+            clave = self._cargar_clave(id_evaluacion)
+            if clave is not None:
+                self.cache.guardar(clave_cache, clave)
+        return clave
+
+    def obtener_id_evaluacion(self, id_intento: str) -> Optional[str]:
+        """ID de la evaluación de un intento (None si el intento no existe)."""
+        intento = self.db.get(self.Intento, id_intento)
+        return intento.id_evaluacion if intento else None
+
+    def invalidar_clave(self, id_evaluacion: str) -> None:
+        """Descarta la clave en caché tras modificar preguntas u opciones."""
+        self.cache.invalidar(CLAVE_RESPUESTAS.format(id_evaluacion))
+
+    # ===== Puntuación =====
+
+    @staticmethod
+    def _puntuar(clave: Dict[str, Any], respuestas) -> tuple:
+        """
+        Puntúa en memoria las respuestas de un intento.
+
+        Returns:
+            (actualizaciones de Respuesta, puntos obtenidos en preguntas)
+        """
+        actualizaciones = []
+        obtenidos = 0.0
+
+        for id_respuesta, id_pregunta, id_opcion, texto, puntos_previos in respuestas:
+            pregunta = clave["preguntas"].get(id_pregunta)
+            if pregunta is None:
+                continue
+
+            if pregunta["tipo"] == TIPO_ENSAYO:
+                # Calificación manual del docente
+                obtenidos += puntos_previos or 0.0
+                continue
+
+            if pregunta["tipo"] in TIPOS_OPCION:
+                correcta = id_opcion is not None and id_opcion in pregunta["opciones"]
+            else:
+                # Respuesta corta
+                correcta = pregunta["texto"] is not None and _normalizar(texto) == pregunta["texto"]
+
+            puntos = pregunta["puntos"] if correcta else 0.0
+            obtenidos += puntos
+            actualizaciones.append({
+                "id_respuesta": id_respuesta,
+                "es_correcta": correcta,
+                "puntos_obtenidos": puntos,
+            })
+
+        return actualizaciones, obtenidos
+
+    @staticmethod
+    def _resultado(clave: Dict[str, Any], obtenidos: float) -> Dict[str, Any]:
+        """
+        Calificación del intento: el porcentaje sale de los puntos de las
+        preguntas y los puntos se escalan a los puntos_totales de la evaluación.
+        """
+        maximo = clave["puntos_preguntas"]
+        porcentaje = round(obtenidos * 100 / maximo, 2) if maximo else 0.0
+        return {
+            "puntos_obtenidos": round(porcentaje * clave["puntos_totales"] / 100, 2),
+            "puntos_totales": clave["puntos_totales"],
+            "porcentaje": porcentaje,
+            "aprobado": porcentaje >= clave["minimo_aprobacion"],
+        }
+
+    def _columnas_respuesta(self):
+        return (
+            self.Respuesta.id_respuesta,
+            self.Respuesta.id_pregunta,
+            self.Respuesta.id_opcion_seleccionada,
+            self.Respuesta.respuesta_texto,
+            self.Respuesta.puntos_obtenidos,
+        )
+
+    def calificar_intento(self, id_intento: str) -> tuple:
+        """
+        Califica un intento. Si seguía en progreso se da por finalizado.
+
+        Args:
+            id_intento: ID del intento
+
+        Returns:
+            tuple: (intento, None) si se calificó, (None, mensaje_error) si no
+        """
+        intento = self.db.get(self.Intento, id_intento)
+        if not intento:
+            return None, f"Intento con ID '{id_intento}' no encontrado"
+
+        estados = self.Intento.__table__.c.estado.type.enum_class
+        if intento.estado == estados.ABANDONADO:
+            return None, "No se puede calificar un intento abandonado"
+
+        clave = self.obtener_clave(intento.id_evaluacion)
+        if clave is None:
+            return None, f"Evaluación con ID '{intento.id_evaluacion}' no encontrada"
+
+        respuestas = self.db.execute(
+            select(*self._columnas_respuesta()).where(self.Respuesta.id_intento == id_intento)
+        ).all()
+        actualizaciones, obtenidos = self._puntuar(clave, respuestas)
+
+        try:
+            if actualizaciones:
+                self.db.execute(update(self.Respuesta), actualizaciones)
+
+            for campo, valor in self._resultado(clave, obtenidos).items():
+                setattr(intento, campo, valor)
+            if intento.estado == estados.EN_PROGRESO:
+                intento.estado = estados.COMPLETADO
+                intento.fecha_finalizacion = datetime.utcnow()
+                if intento.fecha_inicio:
+                    intento.tiempo_transcurrido_segundos = int(
+                        (intento.fecha_finalizacion - intento.fecha_inicio).total_seconds()
+                    )
+
+            self.db.commit()
+            self.db.refresh(intento)
+            return intento, None
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al calificar el intento: {str(e)}"
+
+    def recalificar_evaluacion(self, id_evaluacion: str) -> tuple:
+        """
+        Vuelve a calificar todos los intentos completados de una evaluación,
+        p. ej. después de corregir su clave de respuestas. Los intentos se
+        procesan por lotes y todo se confirma en una sola transacción.
+
+        Args:
+            id_evaluacion: ID de la evaluación
+
+        Returns:
+            tuple: (número de intentos recalificados, None) o (None, mensaje_error)
+        """
+        self.invalidar_clave(id_evaluacion)
+        clave = self.obtener_clave(id_evaluacion)
+        if clave is None:
+            return None, f"Evaluación con ID '{id_evaluacion}' no encontrada"
+
+        estados = self.Intento.__table__.c.estado.type.enum_class
+        ids_intentos: List[str] = list(self.db.execute(
+            select(self.Intento.id_intento).where(
+                self.Intento.id_evaluacion == id_evaluacion,
+                self.Intento.estado == estados.COMPLETADO
+            )
+        ).scalars())
+
+        try:
+            for inicio in range(0, len(ids_intentos), TAMANO_LOTE_RECALIFICACION):
+                lote = ids_intentos[inicio:inicio + TAMANO_LOTE_RECALIFICACION]
+
+                por_intento: Dict[str, list] = {id_intento: [] for id_intento in lote}
+                filas = self.db.execute(
+                    select(self.Respuesta.id_intento, *self._columnas_respuesta())
+                    .where(self.Respuesta.id_intento.in_(lote))
+                )
+                for id_intento, *respuesta in filas:
+                    por_intento[id_intento].append(respuesta)
+
+                respuestas_actualizadas = []
+                intentos_actualizados = []
+                for id_intento, respuestas in por_intento.items():
+                    actualizaciones, obtenidos = self._puntuar(clave, respuestas)
+                    respuestas_actualizadas.extend(actualizaciones)
+                    intentos_actualizados.append({"id_intento": id_intento, **self._resultado(clave, obtenidos)})
+
+                if respuestas_actualizadas:
+                    self.db.execute(update(self.Respuesta), respuestas_actualizadas)
+                if intentos_actualizados:
+                    self.db.execute(update(self.Intento), intentos_actualizados)
+
+            self.db.commit()
+            return len(ids_intentos), None
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al recalificar la evaluación: {str(e)}"
+
+
+class GestorCalificacionAsync:
+    """
+    Versión asíncrona del GestorCalificacion para los endpoints de la API.
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Dict con las clases de los modelos de evaluaciones
+        cache: Caché de las claves de respuestas
+    """
+
+    def __init__(self, db: AsyncSession, modelos: Dict, cache=None):
+        """
+        Inicializa el gestor asíncrono de calificación.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelos: Dict con las clases 'Evaluacion', 'Pregunta', 'Opcion', 'Intento' y 'Respuesta'
+            cache: Caché para las claves de respuestas (por defecto, la del proceso)
+        """
+        self.db = db
+        self.modelos = modelos
+        self.cache = cache
+
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        def llamar(sesion: Session):
+            gestor = GestorCalificacion(sesion, self.modelos, cache=self.cache)
+            return getattr(gestor, metodo)(*args, **kwargs)
+
+        return await self.db.run_sync(llamar)
+
+    async def obtener_clave(self, id_evaluacion: str) -> Optional[Dict[str, Any]]:
+        """
+        Ver GestorCalificacion.obtener_clave. Con la caché vacía, solo una de
+        las peticiones simultáneas de la misma evaluación la lee de la BD; las
+        demás esperan en el event loop y la toman de la caché.
+        """
+        cache = self.cache if self.cache is not None else claves_respuestas
+        clave_cache = CLAVE_RESPUESTAS.format(id_evaluacion)
+        clave = cache.obtener(clave_cache)
+        if clave is not None:
+            return clave
+
+        lock = _lock_carga(id_evaluacion)
+        async with lock:
+            return await self._ejecutar('obtener_clave', id_evaluacion)
+
+    async def calificar_intento(self, id_intento: str) -> tuple:
+        """Ver GestorCalificacion.calificar_intento."""
+        # Carga la clave antes (una sola vez por evaluación); el intento queda
+        # en la sesión y calificar_intento no lo vuelve a consultar
+        id_evaluacion = await self._ejecutar('obtener_id_evaluacion', id_intento)
+        if id_evaluacion is not None:
+            await self.obtener_clave(id_evaluacion)
+        return await self._ejecutar('calificar_intento', id_intento)
+
+    async def recalificar_evaluacion(self, id_evaluacion: str) -> tuple:
+        """Ver GestorCalificacion.recalificar_evaluacion."""
+        return await self._ejecutar('recalificar_evaluacion', id_evaluacion)
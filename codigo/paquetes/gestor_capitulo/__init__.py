@@ -3,7 +3,7 @@ Paquete gestor_capitulo
 ===============
 """
 
-from .gestor_capitulo import GestorCapitulo
+from .gestor_capitulo import GestorCapitulo, GestorCapituloAsync
 
-__all__ = ['GestorCapitulo']
+__all__ = ['GestorCapitulo', 'GestorCapituloAsync']
 __version__ = '0.1.0'
@@ -5,11 +5,58 @@ Implementa la lógica de negocio para la gestión de capítulos.
 Versión actualizada para FastAPI con SQLAlchemy directamente.
 """
 
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Sequence
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 
+# Claves de caché (compartidas con GestorContenido para el capítulo completo)
+CLAVE_CAPITULO = "capitulo:{}"
+CLAVE_CAPITULO_CONTENIDOS = "capitulo_contenidos:{}"
+PREFIJO_CAPITULOS_PUBLICADOS = "capitulos_publicados:"
+
+
+def _instantanea(fila, campos: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Copia los valores de las columnas de una fila ORM a un diccionario
+    (solo 'campos' si se indican: el resto puede no estar cargado).
+    """
+    claves = campos or [columna.key for columna in inspect(fila).mapper.column_attrs]
+    return {clave: getattr(fila, clave) for clave in claves}
+
+
+def _proyeccion(modelo, campos: Sequence[str], *necesarios: str):
+    """
+    Opción load_only con las columnas pedidas y las que necesita la propia
+    consulta (p. ej. la del cursor). Los nombres que no son columnas se ignoran.
+    """
+    columnas = {columna.key for columna in inspect(modelo).column_attrs}
+    nombres = [nombre for nombre in dict.fromkeys([*campos, *necesarios]) if nombre in columnas]
+    return load_only(*(getattr(modelo, nombre) for nombre in nombres))
+
+
+def _codificar_cursor(datos: Dict[str, Any]) -> str:
+    """Codifica la posición de la última fila como un cursor opaco."""
+    crudo = json.dumps(datos, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    """Decodifica un cursor opaco. Devuelve None si no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    return datos if isinstance(datos, dict) else None
+
+
 class GestorCapitulo:
     """
     Gestor de la lógica de negocio para capítulos.
@@ -18,18 +65,41 @@ class GestorCapitulo:
     Attributes:
         db: Sesión de base de datos SQLAlchemy
         modelo_capitulo: Clase del modelo Capitulo
+        cache: Caché de lectura opcional (paquete cache_lectura)
     """
     
-    def __init__(self, db: Session, modelo_capitulo):
+    def __init__(self, db: Session, modelo_capitulo, cache=None):
         """
         Inicializa el gestor de capítulos.
         
         Args:
             db: Sesión de SQLAlchemy
             modelo_capitulo: Clase del modelo Capitulo (de db.contenido.models)
+            cache: Caché para las lecturas de capítulos publicados (opcional).
+                   Los aciertos devuelven copias de solo lectura con los
+                   mismos atributos que el modelo.
         """
         self.db = db
         self.Capitulo = modelo_capitulo
+        self.cache = cache
+    
+    def _invalidar_cache(self, id_capitulo: str, afecta_publicados: bool) -> None:
+        """
+        Invalida las entradas de caché de un capítulo.
+        
+        Args:
+            id_capitulo: UUID del capítulo modificado
+            afecta_publicados: Si True, también invalida los listados de publicados
+        """
+        if self.cache is None:
+            return
+        
+        self.cache.invalidar(
+            CLAVE_CAPITULO.format(id_capitulo),
+            CLAVE_CAPITULO_CONTENIDOS.format(id_capitulo)
+        )
+        if afecta_publicados:
+            self.cache.invalidar_prefijo(PREFIJO_CAPITULOS_PUBLICADOS)
     
     def crear_capitulo(
         self, 
@@ -80,6 +150,9 @@ class GestorCapitulo:
             self.db.commit()
             self.db.refresh(nuevo_capitulo)
             
+            if estado == "PUBLICADO" and self.cache is not None:
+                self.cache.invalidar_prefijo(PREFIJO_CAPITULOS_PUBLICADOS)
+            
             return nuevo_capitulo, None
             
         except IntegrityError as e:
@@ -95,7 +168,8 @@ class GestorCapitulo:
         limit: int = 100,
         tema: Optional[str] = None,
         estado: Optional[str] = None,
-        solo_publicados: bool = False
+        solo_publicados: bool = False,
+        campos: Optional[Sequence[str]] = None
     ) -> List:
         """
         Lista capítulos con filtros opcionales.
@@ -106,12 +180,27 @@ class GestorCapitulo:
             tema: Filtrar por tema (búsqueda parcial)
             estado: Filtrar por estado exacto
             solo_publicados: Si True, solo retorna capítulos PUBLICADOS
+                             (lectura cacheada si el gestor tiene caché)
+            campos: Columnas a cargar (None = todas). Las demás no se leen
+                    de la base de datos y no deben usarse en el resultado
             
         Returns:
             Lista de capítulos que cumplen los filtros
         """
+        clave = None
+        if solo_publicados and self.cache is not None:
+            clave = f"{PREFIJO_CAPITULOS_PUBLICADOS}{skip}:{limit}:{tema or ''}:{','.join(campos or ())}"
+            en_cache = self.cache.obtener(clave)
+            if en_cache is not None:
+                return [SimpleNamespace(**datos) for datos in en_cache]
+            # Antes de consultar: si una escritura invalida entretanto, no se guarda
+            generacion = self.cache.generacion()
+        
         query = self.db.query(self.Capitulo)
         
+        if campos:
+            query = query.options(_proyeccion(self.Capitulo, campos))
+        
         if solo_publicados:
             query = query.filter(self.Capitulo.estado == "PUBLICADO")
         elif estado:
@@ -121,8 +210,69 @@ class GestorCapitulo:
             query = query.filter(self.Capitulo.tema.ilike(f"%{tema}%"))
         
         capitulos = query.order_by(self.Capitulo.numero).offset(skip).limit(limit).all()
+        
+        if clave is not None:
+            self.cache.guardar(clave, [_instantanea(capitulo, campos) for capitulo in capitulos], generacion)
+        
         return capitulos
     
+    def listar_capitulos_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        tema: Optional[str] = None,
+        estado: Optional[str] = None,
+        solo_publicados: bool = False,
+        campos: Optional[Sequence[str]] = None
+    ) -> tuple:
+        """
+        Lista capítulos con paginación por cursor (keyset) sobre 'numero'.
+        A diferencia de offset, el costo de cada página no crece con la posición.
+        
+        Args:
+            cursor: Cursor opaco devuelto por la página anterior (None = primera página)
+            limit: Máximo número de registros a retornar
+            tema: Filtrar por tema (búsqueda parcial)
+            estado: Filtrar por estado exacto
+            solo_publicados: Si True, solo retorna capítulos PUBLICADOS
+            campos: Columnas a cargar (None = todas; 'numero' se carga siempre)
+            
+        Returns:
+            Tupla ((capitulos, siguiente_cursor), None) si éxito.
+            siguiente_cursor es None cuando no hay más páginas.
+            Tupla (None, mensaje_error) si el cursor no es válido
+        """
+        query = self.db.query(self.Capitulo)
+        
+        if campos:
+            query = query.options(_proyeccion(self.Capitulo, campos, "numero"))
+        
+        if cursor:
+            posicion = _decodificar_cursor(cursor)
+            if posicion is None or not isinstance(posicion.get("numero"), int):
+                return None, "Cursor de paginación no válido"
+            query = query.filter(self.Capitulo.numero > posicion["numero"])
+        
+        if solo_publicados:
+            query = query.filter(self.Capitulo.estado == "PUBLICADO")
+        elif estado:
+            query = query.filter(self.Capitulo.estado == estado)
+        
+        if tema:
+            query = query.filter(self.Capitulo.tema.ilike(f"%{tema}%"))
+        
+        # Se pide una fila de más para saber si existe una página siguiente
+        capitulos = query.order_by(self.Capitulo.numero).limit(limit + 1).all()
+        
+        hay_mas = len(capitulos) > limit
+        capitulos = capitulos[:limit]
+        
+        siguiente_cursor = None
+        if hay_mas and capitulos:
+            siguiente_cursor = _codificar_cursor({"numero": capitulos[-1].numero})
+        
+        return (capitulos, siguiente_cursor), None
+    
     def obtener_capitulo_por_id(self, id_capitulo: str) -> tuple:
         """
         Obtiene un capítulo por su ID.
@@ -143,10 +293,31 @@ class GestorCapitulo:
         
         return capitulo, None
     
+    def obtener_version_capitulo(self, id_capitulo: str) -> tuple:
+        """
+        Obtiene solo la fecha de modificación de un capítulo, sin cargar
+        columnas grandes como la introducción. Usado para peticiones condicionales.
+        
+        Args:
+            id_capitulo: UUID del capítulo
+            
+        Returns:
+            Tupla (fecha_modificacion, None) si lo encuentra
+            Tupla (None, mensaje_error) si no existe
+        """
+        fila = self.db.query(self.Capitulo.fecha_modificacion).filter(
+            self.Capitulo.id_capitulo == id_capitulo
+        ).first()
+        
+        if not fila:
+            return None, f"Capítulo con ID {id_capitulo} no encontrado"
+        
+        return fila.fecha_modificacion, None
+    
     def obtener_capitulo_publicado(self, id_capitulo: str) -> tuple:
         """
         Obtiene un capítulo solo si está PUBLICADO.
-        Usado para endpoints públicos.
+        Usado para endpoints públicos. Lectura cacheada si el gestor tiene caché.
         
         Args:
             id_capitulo: UUID del capítulo
@@ -155,6 +326,13 @@ class GestorCapitulo:
             Tupla (capitulo, None) si está publicado
             Tupla (None, mensaje_error) si no existe o no está publicado
         """
+        clave = CLAVE_CAPITULO.format(id_capitulo)
+        if self.cache is not None:
+            en_cache = self.cache.obtener(clave)
+            if en_cache is not None:
+                return SimpleNamespace(**en_cache), None
+            generacion = self.cache.generacion()
+        
         capitulo = self.db.query(self.Capitulo).filter(
             self.Capitulo.id_capitulo == id_capitulo,
             self.Capitulo.estado == "PUBLICADO"
@@ -163,6 +341,9 @@ class GestorCapitulo:
         if not capitulo:
             return None, f"Capítulo con ID {id_capitulo} no encontrado"
         
+        if self.cache is not None:
+            self.cache.guardar(clave, _instantanea(capitulo), generacion)
+        
         return capitulo, None
     
     def actualizar_capitulo(
@@ -207,6 +388,7 @@ class GestorCapitulo:
                 return None, f"Ya existe otro capítulo con el número {datos_actualizacion['numero']}"
         
         # Actualizar campos
+        estaba_publicado = capitulo.estado == "PUBLICADO"
         try:
             for campo, valor in datos_actualizacion.items():
                 if hasattr(capitulo, campo):
@@ -215,6 +397,11 @@ class GestorCapitulo:
             self.db.commit()
             self.db.refresh(capitulo)
             
+            self._invalidar_cache(
+                id_capitulo,
+                afecta_publicados=estaba_publicado or capitulo.estado == "PUBLICADO"
+            )
+            
             return capitulo, None
             
         except IntegrityError as e:
@@ -242,9 +429,11 @@ class GestorCapitulo:
         if not capitulo:
             return False, f"Capítulo con ID {id_capitulo} no encontrado"
         
+        estaba_publicado = capitulo.estado == "PUBLICADO"
         try:
             self.db.delete(capitulo)
             self.db.commit()
+            self._invalidar_cache(id_capitulo, afecta_publicados=estaba_publicado)
             return True, None
             
         except IntegrityError as e:
@@ -284,3 +473,115 @@ class GestorCapitulo:
             query = query.filter(self.Capitulo.estado == estado)
         
         return query.count()
+
+
+class GestorCapituloAsync:
+    """
+    Versión asíncrona del GestorCapitulo para los endpoints de la API.
+    
+    Cada operación se ejecuta con AsyncSession.run_sync: la lógica y las
+    validaciones son las del GestorCapitulo, pero la E/S con la base de
+    datos pasa por el driver asíncrono y no bloquea el event loop.
+    
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelo_capitulo: Clase del modelo Capitulo
+        cache: Caché de lectura opcional (paquete cache_lectura)
+    """
+    
+    def __init__(self, db: AsyncSession, modelo_capitulo, cache=None):
+        """
+        Inicializa el gestor asíncrono de capítulos.
+        
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelo_capitulo: Clase del modelo Capitulo (de db.contenido.models)
+            cache: Caché para las lecturas de capítulos publicados (opcional)
+        """
+        self.db = db
+        self.Capitulo = modelo_capitulo
+        self.cache = cache
+    
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        """Ejecuta un método del GestorCapitulo sobre la sesión síncrona subyacente."""
+        def llamar(sesion: Session):
+            gestor = GestorCapitulo(sesion, self.Capitulo, cache=self.cache)
+            return getattr(gestor, metodo)(*args, **kwargs)
+        
+        return await self.db.run_sync(llamar)
+    
+    async def crear_capitulo(
+        self,
+        numero: int,
+        titulo: str,
+        tema: str,
+        introduccion: str = "",
+        estado: str = "BORRADOR"
+    ) -> tuple:
+        """Ver GestorCapitulo.crear_capitulo."""
+        return await self._ejecutar(
+            'crear_capitulo', numero, titulo, tema,
+            introduccion=introduccion, estado=estado
+        )
+    
+    async def listar_capitulos(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        tema: Optional[str] = None,
+        estado: Optional[str] = None,
+        solo_publicados: bool = False,
+        campos: Optional[Sequence[str]] = None
+    ) -> List:
+        """Ver GestorCapitulo.listar_capitulos."""
+        return await self._ejecutar(
+            'listar_capitulos', skip=skip, limit=limit, tema=tema,
+            estado=estado, solo_publicados=solo_publicados, campos=campos
+        )
+    
+    async def listar_capitulos_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        tema: Optional[str] = None,
+        estado: Optional[str] = None,
+        solo_publicados: bool = False,
+        campos: Optional[Sequence[str]] = None
+    ) -> tuple:
+        """Ver GestorCapitulo.listar_capitulos_por_cursor."""
+        return await self._ejecutar(
+            'listar_capitulos_por_cursor', cursor=cursor, limit=limit, tema=tema,
+            estado=estado, solo_publicados=solo_publicados, campos=campos
+        )
+    
+    async def obtener_capitulo_por_id(self, id_capitulo: str) -> tuple:
+        """Ver GestorCapitulo.obtener_capitulo_por_id."""
+        return await self._ejecutar('obtener_capitulo_por_id', id_capitulo)
+    
+    async def obtener_version_capitulo(self, id_capitulo: str) -> tuple:
+        """Ver GestorCapitulo.obtener_version_capitulo."""
+        return await self._ejecutar('obtener_version_capitulo', id_capitulo)
+    
+    async def obtener_capitulo_publicado(self, id_capitulo: str) -> tuple:
+        """Ver GestorCapitulo.obtener_capitulo_publicado."""
+        return await self._ejecutar('obtener_capitulo_publicado', id_capitulo)
+    
+    async def actualizar_capitulo(
+        self,
+        id_capitulo: str,
+        datos_actualizacion: Dict[str, Any]
+    ) -> tuple:
+        """Ver GestorCapitulo.actualizar_capitulo."""
+        return await self._ejecutar('actualizar_capitulo', id_capitulo, datos_actualizacion)
+    
+    async def eliminar_capitulo(self, id_capitulo: str) -> tuple:
+        """Ver GestorCapitulo.eliminar_capitulo."""
+        return await self._ejecutar('eliminar_capitulo', id_capitulo)
+    
+    async def cambiar_estado(self, id_capitulo: str, nuevo_estado: str) -> tuple:
+        """Ver GestorCapitulo.cambiar_estado."""
+        return await self._ejecutar('cambiar_estado', id_capitulo, nuevo_estado)
+    
+    async def contar_capitulos(self, estado: Optional[str] = None) -> int:
+        """Ver GestorCapitulo.contar_capitulos."""
+        return await self._ejecutar('contar_capitulos', estado=estado)
@@ -3,7 +3,7 @@ Paquete gestor_contenido
 ================
 """
 
-from .gestor_contenido import GestorContenido
+from .gestor_contenido import GestorContenido, GestorContenidoAsync, HUECO_ORDEN, version_contenidos
 
-__all__ = ['GestorContenido']
+__all__ = ['GestorContenido', 'GestorContenidoAsync', 'HUECO_ORDEN', 'version_contenidos']
 __version__ = '0.1.0'
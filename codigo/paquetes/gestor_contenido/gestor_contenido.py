@@ -6,11 +6,98 @@ Versión actualizada para FastAPI con SQLAlchemy directamente.
 Maneja 4 tipos de contenido: Texto, Imagen, Video, Objeto3D.
 """
 
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Sequence
+from sqlalchemy import case, func, insert, inspect, tuple_
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 
+# Claves de caché de capítulos (las mismas que usa GestorCapitulo)
+CLAVE_CAPITULO = "capitulo:{}"
+CLAVE_CAPITULO_CONTENIDOS = "capitulo_contenidos:{}"
+
+TIPOS_CONTENIDO = ("texto", "imagen", "video", "objeto3d")
+
+# Separación entre los 'orden' consecutivos al renumerar un capítulo: deja
+# hueco para mover un bloque entre dos vecinos sin tocar el resto
+HUECO_ORDEN = 1024
+
+
+def _validar_bloque(
+    tipo: str,
+    cuerpo_texto: Optional[str] = None,
+    url_archivo: Optional[str] = None,
+    formato: Optional[str] = None
+) -> Optional[str]:
+    """
+    Valida los campos requeridos según el tipo de contenido.
+    
+    Returns:
+        None si el bloque es válido, o el mensaje de error
+    """
+    if tipo not in TIPOS_CONTENIDO:
+        return f"Tipo de contenido no válido: {tipo}"
+    if tipo == "texto" and not cuerpo_texto:
+        return "El campo 'cuerpo_texto' es requerido para contenido de tipo texto"
+    if tipo in ("imagen", "objeto3d") and (not url_archivo or not formato):
+        return f"Los campos 'url_archivo' y 'formato' son requeridos para contenido de tipo {tipo}"
+    if tipo == "video" and not url_archivo:
+        return "El campo 'url_archivo' es requerido para contenido de tipo video"
+    return None
+
+
+def _instantanea(fila) -> Dict[str, Any]:
+    """Copia los valores de las columnas de una fila ORM a un diccionario."""
+    return {
+        columna.key: getattr(fila, columna.key)
+        for columna in inspect(fila).mapper.column_attrs
+    }
+
+
+def version_contenidos(capitulo, contenidos) -> tuple:
+    """
+    Versión de un capítulo con sus contenidos tal como se sirve: su fecha de
+    modificación y (id_contenido, fecha_modificacion) de cada contenido, en
+    orden. Vale igual para filas ORM que para la copia en caché.
+    """
+    return capitulo.fecha_modificacion, [
+        (contenido.id_contenido, contenido.fecha_modificacion) for contenido in contenidos
+    ]
+
+
+def _proyeccion(modelo, campos: Sequence[str], *necesarios: str):
+    """
+    Opción load_only con las columnas pedidas y las que necesita la propia
+    consulta (p. ej. las del cursor). Los nombres que no son columnas se ignoran.
+    """
+    columnas = {columna.key for columna in inspect(modelo).column_attrs}
+    nombres = [nombre for nombre in dict.fromkeys([*campos, *necesarios]) if nombre in columnas]
+    return load_only(*(getattr(modelo, nombre) for nombre in nombres))
+
+
+def _codificar_cursor(datos: Dict[str, Any]) -> str:
+    """Codifica la posición de la última fila como un cursor opaco."""
+    crudo = json.dumps(datos, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    """Decodifica un cursor opaco. Devuelve None si no es válido."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return None
+    return datos if isinstance(datos, dict) else None
+
+
 class GestorContenido:
     """
     Gestor de la lógica de negocio para contenidos.
@@ -19,9 +106,10 @@ class GestorContenido:
     Attributes:
         db: Sesión de base de datos SQLAlchemy
         modelos: Diccionario con las clases de modelos
+        cache: Caché de lectura opcional (paquete cache_lectura)
     """
     
-    def __init__(self, db: Session, modelos: Dict[str, Any]):
+    def __init__(self, db: Session, modelos: Dict[str, Any], cache=None):
         """
         Inicializa el gestor de contenidos.
         
@@ -29,8 +117,12 @@ class GestorContenido:
             db: Sesión de SQLAlchemy
             modelos: Dict con claves: 'Contenido', 'Texto', 'Imagen', 'Video', 'Objeto3D',
                     'Capitulo', 'UnionCapituloContenido'
+            cache: Caché para las lecturas de contenidos de capítulos (opcional).
+                   Los aciertos devuelven copias de solo lectura con los
+                   mismos atributos que los modelos.
         """
         self.db = db
+        self.cache = cache
         self.Contenido = modelos.get('Contenido')
         self.Texto = modelos.get('Texto')
         self.Imagen = modelos.get('Imagen')
@@ -63,20 +155,18 @@ class GestorContenido:
             Tupla (contenido_creado, None) si éxito
             Tupla (None, mensaje_error) si falla
         """
+        error = _validar_bloque(tipo, cuerpo_texto, url_archivo, formato)
+        if error:
+            return None, error
+        
         try:
             if tipo == "texto":
-                if not cuerpo_texto:
-                    return None, "El campo 'cuerpo_texto' es requerido para contenido de tipo texto"
-                
                 nuevo_contenido = self.Texto(
                     tema=tema,
                     cuerpo_texto=cuerpo_texto
                 )
             
             elif tipo == "imagen":
-                if not url_archivo or not formato:
-                    return None, "Los campos 'url_archivo' y 'formato' son requeridos para contenido de tipo imagen"
-                
                 nuevo_contenido = self.Imagen(
                     tema=tema,
                     url_archivo=url_archivo,
@@ -84,9 +174,6 @@ class GestorContenido:
                 )
             
             elif tipo == "video":
-                if not url_archivo:
-                    return None, "El campo 'url_archivo' es requerido para contenido de tipo video"
-                
                 nuevo_contenido = self.Video(
                     tema=tema,
                     url_archivo=url_archivo,
@@ -94,19 +181,13 @@ class GestorContenido:
                     duracion=duracion
                 )
             
-            elif tipo == "objeto3d":
-                if not url_archivo or not formato:
-                    return None, "Los campos 'url_archivo' y 'formato' son requeridos para contenido de tipo objeto3d"
-                
+            else:
                 nuevo_contenido = self.Objeto3D(
                     tema=tema,
                     url_archivo=url_archivo,
                     formato=formato
                 )
             
-            else:
-                return None, f"Tipo de contenido no válido: {tipo}"
-            
             self.db.add(nuevo_contenido)
             self.db.commit()
             self.db.refresh(nuevo_contenido)
@@ -120,12 +201,123 @@ class GestorContenido:
             self.db.rollback()
             return None, f"Error al crear contenido: {str(e)}"
     
+    def importar_contenidos(
+        self,
+        bloques: List[Dict[str, Any]],
+        id_capitulo: Optional[str] = None
+    ) -> tuple:
+        """
+        Crea muchos contenidos (y sus asignaciones a capítulos) en una sola
+        transacción, con inserciones masivas en lugar de un INSERT y un
+        commit por bloque.
+        
+        Todos los bloques se validan antes de escribir: si alguno no es
+        válido no se inserta ninguno.
+        
+        Args:
+            bloques: Lista de dicts con tipo, tema y los campos del tipo
+                     (cuerpo_texto, url_archivo, formato, duracion).
+                     Opcionalmente 'id_capitulo' y 'orden' por bloque.
+            id_capitulo: Capítulo destino para los bloques que no indican uno
+            
+        Returns:
+            Tupla (ids_creados, None) si éxito, en el mismo orden que 'bloques'
+            Tupla (None, mensaje_error) si falla
+        """
+        if not bloques:
+            return [], None
+        
+        # 1. Validar todos los bloques
+        errores = []
+        for indice, bloque in enumerate(bloques):
+            error = _validar_bloque(
+                bloque.get("tipo"),
+                bloque.get("cuerpo_texto"),
+                bloque.get("url_archivo"),
+                bloque.get("formato")
+            )
+            if error:
+                errores.append(f"Bloque {indice}: {error}")
+        
+        if errores:
+            return None, "; ".join(errores)
+        
+        ids_capitulo = {
+            bloque.get("id_capitulo") or id_capitulo for bloque in bloques
+        } - {None}
+        
+        # 2. Verificar los capítulos destino y calcular el siguiente orden libre
+        siguiente_orden = {}
+        if ids_capitulo:
+            filas = self.db.query(
+                self.Capitulo.id_capitulo,
+                func.max(self.UnionCapituloContenido.orden)
+            ).outerjoin(
+                self.UnionCapituloContenido,
+                self.UnionCapituloContenido.id_capitulo == self.Capitulo.id_capitulo
+            ).filter(
+                self.Capitulo.id_capitulo.in_(ids_capitulo)
+            ).group_by(self.Capitulo.id_capitulo).all()
+            
+            siguiente_orden = {id_cap: (maximo or 0) + 1 for id_cap, maximo in filas}
+            faltantes = ids_capitulo - set(siguiente_orden)
+            if faltantes:
+                return None, f"Capítulo con ID {', '.join(sorted(faltantes))} no encontrado"
+        
+        # 3. Preparar las filas
+        ahora = datetime.utcnow()
+        contenidos, uniones = [], []
+        for bloque in bloques:
+            id_contenido = str(uuid.uuid4())
+            contenidos.append({
+                "id_contenido": id_contenido,
+                "tipo": bloque["tipo"],
+                "tema": bloque.get("tema"),
+                "cuerpo_texto": bloque.get("cuerpo_texto"),
+                "url_archivo": bloque.get("url_archivo"),
+                "formato": bloque.get("formato"),
+                "duracion": bloque.get("duracion"),
+                "fecha_creacion": ahora,
+                "fecha_modificacion": ahora
+            })
+            
+            destino = bloque.get("id_capitulo") or id_capitulo
+            if destino:
+                orden = bloque.get("orden")
+                if orden is None:
+                    orden = siguiente_orden[destino]
+                siguiente_orden[destino] = max(siguiente_orden[destino], orden + 1)
+                uniones.append({
+                    "id_capitulo": destino,
+                    "id_contenido": id_contenido,
+                    "orden": orden
+                })
+        
+        # 4. Insertar todo en una transacción (executemany)
+        try:
+            self.db.execute(insert(self.Contenido.__table__), contenidos)
+            if uniones:
+                self.db.execute(insert(self.UnionCapituloContenido.__table__), uniones)
+            self._marcar_capitulos_modificados(list(ids_capitulo))
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            return None, f"Error de integridad: {str(e)}"
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al importar contenidos: {str(e)}"
+        
+        self._invalidar_cache(*ids_capitulo)
+        
+        return [fila["id_contenido"] for fila in contenidos], None
+    
     def listar_contenidos(
         self,
         skip: int = 0,
         limit: int = 100,
         tipo: Optional[str] = None,
-        tema: Optional[str] = None
+        tema: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
     ) -> List:
         """
         Lista contenidos con filtros opcionales.
@@ -135,21 +327,96 @@ class GestorContenido:
             limit: Máximo de registros a retornar
             tipo: Filtrar por tipo de contenido
             tema: Filtrar por tema (búsqueda parcial)
+            campos: Columnas a cargar (None = todas). Las demás (p. ej.
+                    cuerpo_texto) no se leen de la base de datos y no deben
+                    usarse en el resultado
             
         Returns:
             Lista de contenidos
         """
         query = self.db.query(self.Contenido)
         
+        if campos:
+            query = query.options(_proyeccion(self.Contenido, campos))
+        
         if tipo:
             query = query.filter(self.Contenido.tipo == tipo)
         
         if tema:
             query = query.filter(self.Contenido.tema.ilike(f"%{tema}%"))
         
-        contenidos = query.offset(skip).limit(limit).all()
+        # Orden estable (el mismo que usa la paginación por cursor)
+        contenidos = query.order_by(
+            self.Contenido.fecha_creacion, self.Contenido.id_contenido
+        ).offset(skip).limit(limit).all()
         return contenidos
     
+    def listar_contenidos_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        tipo: Optional[str] = None,
+        tema: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> tuple:
+        """
+        Lista contenidos con paginación por cursor (keyset) sobre
+        (fecha_creacion, id_contenido). El costo de cada página no crece
+        con la posición y las páginas son estables.
+        
+        Args:
+            cursor: Cursor opaco devuelto por la página anterior (None = primera página)
+            limit: Máximo de registros a retornar
+            tipo: Filtrar por tipo de contenido
+            tema: Filtrar por tema (búsqueda parcial)
+            campos: Columnas a cargar (None = todas; las del cursor se cargan siempre)
+            
+        Returns:
+            Tupla ((contenidos, siguiente_cursor), None) si éxito.
+            siguiente_cursor es None cuando no hay más páginas.
+            Tupla (None, mensaje_error) si el cursor no es válido
+        """
+        query = self.db.query(self.Contenido)
+        
+        if campos:
+            query = query.options(_proyeccion(self.Contenido, campos, "fecha_creacion", "id_contenido"))
+        
+        if cursor:
+            posicion = _decodificar_cursor(cursor)
+            try:
+                fecha = datetime.fromisoformat(posicion["fecha_creacion"])
+                id_contenido = str(posicion["id_contenido"])
+            except (TypeError, KeyError, ValueError):
+                return None, "Cursor de paginación no válido"
+            query = query.filter(
+                tuple_(self.Contenido.fecha_creacion, self.Contenido.id_contenido)
+                > tuple_(fecha, id_contenido)
+            )
+        
+        if tipo:
+            query = query.filter(self.Contenido.tipo == tipo)
+        
+        if tema:
+            query = query.filter(self.Contenido.tema.ilike(f"%{tema}%"))
+        
+        # Se pide una fila de más para saber si existe una página siguiente
+        contenidos = query.order_by(
+            self.Contenido.fecha_creacion, self.Contenido.id_contenido
+        ).limit(limit + 1).all()
+        
+        hay_mas = len(contenidos) > limit
+        contenidos = contenidos[:limit]
+        
+        siguiente_cursor = None
+        if hay_mas and contenidos:
+            ultimo = contenidos[-1]
+            siguiente_cursor = _codificar_cursor({
+                "fecha_creacion": ultimo.fecha_creacion.isoformat(),
+                "id_contenido": ultimo.id_contenido
+            })
+        
+        return (contenidos, siguiente_cursor), None
+    
     def obtener_contenido_por_id(self, id_contenido: str) -> tuple:
         """
         Obtiene un contenido por su ID.
@@ -170,6 +437,27 @@ class GestorContenido:
         
         return contenido, None
     
+    def obtener_version_contenido(self, id_contenido: str) -> tuple:
+        """
+        Obtiene solo la fecha de modificación de un contenido, sin cargar
+        columnas grandes como cuerpo_texto. Usado para peticiones condicionales.
+        
+        Args:
+            id_contenido: UUID del contenido
+            
+        Returns:
+            Tupla (fecha_modificacion, None) si lo encuentra
+            Tupla (None, mensaje_error) si no existe
+        """
+        fila = self.db.query(self.Contenido.fecha_modificacion).filter(
+            self.Contenido.id_contenido == id_contenido
+        ).first()
+        
+        if not fila:
+            return None, f"Contenido con ID {id_contenido} no encontrado"
+        
+        return fila.fecha_modificacion, None
+    
     def eliminar_contenido(self, id_contenido: str) -> tuple:
         """
         Elimina un contenido.
@@ -188,9 +476,12 @@ class GestorContenido:
         if not contenido:
             return False, f"Contenido con ID {id_contenido} no encontrado"
         
+        capitulos_afectados = [union.id_capitulo for union in contenido.uniones]
         try:
+            self._marcar_capitulos_modificados(capitulos_afectados)
             self.db.delete(contenido)
             self.db.commit()
+            self._invalidar_cache(*capitulos_afectados)
             return True, None
             
         except IntegrityError as e:
@@ -200,6 +491,52 @@ class GestorContenido:
             self.db.rollback()
             return False, f"Error al eliminar contenido: {str(e)}"
     
+    def guardar_derivados(
+        self,
+        id_contenido: str,
+        ancho: int,
+        alto: int,
+        marcador: Optional[str],
+        derivados: List[Dict[str, Any]]
+    ) -> tuple:
+        """
+        Guarda las dimensiones, el marcador y las versiones responsive de un
+        contenido de tipo imagen (paquete derivados_imagen).
+        
+        Args:
+            id_contenido: UUID del contenido
+            ancho, alto: Dimensiones del original en píxeles
+            marcador: Miniatura desenfocada como data URI
+            derivados: Lista de {ancho, alto, formato, url, tamano}
+            
+        Returns:
+            Tupla (contenido, None) si éxito
+            Tupla (None, mensaje_error) si falla
+        """
+        contenido = self.db.query(self.Contenido).filter(
+            self.Contenido.id_contenido == id_contenido
+        ).first()
+        
+        if not contenido:
+            return None, f"Contenido con ID {id_contenido} no encontrado"
+        if contenido.tipo != "imagen":
+            return None, f"El contenido {id_contenido} no es una imagen"
+        
+        capitulos_afectados = [union.id_capitulo for union in contenido.uniones]
+        try:
+            contenido.ancho = ancho
+            contenido.alto = alto
+            contenido.marcador = marcador
+            contenido.derivados = derivados
+            self.db.commit()
+            self.db.refresh(contenido)
+            self._invalidar_cache(*capitulos_afectados)
+            return contenido, None
+            
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al guardar los derivados: {str(e)}"
+    
     def asignar_contenido_a_capitulo(
         self,
         id_capitulo: str,
@@ -252,9 +589,12 @@ class GestorContenido:
             )
             
             self.db.add(union)
+            self._marcar_capitulos_modificados([id_capitulo])
             self.db.commit()
             self.db.refresh(union)
             
+            self._invalidar_cache(id_capitulo)
+            
             return union, None
             
         except IntegrityError as e:
@@ -275,7 +615,42 @@ class GestorContenido:
             Tupla (lista_contenidos, None) si éxito
             Tupla (None, mensaje_error) si falla
         """
-        # Verificar que el capítulo existe
+        resultado, error = self.obtener_capitulo_con_contenidos(id_capitulo)
+        
+        if error:
+            return None, error
+        
+        return resultado[1], None
+    
+    def obtener_capitulo_con_contenidos(self, id_capitulo: str, version: Optional[tuple] = None) -> tuple:
+        """
+        Obtiene un capítulo junto con sus contenidos ordenados.
+        Usa siempre dos consultas (capítulo + uniones con sus contenidos),
+        sin importar cuántos bloques tenga el capítulo. Lectura cacheada
+        si el gestor tiene caché.
+        
+        Args:
+            id_capitulo: UUID del capítulo
+            version: Versión vigente (de obtener_version_contenidos_de_capitulo).
+                    Si la copia en caché no coincide con ella, se descarta y se
+                    lee de la base de datos
+            
+        Returns:
+            Tupla ((capitulo, lista_contenidos), None) si éxito
+            Tupla (None, mensaje_error) si el capítulo no existe
+        """
+        clave = CLAVE_CAPITULO_CONTENIDOS.format(id_capitulo)
+        if self.cache is not None:
+            en_cache = self.cache.obtener(clave)
+            if en_cache is not None:
+                capitulo = SimpleNamespace(**en_cache["capitulo"])
+                contenidos = [SimpleNamespace(**datos) for datos in en_cache["contenidos"]]
+                if version is None or version_contenidos(capitulo, contenidos) == version:
+                    return (capitulo, contenidos), None
+                self.cache.invalidar(clave)
+            # Antes de consultar: si una escritura invalida entretanto, no se guarda
+            generacion = self.cache.generacion()
+        
         capitulo = self.db.query(self.Capitulo).filter(
             self.Capitulo.id_capitulo == id_capitulo
         ).first()
@@ -283,13 +658,77 @@ class GestorContenido:
         if not capitulo:
             return None, f"Capítulo con ID {id_capitulo} no encontrado"
         
-        # Obtener contenidos ordenados
-        uniones = self.db.query(self.UnionCapituloContenido).filter(
+        contenidos = self._contenidos_ordenados(id_capitulo)
+        
+        if self.cache is not None:
+            self.cache.guardar(clave, {
+                "capitulo": _instantanea(capitulo),
+                "contenidos": [_instantanea(contenido) for contenido in contenidos]
+            }, generacion)
+        
+        return (capitulo, contenidos), None
+    
+    def obtener_version_contenidos_de_capitulo(self, id_capitulo: str) -> tuple:
+        """
+        Obtiene los datos que identifican la versión de los contenidos de un
+        capítulo: su fecha de modificación y, por cada unión en orden,
+        (id_contenido, fecha_modificacion del contenido). Es lo mismo que
+        version_contenidos calcula sobre lo servido. No carga cuerpos de texto.
+        
+        Args:
+            id_capitulo: UUID del capítulo
+            
+        Returns:
+            Tupla ((fecha_capitulo, lista_uniones), None) si éxito
+            Tupla (None, mensaje_error) si el capítulo no existe
+        """
+        fila = self.db.query(self.Capitulo.fecha_modificacion).filter(
+            self.Capitulo.id_capitulo == id_capitulo
+        ).first()
+        
+        if not fila:
+            return None, f"Capítulo con ID {id_capitulo} no encontrado"
+        
+        uniones = self.db.query(
+            self.Contenido.id_contenido,
+            self.Contenido.fecha_modificacion
+        ).select_from(self.UnionCapituloContenido).join(
+            self.Contenido,
+            self.Contenido.id_contenido == self.UnionCapituloContenido.id_contenido
+        ).filter(
+            self.UnionCapituloContenido.id_capitulo == id_capitulo
+        ).order_by(self.UnionCapituloContenido.orden, self.UnionCapituloContenido.id).all()
+        
+        return (fila.fecha_modificacion, [tuple(union) for union in uniones]), None
+    
+    def _marcar_capitulos_modificados(self, ids_capitulo: List[str]) -> None:
+        """
+        Actualiza fecha_modificacion de los capítulos cuya lista de contenidos
+        cambia, para que sus validadores HTTP (ETag/Last-Modified) cambien también.
+        """
+        if not ids_capitulo:
+            return
+        
+        self.db.query(self.Capitulo).filter(
+            self.Capitulo.id_capitulo.in_(ids_capitulo)
+        ).update(
+            {self.Capitulo.fecha_modificacion: datetime.utcnow()},
+            synchronize_session=False
+        )
+    
+    def _contenidos_ordenados(self, id_capitulo: str) -> List:
+        """
+        Obtiene los contenidos de un capítulo ordenados por 'orden'.
+        Las uniones y sus contenidos se cargan en una sola consulta (JOIN)
+        en lugar de una carga perezosa por cada unión.
+        """
+        uniones = self.db.query(self.UnionCapituloContenido).options(
+            joinedload(self.UnionCapituloContenido.contenido)
+        ).filter(
             self.UnionCapituloContenido.id_capitulo == id_capitulo
-        ).order_by(self.UnionCapituloContenido.orden).all()
+        ).order_by(self.UnionCapituloContenido.orden, self.UnionCapituloContenido.id).all()
         
-        contenidos = [union.contenido for union in uniones]
-        return contenidos, None
+        return [union.contenido for union in uniones]
     
     def desasignar_contenido_de_capitulo(
         self,
@@ -317,9 +756,332 @@ class GestorContenido:
         
         try:
             self.db.delete(union)
+            self._marcar_capitulos_modificados([id_capitulo])
             self.db.commit()
+            self._invalidar_cache(id_capitulo)
             return True, None
             
         except Exception as e:
             self.db.rollback()
             return False, f"Error al desasignar contenido: {str(e)}"
+    
+    def reordenar_contenidos(self, id_capitulo: str, ids_contenido: List[str]) -> tuple:
+        """
+        Aplica un orden completo a los contenidos de un capítulo en una sola
+        sentencia UPDATE, dejando HUECO_ORDEN entre cada uno.
+        
+        La lista debe tener exactamente los contenidos actuales del capítulo:
+        si otro editor asignó o quitó alguno mientras tanto, no se aplica.
+        
+        Args:
+            id_capitulo: UUID del capítulo
+            ids_contenido: UUIDs de los contenidos en el orden deseado
+            
+        Returns:
+            Tupla ([(id_contenido, orden), ...], None) si éxito
+            Tupla (None, mensaje_error) si falla
+        """
+        if len(set(ids_contenido)) != len(ids_contenido):
+            return None, "La lista de contenidos tiene elementos repetidos"
+        
+        try:
+            if not self._bloquear_capitulo(id_capitulo):
+                self.db.rollback()
+                return None, f"Capítulo con ID {id_capitulo} no encontrado"
+            
+            actuales = {id_contenido for id_contenido, _ in self._ordenes(id_capitulo)}
+            if actuales != set(ids_contenido):
+                self.db.rollback()
+                return None, "Los contenidos indicados no coinciden con los del capítulo"
+            
+            ordenes = self._renumerar(id_capitulo, ids_contenido)
+            self.db.commit()
+            self._invalidar_cache(id_capitulo)
+            return list(ordenes.items()), None
+            
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al reordenar contenidos: {str(e)}"
+    
+    def mover_contenido(
+        self,
+        id_capitulo: str,
+        id_contenido: str,
+        despues_de: Optional[str] = None
+    ) -> tuple:
+        """
+        Mueve un contenido del capítulo justo detrás de otro (o al principio).
+        
+        Normalmente actualiza una sola fila: el nuevo 'orden' es el punto medio
+        entre los de sus nuevos vecinos. Solo si no queda hueco entre ellos se
+        renumera el capítulo entero, en una sentencia.
+        
+        Args:
+            id_capitulo: UUID del capítulo
+            id_contenido: UUID del contenido a mover
+            despues_de: UUID del contenido que quedará delante (None: al principio)
+            
+        Returns:
+            Tupla ({id_contenido, orden, renumerado}, None) si éxito
+            Tupla (None, mensaje_error) si falla
+        """
+        if despues_de == id_contenido:
+            return None, "Un contenido no se puede mover detrás de sí mismo"
+        
+        try:
+            if not self._bloquear_capitulo(id_capitulo):
+                self.db.rollback()
+                return None, f"Capítulo con ID {id_capitulo} no encontrado"
+            
+            # Orden actual sin el contenido que se mueve (solo ids y 'orden')
+            ordenes = self._ordenes(id_capitulo)
+            if id_contenido not in {id_c for id_c, _ in ordenes}:
+                self.db.rollback()
+                return None, f"El contenido {id_contenido} no está asignado a este capítulo"
+            ordenes = [(id_c, orden) for id_c, orden in ordenes if id_c != id_contenido]
+            
+            if despues_de is None:
+                posicion = 0
+            else:
+                posiciones = [id_c for id_c, _ in ordenes]
+                if despues_de not in posiciones:
+                    self.db.rollback()
+                    return None, f"El contenido {despues_de} no está asignado a este capítulo"
+                posicion = posiciones.index(despues_de) + 1
+            
+            anterior = ordenes[posicion - 1][1] if posicion > 0 else 0
+            if posicion < len(ordenes):
+                siguiente = ordenes[posicion][1]
+            else:
+                siguiente = anterior + 2 * HUECO_ORDEN
+            
+            if siguiente - anterior >= 2:
+                nuevo = (anterior + siguiente) // 2
+                self.db.query(self.UnionCapituloContenido).filter(
+                    self.UnionCapituloContenido.id_capitulo == id_capitulo,
+                    self.UnionCapituloContenido.id_contenido == id_contenido
+                ).update({self.UnionCapituloContenido.orden: nuevo}, synchronize_session=False)
+                renumerado = False
+            else:
+                ids = [id_c for id_c, _ in ordenes]
+                ids.insert(posicion, id_contenido)
+                nuevo = self._renumerar(id_capitulo, ids)[id_contenido]
+                renumerado = True
+            
+            self.db.commit()
+            self._invalidar_cache(id_capitulo)
+            return {"id_contenido": id_contenido, "orden": nuevo, "renumerado": renumerado}, None
+            
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al mover contenido: {str(e)}"
+    
+    def _bloquear_capitulo(self, id_capitulo: str) -> bool:
+        """
+        Actualiza fecha_modificacion del capítulo antes de leer su orden. La
+        escritura bloquea la fila (MySQL) o la base (SQLite) hasta el commit:
+        dos reordenaciones del mismo capítulo se ejecutan una detrás de otra
+        y ninguna trabaja sobre un orden ya cambiado por la otra.
+        
+        Returns:
+            False si el capítulo no existe
+        """
+        filas = self.db.query(self.Capitulo).filter(
+            self.Capitulo.id_capitulo == id_capitulo
+        ).update(
+            {self.Capitulo.fecha_modificacion: datetime.utcnow()},
+            synchronize_session=False
+        )
+        return filas > 0
+    
+    def _ordenes(self, id_capitulo: str) -> List[tuple]:
+        """(id_contenido, orden) de las uniones del capítulo, en orden."""
+        return [
+            tuple(fila) for fila in self.db.query(
+                self.UnionCapituloContenido.id_contenido,
+                self.UnionCapituloContenido.orden
+            ).filter(
+                self.UnionCapituloContenido.id_capitulo == id_capitulo
+            ).order_by(self.UnionCapituloContenido.orden, self.UnionCapituloContenido.id)
+        ]
+    
+    def _renumerar(self, id_capitulo: str, ids_contenido: List[str]) -> Dict[str, int]:
+        """
+        Asigna HUECO_ORDEN, 2·HUECO_ORDEN, ... a los contenidos en el orden
+        dado con un único UPDATE ... SET orden = CASE id_contenido ... END.
+        """
+        ordenes = {id_c: (indice + 1) * HUECO_ORDEN for indice, id_c in enumerate(ids_contenido)}
+        if ordenes:
+            self.db.query(self.UnionCapituloContenido).filter(
+                self.UnionCapituloContenido.id_capitulo == id_capitulo
+            ).update(
+                {self.UnionCapituloContenido.orden: case(ordenes, value=self.UnionCapituloContenido.id_contenido)},
+                synchronize_session=False
+            )
+        return ordenes
+    
+    def _invalidar_cache(self, *ids_capitulo: str) -> None:
+        """
+        Invalida los capítulos indicados y sus contenidos cacheados
+        (su fecha_modificacion cambia al cambiar la lista de contenidos).
+        """
+        if self.cache is None or not ids_capitulo:
+            return
+        
+        claves = []
+        for id_capitulo in ids_capitulo:
+            claves.append(CLAVE_CAPITULO.format(id_capitulo))
+            claves.append(CLAVE_CAPITULO_CONTENIDOS.format(id_capitulo))
+        self.cache.invalidar(*claves)
+
+
+class GestorContenidoAsync:
+    """
+    Versión asíncrona del GestorContenido para los endpoints de la API.
+    
+    Cada operación se ejecuta con AsyncSession.run_sync: la lógica y las
+    validaciones son las del GestorContenido, pero la E/S con la base de
+    datos pasa por el driver asíncrono y no bloquea el event loop.
+    
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Diccionario con las clases de modelos
+        cache: Caché de lectura opcional (paquete cache_lectura)
+    """
+    
+    def __init__(self, db: AsyncSession, modelos: Dict[str, Any], cache=None):
+        """
+        Inicializa el gestor asíncrono de contenidos.
+        
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelos: Dict con claves: 'Contenido', 'Texto', 'Imagen', 'Video', 'Objeto3D',
+                    'Capitulo', 'UnionCapituloContenido'
+            cache: Caché para las lecturas de contenidos de capítulos (opcional)
+        """
+        self.db = db
+        self.modelos = modelos
+        self.cache = cache
+    
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        """Ejecuta un método del GestorContenido sobre la sesión síncrona subyacente."""
+        def llamar(sesion: Session):
+            gestor = GestorContenido(sesion, self.modelos, cache=self.cache)
+            return getattr(gestor, metodo)(*args, **kwargs)
+        
+        return await self.db.run_sync(llamar)
+    
+    async def crear_contenido(
+        self,
+        tipo: str,
+        tema: str,
+        cuerpo_texto: Optional[str] = None,
+        url_archivo: Optional[str] = None,
+        formato: Optional[str] = None,
+        duracion: Optional[float] = None
+    ) -> tuple:
+        """Ver GestorContenido.crear_contenido."""
+        return await self._ejecutar(
+            'crear_contenido', tipo, tema, cuerpo_texto=cuerpo_texto,
+            url_archivo=url_archivo, formato=formato, duracion=duracion
+        )
+    
+    async def importar_contenidos(
+        self,
+        bloques: List[Dict[str, Any]],
+        id_capitulo: Optional[str] = None
+    ) -> tuple:
+        """Ver GestorContenido.importar_contenidos."""
+        return await self._ejecutar('importar_contenidos', bloques, id_capitulo=id_capitulo)
+    
+    async def listar_contenidos(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        tipo: Optional[str] = None,
+        tema: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> List:
+        """Ver GestorContenido.listar_contenidos."""
+        return await self._ejecutar(
+            'listar_contenidos', skip=skip, limit=limit, tipo=tipo, tema=tema, campos=campos
+        )
+    
+    async def listar_contenidos_por_cursor(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        tipo: Optional[str] = None,
+        tema: Optional[str] = None,
+        campos: Optional[Sequence[str]] = None
+    ) -> tuple:
+        """Ver GestorContenido.listar_contenidos_por_cursor."""
+        return await self._ejecutar(
+            'listar_contenidos_por_cursor', cursor=cursor, limit=limit, tipo=tipo,
+            tema=tema, campos=campos
+        )
+    
+    async def obtener_contenido_por_id(self, id_contenido: str) -> tuple:
+        """Ver GestorContenido.obtener_contenido_por_id."""
+        return await self._ejecutar('obtener_contenido_por_id', id_contenido)
+    
+    async def obtener_version_contenido(self, id_contenido: str) -> tuple:
+        """Ver GestorContenido.obtener_version_contenido."""
+        return await self._ejecutar('obtener_version_contenido', id_contenido)
+    
+    async def eliminar_contenido(self, id_contenido: str) -> tuple:
+        """Ver GestorContenido.eliminar_contenido."""
+        return await self._ejecutar('eliminar_contenido', id_contenido)
+    
+    async def guardar_derivados(
+        self,
+        id_contenido: str,
+        ancho: int,
+        alto: int,
+        marcador: Optional[str],
+        derivados: List[Dict[str, Any]]
+    ) -> tuple:
+        """Ver GestorContenido.guardar_derivados."""
+        return await self._ejecutar('guardar_derivados', id_contenido, ancho, alto, marcador, derivados)
+    
+    async def asignar_contenido_a_capitulo(
+        self,
+        id_capitulo: str,
+        id_contenido: str,
+        orden: int
+    ) -> tuple:
+        """Ver GestorContenido.asignar_contenido_a_capitulo."""
+        return await self._ejecutar('asignar_contenido_a_capitulo', id_capitulo, id_contenido, orden)
+    
+    async def listar_contenidos_de_capitulo(self, id_capitulo: str) -> tuple:
+        """Ver GestorContenido.listar_contenidos_de_capitulo."""
+        return await self._ejecutar('listar_contenidos_de_capitulo', id_capitulo)
+    
+    async def obtener_version_contenidos_de_capitulo(self, id_capitulo: str) -> tuple:
+        """Ver GestorContenido.obtener_version_contenidos_de_capitulo."""
+        return await self._ejecutar('obtener_version_contenidos_de_capitulo', id_capitulo)
+    
+    async def obtener_capitulo_con_contenidos(self, id_capitulo: str, version: Optional[tuple] = None) -> tuple:
+        """Ver GestorContenido.obtener_capitulo_con_contenidos."""
+        return await self._ejecutar('obtener_capitulo_con_contenidos', id_capitulo, version)
+    
+    async def reordenar_contenidos(self, id_capitulo: str, ids_contenido: List[str]) -> tuple:
+        """Ver GestorContenido.reordenar_contenidos."""
+        return await self._ejecutar('reordenar_contenidos', id_capitulo, ids_contenido)
+    
+    async def mover_contenido(
+        self,
+        id_capitulo: str,
+        id_contenido: str,
+        despues_de: Optional[str] = None
+    ) -> tuple:
+        """Ver GestorContenido.mover_contenido."""
+        return await self._ejecutar('mover_contenido', id_capitulo, id_contenido, despues_de=despues_de)
+    
+    async def desasignar_contenido_de_capitulo(
+        self,
+        id_capitulo: str,
+        id_contenido: str
+    ) -> tuple:
+        """Ver GestorContenido.desasignar_contenido_de_capitulo."""
+        return await self._ejecutar('desasignar_contenido_de_capitulo', id_capitulo, id_contenido)
@@ -0,0 +1,15 @@
+"""
+Paquete gestor_permisos
+=======================
+"""
+
+from .gestor_permisos import (
+    GestorPermisos, GestorPermisosAsync, CatalogoPermisos, CachePermisos,
+    cache_permisos, instalar_invalidacion, TTL_SEGUNDOS
+)
+
+__all__ = [
+    'GestorPermisos', 'GestorPermisosAsync', 'CatalogoPermisos', 'CachePermisos',
+    'cache_permisos', 'instalar_invalidacion', 'TTL_SEGUNDOS'
+]
+__version__ = '0.1.0'
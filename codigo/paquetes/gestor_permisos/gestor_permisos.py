@@ -0,0 +1,354 @@
+"""
+Gestor de Permisos
+==================
+Resuelve si un usuario puede realizar una acción sobre un recurso
+(Usuario -> usuario_rol -> Rol -> rol_permiso -> Permiso) sin recorrer las
+cuatro tablas en cada petición.
+
+- El catálogo asigna a cada par (recurso, accion) un bit y precalcula la
+  máscara de permisos de cada rol activo (un entero de Python usado como bitset).
+- La máscara de un usuario es la unión (OR) de las máscaras de sus roles y se
+  guarda en CachePermisos con un TTL.
+- Con la máscara en caché, tiene_permiso() es una búsqueda en diccionario y
+  un desplazamiento de bits: no consulta la base de datos.
+
+Invalidación:
+- instalar_invalidacion() registra eventos de Session que, al confirmar la
+  transacción, descartan el catálogo si cambian roles o permisos y la máscara
+  de los usuarios cuyos roles (Usuario.roles o Rol.usuarios) o estado cambian.
+- Los cambios hechos fuera del ORM (SQL directo, otros procesos) se ven al
+  vencer el TTL, o antes llamando a invalidar_usuario() / invalidar_todo().
+"""
+
+import threading
+import time
+from itertools import chain
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+# Vigencia del catálogo y de las máscaras de usuario en caché
+TTL_SEGUNDOS = 300.0
+
+# Usuarios con máscara en caché (al superarlo se descartan las más antiguas)
+MAX_USUARIOS_CACHE = 10000
+
+_CLAVE_SESION = "gestor_permisos_invalidar"
+
+
+class CatalogoPermisos:
+    """
+    Instantánea de permisos y roles.
+
+    Attributes:
+        bits: (recurso, accion) -> índice del bit
+        roles: id_rol -> máscara con los permisos del rol (solo roles activos)
+    """
+
+    def __init__(self, bits: Dict[Tuple[str, str], int], roles: Dict[int, int]):
+        self.bits = bits
+        self.roles = roles
+
+    def mascara(self, ids_roles) -> int:
+        """Unión de las máscaras de los roles indicados (los inactivos no suman)."""
+        mascara = 0
+        for id_rol in ids_roles:
+            mascara |= self.roles.get(id_rol, 0)
+        return mascara
+
+    def permite(self, mascara: int, recurso: str, accion: str) -> bool:
+        """Indica si la máscara incluye el permiso (recurso, accion)."""
+        bit = self.bits.get((recurso, accion))
+        return bit is not None and (mascara >> bit) & 1 == 1
+
+    def permisos(self, mascara: int) -> Set[Tuple[str, str]]:
+        """Pares (recurso, accion) incluidos en la máscara."""
+        return {par for par, bit in self.bits.items() if (mascara >> bit) & 1}
+
+
+class CachePermisos:
+    """
+    Catálogo y máscaras por usuario con TTL, compartidos por el proceso.
+
+    Cada invalidación (total o de usuarios) incrementa la generación: lo
+    calculado antes de invalidar no se guarda aunque termine después.
+    """
+
+    def __init__(self, ttl_segundos: float = TTL_SEGUNDOS, max_usuarios: int = MAX_USUARIOS_CACHE,
+                 reloj: Callable[[], float] = time.monotonic):
+        self.ttl_segundos = ttl_segundos
+        self.max_usuarios = max_usuarios
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._catalogo: Optional[CatalogoPermisos] = None
+        self._catalogo_vence = 0.0
+        self._usuarios: Dict[str, Tuple[int, float]] = {}
+        self._generacion = 0
+
+    @property
+    def generacion(self) -> int:
+        return self._generacion
+
+    def catalogo(self) -> Optional[CatalogoPermisos]:
+        """Catálogo vigente o None si no hay o ha vencido."""
+        if self._catalogo is not None and self._reloj() < self._catalogo_vence:
+            return self._catalogo
+        return None
+
+    def guardar_catalogo(self, catalogo: CatalogoPermisos, generacion: int) -> None:
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._catalogo = catalogo
+            self._catalogo_vence = self._reloj() + self.ttl_segundos
+
+    def mascara(self, id_usuario: str) -> Optional[int]:
+        """Máscara vigente del usuario o None si no está en caché o ha vencido."""
+        entrada = self._usuarios.get(id_usuario)
+        if entrada is None or self._reloj() >= entrada[1]:
+            return None
+        return entrada[0]
+
+    def guardar_mascara(self, id_usuario: str, mascara: int, generacion: int) -> None:
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            if id_usuario not in self._usuarios and len(self._usuarios) >= self.max_usuarios:
+                # Los diccionarios conservan el orden de inserción: fuera el más antiguo
+                del self._usuarios[next(iter(self._usuarios))]
+            self._usuarios[id_usuario] = (mascara, self._reloj() + self.ttl_segundos)
+
+    def invalidar_usuario(self, *ids_usuarios: str) -> None:
+        """Descarta la máscara de los usuarios indicados (cambio de roles o de estado)."""
+        with self._lock:
+            # Una máscara leída con los roles de antes no debe guardarse después
+            self._generacion += 1
+            for id_usuario in ids_usuarios:
+                self._usuarios.pop(id_usuario, None)
+
+    def invalidar_todo(self) -> None:
+        """Descarta el catálogo y todas las máscaras (cambio de roles o de permisos)."""
+        with self._lock:
+            self._generacion += 1
+            self._catalogo = None
+            self._usuarios.clear()
+
+    def __len__(self) -> int:
+        return len(self._usuarios)
+
+
+# Caché por defecto del proceso
+cache_permisos = CachePermisos()
+
+
+class GestorPermisos:
+    """
+    Gestor de autorización basado en roles.
+
+    Attributes:
+        db: Sesión de SQLAlchemy de la BD de usuarios
+        Usuario, Rol, Permiso: Clases de los modelos
+        cache: Caché de catálogo y máscaras
+    """
+
+    def __init__(self, db: Session, modelos: Dict, cache: Optional[CachePermisos] = None):
+        """
+        Inicializa el gestor de permisos.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con las clases 'Usuario', 'Rol' y 'Permiso'
+            cache: Caché de permisos (por defecto, la del proceso)
+        """
+        self.db = db
+        self.Usuario = modelos['Usuario']
+        self.Rol = modelos['Rol']
+        self.Permiso = modelos['Permiso']
+        self.usuario_rol = self.Usuario.roles.property.secondary
+        self.rol_permiso = self.Rol.permisos.property.secondary
+        self.cache = cache if cache is not None else cache_permisos
+
+    # ===== Lectura =====
+
+    def catalogo(self) -> CatalogoPermisos:
+        """Catálogo vigente; si no lo hay, lo construye con dos consultas."""
+        catalogo = self.cache.catalogo()
+        if catalogo is not None:
+            return catalogo
+
+        generacion = self.cache.generacion
+        bits: Dict[Tuple[str, str], int] = {}
+        bit_de_permiso: Dict[int, int] = {}
+        filas = self.db.execute(
+            select(self.Permiso.id_permiso, self.Permiso.recurso, self.Permiso.accion)
+            .order_by(self.Permiso.id_permiso)
+        )
+        for id_permiso, recurso, accion in filas:
+            # Dos permisos con el mismo (recurso, accion) comparten bit
+            bit_de_permiso[id_permiso] = bits.setdefault((recurso, accion), len(bits))
+
+        roles: Dict[int, int] = {}
+        filas = self.db.execute(
+            select(self.Rol.id_rol, self.rol_permiso.c.id_permiso)
+            .outerjoin(self.rol_permiso, self.rol_permiso.c.id_rol == self.Rol.id_rol)
+            .where(self.Rol.activo.is_(True))
+        )
+        for id_rol, id_permiso in filas:
+            mascara = roles.get(id_rol, 0)
+            if id_permiso in bit_de_permiso:
+                mascara |= 1 << bit_de_permiso[id_permiso]
+            roles[id_rol] = mascara
+
+        catalogo = CatalogoPermisos(bits, roles)
+        self.cache.guardar_catalogo(catalogo, generacion)
+        return catalogo
+
+    def mascara_usuario(self, id_usuario: str) -> int:
+        """
+        Máscara de permisos del usuario (0 si no existe o está inactivo).
+        Si está en caché no consulta la base de datos.
+        """
+        mascara = self.cache.mascara(id_usuario)
+        if mascara is not None:
+            return mascara
+
+        generacion = self.cache.generacion
+        catalogo = self.catalogo()
+        ids_roles = self.db.execute(
+            select(self.usuario_rol.c.id_rol)
+            .join(self.Usuario, self.Usuario.id_usuario == self.usuario_rol.c.id_usuario)
+            .where(self.Usuario.id_usuario == id_usuario, self.Usuario.activo.is_(True))
+        ).scalars()
+        mascara = catalogo.mascara(ids_roles)
+        self.cache.guardar_mascara(id_usuario, mascara, generacion)
+        return mascara
+
+    def tiene_permiso(self, id_usuario: str, recurso: str, accion: str) -> tuple:
+        """
+        Indica si el usuario puede realizar la acción sobre el recurso.
+
+        Returns:
+            tuple: (bool, None) o (None, mensaje_error)
+        """
+        try:
+            mascara = self.mascara_usuario(id_usuario)
+            return self.catalogo().permite(mascara, recurso, accion), None
+        except Exception as e:
+            return None, f"Error al resolver los permisos: {str(e)}"
+
+    def permisos_usuario(self, id_usuario: str) -> tuple:
+        """
+        Permisos efectivos del usuario.
+
+        Returns:
+            tuple: (set de pares (recurso, accion), None) o (None, mensaje_error)
+        """
+        try:
+            mascara = self.mascara_usuario(id_usuario)
+            return self.catalogo().permisos(mascara), None
+        except Exception as e:
+            return None, f"Error al resolver los permisos: {str(e)}"
+
+
+class GestorPermisosAsync:
+    """
+    Versión asíncrona del GestorPermisos para las dependencias de la API.
+    Si la máscara del usuario está en caché responde sin abrir la sesión.
+
+    Attributes:
+        fabrica_sesiones: async_sessionmaker de la BD de usuarios
+        modelos: Dict con las clases de los modelos de usuarios
+        cache: Caché de catálogo y máscaras
+    """
+
+    def __init__(self, fabrica_sesiones: Callable[[], AsyncSession], modelos: Dict,
+                 cache: Optional[CachePermisos] = None):
+        """
+        Inicializa el gestor asíncrono de permisos.
+
+        Args:
+            fabrica_sesiones: Fábrica de sesiones asíncronas de la BD de usuarios
+            modelos: Dict con las clases 'Usuario', 'Rol' y 'Permiso'
+            cache: Caché de permisos (por defecto, la del proceso)
+        """
+        self.fabrica_sesiones = fabrica_sesiones
+        self.modelos = modelos
+        self.cache = cache if cache is not None else cache_permisos
+
+    def _en_cache(self, id_usuario: str, recurso: str, accion: str) -> Optional[bool]:
+        catalogo = self.cache.catalogo()
+        mascara = self.cache.mascara(id_usuario)
+        if catalogo is None or mascara is None:
+            return None
+        return catalogo.permite(mascara, recurso, accion)
+
+    async def tiene_permiso(self, id_usuario: str, recurso: str, accion: str) -> tuple:
+        """Ver GestorPermisos.tiene_permiso."""
+        permitido = self._en_cache(id_usuario, recurso, accion)
+        if permitido is not None:
+            return permitido, None
+
+        def llamar(sesion: Session):
+            gestor = GestorPermisos(sesion, self.modelos, cache=self.cache)
+            return gestor.tiene_permiso(id_usuario, recurso, accion)
+
+        async with self.fabrica_sesiones() as db:
+            return await db.run_sync(llamar)
+
+
+# ===== Invalidación por eventos =====
+
+_instalados = set()
+
+
+def instalar_invalidacion(modelos: Dict, cache: Optional[CachePermisos] = None) -> None:
+    """
+    Registra eventos de Session que invalidan la caché cuando se confirma una
+    transacción que cambia roles, permisos o los roles/estado de un usuario.
+    Es idempotente.
+    """
+    Usuario, Rol, Permiso = modelos['Usuario'], modelos['Rol'], modelos['Permiso']
+    if Usuario in _instalados:
+        return
+    _instalados.add(Usuario)
+    cache = cache if cache is not None else cache_permisos
+
+    def cambia(objeto, session, atributos) -> bool:
+        if objeto in session.new or objeto in session.deleted:
+            return True
+        estado = inspect(objeto).attrs
+        return any(estado[nombre].history.has_changes() for nombre in atributos)
+
+    # Atributos del rol que afectan a todas las máscaras; Rol.usuarios (asignar
+    # o quitar el rol) solo afecta a los usuarios añadidos o quitados
+    atributos_rol = [nombre for nombre in inspect(Rol).attrs.keys() if nombre != 'usuarios']
+
+    def al_volcar(session, contexto):
+        pendientes = session.info.setdefault(_CLAVE_SESION, set())
+        for objeto in chain(session.new, session.dirty, session.deleted):
+            if isinstance(objeto, Permiso) or (isinstance(objeto, Rol) and cambia(objeto, session, atributos_rol)):
+                pendientes.add(None)
+            elif isinstance(objeto, Rol):
+                historia = inspect(objeto).attrs.usuarios.history
+                pendientes.update(usuario.id_usuario for usuario in chain(historia.added, historia.deleted))
+            elif isinstance(objeto, Usuario) and cambia(objeto, session, ('roles', 'activo')):
+                pendientes.add(objeto.id_usuario)
+
+    def al_confirmar(session):
+        pendientes = session.info.pop(_CLAVE_SESION, None)
+        if not pendientes:
+            return
+        if None in pendientes:
+            cache.invalidar_todo()
+        else:
+            cache.invalidar_usuario(*pendientes)
+
+    def al_deshacer(session):
+        session.info.pop(_CLAVE_SESION, None)
+
+    event.listen(Session, "after_flush", al_volcar)
+    event.listen(Session, "after_commit", al_confirmar)
+    event.listen(Session, "after_rollback", al_deshacer)
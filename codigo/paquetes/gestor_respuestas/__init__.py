@@ -0,0 +1,9 @@
+"""
+Paquete gestor_respuestas
+=========================
+"""
+
+from .gestor_respuestas import GestorRespuestas, GestorRespuestasAsync, BufferRespuestas, buffer_respuestas
+
+__all__ = ['GestorRespuestas', 'GestorRespuestasAsync', 'BufferRespuestas', 'buffer_respuestas']
+__version__ = '0.1.0'
@@ -0,0 +1,498 @@
+"""
+Gestor de Respuestas
+====================
+Guardado continuo de las respuestas de un intento en progreso.
+
+Los estudiantes guardan respuestas constantemente durante el examen. En vez
+de escribir cada cambio, las respuestas se acumulan en un buffer del proceso
+(write-behind) que conserva solo el último valor de cada (intento, pregunta)
+y se vuelca con un único upsert masivo cuando:
+- alcanza max_pendientes respuestas,
+- el cambio pendiente más antiguo supera intervalo_segundos, o
+- el intento se entrega.
+
+tiempo_transcurrido_segundos se escribe en el mismo volcado con un UPDATE que
+se queda con el mayor valor (sin leer el intento antes de cada cambio).
+
+Un volcado saca los cambios del buffer antes de escribirlos; el buffer
+recuerda qué intentos tienen cambios en vuelo para que la entrega espere a
+que estén escritos antes de calificar.
+
+Los intentos abiertos y las preguntas/opciones de cada evaluación se validan
+contra una caché, así que un guardado normal no toca la BD.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Respuestas pendientes que disparan un volcado
+MAX_PENDIENTES = 500
+
+# Antigüedad máxima (s) de un cambio sin volcar
+INTERVALO_VOLCADO_SEGUNDOS = 2.0
+
+# Intentos abiertos y evaluaciones que recuerda la caché de validación
+MAX_ENTRADAS_CACHE = 10000
+
+# Pausa (s) entre comprobaciones al esperar volcados en vuelo de un intento
+ESPERA_VOLCADO_SEGUNDOS = 0.01
+
+
+class BufferRespuestas:
+    """
+    Buffer write-behind de respuestas, compartido por los gestores del proceso.
+    Las claves son (id_intento, id_pregunta): un nuevo guardado de la misma
+    pregunta sustituye al pendiente.
+    """
+
+    def __init__(
+        self,
+        max_pendientes: int = MAX_PENDIENTES,
+        intervalo_segundos: float = INTERVALO_VOLCADO_SEGUNDOS,
+        max_entradas_cache: int = MAX_ENTRADAS_CACHE,
+        reloj=time.monotonic
+    ):
+        self.max_pendientes = max_pendientes
+        self.intervalo_segundos = intervalo_segundos
+        self.max_entradas_cache = max_entradas_cache
+        self._reloj = reloj
+        self._respuestas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._tiempos: Dict[str, int] = {}
+        self._desde: Optional[float] = None
+        self._en_vuelo: Dict[str, int] = {}
+        self._intentos: "OrderedDict[str, str]" = OrderedDict()
+        self._preguntas: "OrderedDict[str, Dict[str, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== Cambios pendientes =====
+
+    def agregar(self, filas: List[Dict[str, Any]], id_intento: str, tiempo_transcurrido_segundos: Optional[int] = None) -> None:
+        """Añade respuestas (dicts con id_pregunta, id_opcion_seleccionada, respuesta_texto)."""
+        with self._lock:
+            for fila in filas:
+                self._respuestas[(id_intento, fila["id_pregunta"])] = fila
+            if tiempo_transcurrido_segundos is not None:
+                self._tiempos[id_intento] = max(tiempo_transcurrido_segundos, self._tiempos.get(id_intento, 0))
+            if self._desde is None and (filas or tiempo_transcurrido_segundos is not None):
+                self._desde = self._reloj()
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._respuestas)
+
+    def lleno(self) -> bool:
+        return len(self._respuestas) >= self.max_pendientes
+
+    def vencido(self) -> bool:
+        desde = self._desde
+        return desde is not None and self._reloj() - desde >= self.intervalo_segundos
+
+    def extraer(self, id_intento: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Saca del buffer los cambios pendientes (todos o los de un intento).
+        Sus intentos quedan en vuelo hasta llamar a terminar con lo extraído.
+        """
+        with self._lock:
+            if id_intento is None:
+                respuestas, tiempos = list(self._respuestas.values()), self._tiempos
+                self._respuestas, self._tiempos = {}, {}
+            else:
+                claves = [clave for clave in self._respuestas if clave[0] == id_intento]
+                respuestas = [self._respuestas.pop(clave) for clave in claves]
+                tiempos = {id_intento: self._tiempos.pop(id_intento)} if id_intento in self._tiempos else {}
+            if not self._respuestas and not self._tiempos:
+                self._desde = None
+            for id_en_vuelo in _ids_intentos(respuestas, tiempos):
+                self._en_vuelo[id_en_vuelo] = self._en_vuelo.get(id_en_vuelo, 0) + 1
+            return respuestas, tiempos
+
+    def terminar(self, respuestas: List[Dict[str, Any]], tiempos: Dict[str, int]) -> None:
+        """Fin del volcado de unos cambios extraídos (escritos o devueltos)."""
+        with self._lock:
+            for id_en_vuelo in _ids_intentos(respuestas, tiempos):
+                restantes = self._en_vuelo.get(id_en_vuelo, 0) - 1
+                if restantes > 0:
+                    self._en_vuelo[id_en_vuelo] = restantes
+                else:
+                    self._en_vuelo.pop(id_en_vuelo, None)
+
+    def en_vuelo(self, id_intento: str) -> bool:
+        """Indica si algún volcado está escribiendo cambios del intento."""
+        return id_intento in self._en_vuelo
+
+    def tiene_pendientes(self, id_intento: str) -> bool:
+        """Indica si el intento tiene cambios en el buffer."""
+        with self._lock:
+            return id_intento in self._tiempos or any(clave[0] == id_intento for clave in self._respuestas)
+
+    def devolver(self, respuestas: List[Dict[str, Any]], tiempos: Dict[str, int]) -> None:
+        """Reintegra cambios que no se pudieron escribir, sin pisar otros más recientes."""
+        with self._lock:
+            for fila in respuestas:
+                self._respuestas.setdefault((fila["id_intento"], fila["id_pregunta"]), fila)
+            for id_intento, segundos in tiempos.items():
+                self._tiempos[id_intento] = max(segundos, self._tiempos.get(id_intento, 0))
+            if self._desde is None and (self._respuestas or self._tiempos):
+                self._desde = self._reloj()
+
+    # ===== Caché de validación =====
+
+    def _recordar(self, cache: OrderedDict, clave: str, valor: Any) -> None:
+        with self._lock:
+            cache[clave] = valor
+            cache.move_to_end(clave)
+            while len(cache) > self.max_entradas_cache:
+                cache.popitem(last=False)
+
+    def evaluacion_de(self, id_intento: str) -> Optional[str]:
+        return self._intentos.get(id_intento)
+
+    def recordar_intento(self, id_intento: str, id_evaluacion: str) -> None:
+        self._recordar(self._intentos, id_intento, id_evaluacion)
+
+    def olvidar_intento(self, *ids_intentos: str) -> None:
+        with self._lock:
+            for id_intento in ids_intentos:
+                self._intentos.pop(id_intento, None)
+
+    def preguntas_de(self, id_evaluacion: str) -> Optional[Dict[str, frozenset]]:
+        return self._preguntas.get(id_evaluacion)
+
+    def recordar_preguntas(self, id_evaluacion: str, preguntas: Dict[str, frozenset]) -> None:
+        self._recordar(self._preguntas, id_evaluacion, preguntas)
+
+    def olvidar_preguntas(self, id_evaluacion: str) -> None:
+        with self._lock:
+            self._preguntas.pop(id_evaluacion, None)
+
+
+def _ids_intentos(respuestas: List[Dict[str, Any]], tiempos: Dict[str, int]) -> set:
+    return {fila["id_intento"] for fila in respuestas} | set(tiempos)
+
+
+# Buffer por defecto, compartido por todos los gestores del proceso
+buffer_respuestas = BufferRespuestas()
+
+
+def _upsert_respuestas(conexion, tabla, filas: List[Dict[str, Any]]) -> None:
+    """
+    Inserta las respuestas o actualiza la existente de (id_intento, id_pregunta).
+    Solo se sobrescribe con un valor igual o más reciente (fecha_respuesta), por
+    si dos volcados del mismo intento se solapan.
+    """
+    columnas = ("id_opcion_seleccionada", "respuesta_texto", "fecha_respuesta")
+
+    if conexion.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        sentencia = insert(tabla)
+        nueva = tabla.c.fecha_respuesta <= sentencia.inserted.fecha_respuesta
+        # MySQL asigna en orden: fecha_respuesta va la última
+        sentencia = sentencia.on_duplicate_key_update([
+            (columna, case((nueva, sentencia.inserted[columna]), else_=tabla.c[columna]))
+            for columna in columnas
+        ])
+    else:
+        if conexion.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        sentencia = insert(tabla)
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=["id_intento", "id_pregunta"],
+            set_={columna: sentencia.excluded[columna] for columna in columnas},
+            where=tabla.c.fecha_respuesta <= sentencia.excluded.fecha_respuesta
+        )
+
+    conexion.execute(sentencia, [{"id_respuesta": str(uuid.uuid4()), **fila} for fila in filas])
+
+
+class GestorRespuestas:
+    """
+    Gestor del guardado de respuestas de intentos en progreso.
+
+    Attributes:
+        db: Sesión de base de datos SQLAlchemy (BD de evaluaciones)
+        Pregunta, Opcion, Intento, Respuesta: Clases de los modelos
+        buffer: Buffer write-behind de respuestas
+    """
+
+    def __init__(self, db: Session, modelos: Dict, buffer: Optional[BufferRespuestas] = None):
+        """
+        Inicializa el gestor de respuestas.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con las clases 'Pregunta', 'Opcion', 'Intento' y 'Respuesta'
+            buffer: Buffer de respuestas (por defecto, el del proceso)
+        """
+        self.db = db
+        self.Pregunta = modelos['Pregunta']
+        self.Opcion = modelos['Opcion']
+        self.Intento = modelos['Intento']
+        self.Respuesta = modelos['Respuesta']
+        self.buffer = buffer if buffer is not None else buffer_respuestas
+        self._en_progreso = self.Intento.__table__.c.estado.type.enum_class.EN_PROGRESO
+
+    # ===== Validación =====
+
+    def _preguntas(self, id_intento: str) -> tuple:
+        """
+        Preguntas (id -> opciones válidas) de la evaluación de un intento abierto.
+
+        Returns:
+            tuple: (preguntas, None) o (None, mensaje_error)
+        """
+        id_evaluacion = self.buffer.evaluacion_de(id_intento)
+        if id_evaluacion is None:
+            intento = self.db.execute(
+                select(self.Intento.id_evaluacion, self.Intento.estado)
+                .where(self.Intento.id_intento == id_intento)
+            ).first()
+            if intento is None:
+                return None, f"Intento con ID '{id_intento}' no encontrado"
+            if intento.estado != self._en_progreso:
+                return None, "El intento no está en progreso"
+            id_evaluacion = intento.id_evaluacion
+            self.buffer.recordar_intento(id_intento, id_evaluacion)
+
+        preguntas = self.buffer.preguntas_de(id_evaluacion)
+        if preguntas is None:
+            opciones: Dict[str, set] = {}
+            filas = self.db.execute(
+                select(self.Pregunta.id_pregunta, self.Opcion.id_opcion)
+                .outerjoin(self.Opcion, self.Opcion.id_pregunta == self.Pregunta.id_pregunta)
+                .where(self.Pregunta.id_evaluacion == id_evaluacion)
+            )
+            for id_pregunta, id_opcion in filas:
+                opciones.setdefault(id_pregunta, set())
+                if id_opcion is not None:
+                    opciones[id_pregunta].add(id_opcion)
+            preguntas = {id_pregunta: frozenset(ids) for id_pregunta, ids in opciones.items()}
+            self.buffer.recordar_preguntas(id_evaluacion, preguntas)
+
+        return preguntas, None
+
+    # ===== Guardado =====
+
+    def guardar_respuestas(
+        self,
+        id_intento: str,
+        respuestas: List[Dict[str, Any]],
+        tiempo_transcurrido_segundos: Optional[int] = None
+    ) -> tuple:
+        """
+        Acepta un lote de respuestas de un intento en progreso. Se escriben en
+        el siguiente volcado del buffer (inmediatamente si está lleno o vencido).
+
+        Args:
+            id_intento: ID del intento
+            respuestas: Dicts con id_pregunta y id_opcion_seleccionada o respuesta_texto
+            tiempo_transcurrido_segundos: Tiempo que lleva el estudiante en el intento
+
+        Returns:
+            tuple: (dict con aceptadas, pendientes y volcadas, None) o (None, mensaje_error)
+        """
+        preguntas, error = self._preguntas(id_intento)
+        if error:
+            return None, error
+
+        ahora = datetime.utcnow()
+        filas = []
+        for respuesta in respuestas:
+            id_pregunta = respuesta.get("id_pregunta")
+            if id_pregunta not in preguntas:
+                return None, f"La pregunta '{id_pregunta}' no pertenece a la evaluación del intento"
+            id_opcion = respuesta.get("id_opcion_seleccionada")
+            if id_opcion is not None and id_opcion not in preguntas[id_pregunta]:
+                return None, f"La opción '{id_opcion}' no pertenece a la pregunta '{id_pregunta}'"
+            filas.append({
+                "id_intento": id_intento,
+                "id_pregunta": id_pregunta,
+                "id_opcion_seleccionada": id_opcion,
+                "respuesta_texto": respuesta.get("respuesta_texto"),
+                "fecha_respuesta": ahora,
+            })
+
+        self.buffer.agregar(filas, id_intento, tiempo_transcurrido_segundos)
+
+        volcadas = 0
+        if self.buffer.lleno() or self.buffer.vencido():
+            volcadas, error = self.volcar()
+            if error:
+                return None, error
+
+        return {
+            "id_intento": id_intento,
+            "aceptadas": len(filas),
+            "pendientes": self.buffer.pendientes,
+            "volcadas": volcadas,
+        }, None
+
+    def volcar(self, id_intento: Optional[str] = None) -> tuple:
+        """
+        Escribe los cambios pendientes (todos o los de un intento) en una
+        transacción: un upsert masivo de respuestas y un UPDATE de tiempos.
+        Los de intentos que ya no están en progreso se descartan.
+
+        Returns:
+            tuple: (número de respuestas escritas, None) o (None, mensaje_error)
+        """
+        respuestas, tiempos = self.buffer.extraer(id_intento)
+        if not respuestas and not tiempos:
+            return 0, None
+
+        try:
+            ids = _ids_intentos(respuestas, tiempos)
+            abiertos = set(self.db.execute(
+                select(self.Intento.id_intento).where(
+                    self.Intento.id_intento.in_(ids),
+                    self.Intento.estado == self._en_progreso
+                )
+            ).scalars())
+            self.buffer.olvidar_intento(*(ids - abiertos))
+
+            filas = [fila for fila in respuestas if fila["id_intento"] in abiertos]
+            conexion = self.db.connection()
+            if filas:
+                _upsert_respuestas(conexion, self.Respuesta.__table__, filas)
+
+            segundos = [
+                {"b_id": id_intento, "b_segundos": valor}
+                for id_intento, valor in tiempos.items() if id_intento in abiertos
+            ]
+            if segundos:
+                tabla = self.Intento.__table__
+                actual = func.coalesce(tabla.c.tiempo_transcurrido_segundos, 0)
+                conexion.execute(
+                    update(tabla)
+                    .where(tabla.c.id_intento == bindparam("b_id"))
+                    .values(tiempo_transcurrido_segundos=case(
+                        (actual < bindparam("b_segundos"), bindparam("b_segundos")), else_=actual
+                    )),
+                    segundos
+                )
+
+            self.db.commit()
+            return len(filas), None
+        except Exception as e:
+            self.db.rollback()
+            self.buffer.devolver(respuestas, tiempos)
+            return None, f"Error al guardar las respuestas: {str(e)}"
+        finally:
+            self.buffer.terminar(respuestas, tiempos)
+
+    def volcar_vencidos(self) -> tuple:
+        """Vuelca el buffer si su cambio más antiguo supera el intervalo."""
+        if not self.buffer.vencido():
+            return 0, None
+        return self.volcar()
+
+    def entregar(
+        self,
+        id_intento: str,
+        respuestas: Optional[List[Dict[str, Any]]] = None,
+        tiempo_transcurrido_segundos: Optional[int] = None
+    ) -> tuple:
+        """
+        Acepta las últimas respuestas y vuelca las pendientes del intento antes
+        de finalizarlo (la calificación la hace GestorCalificacion).
+
+        Returns:
+            tuple: (número de respuestas escritas, None) o (None, mensaje_error)
+        """
+        if respuestas or tiempo_transcurrido_segundos is not None:
+            _, error = self.guardar_respuestas(id_intento, respuestas or [], tiempo_transcurrido_segundos)
+            if error:
+                return None, error
+
+        volcadas, error = self.volcar(id_intento)
+        if error:
+            return None, error
+        self.buffer.olvidar_intento(id_intento)
+        return volcadas, None
+
+
+class GestorRespuestasAsync:
+    """
+    Versión asíncrona del GestorRespuestas para los endpoints de la API.
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Dict con las clases de los modelos de evaluaciones
+        buffer: Buffer write-behind de respuestas
+    """
+
+    def __init__(self, db: AsyncSession, modelos: Dict, buffer: Optional[BufferRespuestas] = None):
+        """
+        Inicializa el gestor asíncrono de respuestas.
+
+        Args:
+            db: Sesión asíncrona de SQLAlchemy
+            modelos: Dict con las clases 'Pregunta', 'Opcion', 'Intento' y 'Respuesta'
+            buffer: Buffer de respuestas (por defecto, el del proceso)
+        """
+        self.db = db
+        self.modelos = modelos
+        self.buffer = buffer
+
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        def llamar(sesion: Session):
+            gestor = GestorRespuestas(sesion, self.modelos, buffer=self.buffer)
+            return getattr(gestor, metodo)(*args, **kwargs)
+
+        return await self.db.run_sync(llamar)
+
+    async def guardar_respuestas(self, id_intento: str, respuestas: List[Dict[str, Any]], tiempo_transcurrido_segundos: Optional[int] = None) -> tuple:
+        """Ver GestorRespuestas.guardar_respuestas."""
+        return await self._ejecutar('guardar_respuestas', id_intento, respuestas, tiempo_transcurrido_segundos)
+
+    async def volcar(self, id_intento: Optional[str] = None) -> tuple:
+        """
+        Ver GestorRespuestas.volcar. Con id_intento, además espera a que estén
+        escritos los cambios del intento que tenga en vuelo otro volcado.
+        """
+        volcadas, error = await self._ejecutar('volcar', id_intento)
+        if error or id_intento is None:
+            return volcadas, error
+        return await self._completar_volcado(id_intento, volcadas)
+
+    async def volcar_vencidos(self) -> tuple:
+        """Ver GestorRespuestas.volcar_vencidos."""
+        return await self._ejecutar('volcar_vencidos')
+
+    async def entregar(self, id_intento: str, respuestas: Optional[List[Dict[str, Any]]] = None, tiempo_transcurrido_segundos: Optional[int] = None) -> tuple:
+        """
+        Ver GestorRespuestas.entregar. Además espera a que estén escritos los
+        cambios del intento que tenga en vuelo otro volcado, para que la
+        calificación los vea.
+        """
+        volcadas, error = await self._ejecutar('entregar', id_intento, respuestas, tiempo_transcurrido_segundos)
+        if error:
+            return None, error
+        return await self._completar_volcado(id_intento, volcadas)
+
+    async def _completar_volcado(self, id_intento: str, volcadas: int) -> tuple:
+        """
+        Espera a los volcados de otras peticiones con cambios del intento y
+        vuelca lo que devuelvan al buffer si fallan.
+        """
+        buffer = self.buffer if self.buffer is not None else buffer_respuestas
+        while buffer.en_vuelo(id_intento) or buffer.tiene_pendientes(id_intento):
+            if buffer.en_vuelo(id_intento):
+                await asyncio.sleep(ESPERA_VOLCADO_SEGUNDOS)
+                continue
+            devueltas, error = await self._ejecutar('volcar', id_intento)
+            if error:
+                return None, error
+            volcadas += devueltas
+        return volcadas, None
@@ -0,0 +1,26 @@
+"""
+Setup para el paquete gestor_respuestas
+=======================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-gestor-respuestas',
+    version='0.1.0',
+    description='Guardado continuo de respuestas de intentos en progreso',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[
+        'sqlalchemy>=2.0'
+    ],
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
@@ -0,0 +1,11 @@
+"""
+Paquete progreso_estudiantes
+============================
+"""
+
+from .progreso_estudiantes import (
+    GestorProgreso, ColaProgreso, estudiantes_pendientes, instalar_progreso_incremental
+)
+
+__all__ = ['GestorProgreso', 'ColaProgreso', 'estudiantes_pendientes', 'instalar_progreso_incremental']
+__version__ = '0.1.0'
@@ -0,0 +1,310 @@
+"""
+Progreso de Estudiantes
+=======================
+Mantiene los campos desnormalizados de Estudiante (BD de usuarios):
+capitulos_completados, progreso_general y ultimo_capitulo_visto, a partir de
+los capítulos (BD de contenido) y los intentos (BD de evaluaciones).
+
+- Un capítulo es evaluable si está PUBLICADO y tiene al menos una evaluación
+  activa; el estudiante lo completa al aprobar todas sus evaluaciones activas.
+- progreso_general es el porcentaje de capítulos evaluables completados.
+- ultimo_capitulo_visto es el capítulo de su intento más reciente (si no tiene
+  intentos se conserva el valor actual).
+
+Las tres BD no comparten motor, así que los datos se cruzan en memoria por id:
+los estudiantes se recorren por lotes y cada lote hace una consulta IN por BD
+y un UPDATE masivo, nunca consultas por estudiante.
+
+Dos modos:
+- Reconstrucción completa: recalcular_todos().
+- Por eventos: instalar_progreso_incremental() registra en una cola los
+  estudiantes con intentos completados o recalificados (al confirmar la
+  transacción) y procesar_pendientes() los recalcula.
+"""
+
+import threading
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+
+# Estudiantes por lote (tamaño de los IN y de cada UPDATE masivo)
+TAMANO_LOTE = 500
+
+ESTADO_PUBLICADO = "PUBLICADO"
+
+_CLAVE_SESION = "progreso_estudiantes_pendientes"
+
+
+def _lotes(ids: List[str]) -> Iterable[List[str]]:
+    for inicio in range(0, len(ids), TAMANO_LOTE):
+        yield ids[inicio:inicio + TAMANO_LOTE]
+
+
+class ColaProgreso:
+    """Estudiantes pendientes de recalcular (sin duplicados), compartida por el proceso."""
+
+    def __init__(self):
+        self._ids: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def agregar(self, *ids_estudiantes: str) -> None:
+        with self._lock:
+            self._ids.update(ids_estudiantes)
+
+    def extraer(self) -> List[str]:
+        with self._lock:
+            ids, self._ids = list(self._ids), set()
+            return ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+# Cola por defecto, alimentada por instalar_progreso_incremental
+estudiantes_pendientes = ColaProgreso()
+
+
+class GestorProgreso:
+    """
+    Gestor del progreso de los estudiantes.
+
+    Attributes:
+        contenido, usuarios, evaluaciones: Sesiones de SQLAlchemy de cada BD
+        Capitulo, Evaluacion, Intento, Estudiante: Clases de los modelos
+    """
+
+    def __init__(self, contenido: Session, usuarios: Session, evaluaciones: Session, modelos: Dict):
+        """
+        Inicializa el gestor de progreso.
+
+        Args:
+            contenido: Sesión de la BD de contenido
+            usuarios: Sesión de la BD de usuarios
+            evaluaciones: Sesión de la BD de evaluaciones
+            modelos: Dict con las clases 'Capitulo', 'Evaluacion', 'Intento' y 'Estudiante'
+        """
+        self.contenido = contenido
+        self.usuarios = usuarios
+        self.evaluaciones = evaluaciones
+        self.Capitulo = modelos['Capitulo']
+        self.Evaluacion = modelos['Evaluacion']
+        self.Intento = modelos['Intento']
+        self.Estudiante = modelos['Estudiante']
+        self._completado = self.Intento.__table__.c.estado.type.enum_class.COMPLETADO
+        self._capitulos: Optional[Dict[str, Set[str]]] = None
+
+    # ===== Lectura =====
+
+    def _capitulos_evaluables(self) -> Dict[str, Set[str]]:
+        """Capítulos publicados con evaluaciones activas -> IDs de esas evaluaciones."""
+        if self._capitulos is not None:
+            return self._capitulos
+
+        por_capitulo: Dict[str, Set[str]] = {}
+        filas = self.evaluaciones.execute(
+            select(self.Evaluacion.id_capitulo, self.Evaluacion.id_evaluacion)
+            .where(self.Evaluacion.activa.is_(True))
+        )
+        for id_capitulo, id_evaluacion in filas:
+            por_capitulo.setdefault(id_capitulo, set()).add(id_evaluacion)
+
+        publicados: Set[str] = set()
+        for lote in _lotes(list(por_capitulo)):
+            publicados.update(self.contenido.execute(
+                select(self.Capitulo.id_capitulo).where(
+                    self.Capitulo.id_capitulo.in_(lote),
+                    self.Capitulo.estado == ESTADO_PUBLICADO
+                )
+            ).scalars())
+
+        self._capitulos = {
+            id_capitulo: evaluaciones
+            for id_capitulo, evaluaciones in por_capitulo.items() if id_capitulo in publicados
+        }
+        return self._capitulos
+
+    def _aprobadas(self, ids_estudiantes: List[str]) -> Dict[str, Set[str]]:
+        """Evaluaciones aprobadas por cada estudiante del lote."""
+        aprobadas: Dict[str, Set[str]] = {id_estudiante: set() for id_estudiante in ids_estudiantes}
+        filas = self.evaluaciones.execute(
+            select(self.Intento.id_estudiante, self.Intento.id_evaluacion)
+            .where(
+                self.Intento.id_estudiante.in_(ids_estudiantes),
+                self.Intento.estado == self._completado,
+                self.Intento.aprobado.is_(True)
+            )
+            .distinct()
+        )
+        for id_estudiante, id_evaluacion in filas:
+            aprobadas[id_estudiante].add(id_evaluacion)
+        return aprobadas
+
+    def _ultimos_capitulos(self, ids_estudiantes: List[str]) -> Dict[str, str]:
+        """Capítulo del intento más reciente de cada estudiante del lote."""
+        ultimos = (
+            select(self.Intento.id_estudiante, func.max(self.Intento.fecha_inicio).label("fecha"))
+            .where(self.Intento.id_estudiante.in_(ids_estudiantes))
+            .group_by(self.Intento.id_estudiante)
+            .subquery()
+        )
+        filas = self.evaluaciones.execute(
+            select(self.Intento.id_estudiante, self.Evaluacion.id_capitulo)
+            .join(ultimos, and_(
+                ultimos.c.id_estudiante == self.Intento.id_estudiante,
+                ultimos.c.fecha == self.Intento.fecha_inicio
+            ))
+            .join(self.Evaluacion, self.Evaluacion.id_evaluacion == self.Intento.id_evaluacion)
+        )
+        return dict(filas.all())
+
+    # ===== Cálculo =====
+
+    def _procesar_lote(self, ids_estudiantes: List[str]) -> int:
+        """
+        Recalcula un lote y escribe solo las filas que cambian.
+
+        Returns:
+            Número de estudiantes actualizados
+        """
+        actuales = self.usuarios.execute(
+            select(
+                self.Estudiante.id_estudiante,
+                self.Estudiante.capitulos_completados,
+                self.Estudiante.progreso_general,
+                self.Estudiante.ultimo_capitulo_visto
+            ).where(self.Estudiante.id_estudiante.in_(ids_estudiantes))
+        ).all()
+        if not actuales:
+            return 0
+
+        ids = [fila.id_estudiante for fila in actuales]
+        capitulos = self._capitulos_evaluables()
+        aprobadas = self._aprobadas(ids)
+        ultimos = self._ultimos_capitulos(ids)
+
+        cambios = []
+        for fila in actuales:
+            completados = sum(
+                1 for evaluaciones in capitulos.values() if evaluaciones <= aprobadas[fila.id_estudiante]
+            )
+            nuevo = {
+                "capitulos_completados": completados,
+                "progreso_general": round(completados * 100 / len(capitulos)) if capitulos else 0,
+                "ultimo_capitulo_visto": ultimos.get(fila.id_estudiante, fila.ultimo_capitulo_visto),
+            }
+            if any(getattr(fila, campo) != valor for campo, valor in nuevo.items()):
+                cambios.append({"id_estudiante": fila.id_estudiante, **nuevo})
+
+        if cambios:
+            self.usuarios.execute(update(self.Estudiante), cambios)
+        return len(cambios)
+
+    def recalcular_estudiantes(self, ids_estudiantes: List[str]) -> tuple:
+        """
+        Recalcula el progreso de los estudiantes indicados.
+
+        Args:
+            ids_estudiantes: IDs de Estudiante
+
+        Returns:
+            tuple: (dict con estudiantes y actualizados, None) o (None, mensaje_error)
+        """
+        ids = sorted(set(ids_estudiantes))
+        try:
+            actualizados = 0
+            for lote in _lotes(ids):
+                actualizados += self._procesar_lote(lote)
+            self.usuarios.commit()
+            return {"estudiantes": len(ids), "actualizados": actualizados}, None
+        except Exception as e:
+            self.usuarios.rollback()
+            return None, f"Error al recalcular el progreso: {str(e)}"
+
+    def recalcular_todos(self) -> tuple:
+        """
+        Reconstrucción completa: recorre todos los estudiantes por lotes
+        (paginación por id) y confirma cada lote.
+
+        Returns:
+            tuple: (dict con estudiantes y actualizados, None) o (None, mensaje_error)
+        """
+        total = actualizados = 0
+        ultimo = None
+        try:
+            while True:
+                consulta = select(self.Estudiante.id_estudiante).order_by(self.Estudiante.id_estudiante).limit(TAMANO_LOTE)
+                if ultimo is not None:
+                    consulta = consulta.where(self.Estudiante.id_estudiante > ultimo)
+                lote = list(self.usuarios.execute(consulta).scalars())
+                if not lote:
+                    break
+
+                actualizados += self._procesar_lote(lote)
+                self.usuarios.commit()
+                total += len(lote)
+                ultimo = lote[-1]
+
+            return {"estudiantes": total, "actualizados": actualizados}, None
+        except Exception as e:
+            self.usuarios.rollback()
+            return None, f"Error al recalcular el progreso: {str(e)}"
+
+    def procesar_pendientes(self, cola: Optional[ColaProgreso] = None) -> tuple:
+        """
+        Recalcula los estudiantes que esperan en la cola. Si falla, vuelven a ella.
+
+        Returns:
+            tuple: (dict con estudiantes y actualizados, None) o (None, mensaje_error)
+        """
+        cola = cola if cola is not None else estudiantes_pendientes
+        ids = cola.extraer()
+        if not ids:
+            return {"estudiantes": 0, "actualizados": 0}, None
+
+        resultado, error = self.recalcular_estudiantes(ids)
+        if error:
+            cola.agregar(*ids)
+        return resultado, error
+
+
+# ===== Modo por eventos =====
+
+_instalados = set()
+
+
+def instalar_progreso_incremental(modelos: Dict, cola: Optional[ColaProgreso] = None) -> None:
+    """
+    Registra eventos de Session que encolan al estudiante de cada intento que
+    pasa a COMPLETADO o cuya aprobación cambia, cuando la transacción se
+    confirma. Es idempotente. Las recalificaciones masivas (UPDATE sin flush)
+    no pasan por aquí: tras ellas conviene una reconstrucción completa.
+    """
+    Intento = modelos['Intento']
+    if Intento in _instalados:
+        return
+    _instalados.add(Intento)
+    cola = cola if cola is not None else estudiantes_pendientes
+    completado = Intento.__table__.c.estado.type.enum_class.COMPLETADO
+
+    def al_volcar(session, contexto):
+        for objeto in chain(session.new, session.dirty):
+            if not isinstance(objeto, Intento) or objeto.estado != completado:
+                continue
+            atributos = inspect(objeto).attrs
+            if atributos.estado.history.has_changes() or atributos.aprobado.history.has_changes():
+                session.info.setdefault(_CLAVE_SESION, set()).add(objeto.id_estudiante)
+
+    def al_confirmar(session):
+        pendientes = session.info.pop(_CLAVE_SESION, None)
+        if pendientes:
+            cola.agregar(*pendientes)
+
+    def al_deshacer(session):
+        session.info.pop(_CLAVE_SESION, None)
+
+    event.listen(Session, "after_flush", al_volcar)
+    event.listen(Session, "after_commit", al_confirmar)
+    event.listen(Session, "after_rollback", al_deshacer)
@@ -0,0 +1,11 @@
+"""
+Paquete publicacion_capitulos
+=============================
+"""
+
+from .publicacion_capitulos import (
+    GestorPublicacion, GestorPublicacionAsync, compilar, comprimir, CODIFICACIONES
+)
+
+__all__ = ['GestorPublicacion', 'GestorPublicacionAsync', 'compilar', 'comprimir', 'CODIFICACIONES']
+__version__ = '0.1.0'
@@ -0,0 +1,389 @@
+"""
+Publicación de Capítulos
+========================
+Compila un capítulo publicado en un paquete de lectura inmutable: el
+capítulo y sus contenidos ya ordenados, serializados una sola vez a JSON y
+guardados también comprimidos (gzip y, si está instalado el módulo brotli,
+Brotli) en la tabla publicaciones_capitulo.
+
+El endpoint de lectura envía esos bytes tal cual, sin volver a consultar
+capitulos, union_capitulo_contenido y contenidos ni serializar en cada
+visita. Cada publicación es una versión nueva (1, 2, 3…) que se inserta en
+la misma transacción en que se lee el capítulo; la vigente es la de número
+mayor. Las anteriores no se borran: restaurar_version crea una versión nueva
+con los bytes de una antigua, sin recompilar.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import case, func, insert, inspect, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin él solo se guarda la versión gzip
+    brotli = None
+
+
+# Columna de cada codificación (nombres de Content-Encoding)
+COLUMNAS = {
+    "br": "cuerpo_br",
+    "gzip": "cuerpo_gzip",
+    "identity": "cuerpo_json",
+}
+
+# Codificaciones comprimidas que se generan al publicar, de mejor a peor
+CODIFICACIONES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+NIVEL_GZIP = 9
+CALIDAD_BROTLI = 11
+
+ESTADO_PUBLICADO = "PUBLICADO"
+
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _columnas(fila) -> Dict[str, Any]:
+    return {
+        columna.key: getattr(fila, columna.key)
+        for columna in inspect(fila).mapper.column_attrs
+    }
+
+
+def compilar(capitulo, contenidos: Sequence) -> bytes:
+    """
+    Serializa el capítulo con sus contenidos en el orden dado (la misma forma
+    que GET /api/capitulos/{id}/completo).
+
+    Returns:
+        bytes: JSON en UTF-8, sin espacios
+    """
+    paquete = _columnas(capitulo)
+    paquete["contenidos"] = [_columnas(contenido) for contenido in contenidos]
+    return json.dumps(
+        paquete, ensure_ascii=False, separators=(",", ":"), default=_valor_json
+    ).encode("utf-8")
+
+
+def comprimir(cuerpo: bytes) -> Dict[str, Optional[bytes]]:
+    """
+    Versiones comprimidas del cuerpo. La compresión máxima se paga una vez al
+    publicar, no en cada lectura. mtime=0: mismo JSON, mismos bytes gzip.
+
+    Returns:
+        dict: {'gzip': bytes, 'br': bytes o None si no está brotli}
+    """
+    return {
+        "gzip": gzip.compress(cuerpo, compresslevel=NIVEL_GZIP, mtime=0),
+        "br": brotli.compress(cuerpo, quality=CALIDAD_BROTLI) if brotli is not None else None,
+    }
+
+
+class GestorPublicacion:
+    """
+    Gestor de las versiones publicadas de los capítulos.
+
+    Attributes:
+        db: Sesión de SQLAlchemy
+        Capitulo, Contenido, UnionCapituloContenido, PublicacionCapitulo: Modelos
+    """
+
+    def __init__(self, db: Session, modelos: Dict[str, Any]):
+        """
+        Inicializa el gestor de publicaciones.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            modelos: Dict con claves: 'Capitulo', 'Contenido',
+                    'UnionCapituloContenido', 'PublicacionCapitulo'
+        """
+        self.db = db
+        self.Capitulo = modelos['Capitulo']
+        self.Contenido = modelos['Contenido']
+        self.UnionCapituloContenido = modelos['UnionCapituloContenido']
+        self.PublicacionCapitulo = modelos['PublicacionCapitulo']
+
+    def publicar(self, id_capitulo: str) -> tuple:
+        """
+        Compila el capítulo (que debe estar PUBLICADO) y lo guarda como una
+        versión nueva. Si el resultado es idéntico a la versión vigente no se
+        crea otra.
+
+        Args:
+            id_capitulo: UUID del capítulo
+
+        Returns:
+            Tupla (info_version, None) con 'nueva' indicando si se creó
+            Tupla (None, mensaje_error) si no existe, no está publicado o falla
+        """
+        try:
+            capitulo, error = self._bloquear_capitulo(id_capitulo)
+            if error:
+                self.db.rollback()
+                return None, error
+
+            uniones = self.db.query(self.UnionCapituloContenido).options(
+                joinedload(self.UnionCapituloContenido.contenido)
+            ).filter(
+                self.UnionCapituloContenido.id_capitulo == id_capitulo
+            ).order_by(self.UnionCapituloContenido.orden, self.UnionCapituloContenido.id).all()
+
+            cuerpo = compilar(capitulo, [union.contenido for union in uniones])
+            huella = hashlib.sha256(cuerpo).hexdigest()
+
+            vigente = self._vigente(id_capitulo)
+            if vigente is not None and vigente.huella == huella:
+                self.db.rollback()
+                return self._info(vigente, nueva=False), None
+
+            comprimidos = comprimir(cuerpo)
+            publicacion = self.PublicacionCapitulo(
+                id_capitulo=id_capitulo,
+                version=(vigente.version if vigente is not None else 0) + 1,
+                fecha_publicacion=datetime.utcnow(),
+                huella=huella,
+                cuerpo_json=cuerpo,
+                cuerpo_gzip=comprimidos["gzip"],
+                cuerpo_br=comprimidos["br"]
+            )
+            self.db.add(publicacion)
+            self.db.commit()
+            return self._info(publicacion, nueva=True), None
+
+        except IntegrityError:
+            self.db.rollback()
+            return None, f"Otra publicación del capítulo {id_capitulo} se guardó a la vez; vuelve a intentarlo"
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al publicar el capítulo: {str(e)}"
+
+    def restaurar_version(self, id_capitulo: str, version: int) -> tuple:
+        """
+        Vuelve a una versión anterior: inserta una versión nueva con sus
+        mismos bytes (INSERT … SELECT, sin pasar los cuerpos por Python).
+
+        Returns:
+            Tupla (info_version, None) con 'nueva' indicando si se creó
+            Tupla (None, mensaje_error) si el capítulo o la versión no existen
+        """
+        P = self.PublicacionCapitulo
+        try:
+            _, error = self._bloquear_capitulo(id_capitulo)
+            if error:
+                self.db.rollback()
+                return None, error
+
+            restaurada = self._fila(id_capitulo, version)
+            if restaurada is None:
+                self.db.rollback()
+                return None, f"Versión {version} del capítulo {id_capitulo} no encontrada"
+
+            vigente = self._vigente(id_capitulo)
+            if vigente.huella == restaurada.huella:
+                self.db.rollback()
+                return self._info(vigente, nueva=False), None
+
+            nueva = vigente.version + 1
+            self.db.execute(insert(P).from_select(
+                ["id_capitulo", "version", "fecha_publicacion", "huella", "origen",
+                 "cuerpo_json", "cuerpo_gzip", "cuerpo_br"],
+                select(
+                    P.id_capitulo, literal(nueva), literal(datetime.utcnow()), P.huella, literal(version),
+                    P.cuerpo_json, P.cuerpo_gzip, P.cuerpo_br
+                ).where(P.id_capitulo == id_capitulo, P.version == version)
+            ))
+            self.db.commit()
+            return self._info(self._fila(id_capitulo, nueva), nueva=True), None
+
+        except IntegrityError:
+            self.db.rollback()
+            return None, f"Otra publicación del capítulo {id_capitulo} se guardó a la vez; vuelve a intentarlo"
+        except Exception as e:
+            self.db.rollback()
+            return None, f"Error al restaurar la versión: {str(e)}"
+
+    def listar_versiones(self, id_capitulo: str) -> tuple:
+        """
+        Lista las versiones publicadas de un capítulo, de la más reciente a la
+        más antigua, con el tamaño de cada cuerpo (sin leerlos).
+
+        Returns:
+            Tupla (lista_versiones, None) si el capítulo existe
+            Tupla (None, mensaje_error) si no existe
+        """
+        if self.db.get(self.Capitulo, id_capitulo) is None:
+            return None, f"Capítulo con ID {id_capitulo} no encontrado"
+
+        P = self.PublicacionCapitulo
+        filas = self.db.execute(
+            select(
+                P.version, P.fecha_publicacion, P.huella, P.origen,
+                func.length(P.cuerpo_json).label("tamano"),
+                func.length(P.cuerpo_gzip).label("tamano_gzip"),
+                func.length(P.cuerpo_br).label("tamano_br")
+            ).where(P.id_capitulo == id_capitulo).order_by(P.version.desc())
+        ).all()
+
+        return [dict(fila._mapping, vigente=i == 0) for i, fila in enumerate(filas)], None
+
+    def obtener_publicacion(self, id_capitulo: str, version: Optional[int] = None) -> tuple:
+        """
+        Obtiene los datos de una versión (por defecto la vigente) sin leer su
+        cuerpo, para responder 304 sin tocar los bytes. Sin 'version', solo
+        si el capítulo sigue PUBLICADO.
+
+        Returns:
+            Tupla ({version, fecha_publicacion, huella, origen}, None)
+            Tupla (None, mensaje_error) si no hay tal publicación
+        """
+        P = self.PublicacionCapitulo
+        consulta = select(P.version, P.fecha_publicacion, P.huella, P.origen).where(P.id_capitulo == id_capitulo)
+        if version is None:
+            consulta = consulta.join(self.Capitulo, self.Capitulo.id_capitulo == P.id_capitulo).where(
+                self.Capitulo.estado == ESTADO_PUBLICADO
+            ).order_by(P.version.desc()).limit(1)
+        else:
+            consulta = consulta.where(P.version == version)
+
+        fila = self.db.execute(consulta).first()
+        if fila is None:
+            if version is None:
+                return None, f"Capítulo con ID {id_capitulo} no encontrado o sin publicar"
+            return None, f"Versión {version} del capítulo {id_capitulo} no encontrada"
+        return dict(fila._mapping), None
+
+    def obtener_cuerpo(self, id_capitulo: str, version: int, codificaciones: Sequence[str] = ()) -> tuple:
+        """
+        Lee el cuerpo de una versión en la primera codificación de
+        'codificaciones' que tenga guardada (JSON sin comprimir si ninguna).
+        Se lee una sola columna: la elección la hace la propia consulta.
+
+        Args:
+            id_capitulo: UUID del capítulo
+            version: Número de versión (ver obtener_publicacion)
+            codificaciones: Content-Encoding aceptables, de más a menos preferida
+
+        Returns:
+            Tupla ((cuerpo, codificacion), None)
+            Tupla (None, mensaje_error) si la versión no existe
+        """
+        P = self.PublicacionCapitulo
+        candidatas = [c for c in codificaciones if c in COLUMNAS and c != "identity"]
+        if candidatas:
+            cuerpo = case(
+                *[(getattr(P, COLUMNAS[c]).isnot(None), getattr(P, COLUMNAS[c])) for c in candidatas],
+                else_=P.cuerpo_json
+            )
+            codificacion = case(
+                *[(getattr(P, COLUMNAS[c]).isnot(None), literal(c)) for c in candidatas],
+                else_=literal("identity")
+            )
+        else:
+            cuerpo, codificacion = P.cuerpo_json, literal("identity")
+
+        fila = self.db.execute(
+            select(cuerpo, codificacion).where(P.id_capitulo == id_capitulo, P.version == version)
+        ).first()
+        if fila is None:
+            return None, f"Versión {version} del capítulo {id_capitulo} no encontrada"
+        return (bytes(fila[0]), fila[1]), None
+
+    def _bloquear_capitulo(self, id_capitulo: str) -> tuple:
+        """
+        Escribe la fila del capítulo sin cambiar nada (ni fecha_modificacion)
+        para bloquearla hasta el commit: dos publicaciones del mismo capítulo
+        se hacen una detrás de otra y cada una ve la versión de la anterior.
+
+        Returns:
+            Tupla (capitulo, None) o (None, mensaje_error)
+        """
+        filas = self.db.query(self.Capitulo).filter(
+            self.Capitulo.id_capitulo == id_capitulo
+        ).update(
+            {self.Capitulo.estado: self.Capitulo.estado,
+             self.Capitulo.fecha_modificacion: self.Capitulo.fecha_modificacion},
+            synchronize_session=False
+        )
+        if not filas:
+            return None, f"Capítulo con ID {id_capitulo} no encontrado"
+
+        capitulo = self.db.get(self.Capitulo, id_capitulo, populate_existing=True)
+        if capitulo.estado != ESTADO_PUBLICADO:
+            return None, f"El capítulo {id_capitulo} no está publicado (estado {capitulo.estado})"
+        return capitulo, None
+
+    def _vigente(self, id_capitulo: str):
+        P = self.PublicacionCapitulo
+        return self.db.execute(
+            select(P.version, P.fecha_publicacion, P.huella, P.origen)
+            .where(P.id_capitulo == id_capitulo).order_by(P.version.desc()).limit(1)
+        ).first()
+
+    def _fila(self, id_capitulo: str, version: int):
+        P = self.PublicacionCapitulo
+        return self.db.execute(
+            select(P.version, P.fecha_publicacion, P.huella, P.origen)
+            .where(P.id_capitulo == id_capitulo, P.version == version)
+        ).first()
+
+    @staticmethod
+    def _info(fila, nueva: bool) -> Dict[str, Any]:
+        return {
+            "version": fila.version,
+            "fecha_publicacion": fila.fecha_publicacion,
+            "huella": fila.huella,
+            "origen": fila.origen,
+            "nueva": nueva,
+        }
+
+
+class GestorPublicacionAsync:
+    """
+    Versión asíncrona del GestorPublicacion para los endpoints de la API
+    (AsyncSession.run_sync, como GestorContenidoAsync).
+
+    Attributes:
+        db: Sesión asíncrona de SQLAlchemy
+        modelos: Diccionario con las clases de modelos
+    """
+
+    def __init__(self, db: AsyncSession, modelos: Dict[str, Any]):
+        self.db = db
+        self.modelos = modelos
+
+    async def _ejecutar(self, metodo: str, *args, **kwargs):
+        """Ejecuta un método del GestorPublicacion sobre la sesión síncrona subyacente."""
+        def llamar(sesion: Session):
+            return getattr(GestorPublicacion(sesion, self.modelos), metodo)(*args, **kwargs)
+
+        return await self.db.run_sync(llamar)
+
+    async def publicar(self, id_capitulo: str) -> tuple:
+        """Ver GestorPublicacion.publicar."""
+        return await self._ejecutar('publicar', id_capitulo)
+
+    async def restaurar_version(self, id_capitulo: str, version: int) -> tuple:
+        """Ver GestorPublicacion.restaurar_version."""
+        return await self._ejecutar('restaurar_version', id_capitulo, version)
+
+    async def listar_versiones(self, id_capitulo: str) -> tuple:
+        """Ver GestorPublicacion.listar_versiones."""
+        return await self._ejecutar('listar_versiones', id_capitulo)
+
+    async def obtener_publicacion(self, id_capitulo: str, version: Optional[int] = None) -> tuple:
+        """Ver GestorPublicacion.obtener_publicacion."""
+        return await self._ejecutar('obtener_publicacion', id_capitulo, version)
+
+    async def obtener_cuerpo(self, id_capitulo: str, version: int, codificaciones: Sequence[str] = ()) -> tuple:
+        """Ver GestorPublicacion.obtener_cuerpo."""
+        return await self._ejecutar('obtener_cuerpo', id_capitulo, version, list(codificaciones))
@@ -0,0 +1,29 @@
+"""
+Setup para el paquete publicacion_capitulos
+===========================================
+"""
+
+from setuptools import setup, find_packages
+
+setup(
+    name='libro-publicacion-capitulos',
+    version='0.1.0',
+    description='Versiones publicadas de los capítulos, precompiladas y comprimidas (JSON + gzip/Brotli)',
+    author='Anibal Cordoba & Zabala',
+    packages=find_packages(),
+    python_requires='>=3.8',
+    install_requires=[
+        'sqlalchemy>=2.0.0',
+    ],
+    extras_require={
+        'brotli': ['brotli>=1.0.9'],
+    },
+    classifiers=[
+        'Development Status :: 3 - Alpha',
+        'Intended Audience :: Developers',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+    ],
+)
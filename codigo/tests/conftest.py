@@ -26,19 +26,59 @@ sys.path.insert(0, str(api_path))
 
 # Importar modelos y configuración
 from db.config import BaseContenido
-from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido
+from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido, PublicacionCapitulo
 
 # Importar API (ya usará BD en memoria por TESTING=true)
 import main as api_main
-from dependencies import get_db, engine as test_engine
+from dependencies import get_db, engine as test_engine, evaluaciones_engine as evaluaciones_test_engine
+from dependencies import usuarios_engine as usuarios_test_engine
+from db.evaluaciones.models import Evaluacion
+from db.usuarios.models import Usuario, Rol, Permiso, TipoUsuario
 
 app = api_main.app
 
+# Usuario con permisos de escritura sobre capítulos y contenidos; el cliente
+# de prueba envía por defecto un token de acceso suyo
+ID_USUARIO_EDITOR = "usr-editor-test"
+EMAIL_EDITOR = "editor@test.com"
+PASSWORD_EDITOR = "editor-secreto"
+PERMISOS_EDITOR = [
+    (recurso, accion)
+    for recurso in ("capitulo", "contenido")
+    for accion in ("crear", "actualizar", "eliminar")
+] + [("contenido", "exportar"), ("contenido", "importar")]
+
+
+def _crear_usuario_editor():
+    """Crea el rol Editor con PERMISOS_EDITOR y el usuario que lo tiene."""
+    from dependencies import UsuariosSessionLocal
+    from gestor_autenticacion import hashear_password
+
+    db = UsuariosSessionLocal()
+    try:
+        if db.get(Usuario, ID_USUARIO_EDITOR) is not None:
+            return
+        rol = Rol(nombre="Editor", permisos=[
+            Permiso(nombre=f"{recurso}.{accion}", recurso=recurso, accion=accion)
+            for recurso, accion in PERMISOS_EDITOR
+        ])
+        db.add(Usuario(
+            id_usuario=ID_USUARIO_EDITOR, email=EMAIL_EDITOR,
+            password_hash=hashear_password(PASSWORD_EDITOR, rondas=4),
+            nombre="Editor", apellido="Test", tipo_usuario=TipoUsuario.DOCENTE, roles=[rol]
+        ))
+        db.commit()
+    finally:
+        db.close()
+
 
 def pytest_configure(config):
     """Hook que se ejecuta al iniciar pytest, antes de cualquier test."""
     # Crear todas las tablas en la BD de test
     BaseContenido.metadata.create_all(bind=test_engine)
+    Evaluacion.metadata.create_all(bind=evaluaciones_test_engine)
+    Usuario.metadata.create_all(bind=usuarios_test_engine)
+    _crear_usuario_editor()
     print(f"\n✅ Tablas creadas en BD de test")
 
 
@@ -46,10 +86,21 @@ def pytest_unconfigure(config):
     """Hook que se ejecuta al finalizar todos los tests."""
     # Eliminar la base de datos temporal
     import os
-    test_db_path = Path(__file__).parent.parent / "data" / "test_contenido.db"
-    if test_db_path.exists():
-        os.remove(test_db_path)
-        print(f"\n🗑️  BD de test eliminada")
+    import shutil
+    from db.motores import registro
+    registro.cerrar_todos()
+    
+    datos = Path(__file__).parent.parent / "data"
+    for test_db_path in (datos / "test_contenido.db", datos / "test_evaluaciones.db", datos / "test_usuarios.db"):
+        # Archivos auxiliares del modo WAL
+        for sufijo in ("-wal", "-shm"):
+            auxiliar = test_db_path.with_name(test_db_path.name + sufijo)
+            if auxiliar.exists():
+                os.remove(auxiliar)
+        if test_db_path.exists():
+            os.remove(test_db_path)
+    shutil.rmtree(datos / "test_medios", ignore_errors=True)
+    print(f"\n🗑️  BD de test eliminada")
 
 
 # ===== FIXTURES DE BASE DE DATOS =====
@@ -62,9 +113,15 @@ def clean_db():
     """
     # Limpiar datos antes del test
     from dependencies import SessionLocal
+    from api.dependencies import cache
+    from api.autorizacion import cache_permisos
+    if cache is not None:
+        cache.limpiar()
+    cache_permisos.invalidar_todo()
     db = SessionLocal()
     try:
         db.query(UnionCapituloContenido).delete()
+        db.query(PublicacionCapitulo).delete()
         db.query(Contenido).delete()
         db.query(Capitulo).delete()
         db.commit()
@@ -79,6 +136,7 @@ def clean_db():
     db = SessionLocal()
     try:
         db.query(UnionCapituloContenido).delete()
+        db.query(PublicacionCapitulo).delete()
         db.query(Contenido).delete()
         db.query(Capitulo).delete()
         db.commit()
@@ -104,16 +162,47 @@ def test_db_session():
         session.close()
 
 
+def cabeceras_de(id_usuario: str) -> dict:
+    """Cabecera Authorization con un token de acceso del usuario."""
+    from api.autenticacion import firmador
+    return {"Authorization": f"Bearer {firmador.emitir(id_usuario)['token']}"}
+
+
+@pytest.fixture
+def cabeceras_editor():
+    """Cabeceras que identifican al usuario editor."""
+    return cabeceras_de(ID_USUARIO_EDITOR)
+
+
 @pytest.fixture(scope="function")
-def client():
+def client(cabeceras_editor):
     """
     Cliente de prueba de FastAPI.
     Ya usa automáticamente la BD en memoria por TESTING=true.
+    Se identifica como el usuario editor (permisos de escritura).
     """
-    with TestClient(app) as test_client:
+    with TestClient(app, headers=cabeceras_editor) as test_client:
         yield test_client
 
 
+@pytest.fixture(scope="function")
+def test_evaluaciones_session():
+    """
+    Sesión de la BD de evaluaciones de test, vacía al empezar cada test.
+    """
+    from dependencies import EvaluacionesSessionLocal
+    
+    session = EvaluacionesSessionLocal()
+    for tabla in reversed(Evaluacion.metadata.sorted_tables):
+        session.execute(tabla.delete())
+    session.commit()
+    
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 # ===== FIXTURES DE DATOS DE PRUEBA =====
 
 @pytest.fixture
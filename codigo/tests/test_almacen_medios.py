@@ -0,0 +1,243 @@
+"""
+Tests del Almacén de Medios
+===========================
+Subidas por trozos a disco local y a un servicio compatible con S3,
+deduplicación por SHA-256 y creación de contenidos subiendo el archivo.
+"""
+
+import asyncio
+import hashlib
+import io
+import shutil
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "almacen_medios"))
+
+import main as api_main
+from api import dependencies
+from almacen_medios import AlmacenLocal, AlmacenS3, ArchivoDemasiadoGrande, TAMANO_TROZO
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"pixeles" * 100
+
+
+def _trozos(datos: bytes, tamano: int = 64):
+    return (datos[i:i + tamano] for i in range(0, len(datos), tamano))
+
+
+class ErrorS3(Exception):
+    """Como botocore.exceptions.ClientError: el código va en response['Error']['Code']."""
+
+    def __init__(self, codigo):
+        super().__init__(codigo)
+        self.response = {"Error": {"Code": codigo}}
+
+
+class S3Local:
+    """Servicio compatible con S3 en un directorio, con las operaciones que usa AlmacenS3."""
+
+    def __init__(self, directorio: Path):
+        self.directorio = directorio
+        self.subidas = []
+
+    def _ruta(self, bucket, clave):
+        return self.directorio / bucket / clave
+
+    def head_object(self, Bucket, Key):
+        ruta = self._ruta(Bucket, Key)
+        if not ruta.is_file():
+            raise ErrorS3("404")
+        return {"ContentLength": ruta.stat().st_size}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        ruta = self._ruta(Bucket, Key)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(ruta, "wb") as destino:
+            shutil.copyfileobj(Fileobj, destino)
+        self.subidas.append((Key, ExtraArgs))
+
+    def get_object(self, Bucket, Key):
+        try:
+            return {"Body": open(self._ruta(Bucket, Key), "rb")}
+        except FileNotFoundError:
+            raise ErrorS3("NoSuchKey")
+
+    def delete_object(self, Bucket, Key):
+        self._ruta(Bucket, Key).unlink(missing_ok=True)
+
+
+@pytest.fixture
+def local(tmp_path):
+    return AlmacenLocal(tmp_path / "medios", url_base="/media")
+
+
+@pytest.fixture
+def s3(tmp_path):
+    return AlmacenS3(S3Local(tmp_path / "s3"), "libro", url_base="https://cdn.test/", prefijo="medios")
+
+
+def _archivos(directorio: Path):
+    return [p for p in directorio.rglob("*") if p.is_file()]
+
+
+class TestAlmacenLocal:
+    """Backend en disco"""
+
+    def test_guardar_por_trozos(self, local):
+        medio = local.guardar(_trozos(PNG), "Celula.PNG")
+
+        sha256 = hashlib.sha256(PNG).hexdigest()
+        assert medio["clave"] == f"{sha256[:2]}/{sha256}.png"
+        assert medio["url"] == f"/media/{medio['clave']}"
+        assert medio["tamano"] == len(PNG)
+        assert medio["tipo_mime"] == "image/png"
+        assert medio["duplicado"] is False
+        assert local.ruta(medio["clave"]).read_bytes() == PNG
+
+    def test_deduplicacion(self, local):
+        primero = local.guardar(_trozos(PNG), "a.png")
+        segundo = local.guardar(_trozos(PNG, 7), "b.png")
+
+        assert segundo["duplicado"] is True
+        assert segundo["clave"] == primero["clave"]
+        # Solo el archivo publicado: ni copias ni temporales
+        assert _archivos(local.directorio) == [local.ruta(primero["clave"])]
+
+    def test_tamano_maximo(self, local):
+        local.max_bytes = 100
+
+        with pytest.raises(ArchivoDemasiadoGrande):
+            local.guardar(_trozos(PNG), "grande.png")
+
+        assert _archivos(local.directorio) == []
+
+    def test_memoria_constante(self, local):
+        trozo = b"v" * TAMANO_TROZO
+
+        tracemalloc.start()
+        try:
+            medio = local.guardar((trozo for _ in range(32)), "video.mp4")
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert medio["tamano"] == 32 * TAMANO_TROZO
+        assert pico < 4 * TAMANO_TROZO
+
+    def test_guardar_async(self, local):
+        async def flujo():
+            for trozo in _trozos(PNG):
+                yield trozo
+
+        medio = asyncio.run(local.guardar_async(flujo(), "celula.png"))
+
+        assert local.ruta(medio["clave"]).read_bytes() == PNG
+
+    def test_clave_no_valida(self, local):
+        with pytest.raises(ValueError):
+            local.ruta("../../etc/passwd")
+        assert local.clave_de_url("https://otro/celula.png") is None
+
+
+class TestAlmacenS3:
+    """Backend compatible con S3"""
+
+    def test_guardar(self, s3):
+        medio = s3.guardar(_trozos(PNG), "celula.png")
+
+        assert medio["url"] == f"https://cdn.test/medios/{medio['clave']}"
+        assert s3.cliente.subidas == [(f"medios/{medio['clave']}", {"ContentType": "image/png"})]
+        with s3.abrir(medio["clave"]) as cuerpo:
+            assert cuerpo.read() == PNG
+        assert s3.clave_de_url(medio["url"]) == medio["clave"]
+
+    def test_duplicado_no_se_vuelve_a_enviar(self, s3):
+        s3.guardar(_trozos(PNG), "a.png")
+        segundo = s3.guardar(_trozos(PNG), "b.png")
+
+        assert segundo["duplicado"] is True
+        assert len(s3.cliente.subidas) == 1
+
+    def test_eliminar_y_abrir_inexistente(self, s3):
+        medio = s3.guardar(_trozos(PNG), "celula.png")
+
+        assert s3.eliminar(medio["clave"]) is True
+        assert s3.eliminar(medio["clave"]) is False
+        with pytest.raises(FileNotFoundError):
+            s3.abrir(medio["clave"])
+
+
+# ===== API =====
+
+class TestEndpoints:
+    """POST /api/contenidos/subir, POST /api/medios/ y GET /media/..."""
+
+    def test_crear_contenido_con_archivo(self, client):
+        response = client.post(
+            "/api/contenidos/subir",
+            data={"tipo": "imagen", "tema": "Célula"},
+            files={"archivo": ("celula.png", PNG, "image/png")}
+        )
+
+        assert response.status_code == 201
+        contenido = response.json()
+        assert contenido["formato"] == "png"
+        assert contenido["url_archivo"].startswith("/media/")
+
+        descarga = client.get(contenido["url_archivo"])
+        assert descarga.status_code == 200
+        assert descarga.content == PNG
+        assert "immutable" in descarga.headers["cache-control"]
+
+    def test_mismo_archivo_una_sola_vez(self, client):
+        datos = {"tipo": "video", "tema": "Mitosis", "duracion": "4.5"}
+        primero = client.post("/api/contenidos/subir", data=datos, files={"archivo": ("a.mp4", b"frames" * 1000)})
+        segundo = client.post("/api/contenidos/subir", data=datos, files={"archivo": ("b.mp4", b"frames" * 1000)})
+
+        assert primero.json()["id_contenido"] != segundo.json()["id_contenido"]
+        assert primero.json()["url_archivo"] == segundo.json()["url_archivo"]
+        assert primero.json()["duracion"] == 4.5
+
+    def test_tipo_sin_archivo(self, client):
+        response = client.post(
+            "/api/contenidos/subir",
+            data={"tipo": "texto", "tema": "Célula"},
+            files={"archivo": ("notas.txt", b"hola")}
+        )
+
+        assert response.status_code == 400
+
+    def test_subida_directa(self, client):
+        response = client.post("/api/medios/?nombre=celula.glb", content=_trozos(b"glTF" * 5000, 1024))
+
+        assert response.status_code == 201
+        medio = response.json()
+        assert medio["tamano"] == 20000
+        assert client.get(medio["url"]).content == b"glTF" * 5000
+
+    def test_demasiado_grande(self, client, monkeypatch):
+        monkeypatch.setattr(dependencies.almacen, "max_bytes", 10)
+
+        response = client.post("/api/medios/?nombre=video.mp4", content=b"x" * 100)
+
+        assert response.status_code == 413
+
+    def test_requiere_permiso(self):
+        with TestClient(api_main.app) as anonimo:
+            response = anonimo.post("/api/medios/?nombre=a.png", content=PNG)
+
+        assert response.status_code == 401
+
+    def test_medio_inexistente(self, client):
+        assert client.get("/media/../conftest.py").status_code == 404
+        assert client.get("/media/ab/" + "ab" * 32 + ".png").status_code == 404
+
+
+pytestmark = [
+    pytest.mark.integration
+]
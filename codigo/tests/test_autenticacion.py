@@ -0,0 +1,342 @@
+"""
+Tests de Autenticación
+======================
+Tokens firmados validados sin BD, inicio de sesión con bcrypt en un pool
+propio, refresco con rotación, revocación en memoria y escritura por lotes
+de ultimo_acceso.
+"""
+
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_autenticacion"))
+
+import main as api_main
+import gestor_autenticacion
+from api.autenticacion import firmador
+from db.usuarios.models import Usuario, TipoUsuario
+from gestor_autenticacion import (
+    GestorAutenticacion, GestorAutenticacionAsync, FirmadorTokens, ListaRevocacion, RegistroAccesos,
+    registro_accesos, hashear_password, TIPO_ACCESO, TIPO_REFRESCO, ERROR_CREDENCIALES
+)
+
+
+MODELOS = {
+    'Usuario': Usuario
+}
+
+PASSWORD = "clave-de-ana"
+
+
+class Reloj:
+    """Reloj manual para caducidades e intervalos."""
+
+    def __init__(self, ahora=1_000_000.0):
+        self.ahora = ahora
+
+    def __call__(self):
+        return self.ahora
+
+
+def _usuario(id_usuario="usr-ana", activo=True):
+    return Usuario(
+        id_usuario=id_usuario, email=f"{id_usuario}@test.com",
+        password_hash=hashear_password(PASSWORD, rondas=4),
+        nombre="Ana", apellido="Test", tipo_usuario=TipoUsuario.ESTUDIANTE, activo=activo
+    )
+
+
+@pytest.fixture
+def usuarios():
+    """BD de usuarios en memoria que cuenta las sentencias ejecutadas."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Usuario.metadata.create_all(engine)
+    sesion = sessionmaker(bind=engine)()
+    sesion.sentencias = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sesion.sentencias.append(statement)
+
+    yield sesion
+    sesion.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def gestor(usuarios, reloj):
+    return GestorAutenticacion(
+        usuarios, MODELOS, FirmadorTokens("secreto", reloj=reloj),
+        revocados=ListaRevocacion(reloj=reloj), accesos=RegistroAccesos(intervalo_segundos=60, reloj=reloj)
+    )
+
+
+class TestTokens:
+    """Firma y verificación locales"""
+
+    def test_emitir_y_verificar(self, reloj):
+        tokens = FirmadorTokens("secreto", reloj=reloj)
+
+        emitido = tokens.emitir("usr-1")
+        datos, error = tokens.verificar(emitido["token"])
+
+        assert error is None
+        assert datos == emitido["datos"]
+        assert datos["sub"] == "usr-1"
+        assert datos["exp"] - datos["iat"] == 15 * 60
+
+    def test_firma_alterada_u_otro_secreto(self, reloj):
+        tokens = FirmadorTokens("secreto", reloj=reloj)
+        token = tokens.emitir("usr-1")["token"]
+        cabecera, contenido, firma = token.split(".")
+        ajeno = FirmadorTokens("otro", reloj=reloj).emitir("usr-admin")["token"]
+
+        assert tokens.verificar(f"{cabecera}.{contenido}.{firma[:-2]}xx")[1] == "Firma del token inválida"
+        assert tokens.verificar(ajeno)[1] == "Firma del token inválida"
+        assert tokens.verificar("no-es-un-token")[1] == "Token mal formado"
+
+    def test_rechaza_alg_none(self, reloj):
+        tokens = FirmadorTokens("secreto", reloj=reloj)
+        _, contenido, _ = tokens.emitir("usr-1")["token"].split(".")
+        sin_firma = gestor_autenticacion._b64(b'{"alg":"none","typ":"JWT"}')
+
+        assert tokens.verificar(f"{sin_firma}.{contenido}.")[1] == "Token mal formado"
+
+    def test_no_ascii(self, reloj):
+        tokens = FirmadorTokens("secreto", reloj=reloj)
+        cabecera, contenido, firma = tokens.emitir("usr-1")["token"].split(".")
+
+        assert tokens.verificar(f"{cabecera}.{contenido}.{firma[:-1]}ñ")[1] == "Token mal formado"
+        assert tokens.verificar(f"{cabecera}.{contenido}ñ.{firma}")[1] == "Token mal formado"
+
+    def test_caducado(self, reloj):
+        tokens = FirmadorTokens("secreto", duracion_acceso=60, reloj=reloj)
+        token = tokens.emitir("usr-1")["token"]
+
+        reloj.ahora += 60
+
+        assert tokens.verificar(token)[1] == "Token caducado"
+
+    def test_tipo_incorrecto(self, reloj):
+        tokens = FirmadorTokens("secreto", reloj=reloj)
+        refresco = tokens.emitir("usr-1", TIPO_REFRESCO)["token"]
+
+        assert tokens.verificar(refresco, TIPO_ACCESO)[1] == "Tipo de token incorrecto"
+
+
+class TestGestor:
+    """Inicio de sesión, refresco y último acceso"""
+
+    def test_login(self, usuarios, gestor):
+        usuarios.add(_usuario())
+        usuarios.commit()
+
+        resultado, error = gestor.login("usr-ana@test.com", PASSWORD)
+
+        assert error is None
+        assert resultado["id_usuario"] == "usr-ana"
+        assert gestor.firmador.verificar(resultado["access_token"])[0]["sub"] == "usr-ana"
+
+    def test_credenciales_invalidas(self, usuarios, gestor):
+        usuarios.add_all([_usuario(), _usuario("usr-inactivo", activo=False)])
+        usuarios.commit()
+
+        assert gestor.login("usr-ana@test.com", "otra") == (None, ERROR_CREDENCIALES)
+        assert gestor.login("nadie@test.com", PASSWORD) == (None, ERROR_CREDENCIALES)
+        assert gestor.login("usr-inactivo@test.com", PASSWORD) == (None, ERROR_CREDENCIALES)
+        # bcrypt no admite más de 72 bytes: no es un error del servidor
+        assert gestor.login("usr-ana@test.com", "x" * 100) == (None, ERROR_CREDENCIALES)
+
+    def test_refresco_de_un_solo_uso(self, usuarios, gestor):
+        usuarios.add(_usuario())
+        usuarios.commit()
+        refresco = gestor.login("usr-ana@test.com", PASSWORD)[0]["refresh_token"]
+
+        nuevo, error = gestor.refrescar(refresco)
+        reutilizado = gestor.refrescar(refresco)
+
+        assert error is None
+        assert nuevo["refresh_token"] != refresco
+        assert reutilizado == (None, "Token revocado")
+
+    def test_accesos_limitados_por_intervalo(self, gestor, reloj):
+        accesos = gestor.accesos
+
+        assert accesos.registrar("usr-ana") is True
+        assert accesos.registrar("usr-ana") is False
+        reloj.ahora += 61
+        assert accesos.registrar("usr-ana") is True
+        assert accesos.pendientes == 1
+
+    def test_volcar_accesos_en_un_update(self, usuarios, gestor):
+        usuarios.add_all([_usuario(f"usr-{i}") for i in range(5)])
+        usuarios.commit()
+        fecha_modificacion = usuarios.get(Usuario, "usr-0").fecha_modificacion
+        for i in range(5):
+            gestor.accesos.registrar(f"usr-{i}")
+        usuarios.sentencias.clear()
+
+        escritos, error = gestor.volcar_accesos()
+
+        assert (escritos, error) == (5, None)
+        assert sum(1 for s in usuarios.sentencias if s.startswith("UPDATE usuarios")) == 1
+        usuarios.expire_all()
+        usuario = usuarios.get(Usuario, "usr-0")
+        assert usuario.ultimo_acceso is not None
+        assert usuario.fecha_modificacion == fecha_modificacion
+        assert gestor.volcar_accesos() == (0, None)
+
+    def test_volcado_fallido_devuelve_los_accesos(self, usuarios, gestor):
+        gestor.accesos.registrar("usr-ana")
+        usuarios.get_bind().dispose()
+        usuarios.bind = create_engine("sqlite://")  # sin tablas
+
+        escritos, error = gestor.volcar_accesos()
+
+        assert escritos is None
+        assert "Error al guardar los últimos accesos" in error
+        assert gestor.accesos.pendientes == 1
+
+
+# ===== API =====
+
+@pytest.fixture
+def ana():
+    """Usuaria de la BD de usuarios de la API (se borra al terminar)."""
+    from dependencies import UsuariosSessionLocal
+
+    db = UsuariosSessionLocal()
+    db.add(_usuario())
+    db.commit()
+    yield db
+    registro_accesos.extraer()
+    db.rollback()
+    db.query(Usuario).filter(Usuario.id_usuario == "usr-ana").delete()
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def anonimo():
+    with TestClient(api_main.app) as cliente:
+        yield cliente
+
+
+def _login(cliente, password=PASSWORD):
+    return cliente.post("/api/auth/login", json={"email": "usr-ana@test.com", "password": password})
+
+
+class TestEndpoints:
+    """/api/auth/login, /refresh y /logout"""
+
+    def test_login_y_acceso(self, anonimo, ana):
+        response = _login(anonimo)
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["token_type"] == "bearer"
+        # Sin permisos de escritura, pero identificada: 403 y no 401
+        crear = anonimo.post(
+            "/api/capitulos/", json={"titulo": "T", "numero": 1},
+            headers={"Authorization": f"Bearer {datos['access_token']}"}
+        )
+        assert crear.status_code == 403
+
+    def test_login_incorrecto(self, anonimo, ana):
+        incorrecto = _login(anonimo, "otra")
+        inexistente = anonimo.post("/api/auth/login", json={"email": "nadie@test.com", "password": PASSWORD})
+
+        assert incorrecto.status_code == inexistente.status_code == 401
+        assert incorrecto.json() == inexistente.json()
+
+    def test_refresh(self, anonimo, ana):
+        refresco = _login(anonimo).json()["refresh_token"]
+
+        primero = anonimo.post("/api/auth/refresh", json={"refresh_token": refresco})
+        segundo = anonimo.post("/api/auth/refresh", json={"refresh_token": refresco})
+
+        assert primero.status_code == 200
+        assert segundo.status_code == 401
+
+    def test_logout_revoca(self, anonimo, ana):
+        tokens = _login(anonimo).json()
+        cabeceras = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        salir = anonimo.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=cabeceras)
+
+        assert salir.status_code == 204
+        assert anonimo.post("/api/auth/logout", headers=cabeceras).status_code == 401
+        assert anonimo.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    def test_token_invalido(self, anonimo):
+        response = anonimo.post("/api/capitulos/", json={}, headers={"Authorization": "Bearer x.y.z"})
+
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+    def test_token_no_ascii(self, anonimo):
+        cabecera = f"Bearer {FirmadorTokens._CABECERA}.e30.firmañ".encode("utf-8")
+
+        response = anonimo.post("/api/capitulos/", json={}, headers={"Authorization": cabecera})
+
+        assert response.status_code == 401
+
+    def test_bcrypt_fuera_del_event_loop(self, anonimo, ana, monkeypatch):
+        hilos = []
+        verificar = gestor_autenticacion.verificar_password
+
+        def espia(password, password_hash):
+            hilos.append(threading.current_thread().name)
+            return verificar(password, password_hash)
+
+        monkeypatch.setattr(gestor_autenticacion, "verificar_password", espia)
+
+        assert _login(anonimo).status_code == 200
+        assert len(hilos) == 1 and hilos[0].startswith("bcrypt")
+
+    def test_saturado(self, anonimo, ana, monkeypatch):
+        monkeypatch.setattr(GestorAutenticacionAsync, "_en_espera", gestor_autenticacion.MAX_LOGINS_EN_ESPERA)
+
+        response = _login(anonimo)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_ultimo_acceso_por_lotes(self, ana):
+        # Usuario nuevo: el registro del proceso aún no lo ha visto en este intervalo
+        id_usuario = f"usr-{uuid.uuid4().hex[:8]}"
+        ana.add(_usuario(id_usuario))
+        ana.commit()
+        token = firmador.emitir(id_usuario)["token"]
+
+        try:
+            with TestClient(api_main.app, headers={"Authorization": f"Bearer {token}"}) as cliente:
+                for _ in range(3):
+                    cliente.post("/api/capitulos/", json={})
+                ana.expire_all()
+                assert ana.get(Usuario, id_usuario).ultimo_acceso is None
+                assert registro_accesos.pendientes == 1
+
+            # Al apagar la aplicación se escriben los pendientes
+            ana.expire_all()
+            assert ana.get(Usuario, id_usuario).ultimo_acceso is not None
+        finally:
+            ana.query(Usuario).filter(Usuario.id_usuario == id_usuario).delete()
+            ana.commit()
+
+pytestmark = [
+    pytest.mark.security
+]
@@ -0,0 +1,345 @@
+"""
+Tests de Autorización por Roles
+===============================
+Máscaras de permisos por rol y por usuario, caché con TTL, invalidación al
+cambiar roles o permisos, y protección de las rutas de escritura de
+capítulos y contenidos.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_permisos"))
+
+import main as api_main
+from api.autenticacion import firmador
+from db.usuarios.models import Usuario, Rol, Permiso, TipoUsuario
+from gestor_permisos import GestorPermisos, CachePermisos, cache_permisos
+
+
+MODELOS = {
+    'Usuario': Usuario,
+    'Rol': Rol,
+    'Permiso': Permiso
+}
+
+
+class Reloj:
+    """Reloj manual para los TTL."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def usuarios():
+    """BD de usuarios en memoria que cuenta las sentencias ejecutadas."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Usuario.metadata.create_all(engine)
+    sesion = sessionmaker(bind=engine)()
+    sesion.sentencias = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sesion.sentencias.append(statement)
+
+    yield sesion
+    sesion.close()
+    engine.dispose()
+
+
+def _permiso(recurso, accion):
+    return Permiso(nombre=f"{recurso}.{accion}", recurso=recurso, accion=accion)
+
+
+def _usuario(id_usuario, *roles, activo=True):
+    return Usuario(
+        id_usuario=id_usuario, email=f"{id_usuario}@test.com", password_hash="-",
+        nombre="Nombre", apellido="Apellido", tipo_usuario=TipoUsuario.DOCENTE,
+        activo=activo, roles=list(roles)
+    )
+
+
+@pytest.fixture
+def roles(usuarios):
+    """Editor (crear/actualizar capítulo), Revisor (leer capítulo) y un rol inactivo."""
+    editor = Rol(nombre="Editor", permisos=[_permiso("capitulo", "crear"), _permiso("capitulo", "actualizar")])
+    revisor = Rol(nombre="Revisor", permisos=[_permiso("capitulo", "leer")])
+    inactivo = Rol(nombre="Inactivo", activo=False, permisos=[_permiso("contenido", "eliminar")])
+    usuarios.add_all([editor, revisor, inactivo])
+    usuarios.commit()
+    return editor, revisor, inactivo
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def gestor(usuarios, reloj):
+    return GestorPermisos(usuarios, MODELOS, cache=CachePermisos(ttl_segundos=60, reloj=reloj))
+
+
+class TestMascaras:
+    """Unión de los permisos de los roles del usuario"""
+
+    def test_union_de_roles(self, usuarios, roles, gestor):
+        editor, revisor, inactivo = roles
+        usuarios.add(_usuario("ana", editor, revisor, inactivo))
+        usuarios.commit()
+
+        permisos, error = gestor.permisos_usuario("ana")
+
+        assert error is None
+        assert permisos == {("capitulo", "crear"), ("capitulo", "actualizar"), ("capitulo", "leer")}
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (True, None)
+        # El rol inactivo no suma
+        assert gestor.tiene_permiso("ana", "contenido", "eliminar") == (False, None)
+
+    def test_usuario_inexistente_o_inactivo(self, usuarios, roles, gestor):
+        usuarios.add(_usuario("beto", roles[0], activo=False))
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("beto", "capitulo", "crear") == (False, None)
+        assert gestor.tiene_permiso("nadie", "capitulo", "crear") == (False, None)
+
+    def test_permiso_desconocido(self, usuarios, roles, gestor):
+        usuarios.add(_usuario("ana", roles[0]))
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("ana", "evaluacion", "crear") == (False, None)
+
+
+class TestCache:
+    """Con la máscara en caché no se consulta la BD"""
+
+    def test_segunda_consulta_sin_sql(self, usuarios, roles, gestor):
+        usuarios.add(_usuario("ana", roles[0]))
+        usuarios.commit()
+        gestor.tiene_permiso("ana", "capitulo", "crear")
+        usuarios.sentencias.clear()
+
+        for accion in ("crear", "actualizar", "eliminar"):
+            gestor.tiene_permiso("ana", "capitulo", accion)
+
+        assert usuarios.sentencias == []
+
+    def test_catalogo_compartido_entre_usuarios(self, usuarios, roles, gestor):
+        usuarios.add_all([_usuario("ana", roles[0]), _usuario("beto", roles[1])])
+        usuarios.commit()
+        gestor.tiene_permiso("ana", "capitulo", "crear")
+        usuarios.sentencias.clear()
+
+        gestor.tiene_permiso("beto", "capitulo", "leer")
+
+        # Solo los roles de beto: el catálogo ya está en caché
+        assert len(usuarios.sentencias) == 1
+
+    def test_ttl(self, usuarios, roles, gestor, reloj):
+        usuarios.add(_usuario("ana", roles[0]))
+        usuarios.commit()
+        gestor.tiene_permiso("ana", "capitulo", "crear")
+        usuarios.sentencias.clear()
+
+        reloj.ahora += 61
+        gestor.tiene_permiso("ana", "capitulo", "crear")
+
+        assert usuarios.sentencias != []
+
+    def test_invalidacion_explicita(self, usuarios, roles, gestor):
+        editor, revisor, _ = roles
+        ana = _usuario("ana", revisor)
+        usuarios.add(ana)
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (False, None)
+
+        # Cambio con SQL directo: la caché no se entera hasta invalidar
+        usuarios.execute(Usuario.roles.property.secondary.insert().values(id_usuario="ana", id_rol=editor.id_rol))
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (False, None)
+
+        gestor.cache.invalidar_usuario("ana")
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (True, None)
+
+    def test_mascara_leida_antes_de_invalidar(self):
+        cache = CachePermisos(ttl_segundos=60)
+        generacion = cache.generacion
+        # Se revoca un rol mientras otra petición calcula la máscara con los roles de antes
+        cache.invalidar_usuario("ana")
+
+        cache.guardar_mascara("ana", 0b1, generacion)
+
+        assert cache.mascara("ana") is None
+
+
+class TestInvalidacionPorEventos:
+    """Los cambios hechos con el ORM invalidan la caché del proceso al confirmarse"""
+
+    @pytest.fixture
+    def gestor(self, usuarios):
+        cache_permisos.invalidar_todo()
+        yield GestorPermisos(usuarios, MODELOS, cache=cache_permisos)
+        cache_permisos.invalidar_todo()
+
+    def test_asignar_rol(self, usuarios, roles, gestor):
+        editor, revisor, _ = roles
+        ana = _usuario("ana", revisor)
+        usuarios.add(ana)
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (False, None)
+
+        ana.roles.append(editor)
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (True, None)
+
+    def test_quitar_usuario_del_rol(self, usuarios, roles, gestor):
+        editor, _, _ = roles
+        usuarios.add(_usuario("ana", editor))
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (True, None)
+        usuarios.expire_all()
+
+        editor.usuarios.clear()
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (False, None)
+
+    def test_conceder_permiso_a_rol(self, usuarios, roles, gestor):
+        _, revisor, _ = roles
+        usuarios.add(_usuario("ana", revisor))
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "contenido", "crear") == (False, None)
+
+        revisor.permisos.append(_permiso("contenido", "crear"))
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("ana", "contenido", "crear") == (True, None)
+
+    def test_desactivar_rol(self, usuarios, roles, gestor):
+        editor, _, _ = roles
+        usuarios.add(_usuario("ana", editor))
+        usuarios.commit()
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (True, None)
+
+        editor.activo = False
+        usuarios.commit()
+
+        assert gestor.tiene_permiso("ana", "capitulo", "crear") == (False, None)
+
+    def test_rollback_no_invalida(self, usuarios, roles, gestor):
+        editor, revisor, _ = roles
+        ana = _usuario("ana", revisor)
+        usuarios.add(ana)
+        usuarios.commit()
+        gestor.tiene_permiso("ana", "capitulo", "crear")
+
+        ana.roles.append(editor)
+        usuarios.flush()
+        usuarios.rollback()
+
+        assert cache_permisos.mascara("ana") is not None
+
+
+@pytest.fixture
+def autor_contenidos():
+    """Usuario que puede crear contenidos pero no modificar capítulos."""
+    from dependencies import UsuariosSessionLocal
+
+    db = UsuariosSessionLocal()
+    permiso = db.query(Permiso).filter_by(recurso="contenido", accion="crear").first()
+    rol = Rol(nombre="Autor de contenidos", permisos=[permiso or _permiso("contenido", "crear")])
+    usuario = _usuario("usr-autor-contenidos", rol)
+    db.add(usuario)
+    db.commit()
+    yield usuario.id_usuario
+    db.delete(usuario)
+    db.delete(rol)
+    db.commit()
+    db.close()
+
+
+class TestRutasProtegidas:
+    """Dependency requiere_permiso en las rutas de escritura"""
+
+    def test_sin_usuario(self, sample_capitulo_data):
+        with TestClient(api_main.app) as cliente:
+            response = cliente.post("/api/capitulos/", json=sample_capitulo_data)
+
+        assert response.status_code == 401
+
+    def test_sin_permiso(self, sample_capitulo_data):
+        token = firmador.emitir("usr-sin-roles")["token"]
+        with TestClient(api_main.app, headers={"Authorization": f"Bearer {token}"}) as cliente:
+            response = cliente.post("/api/capitulos/", json=sample_capitulo_data)
+
+        assert response.status_code == 403
+
+    def test_lectura_libre(self, capitulo_publicado):
+        with TestClient(api_main.app) as cliente:
+            response = cliente.get(f"/api/capitulos/{capitulo_publicado.id_capitulo}")
+
+        assert response.status_code == 200
+
+    def test_importar_a_capitulo_sin_permiso_de_capitulo(self, autor_contenidos, capitulo_borrador):
+        token = firmador.emitir(autor_contenidos)["token"]
+        bloques = [{"tipo": "texto", "tema": "Célula", "cuerpo_texto": "Membrana"}]
+        with TestClient(api_main.app, headers={"Authorization": f"Bearer {token}"}) as cliente:
+            sin_capitulo = cliente.post("/api/contenidos/importar", json={"bloques": bloques})
+            con_capitulo = cliente.post(
+                "/api/contenidos/importar",
+                json={"id_capitulo": capitulo_borrador.id_capitulo, "bloques": bloques}
+            )
+            por_bloque = cliente.post(
+                "/api/contenidos/importar",
+                json={"bloques": [{**bloques[0], "id_capitulo": capitulo_borrador.id_capitulo}]}
+            )
+
+        assert sin_capitulo.status_code == 201
+        assert con_capitulo.status_code == 403
+        assert por_bloque.status_code == 403
+
+    @pytest.mark.parametrize("pagina", ["/crear-capitulo", "/gestionar-contenidos", "/ver-capitulos"])
+    def test_paginas_de_edicion_envian_el_token(self, pagina):
+        with TestClient(api_main.app) as cliente:
+            html = cliente.get(pagina).text
+
+        escrituras = re.findall(r"await (\w+)\((['`])(/api/[^'`]*)\2, \{\s*method: '(?:POST|PUT|DELETE)'", html)
+        assert "'Authorization', `Bearer ${token}`" in html
+        assert [funcion for funcion, _, url in escrituras if not url.startswith("/api/auth/")]
+        assert all(funcion == "fetchConSesion" for funcion, _, url in escrituras if not url.startswith("/api/auth/"))
+
+    def test_crear_capitulo_desde_la_pagina(self, sample_capitulo_data):
+        """El formulario de /crear-capitulo: 401 sin sesión, 201 tras /api/auth/login"""
+        with TestClient(api_main.app) as cliente:
+            assert "fetchConSesion('/api/capitulos/'" in cliente.get("/crear-capitulo").text
+            sin_sesion = cliente.post("/api/capitulos/", json=sample_capitulo_data)
+            tokens = cliente.post("/api/auth/login", json={"email": "editor@test.com", "password": "editor-secreto"}).json()
+            con_sesion = cliente.post(
+                "/api/capitulos/", json=sample_capitulo_data,
+                headers={"Authorization": f"Bearer {tokens['access_token']}"}
+            )
+
+        assert sin_sesion.status_code == 401
+        assert con_sesion.status_code == 201
+
+    def test_con_permiso(self, client, sample_capitulo_data):
+        response = client.post("/api/capitulos/", json=sample_capitulo_data)
+
+        assert response.status_code == 201
+
+
+pytestmark = [
+    pytest.mark.security
+]
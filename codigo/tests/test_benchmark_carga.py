@@ -0,0 +1,95 @@
+"""
+Tests del Benchmark de Carga
+=============================
+Siembra, ejecución de escenarios contra la API y comparación con la línea base.
+"""
+
+import asyncio
+import copy
+
+import pytest
+
+import main as api_main
+from benchmarks import carga
+from db.contenido.models import Capitulo, Contenido, UnionCapituloContenido
+
+
+def _ejecucion(p95=10.0, pps=100.0, consultas=2.0, errores=0):
+    return {
+        "configuracion": {"capitulos": 10, "bloques": 5},
+        "escenarios": {
+            "obtener_capitulo": {
+                "p95_ms": p95,
+                "peticiones_por_segundo": pps,
+                "consultas_por_peticion": consultas,
+                "errores": errores,
+            }
+        }
+    }
+
+
+class TestSiembra:
+    """Volumen sembrado"""
+
+    def test_sembrar_capitulos_bloques_asignaciones(self, test_db_session):
+        datos = carga.sembrar(test_db_session, capitulos=3, bloques=2, asignaciones=2)
+
+        assert len(datos["capitulos"]) == 3
+        assert len(datos["contenidos"]) == 6
+        assert test_db_session.query(Capitulo).count() == 3
+        assert test_db_session.query(Contenido).count() == 6
+        assert test_db_session.query(UnionCapituloContenido).count() == 12
+
+
+class TestEjecucion:
+    """Escenarios contra la aplicación"""
+
+    def test_todos_los_escenarios_sin_errores(self, test_db_session, cabeceras_editor):
+        datos = carga.sembrar(test_db_session, capitulos=3, bloques=2)
+
+        resultados = asyncio.run(carga.ejecutar(
+            api_main.app, datos, peticiones=4, concurrencia=2, calentamiento=1, cabeceras=cabeceras_editor
+        ))
+
+        assert set(resultados) == {escenario.nombre for escenario in carga.ESCENARIOS}
+        for nombre, resultado in resultados.items():
+            assert resultado["peticiones"] == 4, nombre
+            assert resultado["errores"] == 0, nombre
+            assert resultado["p50_ms"] <= resultado["p95_ms"] <= resultado["p99_ms"]
+            assert resultado["consultas_por_peticion"] is not None, nombre
+
+    def test_percentil(self):
+        valores = [float(n) for n in range(1, 101)]
+
+        assert carga.percentil(valores, 50) == 50.0
+        assert carga.percentil(valores, 99) == 99.0
+        assert carga.percentil([], 95) == 0.0
+
+
+class TestComparacion:
+    """Detección de regresiones frente a la línea base"""
+
+    def test_sin_regresiones_dentro_de_la_tolerancia(self):
+        assert carga.comparar(_ejecucion(), _ejecucion(p95=12.0, pps=80.0)) == []
+
+    def test_latencia_y_throughput(self):
+        regresiones = carga.comparar(_ejecucion(), _ejecucion(p95=20.0, pps=50.0))
+
+        assert len(regresiones) == 2
+
+    def test_mas_consultas_por_peticion(self):
+        regresiones = carga.comparar(_ejecucion(), _ejecucion(consultas=12.0))
+
+        assert regresiones == ["obtener_capitulo: consultas/petición 2.0 -> 12.0"]
+
+    def test_configuracion_distinta(self):
+        actual = _ejecucion()
+        otra = copy.deepcopy(actual)
+        otra["configuracion"]["capitulos"] = 100
+
+        assert len(carga.comparar(actual, otra)) == 1
+
+
+pytestmark = [
+    pytest.mark.performance
+]
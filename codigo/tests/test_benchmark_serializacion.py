@@ -0,0 +1,53 @@
+"""
+Tests del Benchmark de Serialización
+====================================
+Los caminos medidos producen el mismo cuerpo y el informe se guarda en JSON.
+"""
+
+import json
+
+import pytest
+
+from benchmarks import serializacion
+
+
+class TestCaminos:
+    """Caminos de serialización"""
+
+    def test_mismo_cuerpo(self):
+        datos = serializacion.generar_bloques(5, parrafos=2)
+        valor = serializacion.LISTA_CONTENIDOS.validate_python(datos)
+
+        cuerpos = {nombre: json.loads(serializar(valor)) for nombre, serializar in serializacion.caminos().items()}
+
+        assert "dump_json" in cuerpos
+        assert all(cuerpo == cuerpos["dump_json"] for cuerpo in cuerpos.values())
+        assert cuerpos["dump_json"][0]["cuerpo_texto"] == serializacion.PARRAFO * 2
+
+    def test_compresion_reduce_el_cuerpo(self):
+        datos = serializacion.generar_bloques(20)
+        cuerpo = serializacion.LISTA_CONTENIDOS.dump_json(serializacion.LISTA_CONTENIDOS.validate_python(datos))
+
+        resultados = serializacion.medir_compresion(cuerpo, repeticiones=1)
+
+        assert resultados["identity"]["bytes"] == len(cuerpo)
+        assert resultados["gzip"]["bytes"] < len(cuerpo) / 5
+
+
+class TestEjecucion:
+    """python -m benchmarks.serializacion"""
+
+    def test_guardar_resultados(self, tmp_path, capsys):
+        destino = tmp_path / "serializacion.json"
+
+        assert serializacion.main(["--bloques", "10", "--repeticiones", "2", "--guardar", str(destino)]) == 0
+
+        informe = json.loads(destino.read_text(encoding="utf-8"))
+        assert informe["configuracion"]["bloques"] == 10
+        assert set(informe["serializacion"]) >= {"jsonable_encoder", "json.dumps", "dump_json"}
+        assert "Serialización" in capsys.readouterr().out
+
+
+pytestmark = [
+    pytest.mark.performance
+]
@@ -0,0 +1,316 @@
+"""
+Tests de la Caché de Lectura
+=============================
+Backends (LRU en memoria y Redis simulado), lectura read-through en los
+gestores e invalidación en las escrituras.
+"""
+
+import fnmatch
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from cache_lectura import CacheLRU, CacheRedis
+from gestor_capitulo import GestorCapitulo
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+class RedisFalso:
+    """Cliente mínimo compatible con Redis que guarda todo en un dict."""
+
+    def __init__(self):
+        self.datos = {}
+
+    def get(self, clave):
+        return self.datos.get(clave)
+
+    def set(self, clave, valor, ex=None):
+        self.datos[clave] = valor
+
+    def delete(self, *claves):
+        return sum(1 for clave in claves if self.datos.pop(clave, None) is not None)
+
+    def scan_iter(self, match="*"):
+        return [clave for clave in list(self.datos) if fnmatch.fnmatch(clave, match)]
+
+    def incr(self, clave):
+        self.datos[clave] = int(self.datos.get(clave) or 0) + 1
+        return self.datos[clave]
+
+
+@pytest.fixture(params=["lru", "redis"])
+def cache(request):
+    """Una caché de cada backend."""
+    if request.param == "lru":
+        return CacheLRU(max_entradas=100, ttl_segundos=60)
+    return CacheRedis(RedisFalso(), ttl_segundos=60)
+
+
+# ============================================================================
+# GRUPO 1: Backends
+# ============================================================================
+
+class TestBackends:
+    """Comportamiento común de los backends"""
+
+    def test_guardar_y_obtener(self, cache):
+        cache.guardar("capitulo:1", {"titulo": "Célula"})
+
+        assert cache.obtener("capitulo:1") == {"titulo": "Célula"}
+        assert cache.obtener("capitulo:2") is None
+        assert cache.estadisticas()["aciertos"] == 1
+        assert cache.estadisticas()["fallos"] == 1
+
+    def test_invalidar_prefijo(self, cache):
+        cache.guardar("capitulos_publicados:0:100:", [])
+        cache.guardar("capitulos_publicados:0:10:", [])
+        cache.guardar("capitulo:1", {})
+
+        cache.invalidar_prefijo("capitulos_publicados:")
+
+        assert cache.obtener("capitulos_publicados:0:100:") is None
+        assert cache.obtener("capitulo:1") == {}
+        assert cache.estadisticas()["invalidaciones"] == 2
+
+    def test_fechas_se_conservan(self, cache):
+        from datetime import datetime
+        fecha = datetime(2024, 5, 1, 12, 30)
+        cache.guardar("capitulo:1", {"fecha_modificacion": fecha})
+
+        assert cache.obtener("capitulo:1")["fecha_modificacion"] == fecha
+
+    def test_no_guarda_si_hubo_invalidacion(self, cache):
+        generacion = cache.generacion()
+        cache.invalidar("capitulo:1")
+
+        cache.guardar("capitulo:1", {"titulo": "Viejo"}, generacion)
+
+        assert cache.obtener("capitulo:1") is None
+
+    def test_guarda_con_la_generacion_vigente(self, cache):
+        cache.guardar("capitulo:1", {"titulo": "Célula"}, cache.generacion())
+
+        assert cache.obtener("capitulo:1") == {"titulo": "Célula"}
+
+    def test_limpiar_avanza_la_generacion(self, cache):
+        generacion = cache.generacion()
+        cache.limpiar()
+
+        cache.guardar("capitulo:1", {}, generacion)
+
+        assert cache.obtener("capitulo:1") is None
+
+    def test_contadores_con_hilos(self, cache):
+        cache.guardar("a", 1)
+
+        def leer():
+            for _ in range(500):
+                cache.obtener("a")
+                cache.obtener("b")
+
+        hilos = [threading.Thread(target=leer) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert (cache.aciertos, cache.fallos) == (4000, 4000)
+
+
+class TestCacheLRU:
+    """Políticas propias del LRU en memoria"""
+
+    def test_desaloja_la_menos_usada(self):
+        cache = CacheLRU(max_entradas=2, ttl_segundos=60)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        cache.obtener("a")
+        cache.guardar("c", 3)
+
+        assert cache.obtener("b") is None
+        assert cache.obtener("a") == 1
+        assert cache.obtener("c") == 3
+
+    def test_expira_por_ttl(self):
+        cache = CacheLRU(max_entradas=10, ttl_segundos=0)
+        cache.guardar("a", 1)
+        time.sleep(0.01)
+
+        assert cache.obtener("a") is None
+
+
+# ============================================================================
+# GRUPO 2: Lectura e invalidación en los gestores
+# ============================================================================
+
+class TestGestoresConCache:
+    """Read-through e invalidación precisa"""
+
+    def test_capitulo_publicado_se_sirve_desde_cache(self, test_db_session, capitulo_publicado, cache):
+        gestor = GestorCapitulo(test_db_session, Capitulo, cache=cache)
+        id_capitulo = capitulo_publicado.id_capitulo
+
+        gestor.obtener_capitulo_publicado(id_capitulo)
+        capitulo, error = gestor.obtener_capitulo_publicado(id_capitulo)
+
+        assert error is None
+        assert capitulo.titulo == capitulo_publicado.titulo
+        assert cache.estadisticas()["aciertos"] == 1
+
+    def test_actualizar_invalida_capitulo_y_listado(self, test_db_session, capitulo_publicado, cache):
+        gestor = GestorCapitulo(test_db_session, Capitulo, cache=cache)
+        id_capitulo = capitulo_publicado.id_capitulo
+        gestor.obtener_capitulo_publicado(id_capitulo)
+        gestor.listar_capitulos(solo_publicados=True)
+
+        gestor.actualizar_capitulo(id_capitulo, {"titulo": "Nuevo título"})
+
+        capitulo, _ = gestor.obtener_capitulo_publicado(id_capitulo)
+        listado = gestor.listar_capitulos(solo_publicados=True)
+        assert capitulo.titulo == "Nuevo título"
+        assert [c.titulo for c in listado] == ["Nuevo título"]
+
+    def test_cambiar_estado_retira_de_publicados(self, test_db_session, capitulo_publicado, cache):
+        gestor = GestorCapitulo(test_db_session, Capitulo, cache=cache)
+        id_capitulo = capitulo_publicado.id_capitulo
+        gestor.obtener_capitulo_publicado(id_capitulo)
+        gestor.listar_capitulos(solo_publicados=True)
+
+        gestor.cambiar_estado(id_capitulo, "ARCHIVADO")
+
+        capitulo, error = gestor.obtener_capitulo_publicado(id_capitulo)
+        assert capitulo is None and error is not None
+        assert gestor.listar_capitulos(solo_publicados=True) == []
+
+    def test_borrador_no_invalida_listado_publicados(self, test_db_session, capitulo_borrador, capitulo_publicado, cache):
+        gestor = GestorCapitulo(test_db_session, Capitulo, cache=cache)
+        gestor.listar_capitulos(solo_publicados=True)
+
+        gestor.actualizar_capitulo(capitulo_borrador.id_capitulo, {"titulo": "Otro borrador"})
+        gestor.listar_capitulos(solo_publicados=True)
+
+        assert cache.estadisticas()["aciertos"] == 1
+
+    def test_lectura_vieja_no_se_guarda_tras_invalidar(self, test_db_session, capitulo_publicado, cache, monkeypatch):
+        """Una lectura que empezó antes de una escritura no deja su copia en caché."""
+        import gestor_capitulo
+        from dependencies import SessionLocal
+
+        id_capitulo = capitulo_publicado.id_capitulo
+        instantanea = gestor_capitulo._instantanea
+
+        def leida_antes_de_escribir(fila, campos=None):
+            datos = instantanea(fila, campos)
+            # Otra petición actualiza (e invalida) antes de que la lectura guarde
+            otra_sesion = SessionLocal()
+            try:
+                GestorCapitulo(otra_sesion, Capitulo, cache=cache).actualizar_capitulo(
+                    id_capitulo, {"titulo": "Nuevo título"}
+                )
+            finally:
+                otra_sesion.close()
+            return datos
+
+        monkeypatch.setattr(gestor_capitulo, "_instantanea", leida_antes_de_escribir)
+        capitulo, _ = GestorCapitulo(test_db_session, Capitulo, cache=cache).obtener_capitulo_publicado(id_capitulo)
+
+        assert capitulo.titulo == capitulo_publicado.titulo
+        assert cache.obtener(f"capitulo:{id_capitulo}") is None
+
+    def test_eliminar_capitulo_invalida(self, test_db_session, capitulo_publicado, cache):
+        gestor = GestorCapitulo(test_db_session, Capitulo, cache=cache)
+        id_capitulo = capitulo_publicado.id_capitulo
+        gestor.obtener_capitulo_publicado(id_capitulo)
+
+        gestor.eliminar_capitulo(id_capitulo)
+
+        capitulo, _ = gestor.obtener_capitulo_publicado(id_capitulo)
+        assert capitulo is None
+
+    def test_asignar_y_desasignar_invalidan_contenidos(self, test_db_session, capitulo_publicado, contenido_texto, cache):
+        gestor = GestorContenido(test_db_session, MODELOS, cache=cache)
+        id_capitulo = capitulo_publicado.id_capitulo
+        assert gestor.listar_contenidos_de_capitulo(id_capitulo) == ([], None)
+
+        gestor.asignar_contenido_a_capitulo(id_capitulo, contenido_texto.id_contenido, 1)
+        contenidos, _ = gestor.listar_contenidos_de_capitulo(id_capitulo)
+        assert [c.id_contenido for c in contenidos] == [contenido_texto.id_contenido]
+
+        gestor.desasignar_contenido_de_capitulo(id_capitulo, contenido_texto.id_contenido)
+        contenidos, _ = gestor.listar_contenidos_de_capitulo(id_capitulo)
+        assert contenidos == []
+
+    def test_eliminar_contenido_invalida_sus_capitulos(self, test_db_session, capitulo_con_contenido, contenido_texto, cache):
+        gestor = GestorContenido(test_db_session, MODELOS, cache=cache)
+        id_capitulo = capitulo_con_contenido.id_capitulo
+        gestor.listar_contenidos_de_capitulo(id_capitulo)
+
+        gestor.eliminar_contenido(contenido_texto.id_contenido)
+
+        contenidos, _ = gestor.listar_contenidos_de_capitulo(id_capitulo)
+        assert contenidos == []
+
+
+# ============================================================================
+# GRUPO 3: API
+# ============================================================================
+
+class TestCacheAPI:
+    """Caché a través de los endpoints"""
+
+    def test_capitulo_completo_refleja_cambios(self, client, capitulo_con_contenido):
+        url = f"/api/capitulos/{capitulo_con_contenido.id_capitulo}/completo"
+        client.get(url)
+
+        client.put(f"/api/capitulos/{capitulo_con_contenido.id_capitulo}", json={"titulo": "Actualizado"})
+
+        assert client.get(url).json()["titulo"] == "Actualizado"
+
+    @pytest.mark.parametrize("ruta", ["/api/capitulos/{}/completo", "/api/contenidos/capitulo/{}"])
+    def test_etag_de_lo_servido_con_cache_vieja(self, client, test_db_session, capitulo_con_contenido, contenido_texto, ruta):
+        url = ruta.format(capitulo_con_contenido.id_capitulo)
+        etag_viejo = client.get(url).headers["etag"]
+        # Escritura que no pasa por los gestores: la copia en caché queda vieja
+        contenido_texto.cuerpo_texto = "Texto nuevo"
+        contenido_texto.fecha_modificacion = contenido_texto.fecha_modificacion + timedelta(seconds=5)
+        test_db_session.commit()
+
+        response = client.get(url, headers={"If-None-Match": etag_viejo})
+
+        assert response.status_code == 200
+        assert "Texto nuevo" in response.text
+        assert response.headers["etag"] != etag_viejo
+        assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    def test_estadisticas_cache(self, client, capitulo_publicado):
+        url = f"/api/capitulos/{capitulo_publicado.id_capitulo}/completo"
+        client.get(url)
+        client.get(url)
+
+        response = client.get("/api/admin/cache")
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["aciertos"] >= 1
+        assert datos["fallos"] >= 1
+
+
+pytestmark = [
+    pytest.mark.unit
+]
@@ -0,0 +1,272 @@
+"""
+Tests del Gestor de Calificación
+=================================
+Calificación automática de intentos con la clave de respuestas en caché,
+escritura masiva de las respuestas y recalificación de una evaluación.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_calificacion"))
+
+from db.evaluaciones.models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta, TipoPregunta, EstadoIntento
+)
+from gestor_calificacion import GestorCalificacion, GestorCalificacionAsync, _CacheClaves
+
+
+MODELOS = {
+    'Evaluacion': Evaluacion,
+    'Pregunta': Pregunta,
+    'Opcion': Opcion,
+    'Intento': Intento,
+    'Respuesta': Respuesta
+}
+
+
+@pytest.fixture
+def sesion_evaluaciones():
+    """BD de evaluaciones en memoria."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Evaluacion.metadata.create_all(engine)
+    sesion = sessionmaker(bind=engine)()
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def evaluacion(sesion_evaluaciones):
+    """
+    Evaluación de 4 preguntas (opción múltiple 2 pts, verdadero/falso 1 pt,
+    respuesta corta 1 pt, ensayo 4 pts) sobre 50 puntos, aprobación al 60 %.
+    """
+    evaluacion = Evaluacion(
+        id_capitulo="cap-1", titulo="Célula", id_docente_creador="doc-1",
+        puntos_totales=50.0, calificacion_minima_aprobacion=60.0
+    )
+    multiple = Pregunta(tipo=TipoPregunta.OPCION_MULTIPLE, enunciado="¿Orgánulo de la respiración?", orden=1, puntos=2.0)
+    multiple.opciones = [
+        Opcion(texto="Mitocondria", es_correcta=True, orden=1),
+        Opcion(texto="Ribosoma", es_correcta=False, orden=2),
+    ]
+    verdadero_falso = Pregunta(tipo=TipoPregunta.VERDADERO_FALSO, enunciado="El núcleo tiene ADN", orden=2, puntos=1.0)
+    verdadero_falso.opciones = [
+        Opcion(texto="Verdadero", es_correcta=True, orden=1),
+        Opcion(texto="Falso", es_correcta=False, orden=2),
+    ]
+    corta = Pregunta(
+        tipo=TipoPregunta.RESPUESTA_CORTA, enunciado="Unidad básica de la vida", orden=3,
+        puntos=1.0, respuesta_correcta_texto="Célula"
+    )
+    ensayo = Pregunta(tipo=TipoPregunta.ENSAYO, enunciado="Explica la mitosis", orden=4, puntos=4.0)
+    evaluacion.preguntas = [multiple, verdadero_falso, corta, ensayo]
+
+    sesion_evaluaciones.add(evaluacion)
+    sesion_evaluaciones.commit()
+    return evaluacion
+
+
+def _intento(sesion, evaluacion, respuestas, estudiante="est-1", estado=EstadoIntento.EN_PROGRESO):
+    """Crea un intento con respuestas {orden de pregunta: índice de opción | texto | puntos de ensayo}."""
+    intento = Intento(
+        id_evaluacion=evaluacion.id_evaluacion, id_estudiante=estudiante,
+        numero_intento=1, puntos_totales=evaluacion.puntos_totales, estado=estado
+    )
+    preguntas = {pregunta.orden: pregunta for pregunta in evaluacion.preguntas}
+    for orden, valor in respuestas.items():
+        pregunta = preguntas[orden]
+        if pregunta.tipo in (TipoPregunta.OPCION_MULTIPLE, TipoPregunta.VERDADERO_FALSO):
+            intento.respuestas.append(Respuesta(id_pregunta=pregunta.id_pregunta, id_opcion_seleccionada=pregunta.opciones[valor].id_opcion))
+        elif pregunta.tipo == TipoPregunta.RESPUESTA_CORTA:
+            intento.respuestas.append(Respuesta(id_pregunta=pregunta.id_pregunta, respuesta_texto=valor))
+        else:
+            intento.respuestas.append(Respuesta(id_pregunta=pregunta.id_pregunta, respuesta_texto="...", puntos_obtenidos=valor))
+    sesion.add(intento)
+    sesion.commit()
+    return intento
+
+
+class TestCalificarIntento:
+    """Calificación de un intento"""
+
+    def test_todas_correctas(self, sesion_evaluaciones, evaluacion):
+        intento = _intento(sesion_evaluaciones, evaluacion, {1: 0, 2: 0, 3: "  célula ", 4: 4.0})
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        calificado, error = gestor.calificar_intento(intento.id_intento)
+
+        assert error is None
+        assert calificado.porcentaje == 100.0
+        assert calificado.puntos_obtenidos == 50.0
+        assert calificado.aprobado is True
+        assert calificado.estado == EstadoIntento.COMPLETADO
+        assert calificado.fecha_finalizacion is not None
+        assert all(r.es_correcta for r in calificado.respuestas if r.pregunta.tipo != TipoPregunta.ENSAYO)
+
+    def test_incorrectas_y_sin_responder(self, sesion_evaluaciones, evaluacion):
+        intento = _intento(sesion_evaluaciones, evaluacion, {1: 1, 3: "Celulas"})
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        calificado, error = gestor.calificar_intento(intento.id_intento)
+
+        assert error is None
+        assert calificado.porcentaje == 0.0
+        assert calificado.aprobado is False
+        assert {r.es_correcta for r in calificado.respuestas} == {False}
+        assert {r.puntos_obtenidos for r in calificado.respuestas} == {0.0}
+
+    def test_ensayo_conserva_puntos_del_docente(self, sesion_evaluaciones, evaluacion):
+        intento = _intento(sesion_evaluaciones, evaluacion, {1: 0, 2: 0, 3: "célula", 4: 1.0})
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        calificado, _ = gestor.calificar_intento(intento.id_intento)
+
+        # (2 + 1 + 1 + 1) / 8 puntos
+        assert calificado.porcentaje == 62.5
+        assert calificado.puntos_obtenidos == 31.25
+        assert calificado.aprobado is True
+        ensayo = next(r for r in calificado.respuestas if r.pregunta.tipo == TipoPregunta.ENSAYO)
+        assert ensayo.es_correcta is None
+
+    def test_intento_inexistente(self, sesion_evaluaciones):
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        intento, error = gestor.calificar_intento("no-existe")
+
+        assert intento is None
+        assert "no encontrado" in error
+
+    def test_intento_abandonado(self, sesion_evaluaciones, evaluacion):
+        intento = _intento(sesion_evaluaciones, evaluacion, {1: 0}, estado=EstadoIntento.ABANDONADO)
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        calificado, error = gestor.calificar_intento(intento.id_intento)
+
+        assert calificado is None
+        assert "abandonado" in error
+
+
+class TestClaveEnCache:
+    """La clave se carga una vez y las respuestas se escriben en bloque"""
+
+    def test_segundo_intento_no_relee_la_clave(self, sesion_evaluaciones, evaluacion):
+        primero = _intento(sesion_evaluaciones, evaluacion, {1: 0, 2: 1}, estudiante="est-1")
+        segundo = _intento(sesion_evaluaciones, evaluacion, {1: 0, 2: 0, 3: "célula"}, estudiante="est-2")
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+        gestor.calificar_intento(primero.id_intento)
+        sesion_evaluaciones.expire_all()
+
+        sentencias = []
+        engine = sesion_evaluaciones.get_bind()
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            gestor.calificar_intento(segundo.id_intento)
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        assert not any("FROM preguntas" in s or "FROM opciones" in s for s in sentencias)
+        assert sum(1 for s in sentencias if s.startswith("UPDATE respuestas")) == 1
+
+    def test_recalificar_tras_cambiar_la_clave(self, sesion_evaluaciones, evaluacion):
+        intentos = [
+            _intento(sesion_evaluaciones, evaluacion, {1: 1, 2: 0}, estudiante=f"est-{n}")
+            for n in range(3)
+        ]
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+        for intento in intentos:
+            gestor.calificar_intento(intento.id_intento)
+        assert {i.porcentaje for i in intentos} == {12.5}
+
+        # La opción correcta de la primera pregunta era la otra
+        opciones = evaluacion.preguntas[0].opciones
+        opciones[0].es_correcta, opciones[1].es_correcta = False, True
+        sesion_evaluaciones.commit()
+
+        total, error = gestor.recalificar_evaluacion(evaluacion.id_evaluacion)
+
+        assert error is None
+        assert total == 3
+        sesion_evaluaciones.expire_all()
+        assert {i.porcentaje for i in intentos} == {37.5}
+        assert {i.puntos_obtenidos for i in intentos} == {18.75}
+
+    def test_recalificar_evaluacion_inexistente(self, sesion_evaluaciones):
+        gestor = GestorCalificacion(sesion_evaluaciones, MODELOS, cache=_CacheClaves())
+
+        total, error = gestor.recalificar_evaluacion("no-existe")
+
+        assert total is None
+        assert "no encontrada" in error
+
+
+
+class TestCargaConcurrente:
+    """GestorCalificacionAsync con varias peticiones a la vez"""
+
+    def test_cargas_simultaneas_con_cache_vacia(self, tmp_path, monkeypatch):
+        url = f"sqlite:///{tmp_path / 'evaluaciones.db'}"
+        engine = create_engine(url)
+        Evaluacion.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as sesion:
+            evaluacion = Evaluacion(id_capitulo="cap-1", titulo="Célula", id_docente_creador="doc-1")
+            evaluacion.preguntas = [Pregunta(
+                tipo=TipoPregunta.RESPUESTA_CORTA, enunciado="Unidad básica de la vida", orden=1,
+                puntos=1.0, respuesta_correcta_texto="Célula"
+            )]
+            sesion.add(evaluacion)
+            sesion.commit()
+            id_evaluacion = evaluacion.id_evaluacion
+        engine.dispose()
+
+        cargas = []
+        cargar_clave = GestorCalificacion._cargar_clave
+
+        def contar(gestor, id_evaluacion):
+            cargas.append(id_evaluacion)
+            return cargar_clave(gestor, id_evaluacion)
+
+        monkeypatch.setattr(GestorCalificacion, "_cargar_clave", contar)
+
+        async def dos_peticiones():
+            motor = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite", 1))
+            cache = _CacheClaves()
+            try:
+                async with AsyncSession(motor) as una, AsyncSession(motor) as otra:
+                    return await asyncio.gather(
+                        GestorCalificacionAsync(una, MODELOS, cache=cache).obtener_clave(id_evaluacion),
+                        GestorCalificacionAsync(otra, MODELOS, cache=cache).obtener_clave(id_evaluacion),
+                    )
+            finally:
+                await motor.dispose()
+
+        # En otro hilo: si el event loop se bloquea, el test falla en vez de colgarse
+        claves = []
+        hilo = threading.Thread(target=lambda: claves.extend(asyncio.run(dos_peticiones())), daemon=True)
+        hilo.start()
+        hilo.join(timeout=10)
+
+        assert not hilo.is_alive(), "las cargas simultáneas bloquearon el event loop"
+        assert len(claves) == 2
+        assert claves[0] is not None and claves[0] == claves[1]
+        assert cargas == [id_evaluacion]
+
+
+pytestmark = [
+    pytest.mark.unit
+]
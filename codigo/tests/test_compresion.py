@@ -0,0 +1,157 @@
+"""
+Tests de Compresión de Respuestas
+=================================
+MiddlewareCompresion: negociación con Accept-Encoding, tamaño mínimo,
+respuestas por trozos y respuestas que no deben tocarse.
+"""
+
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from api.compresion import MiddlewareCompresion
+
+
+JSON_GRANDE = {"texto": "La mitocondria produce ATP. " * 200}
+
+
+def _app_prueba():
+    """App mínima con una respuesta de cada tipo detrás del middleware."""
+    async def grande(request):
+        return JSONResponse(JSON_GRANDE, headers={"ETag": '"v1"'})
+
+    async def pequena(request):
+        return JSONResponse({"ok": True})
+
+    async def trozos(request):
+        async def lineas():
+            for indice in range(100):
+                yield json.dumps({"linea": indice, "texto": "célula " * 20}) + "\n"
+        return StreamingResponse(lineas(), media_type="application/x-ndjson")
+
+    async def binario(request):
+        return Response(b"\x89PNG" + bytes(4000), media_type="image/png")
+
+    async def sin_transformar(request):
+        return JSONResponse(JSON_GRANDE, headers={"Cache-Control": "no-transform"})
+
+    async def ya_comprimida(request):
+        cuerpo = gzip.compress(json.dumps(JSON_GRANDE).encode())
+        return Response(cuerpo, media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    rutas = [
+        Route("/grande", grande), Route("/pequena", pequena), Route("/trozos", trozos),
+        Route("/binario", binario), Route("/sin-transformar", sin_transformar),
+        Route("/ya-comprimida", ya_comprimida),
+    ]
+    app = Starlette(routes=rutas)
+    app.add_middleware(MiddlewareCompresion, minimo=1024, codificaciones=("gzip",))
+    return app
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    return TestClient(_app_prueba())
+
+
+def _cabeceras(codificacion="gzip"):
+    return {"Accept-Encoding": codificacion}
+
+
+class TestNegociacion:
+    """Accept-Encoding y tamaño mínimo"""
+
+    def test_comprime_con_gzip(self, cliente):
+        response = cliente.get("/grande", headers=_cabeceras())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(json.dumps(JSON_GRANDE))
+        assert response.json() == JSON_GRANDE
+
+    def test_etag_pasa_a_debil(self, cliente):
+        response = cliente.get("/grande", headers=_cabeceras())
+
+        assert response.headers["etag"] == 'W/"v1"'
+
+    def test_cliente_sin_gzip(self, cliente):
+        response = cliente.get("/grande", headers=_cabeceras("identity"))
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"v1"'
+        assert response.json() == JSON_GRANDE
+
+    def test_q_cero(self, cliente):
+        response = cliente.get("/grande", headers=_cabeceras("gzip;q=0, identity"))
+
+        assert "content-encoding" not in response.headers
+
+    def test_por_debajo_del_minimo(self, cliente):
+        response = cliente.get("/pequena", headers=_cabeceras())
+
+        assert "content-encoding" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == {"ok": True}
+
+
+class TestTipos:
+    """Qué respuestas se comprimen"""
+
+    def test_por_trozos(self, cliente):
+        response = cliente.get("/trozos", headers=_cabeceras())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lineas = response.text.splitlines()
+        assert len(lineas) == 100
+        assert json.loads(lineas[-1])["linea"] == 99
+
+    def test_binario_sin_comprimir(self, cliente):
+        response = cliente.get("/binario", headers=_cabeceras())
+
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_no_transform(self, cliente):
+        response = cliente.get("/sin-transformar", headers=_cabeceras())
+
+        assert "content-encoding" not in response.headers
+
+    def test_ya_comprimida_no_se_recomprime(self, cliente):
+        response = cliente.get("/ya-comprimida", headers=_cabeceras())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json() == JSON_GRANDE
+
+
+class TestAPI:
+    """Middleware instalado en la API"""
+
+    def test_listado_de_contenidos(self, client, capitulo_borrador):
+        bloques = [{"tipo": "texto", "tema": f"Tema {i}", "cuerpo_texto": "Citoplasma. " * 50} for i in range(20)]
+        client.post("/api/contenidos/importar", json={"id_capitulo": capitulo_borrador.id_capitulo, "bloques": bloques})
+
+        response = client.get(f"/api/contenidos/capitulo/{capitulo_borrador.id_capitulo}", headers=_cabeceras())
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 20
+
+    def test_rango_de_medios_sin_comprimir(self, client):
+        url = client.post("/api/medios/?nombre=notas.txt", content=b"ribosoma " * 500).json()["url"]
+
+        response = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-8"})
+
+        assert response.status_code == 206
+        assert "content-encoding" not in response.headers
+        assert response.content == b"ribosoma "
+
+
+pytestmark = [
+    pytest.mark.integration
+]
@@ -0,0 +1,162 @@
+"""
+CP01_03 — Visualizar capítulo con sus contenidos
+=================================================
+
+Casos de prueba para el endpoint GET /api/capitulos/{id}/completo
+
+Cobertura:
+- Capítulo y contenidos en una sola petición
+- Contenidos ordenados por 'orden'
+- Número de consultas constante (sin N+1)
+- Capítulo inexistente
+"""
+
+import pytest
+from sqlalchemy import event
+
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+def _asignar_bloques(session, capitulo, cantidad):
+    """Crea 'cantidad' bloques de texto y los asigna en orden inverso de creación."""
+    for i in range(cantidad):
+        bloque = Texto(tema="Testing", cuerpo_texto=f"Bloque {i}")
+        session.add(bloque)
+        session.flush()
+        session.add(UnionCapituloContenido(
+            id_capitulo=capitulo.id_capitulo,
+            id_contenido=bloque.id_contenido,
+            orden=cantidad - i
+        ))
+    session.commit()
+
+
+class TestCP01_03_CapituloCompleto:
+    """Tests del endpoint que devuelve capítulo + contenidos"""
+
+    def test_capitulo_completo_incluye_contenidos(self, client, capitulo_con_contenido, contenido_texto):
+        """
+        Test CP01_03.01: Devuelve los campos del capítulo y sus contenidos
+        """
+        # Act
+        response = client.get(f"/api/capitulos/{capitulo_con_contenido.id_capitulo}/completo")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id_capitulo"] == capitulo_con_contenido.id_capitulo
+        assert data["titulo"] == capitulo_con_contenido.titulo
+        assert len(data["contenidos"]) == 1
+        assert data["contenidos"][0]["id_contenido"] == contenido_texto.id_contenido
+        assert data["contenidos"][0]["cuerpo_texto"] == contenido_texto.cuerpo_texto
+
+    def test_capitulo_completo_ordenado(self, client, test_db_session, capitulo_publicado):
+        """
+        Test CP01_03.02: Los contenidos vienen ordenados por 'orden'
+        """
+        # Arrange
+        _asignar_bloques(test_db_session, capitulo_publicado, 5)
+
+        # Act
+        response = client.get(f"/api/capitulos/{capitulo_publicado.id_capitulo}/completo")
+
+        # Assert
+        textos = [c["cuerpo_texto"] for c in response.json()["contenidos"]]
+        assert textos == [f"Bloque {i}" for i in range(4, -1, -1)]
+
+    def test_capitulo_completo_sin_contenidos(self, client, capitulo_publicado):
+        """
+        Test CP01_03.03: Capítulo sin contenidos devuelve lista vacía
+        """
+        response = client.get(f"/api/capitulos/{capitulo_publicado.id_capitulo}/completo")
+
+        assert response.status_code == 200
+        assert response.json()["contenidos"] == []
+
+    def test_capitulo_completo_inexistente(self, client):
+        """
+        Test CP01_03.04: Capítulo inexistente devuelve 404
+        """
+        response = client.get("/api/capitulos/00000000-0000-0000-0000-000000000000/completo")
+
+        assert response.status_code == 404
+
+
+class TestCP01_03_Consultas:
+    """Tests del número de consultas ejecutadas"""
+
+    def _contar_consultas(self, session, funcion):
+        """Ejecuta 'funcion' y devuelve cuántas sentencias SQL emitió."""
+        sentencias = []
+        engine = session.get_bind()
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            funcion()
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        return len(sentencias)
+
+    @pytest.mark.performance
+    def test_consultas_constantes(self, test_db_session, capitulo_publicado):
+        """
+        Test CP01_03.05: La cantidad de consultas no depende de los bloques
+        """
+        # Arrange
+        id_capitulo = capitulo_publicado.id_capitulo
+        _asignar_bloques(test_db_session, capitulo_publicado, 30)
+        test_db_session.expire_all()
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        # Act
+        consultas = self._contar_consultas(
+            test_db_session,
+            lambda: gestor.obtener_capitulo_con_contenidos(id_capitulo)
+        )
+
+        # Assert
+        assert consultas <= 2
+
+    @pytest.mark.performance
+    def test_listar_contenidos_de_capitulo_sin_n_mas_1(self, test_db_session, capitulo_publicado):
+        """
+        Test CP01_03.06: El listado de contenidos del capítulo no hace N+1
+        """
+        # Arrange
+        id_capitulo = capitulo_publicado.id_capitulo
+        _asignar_bloques(test_db_session, capitulo_publicado, 30)
+        test_db_session.expire_all()
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        # Act
+        consultas = self._contar_consultas(
+            test_db_session,
+            lambda: gestor.listar_contenidos_de_capitulo(id_capitulo)
+        )
+
+        # Assert
+        assert consultas <= 2
+
+
+# Markers para organizar los tests
+pytestmark = [
+    pytest.mark.cp01_03,
+    pytest.mark.integration
+]
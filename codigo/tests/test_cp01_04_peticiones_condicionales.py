@@ -0,0 +1,202 @@
+"""
+CP01_04 — Peticiones condicionales (ETag / Last-Modified)
+==========================================================
+
+Casos de prueba para GET /api/capitulos/{id}, GET /api/contenidos/{id},
+GET /api/capitulos/{id}/completo y GET /api/contenidos/capitulo/{id}
+
+Cobertura:
+- Cabeceras ETag y Last-Modified en la respuesta
+- 304 Not Modified con If-None-Match y con If-Modified-Since
+- Los validadores cambian al modificar el recurso o sus uniones
+- La comprobación de versión no carga columnas grandes
+"""
+
+import pytest
+from sqlalchemy import event
+
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_capitulo import GestorCapitulo
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+class TestCP01_04_Capitulo:
+    """Peticiones condicionales sobre un capítulo"""
+
+    def test_respuesta_incluye_validadores(self, client, capitulo_publicado):
+        """
+        Test CP01_04.01: La respuesta 200 incluye ETag y Last-Modified
+        """
+        response = client.get(f"/api/capitulos/{capitulo_publicado.id_capitulo}")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert "last-modified" in response.headers
+
+    def test_if_none_match_devuelve_304(self, client, capitulo_publicado):
+        """
+        Test CP01_04.02: Con el mismo ETag se responde 304 sin cuerpo
+        """
+        url = f"/api/capitulos/{capitulo_publicado.id_capitulo}"
+        etag = client.get(url).headers["etag"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_if_modified_since_devuelve_304(self, client, capitulo_publicado):
+        """
+        Test CP01_04.03: Con la fecha de Last-Modified se responde 304
+        """
+        url = f"/api/capitulos/{capitulo_publicado.id_capitulo}"
+        modificado = client.get(url).headers["last-modified"]
+
+        response = client.get(url, headers={"If-Modified-Since": modificado})
+
+        assert response.status_code == 304
+
+    def test_etag_cambia_al_actualizar(self, client, capitulo_publicado):
+        """
+        Test CP01_04.04: Tras actualizar, el ETag anterior ya no coincide
+        """
+        url = f"/api/capitulos/{capitulo_publicado.id_capitulo}"
+        etag = client.get(url).headers["etag"]
+
+        client.put(url, json={"titulo": "Título nuevo"})
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["titulo"] == "Título nuevo"
+        assert response.headers["etag"] != etag
+
+    def test_capitulo_inexistente_sigue_siendo_404(self, client):
+        """
+        Test CP01_04.05: Un ID inexistente devuelve 404 aunque envíe If-None-Match
+        """
+        response = client.get(
+            "/api/capitulos/00000000-0000-0000-0000-000000000000",
+            headers={"If-None-Match": "*"}
+        )
+
+        assert response.status_code == 404
+
+
+class TestCP01_04_Contenido:
+    """Peticiones condicionales sobre un contenido"""
+
+    def test_if_none_match_contenido(self, client, contenido_texto):
+        """
+        Test CP01_04.06: Un contenido sin cambios responde 304
+        """
+        url = f"/api/contenidos/{contenido_texto.id_contenido}"
+        etag = client.get(url).headers["etag"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+
+class TestCP01_04_ContenidosDeCapitulo:
+    """Peticiones condicionales sobre los contenidos de un capítulo"""
+
+    @pytest.mark.parametrize("plantilla", [
+        "/api/contenidos/capitulo/{}",
+        "/api/capitulos/{}/completo",
+    ])
+    def test_etag_cambia_al_asignar(self, client, capitulo_publicado, contenido_texto, plantilla):
+        """
+        Test CP01_04.07: Asignar un contenido cambia el ETag del listado
+        """
+        url = plantilla.format(capitulo_publicado.id_capitulo)
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+        client.post("/api/contenidos/asignar", params={
+            "id_capitulo": capitulo_publicado.id_capitulo,
+            "id_contenido": contenido_texto.id_contenido,
+            "orden": 1
+        })
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_desasignar_cambia_etag(self, client, capitulo_con_contenido, contenido_texto):
+        """
+        Test CP01_04.08: Desasignar cambia el ETag del listado
+        """
+        url = f"/api/contenidos/capitulo/{capitulo_con_contenido.id_capitulo}"
+        etag = client.get(url).headers["etag"]
+
+        client.delete(f"/api/contenidos/desasignar/{capitulo_con_contenido.id_capitulo}/{contenido_texto.id_contenido}")
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+class TestCP01_04_Consultas:
+    """La comprobación de versión no carga columnas grandes"""
+
+    def _sentencias(self, session, funcion):
+        sentencias = []
+        engine = session.get_bind()
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            funcion()
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+        return sentencias
+
+    def test_version_capitulo_no_carga_introduccion(self, test_db_session, capitulo_publicado):
+        """
+        Test CP01_04.09: obtener_version_capitulo solo consulta fecha_modificacion
+        """
+        gestor = GestorCapitulo(test_db_session, Capitulo)
+
+        sentencias = self._sentencias(
+            test_db_session,
+            lambda: gestor.obtener_version_capitulo(capitulo_publicado.id_capitulo)
+        )
+
+        assert len(sentencias) == 1
+        assert "introduccion" not in sentencias[0]
+
+    def test_version_contenido_no_carga_cuerpo(self, test_db_session, contenido_texto):
+        """
+        Test CP01_04.10: obtener_version_contenido no consulta cuerpo_texto
+        """
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        sentencias = self._sentencias(
+            test_db_session,
+            lambda: gestor.obtener_version_contenido(contenido_texto.id_contenido)
+        )
+
+        assert len(sentencias) == 1
+        assert "cuerpo_texto" not in sentencias[0]
+
+
+pytestmark = [
+    pytest.mark.cp01_04,
+    pytest.mark.integration
+]
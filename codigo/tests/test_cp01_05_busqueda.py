@@ -0,0 +1,221 @@
+"""
+CP01_05 — Búsqueda de texto completo
+=====================================
+
+Casos de prueba para GET /api/buscar y GestorBusqueda (SQLite FTS5)
+
+Cobertura:
+- Búsqueda en introducción de capítulos y cuerpo de bloques de texto
+- Resaltado de términos y orden por relevancia
+- Índice sincronizado al crear, actualizar y eliminar
+- Índice estable aunque se renumere el rowid de las tablas
+- Filtro por tipo y paginación
+- Consultas sin palabras y caracteres especiales
+- Escapado HTML del texto resaltado
+"""
+
+import pytest
+from sqlalchemy import text
+
+from db.contenido.models import Capitulo, Texto, Imagen
+from gestor_busqueda import GestorBusqueda, _fragmento, _html
+
+
+def _buscar(client, q, **params):
+    response = client.get("/api/buscar", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def biblioteca(test_db_session):
+    """Dos capítulos y tres bloques con vocabulario conocido."""
+    test_db_session.add_all([
+        Capitulo(
+            titulo="La mitocondria", numero=1, tema="Biología Celular", estado="PUBLICADO",
+            introduccion="Orgánulo que produce energía para la célula."
+        ),
+        Capitulo(
+            titulo="Fotosíntesis", numero=2, tema="Botánica", estado="PUBLICADO",
+            introduccion="Las plantas transforman la luz en energía química."
+        ),
+        Texto(tema="Biología Celular", cuerpo_texto="La mitocondria tiene su propio ADN mitocondrial."),
+        Texto(tema="Genética", cuerpo_texto="El ADN se replica antes de la división celular."),
+        Imagen(tema="Mitocondria", url_archivo="https://s3/mito.png", formato="png"),
+    ])
+    test_db_session.commit()
+
+
+class TestCP01_05_Busqueda:
+    """Búsqueda a través de la API"""
+
+    def test_busca_en_capitulos_y_textos(self, client, biblioteca):
+        """
+        Test CP01_05.01: Encuentra capítulos y bloques de texto, no imágenes
+        """
+        datos = _buscar(client, "mitocondria")
+
+        assert datos["total"] == 2
+        assert sorted(r["tipo"] for r in datos["resultados"]) == ["capitulo", "texto"]
+
+    def test_resaltado(self, client, biblioteca):
+        """
+        Test CP01_05.02: Los términos aparecen resaltados en título y fragmento
+        """
+        datos = _buscar(client, "fotosintesis", tipo="capitulo")
+
+        resultado = datos["resultados"][0]
+        assert resultado["titulo"] == "<mark>Fotosíntesis</mark>"
+
+        datos = _buscar(client, "replica", tipo="texto")
+        assert "<mark>replica</mark>" in datos["resultados"][0]["fragmento"]
+
+    def test_todas_las_palabras_y_prefijos(self, client, biblioteca):
+        """
+        Test CP01_05.03: Todas las palabras deben aparecer; se aceptan prefijos
+        """
+        assert _buscar(client, "energía plantas")["total"] == 1
+        assert _buscar(client, "mitocon")["total"] == 2
+
+    def test_relevancia(self, client, biblioteca):
+        """
+        Test CP01_05.04: Un término en el título pesa más que en el cuerpo
+        """
+        resultados = _buscar(client, "mitocondria")["resultados"]
+
+        assert resultados[0]["tipo"] == "capitulo"
+        assert resultados[0]["puntuacion"] >= resultados[1]["puntuacion"]
+
+    def test_paginacion(self, client, biblioteca):
+        """
+        Test CP01_05.05: limit/offset recorren los resultados sin repetir
+        """
+        primera = _buscar(client, "energía", limit=1)
+        segunda = _buscar(client, "energía", limit=1, offset=1)
+
+        assert primera["total"] == segunda["total"] == 2
+        assert primera["resultados"][0]["id"] != segunda["resultados"][0]["id"]
+
+    def test_sin_palabras(self, client):
+        """
+        Test CP01_05.06: Una consulta solo con símbolos devuelve 400
+        """
+        response = client.get("/api/buscar", params={"q": '"*()'})
+
+        assert response.status_code == 400
+
+    def test_operadores_fts_no_rompen(self, client, biblioteca):
+        """
+        Test CP01_05.07: Los operadores de FTS5 en la consulta se tratan como texto
+        """
+        datos = _buscar(client, 'ADN OR "NEAR(')
+
+        assert datos["total"] == 0
+
+
+class TestCP01_05_Sincronizacion:
+    """El índice se mantiene al escribir"""
+
+    def test_actualizar_capitulo(self, client, capitulo_publicado):
+        """
+        Test CP01_05.08: Al actualizar la introducción cambia lo que se encuentra
+        """
+        client.put(
+            f"/api/capitulos/{capitulo_publicado.id_capitulo}",
+            json={"introduccion": "Ribosomas y síntesis de proteínas"}
+        )
+
+        assert _buscar(client, "ribosomas")["total"] == 1
+
+    def test_eliminar_texto(self, client, contenido_texto):
+        """
+        Test CP01_05.09: Un bloque eliminado deja de aparecer
+        """
+        palabra = contenido_texto.cuerpo_texto.split()[0]
+        antes = _buscar(client, palabra)["total"]
+
+        client.delete(f"/api/contenidos/{contenido_texto.id_contenido}")
+
+        assert _buscar(client, palabra)["total"] == antes - 1
+
+    def test_importacion_masiva_se_indexa(self, client):
+        """
+        Test CP01_05.10: Los bloques insertados en bloque también se indexan
+        """
+        client.post("/api/contenidos/importar", json={"bloques": [
+            {"tipo": "texto", "tema": "Ecología", "cuerpo_texto": "Los ecosistemas acuáticos"}
+        ]})
+
+        assert _buscar(client, "ecosistemas")["total"] == 1
+
+    def test_rowid_renumerado(self, client, test_db_session, biblioteca):
+        """
+        Test CP01_05.12: El índice no depende del rowid implícito (VACUUM lo renumera)
+        """
+        test_db_session.execute(text("UPDATE capitulos SET rowid = rowid + 1000"))
+        test_db_session.execute(text("UPDATE contenidos SET rowid = rowid + 1000"))
+        test_db_session.commit()
+
+        datos = _buscar(client, "mitocondria")
+
+        assert datos["total"] == 2
+        assert sorted(r["tema"] for r in datos["resultados"]) == ["Biología Celular", "Biología Celular"]
+
+    def test_texto_cambia_de_tipo(self, test_db_session, contenido_texto):
+        """
+        Test CP01_05.13: Un bloque que deja de ser texto sale del índice
+        """
+        palabra = contenido_texto.cuerpo_texto.split()[0]
+        test_db_session.execute(
+            text("UPDATE contenidos SET tipo = 'imagen' WHERE id_contenido = :id"),
+            {"id": contenido_texto.id_contenido}
+        )
+        test_db_session.commit()
+
+        (resultados, total), _ = GestorBusqueda(test_db_session).buscar(palabra, tipo="texto")
+
+        assert total == 0
+
+
+class TestCP01_05_Gestor:
+    """Validaciones del GestorBusqueda"""
+
+    def test_texto_guardado_se_escapa(self, client, test_db_session):
+        """
+        Test CP01_05.14: El HTML del texto guardado llega escapado; solo <mark> queda como etiqueta
+        """
+        test_db_session.add(Capitulo(
+            titulo="<img src=x onerror=alert(1)> Ribosomas", numero=1, tema="Biología", estado="PUBLICADO",
+            introduccion="Sintetizan <b>proteínas</b> & el <script>alert(1)</script>"
+        ))
+        test_db_session.commit()
+
+        por_titulo = _buscar(client, "ribosomas")["resultados"][0]
+        por_introduccion = _buscar(client, "proteinas")["resultados"][0]
+
+        assert por_titulo["titulo"] == "&lt;img src=x onerror=alert(1)&gt; <mark>Ribosomas</mark>"
+        assert "<script>" not in por_introduccion["fragmento"]
+        assert "&lt;b&gt;<mark>proteínas</mark>&lt;/b&gt; &amp; el &lt;script&gt;" in por_introduccion["fragmento"]
+
+    def test_resaltado_mysql_escapa(self):
+        """
+        Test CP01_05.15: El resaltado hecho en Python (MySQL) también escapa el texto
+        """
+        fragmento = _html(_fragmento("Los <b>ribosomas</b> sintetizan & pliegan", ["ribosomas"]))
+
+        assert fragmento == "Los &lt;b&gt;<mark>ribosomas</mark>&lt;/b&gt; sintetizan &amp; pliegan"
+
+    def test_tipo_no_valido(self, test_db_session):
+        """
+        Test CP01_05.11: Un tipo desconocido devuelve error
+        """
+        resultado, error = GestorBusqueda(test_db_session).buscar("célula", tipo="video")
+
+        assert resultado is None
+        assert "no válido" in error
+
+
+pytestmark = [
+    pytest.mark.cp01_05,
+    pytest.mark.integration
+]
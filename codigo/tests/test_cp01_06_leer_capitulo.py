@@ -0,0 +1,152 @@
+"""
+CP01_06 — Página de lectura renderizada en el servidor
+=======================================================
+
+Casos de prueba para GET /leer/{id}
+
+Cobertura:
+- El capítulo publicado y sus bloques llegan en el HTML de la primera respuesta
+- Cada bloque se renderiza una vez por versión (caché de fragmentos)
+- Las plantillas se compilan al arrancar
+- Capítulos sin publicar, 304 y escape del texto
+"""
+
+import pytest
+
+import main as api_main
+from api.dependencies import cache_fragmentos
+from db.contenido.models import Contenido
+
+
+DERIVADOS = [
+    {"ancho": 320, "alto": 213, "formato": formato, "url": f"/media/ab/abcd-320w.{formato}", "tamano": 100}
+    for formato in ("jpeg", "webp", "avif")
+]
+
+
+@pytest.fixture
+def capitulo_para_leer(client, test_db_session, capitulo_borrador):
+    """Capítulo publicado con un texto y una imagen con derivados."""
+    id_capitulo = capitulo_borrador.id_capitulo
+    bloques = [
+        {"tipo": "texto", "tema": "Membrana", "cuerpo_texto": "La membrana <b>separa</b> la célula."},
+        {"tipo": "imagen", "tema": "Mitocondria", "url_archivo": "/media/ab/abcd.jpg", "formato": "jpeg"},
+    ]
+    ids = client.post("/api/contenidos/importar", json={"id_capitulo": id_capitulo, "bloques": bloques}).json()["ids"]
+    imagen = test_db_session.get(Contenido, ids[1])
+    imagen.ancho, imagen.alto, imagen.derivados = 1200, 800, DERIVADOS
+    test_db_session.commit()
+    assert client.post(f"/api/capitulos/{id_capitulo}/publicar").status_code == 201
+    if cache_fragmentos is not None:
+        cache_fragmentos.limpiar()
+        cache_fragmentos.reiniciar_estadisticas()
+    return id_capitulo, ids
+
+
+class TestCP01_06_Lectura:
+    """GET /leer/{id}"""
+
+    def test_html_completo(self, client, capitulo_para_leer):
+        """
+        Test CP01_06.01: Título, texto e imagen responsive en la primera respuesta
+        """
+        id_capitulo, ids = capitulo_para_leer
+
+        response = client.get(f"/leer/{id_capitulo}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+        html = response.text
+        assert "Capítulo de Prueba - Borrador" in html
+        assert f'id="bloque-{ids[0]}"' in html
+        assert html.index(f"bloque-{ids[0]}") < html.index(f"bloque-{ids[1]}")
+        assert '<source type="image/avif"' in html
+        assert "/media/ab/abcd-320w.webp 320w" in html
+        assert "<script" not in html
+
+    def test_texto_escapado(self, client, capitulo_para_leer):
+        """
+        Test CP01_06.02: El texto de los bloques se escapa
+        """
+        id_capitulo, _ = capitulo_para_leer
+
+        html = client.get(f"/leer/{id_capitulo}").text
+
+        assert "La membrana &lt;b&gt;separa&lt;/b&gt; la célula." in html
+
+    def test_sin_publicar(self, client, capitulo_borrador):
+        """
+        Test CP01_06.03: 404 si el capítulo no está publicado o no existe
+        """
+        assert client.get(f"/leer/{capitulo_borrador.id_capitulo}").status_code == 404
+        assert client.get("/leer/no-existe").status_code == 404
+
+    def test_no_modificado(self, client, capitulo_para_leer):
+        """
+        Test CP01_06.04: If-None-Match con el ETag de la página responde 304
+        """
+        id_capitulo, _ = capitulo_para_leer
+        etag = client.get(f"/leer/{id_capitulo}").headers["etag"]
+
+        assert client.get(f"/leer/{id_capitulo}", headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.skipif(cache_fragmentos is None, reason="Caché desactivada (CACHE_BACKEND=ninguno)")
+class TestCP01_06_Fragmentos:
+    """Caché de fragmentos por (id_contenido, fecha_modificacion)"""
+
+    def test_bloques_cacheados(self, client, capitulo_para_leer):
+        """
+        Test CP01_06.05: La segunda visita no vuelve a renderizar ningún bloque
+        """
+        id_capitulo, _ = capitulo_para_leer
+
+        primera = client.get(f"/leer/{id_capitulo}").text
+        segunda = client.get(f"/leer/{id_capitulo}").text
+
+        assert primera == segunda
+        assert (cache_fragmentos.fallos, cache_fragmentos.aciertos) == (2, 2)
+
+    def test_solo_el_bloque_editado(self, client, test_db_session, capitulo_para_leer):
+        """
+        Test CP01_06.06: Tras editar un bloque y republicar, solo ese bloque se renderiza de nuevo
+        """
+        id_capitulo, ids = capitulo_para_leer
+        client.get(f"/leer/{id_capitulo}")
+        texto = test_db_session.get(Contenido, ids[0])
+        texto.cuerpo_texto = "La membrana es semipermeable."
+        test_db_session.commit()
+        client.post(f"/api/capitulos/{id_capitulo}/publicar")
+        cache_fragmentos.reiniciar_estadisticas()
+
+        html = client.get(f"/leer/{id_capitulo}").text
+
+        assert "La membrana es semipermeable." in html
+        assert (cache_fragmentos.fallos, cache_fragmentos.aciertos) == (1, 1)
+
+
+class TestCP01_06_Plantillas:
+    """Plantillas compiladas al arrancar"""
+
+    def test_precompiladas(self, client, capitulo_para_leer, monkeypatch):
+        """
+        Test CP01_06.07: Con la app arrancada, renderizar no vuelve a leer ninguna plantilla
+        """
+        id_capitulo, _ = capitulo_para_leer
+        entorno = api_main.templates.env
+        if cache_fragmentos is not None:
+            cache_fragmentos.limpiar()
+
+        def sin_disco(*args, **kwargs):
+            raise AssertionError("plantilla leída del disco")
+
+        monkeypatch.setattr(entorno.loader, "get_source", sin_disco)
+
+        assert client.get(f"/leer/{id_capitulo}").status_code == 200
+        assert client.get("/ver-capitulos").status_code == 200
+
+
+pytestmark = [
+    pytest.mark.cp01_06,
+    pytest.mark.integration
+]
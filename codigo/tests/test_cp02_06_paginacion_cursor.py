@@ -0,0 +1,198 @@
+"""
+CP02_06 — Paginación por cursor
+================================
+
+Casos de prueba para la paginación keyset de GET /api/capitulos/ y
+GET /api/contenidos/
+
+Cobertura:
+- Recorrido completo siguiendo los cursores, sin repetidos ni omitidos
+- Cabeceras Link y X-Next-Cursor
+- Filtros conservados entre páginas
+- Cursor no válido
+- Compatibilidad con skip/limit
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_capitulo import GestorCapitulo
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+def _crear_capitulos(session, cantidad):
+    for numero in range(cantidad, 0, -1):
+        session.add(Capitulo(
+            titulo=f"Capítulo {numero}",
+            numero=numero,
+            tema="Biología" if numero % 2 else "Química",
+            estado="PUBLICADO"
+        ))
+    session.commit()
+
+
+def _crear_textos(session, cantidad, misma_fecha=False):
+    """Crea textos; con misma_fecha todos comparten fecha_creacion (empates)."""
+    base = datetime(2024, 1, 1)
+    for i in range(cantidad):
+        fecha = base if misma_fecha else base + timedelta(minutes=i)
+        session.add(Texto(tema="Testing", cuerpo_texto=f"Texto {i}", fecha_creacion=fecha))
+    session.commit()
+
+
+def _recorrer(client, url, **params):
+    """Sigue X-Next-Cursor hasta la última página y devuelve todas las filas."""
+    filas, paginas = [], 0
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        filas.extend(response.json())
+        paginas += 1
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return filas, paginas
+        params["cursor"] = cursor
+
+
+class TestCP02_06_Capitulos:
+    """Paginación por cursor de capítulos"""
+
+    def test_recorrido_completo(self, client, test_db_session):
+        """
+        Test CP02_06.01: Siguiendo los cursores se obtienen todos, en orden, sin repetir
+        """
+        _crear_capitulos(test_db_session, 7)
+
+        filas, paginas = _recorrer(client, "/api/capitulos/", limit=3)
+
+        assert [c["numero"] for c in filas] == list(range(1, 8))
+        assert paginas == 3
+
+    def test_cabecera_link(self, client, test_db_session):
+        """
+        Test CP02_06.02: Link apunta a la página siguiente y conserva los filtros
+        """
+        _crear_capitulos(test_db_session, 6)
+
+        response = client.get("/api/capitulos/", params={"limit": 2, "tema": "Biolog"})
+
+        assert [c["numero"] for c in response.json()] == [1, 3]
+        link = response.headers["link"]
+        assert link.endswith('; rel="next"')
+        assert "tema=Biolog" in link
+        assert f"cursor={response.headers['x-next-cursor']}" in link
+
+    def test_ultima_pagina_sin_cursor(self, client, test_db_session):
+        """
+        Test CP02_06.03: La última página no incluye cursor siguiente
+        """
+        _crear_capitulos(test_db_session, 2)
+
+        response = client.get("/api/capitulos/", params={"limit": 2})
+
+        assert len(response.json()) == 2
+        assert "x-next-cursor" not in response.headers
+        assert "link" not in response.headers
+
+    def test_cursor_no_valido(self, client):
+        """
+        Test CP02_06.04: Un cursor mal formado devuelve 400
+        """
+        response = client.get("/api/capitulos/", params={"cursor": "no-es-un-cursor"})
+
+        assert response.status_code == 400
+
+    def test_skip_sigue_funcionando(self, client, test_db_session):
+        """
+        Test CP02_06.05: skip/limit se mantiene por compatibilidad
+        """
+        _crear_capitulos(test_db_session, 5)
+
+        response = client.get("/api/capitulos/", params={"skip": 2, "limit": 2})
+
+        assert [c["numero"] for c in response.json()] == [3, 4]
+
+
+class TestCP02_06_Contenidos:
+    """Paginación por cursor de contenidos"""
+
+    def test_recorrido_completo(self, client, test_db_session):
+        """
+        Test CP02_06.06: Los contenidos se recorren por fecha de creación
+        """
+        _crear_textos(test_db_session, 5)
+
+        filas, paginas = _recorrer(client, "/api/contenidos/", limit=2)
+
+        assert [c["cuerpo_texto"] for c in filas] == [f"Texto {i}" for i in range(5)]
+        assert paginas == 3
+
+    def test_empates_de_fecha(self, client, test_db_session):
+        """
+        Test CP02_06.07: Con fechas iguales el id desempata sin perder filas
+        """
+        _crear_textos(test_db_session, 6, misma_fecha=True)
+
+        filas, _ = _recorrer(client, "/api/contenidos/", limit=4)
+
+        ids = [c["id_contenido"] for c in filas]
+        assert len(ids) == 6
+        assert ids == sorted(ids)
+
+    def test_cursor_no_valido(self, client):
+        """
+        Test CP02_06.08: Un cursor con campos inválidos devuelve 400
+        """
+        response = client.get("/api/contenidos/", params={"cursor": "eyJ4IjoxfQ"})
+
+        assert response.status_code == 400
+
+
+class TestCP02_06_Gestores:
+    """Paginación por cursor directamente en los gestores"""
+
+    def test_gestor_capitulo(self, test_db_session):
+        """
+        Test CP02_06.09: El gestor devuelve la página y el cursor siguiente
+        """
+        _crear_capitulos(test_db_session, 3)
+        gestor = GestorCapitulo(test_db_session, Capitulo)
+
+        (pagina, cursor), error = gestor.listar_capitulos_por_cursor(limit=2)
+        (resto, fin), _ = gestor.listar_capitulos_por_cursor(cursor=cursor, limit=2)
+
+        assert error is None
+        assert [c.numero for c in pagina] == [1, 2]
+        assert [c.numero for c in resto] == [3]
+        assert fin is None
+
+    def test_gestor_contenido_offset_estable(self, test_db_session):
+        """
+        Test CP02_06.10: El modo offset usa el mismo orden que el cursor
+        """
+        _crear_textos(test_db_session, 4)
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        (pagina, _), _ = gestor.listar_contenidos_por_cursor(limit=4)
+
+        assert gestor.listar_contenidos(limit=4) == pagina
+
+
+pytestmark = [
+    pytest.mark.cp02_06,
+    pytest.mark.integration
+]
@@ -0,0 +1,155 @@
+"""
+CP02_07 — Importación masiva de contenidos
+===========================================
+
+Casos de prueba para POST /api/contenidos/importar y
+GestorContenido.importar_contenidos
+
+Cobertura:
+- Creación de bloques de todos los tipos con sus IDs en orden
+- Asignación al capítulo con orden explícito o al final
+- Validación previa: un bloque inválido no crea ninguno
+- Capítulo destino inexistente
+- Inserción masiva sin una sentencia por bloque
+"""
+
+import pytest
+from sqlalchemy import event
+
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+BLOQUES = [
+    {"tipo": "texto", "tema": "Célula", "cuerpo_texto": "Introducción"},
+    {"tipo": "imagen", "tema": "Célula", "url_archivo": "https://s3/celula.png", "formato": "png"},
+    {"tipo": "video", "tema": "Célula", "url_archivo": "https://s3/mitosis.mp4", "duracion": 42.5},
+    {"tipo": "objeto3d", "tema": "Célula", "url_archivo": "https://s3/celula.glb", "formato": "glb"},
+]
+
+
+class TestCP02_07_Importacion:
+    """Importación a través de la API"""
+
+    def test_importar_bloques(self, client, test_db_session):
+        """
+        Test CP02_07.01: Se crean todos los bloques y se devuelven sus IDs en orden
+        """
+        response = client.post("/api/contenidos/importar", json={"bloques": BLOQUES})
+
+        assert response.status_code == 201
+        datos = response.json()
+        assert datos["total"] == 4
+        tipos = [test_db_session.get(Contenido, id_).tipo for id_ in datos["ids"]]
+        assert tipos == ["texto", "imagen", "video", "objeto3d"]
+
+    def test_importar_y_asignar_a_capitulo(self, client, capitulo_con_contenido):
+        """
+        Test CP02_07.02: Los bloques sin orden se agregan al final del capítulo
+        """
+        id_capitulo = capitulo_con_contenido.id_capitulo
+
+        response = client.post("/api/contenidos/importar", json={
+            "id_capitulo": id_capitulo,
+            "bloques": BLOQUES[:2]
+        })
+
+        assert response.status_code == 201
+        contenidos = client.get(f"/api/contenidos/capitulo/{id_capitulo}").json()
+        assert len(contenidos) == 3
+        assert [c["id_contenido"] for c in contenidos[1:]] == response.json()["ids"]
+
+    def test_orden_explicito(self, client, capitulo_publicado):
+        """
+        Test CP02_07.03: Se respeta el orden indicado en cada bloque
+        """
+        id_capitulo = capitulo_publicado.id_capitulo
+        bloques = [
+            {"tipo": "texto", "tema": "T", "cuerpo_texto": "segundo", "orden": 20},
+            {"tipo": "texto", "tema": "T", "cuerpo_texto": "primero", "orden": 10},
+        ]
+
+        client.post("/api/contenidos/importar", json={"id_capitulo": id_capitulo, "bloques": bloques})
+
+        contenidos = client.get(f"/api/contenidos/capitulo/{id_capitulo}").json()
+        assert [c["cuerpo_texto"] for c in contenidos] == ["primero", "segundo"]
+
+    def test_bloque_invalido_no_crea_ninguno(self, client, test_db_session):
+        """
+        Test CP02_07.04: La validación es previa: con un bloque inválido no se inserta nada
+        """
+        bloques = BLOQUES + [{"tipo": "imagen", "tema": "Célula", "url_archivo": "https://s3/x.png"}]
+
+        response = client.post("/api/contenidos/importar", json={"bloques": bloques})
+
+        assert response.status_code == 400
+        assert "Bloque 4" in response.json()["detail"]
+        assert test_db_session.query(Contenido).count() == 0
+
+    def test_capitulo_inexistente(self, client, test_db_session):
+        """
+        Test CP02_07.05: Un capítulo destino inexistente devuelve 400 sin insertar
+        """
+        response = client.post("/api/contenidos/importar", json={
+            "id_capitulo": "00000000-0000-0000-0000-000000000000",
+            "bloques": BLOQUES[:1]
+        })
+
+        assert response.status_code == 400
+        assert test_db_session.query(Contenido).count() == 0
+
+    def test_lista_vacia_rechazada(self, client):
+        """
+        Test CP02_07.06: Una importación sin bloques es rechazada por validación
+        """
+        response = client.post("/api/contenidos/importar", json={"bloques": []})
+
+        assert response.status_code == 422
+
+
+class TestCP02_07_Gestor:
+    """Importación directamente en el gestor"""
+
+    @pytest.mark.performance
+    def test_sentencias_constantes(self, test_db_session, capitulo_publicado):
+        """
+        Test CP02_07.07: El número de sentencias no depende de la cantidad de bloques
+        """
+        gestor = GestorContenido(test_db_session, MODELOS)
+        bloques = [
+            {"tipo": "texto", "tema": "T", "cuerpo_texto": f"Bloque {i}"} for i in range(200)
+        ]
+        sentencias = []
+        engine = test_db_session.get_bind()
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            ids, error = gestor.importar_contenidos(bloques, id_capitulo=capitulo_publicado.id_capitulo)
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+
+        assert error is None
+        assert len(ids) == 200
+        assert len(sentencias) <= 5
+        assert test_db_session.query(UnionCapituloContenido).count() == 200
+
+
+pytestmark = [
+    pytest.mark.cp02_07,
+    pytest.mark.integration
+]
@@ -0,0 +1,304 @@
+"""
+CP02_08 — Exportación e importación del catálogo
+=================================================
+
+Casos de prueba para GET /api/exportacion/, POST /api/exportacion/importar,
+GestorExportacion y db/exportar_contenido.py
+
+Cobertura:
+- Ida y vuelta NDJSON y CSV, en claro y en gzip
+- Una consulta por tabla y entrega en bloques
+- Inserción por lotes en una sola transacción
+- Volcados no válidos o que chocan con datos existentes
+- Permisos de exportación e importación
+"""
+
+import gzip
+import io
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "exportacion_contenido"))
+
+import main as api_main
+import exportacion_contenido
+from db import exportar_contenido
+from db.contenido.models import Capitulo, Contenido, Texto, Imagen, Video, UnionCapituloContenido
+from exportacion_contenido import GestorExportacion
+
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+TABLAS = ("capitulos", "contenidos", "union_capitulo_contenido")
+
+
+def _bd():
+    """BD de contenido en memoria que anota las sentencias ejecutadas."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Capitulo.metadata.create_all(engine)
+    sesion = sessionmaker(bind=engine)()
+    sesion.sentencias = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sesion.sentencias.append(statement)
+
+    return sesion
+
+
+@pytest.fixture
+def origen():
+    """Catálogo de ejemplo: dos capítulos, cinco contenidos (uno con derivados) y sus uniones."""
+    sesion = _bd()
+    fecha = datetime(2025, 3, 1, 10, 30, 15, 250000)
+    capitulos = [
+        Capitulo(titulo="La célula", numero=1, tema="Biología", introduccion="Unidad básica", estado="PUBLICADO",
+                 fecha_creacion=fecha, fecha_modificacion=fecha),
+        Capitulo(titulo="Genética, \"ADN\"\ny herencia", numero=2, tema="Biología"),
+    ]
+    contenidos = [Texto(tema="Biología", cuerpo_texto=f"Párrafo {i}, con comas") for i in range(3)]
+    contenidos.append(Imagen(
+        tema="Biología", url_archivo="/media/ab/celula.jpg", formato="jpg", ancho=1600, alto=900,
+        marcador="data:image/webp;base64,UklGRg==",
+        derivados=[{"ancho": 320, "alto": 180, "formato": "webp", "url": "/media/ab/celula-320w.webp", "tamano": 5120}]
+    ))
+    contenidos.append(Video(tema="Biología", url_archivo="https://s3/mitosis.mp4", duracion=42.5))
+    sesion.add_all(capitulos + contenidos)
+    sesion.flush()
+    sesion.add_all([
+        UnionCapituloContenido(id_capitulo=capitulos[i % 2].id_capitulo, id_contenido=c.id_contenido, orden=i)
+        for i, c in enumerate(contenidos)
+    ])
+    sesion.commit()
+    yield sesion
+    sesion.close()
+
+
+@pytest.fixture
+def destino():
+    sesion = _bd()
+    yield sesion
+    sesion.close()
+
+
+def _filas(sesion):
+    """Contenido de las tres tablas, para comparar BD de origen y de destino."""
+    return {
+        tabla.name: [tuple(fila) for fila in sesion.execute(select(tabla).order_by(*tabla.primary_key.columns))]
+        for tabla in (Capitulo.__table__, Contenido.__table__, UnionCapituloContenido.__table__)
+    }
+
+
+def _volcado(sesion, formato="ndjson", comprimir=False, **kwargs) -> bytes:
+    return b"".join(GestorExportacion(sesion, MODELOS, **kwargs).exportar(formato, comprimir))
+
+
+class TestCP02_08_IdaYVuelta:
+    """Lo exportado se vuelve a cargar sin cambios"""
+
+    @pytest.mark.parametrize("formato", ["ndjson", "csv"])
+    @pytest.mark.parametrize("comprimir", [False, True])
+    def test_ida_y_vuelta(self, origen, destino, formato, comprimir):
+        """
+        Test CP02_08.01: Las tres tablas llegan iguales, fechas, decimales y JSON incluidos
+        """
+        volcado = _volcado(origen, formato, comprimir)
+
+        totales, error = GestorExportacion(destino, MODELOS).importar(io.BytesIO(volcado), formato)
+
+        assert error is None
+        assert totales == {"capitulos": 2, "contenidos": 5, "union_capitulo_contenido": 5}
+        assert _filas(destino) == _filas(origen)
+
+    def test_formato_ndjson(self, origen):
+        """
+        Test CP02_08.02: Una línea JSON por fila, tablas en orden de dependencias
+        """
+        lineas = [json.loads(linea) for linea in _volcado(origen).decode("utf-8").splitlines()]
+
+        assert len(lineas) == 12
+        assert [linea["tabla"] for linea in lineas] == ["capitulos"] * 2 + ["contenidos"] * 5 + ["union_capitulo_contenido"] * 5
+        primero = next(linea for linea in lineas if linea.get("numero") == 1)
+        assert primero["fecha_creacion"] == "2025-03-01T10:30:15.250000"
+        imagen = next(linea for linea in lineas if linea.get("tipo") == "imagen")
+        assert imagen["derivados"][0]["formato"] == "webp"
+
+    def test_gzip(self, origen):
+        """
+        Test CP02_08.03: El volcado comprimido es un archivo gzip válido
+        """
+        assert gzip.decompress(_volcado(origen, comprimir=True)) == _volcado(origen)
+
+
+class TestCP02_08_Streaming:
+    """La exportación lee cada tabla una vez y entrega bloques; la importación inserta por lotes"""
+
+    def test_una_consulta_por_tabla(self, origen):
+        """
+        Test CP02_08.04: Tres SELECT, sin paginar con OFFSET
+        """
+        origen.sentencias.clear()
+
+        _volcado(origen, tamano_lote=2)
+
+        consultas = [s for s in origen.sentencias if s.startswith("SELECT")]
+        assert len(consultas) == 3
+        assert not any("OFFSET" in s for s in consultas)
+
+    def test_bloques(self, origen, monkeypatch):
+        """
+        Test CP02_08.05: El volcado sale en varios bloques si supera TAMANO_BLOQUE
+        """
+        monkeypatch.setattr(exportacion_contenido, "TAMANO_BLOQUE", 256)
+
+        bloques = list(GestorExportacion(origen, MODELOS).exportar())
+
+        assert len(bloques) > 3
+        assert b"".join(bloques) == _volcado(origen)
+
+    def test_insercion_por_lotes(self, origen, destino):
+        """
+        Test CP02_08.06: Un INSERT executemany por lote
+        """
+        volcado = _volcado(origen)
+
+        _, error = GestorExportacion(destino, MODELOS, tamano_lote=2).importar(io.BytesIO(volcado))
+
+        inserciones = [s for s in destino.sentencias if s.startswith("INSERT INTO contenidos")]
+        assert error is None
+        assert len(inserciones) == 3  # 5 filas en lotes de 2
+
+    def test_volcado_no_valido_no_importa_nada(self, origen, destino):
+        """
+        Test CP02_08.07: Una línea mal formada deshace los lotes ya insertados
+        """
+        volcado = _volcado(origen) + b"{no es json\n"
+
+        totales, error = GestorExportacion(destino, MODELOS, tamano_lote=2).importar(io.BytesIO(volcado))
+
+        assert totales is None
+        assert error.startswith("Volcado no válido")
+        assert all(filas == [] for filas in _filas(destino).values())
+
+    def test_tabla_desconocida(self, destino):
+        """
+        Test CP02_08.08: Solo se aceptan las tablas del catálogo
+        """
+        volcado = b'{"tabla":"usuarios","id_usuario":"x"}\n'
+
+        _, error = GestorExportacion(destino, MODELOS).importar(io.BytesIO(volcado))
+
+        assert "tabla desconocida 'usuarios'" in error
+
+    def test_conflicto_con_datos_existentes(self, origen):
+        """
+        Test CP02_08.09: Importar sobre la misma BD choca con las claves existentes
+        """
+        _, error = GestorExportacion(origen, MODELOS).importar(io.BytesIO(_volcado(origen)))
+
+        assert error.startswith("El volcado choca con datos existentes")
+        assert len(_filas(origen)["capitulos"]) == 2
+
+
+class TestCP02_08_API:
+    """GET /api/exportacion/ y POST /api/exportacion/importar"""
+
+    def test_exportar(self, client, capitulo_con_contenido):
+        """
+        Test CP02_08.10: Volcado NDJSON en streaming con nombre de archivo
+        """
+        response = client.get("/api/exportacion/")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert 'filename="contenido.ndjson"' in response.headers["content-disposition"]
+        tablas = [json.loads(linea)["tabla"] for linea in response.text.splitlines()]
+        assert tablas == list(TABLAS)
+
+    def test_exportar_csv_gzip(self, client, capitulo_con_contenido):
+        """
+        Test CP02_08.11: CSV comprimido con gzip
+        """
+        response = client.get("/api/exportacion/?formato=csv&gzip=true")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        # httpx no descomprime: no es Content-Encoding sino un archivo .gz
+        lineas = gzip.decompress(response.content).decode("utf-8").splitlines()
+        assert lineas[0].startswith("tabla,id_capitulo,titulo")
+        assert len(lineas) == 4
+
+    def test_formato_no_soportado(self, client):
+        """
+        Test CP02_08.12: Formato desconocido
+        """
+        assert client.get("/api/exportacion/?formato=xml").status_code == 422
+
+    def test_importar(self, client, capitulo_con_contenido, test_db_session):
+        """
+        Test CP02_08.13: Exportar, vaciar la BD e importar deja el capítulo como estaba
+        """
+        volcado = client.get("/api/exportacion/?gzip=true").content
+        id_capitulo = capitulo_con_contenido.id_capitulo
+        client.delete(f"/api/capitulos/{id_capitulo}")
+        test_db_session.query(Contenido).delete()
+        test_db_session.commit()
+
+        response = client.post("/api/exportacion/importar", content=volcado)
+
+        assert response.status_code == 201
+        assert response.json() == {"capitulos": 1, "contenidos": 1, "union_capitulo_contenido": 1}
+        capitulo = client.get(f"/api/capitulos/{id_capitulo}")
+        assert capitulo.status_code == 200
+
+    def test_importar_no_valido(self, client):
+        """
+        Test CP02_08.14: Un volcado no válido es un 400
+        """
+        response = client.post("/api/exportacion/importar?formato=csv", content=b"tabla,id\nusuarios,1\n")
+
+        assert response.status_code == 400
+
+    def test_requiere_permisos(self, capitulo_con_contenido):
+        """
+        Test CP02_08.15: Exportar e importar no están abiertos a cualquiera
+        """
+        with TestClient(api_main.app) as anonimo:
+            assert anonimo.get("/api/exportacion/").status_code == 401
+            assert anonimo.post("/api/exportacion/importar", content=b"").status_code == 401
+
+
+class TestCP02_08_CLI:
+    """db/exportar_contenido.py"""
+
+    def test_exportar_e_importar(self, origen, destino, tmp_path, monkeypatch):
+        """
+        Test CP02_08.16: El formato y la compresión salen de la extensión
+        """
+        archivo = tmp_path / "contenido.csv.gz"
+
+        monkeypatch.setattr(exportar_contenido, "get_contenido_session", lambda: origen)
+        assert exportar_contenido.main(["exportar", str(archivo)]) == 0
+        monkeypatch.setattr(exportar_contenido, "get_contenido_session", lambda: destino)
+        assert exportar_contenido.main(["importar", str(archivo)]) == 0
+
+        assert gzip.decompress(archivo.read_bytes()).startswith(b"tabla,")
+        assert _filas(destino) == _filas(origen)
+
+
+pytestmark = [
+    pytest.mark.cp02_08,
+    pytest.mark.integration
+]
@@ -0,0 +1,270 @@
+"""
+CP02_09 — Reordenación de los contenidos de un capítulo
+========================================================
+
+Casos de prueba para PUT /api/contenidos/capitulo/{id}/orden,
+POST /api/contenidos/capitulo/{id}/mover y GestorContenido.reordenar_contenidos /
+mover_contenido
+
+Cobertura:
+- Orden completo en una sentencia, rechazado si no coincide con el capítulo
+- Movimiento de un bloque con una sola fila actualizada
+- Renumeración en bloque solo cuando se acaban los huecos
+- Editores concurrentes: el orden final es siempre una permutación sin empates
+- Permisos
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main as api_main
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_contenido import GestorContenido, HUECO_ORDEN
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+@pytest.fixture
+def capitulo_largo(client, capitulo_publicado):
+    """Capítulo con 60 bloques de orden 1..60 (sin huecos, como los asigna importar)."""
+    id_capitulo = capitulo_publicado.id_capitulo
+    bloques = [{"tipo": "texto", "tema": "T", "cuerpo_texto": f"Bloque {i}"} for i in range(60)]
+    response = client.post("/api/contenidos/importar", json={"id_capitulo": id_capitulo, "bloques": bloques})
+    assert response.status_code == 201
+    return id_capitulo, response.json()["ids"]
+
+
+def _orden(client, id_capitulo):
+    return [c["id_contenido"] for c in client.get(f"/api/contenidos/capitulo/{id_capitulo}").json()]
+
+
+def _sentencias(sesion, funcion):
+    sentencias = []
+    engine = sesion.get_bind()
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        resultado = funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return resultado, sentencias
+
+
+def _actualizaciones_de_uniones(sentencias):
+    return [s for s, _ in sentencias if s.lstrip().upper().startswith("UPDATE UNION_CAPITULO_CONTENIDO")]
+
+
+class TestCP02_09_OrdenCompleto:
+    """PUT /api/contenidos/capitulo/{id}/orden"""
+
+    def test_reordenar(self, client, capitulo_largo):
+        """
+        Test CP02_09.01: Se aplica el orden pedido, con huecos entre cada bloque
+        """
+        id_capitulo, ids = capitulo_largo
+        nuevo = list(reversed(ids))
+
+        response = client.put(f"/api/contenidos/capitulo/{id_capitulo}/orden", json={"ids": nuevo})
+
+        assert response.status_code == 200
+        ordenes = [c["orden"] for c in response.json()["contenidos"]]
+        assert ordenes == [HUECO_ORDEN * (i + 1) for i in range(60)]
+        assert _orden(client, id_capitulo) == nuevo
+
+    def test_una_sentencia(self, test_db_session, capitulo_largo):
+        """
+        Test CP02_09.02: Todo el capítulo se reordena con un único UPDATE de uniones
+        """
+        id_capitulo, ids = capitulo_largo
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        (ordenes, error), sentencias = _sentencias(
+            test_db_session, lambda: gestor.reordenar_contenidos(id_capitulo, ids[::-1])
+        )
+
+        assert error is None
+        assert len(ordenes) == 60
+        assert len(_actualizaciones_de_uniones(sentencias)) == 1
+
+    def test_lista_desactualizada(self, client, capitulo_largo):
+        """
+        Test CP02_09.03: Si la lista no coincide con el capítulo (otro editor lo cambió) se responde 409
+        """
+        id_capitulo, ids = capitulo_largo
+
+        response = client.put(f"/api/contenidos/capitulo/{id_capitulo}/orden", json={"ids": ids[1:]})
+
+        assert response.status_code == 409
+        assert _orden(client, id_capitulo) == ids
+
+    def test_repetidos_y_capitulo_inexistente(self, client, capitulo_largo):
+        """
+        Test CP02_09.04: Ids repetidos (400) y capítulo inexistente (404)
+        """
+        id_capitulo, ids = capitulo_largo
+
+        repetidos = client.put(f"/api/contenidos/capitulo/{id_capitulo}/orden", json={"ids": ids + ids[:1]})
+        inexistente = client.put("/api/contenidos/capitulo/no-existe/orden", json={"ids": ids})
+
+        assert repetidos.status_code == 400
+        assert inexistente.status_code == 404
+
+
+class TestCP02_09_Mover:
+    """POST /api/contenidos/capitulo/{id}/mover"""
+
+    def test_mover_de_50_a_2(self, client, capitulo_largo):
+        """
+        Test CP02_09.05: El bloque 50 pasa a la segunda posición
+        """
+        id_capitulo, ids = capitulo_largo
+
+        response = client.post(
+            f"/api/contenidos/capitulo/{id_capitulo}/mover",
+            json={"id_contenido": ids[49], "despues_de": ids[0]}
+        )
+
+        assert response.status_code == 200
+        assert _orden(client, id_capitulo) == [ids[0], ids[49]] + ids[1:49] + ids[50:]
+
+    def test_una_fila_por_movimiento(self, test_db_session, capitulo_largo):
+        """
+        Test CP02_09.06: Sin huecos se renumera una vez; después cada movimiento actualiza una fila
+        """
+        id_capitulo, ids = capitulo_largo
+        gestor = GestorContenido(test_db_session, MODELOS)
+
+        primero, error = gestor.mover_contenido(id_capitulo, ids[49], despues_de=ids[0])
+        assert error is None
+        assert primero["renumerado"] is True
+
+        (segundo, error), sentencias = _sentencias(
+            test_db_session, lambda: gestor.mover_contenido(id_capitulo, ids[30], despues_de=ids[10])
+        )
+        assert error is None
+        assert segundo["renumerado"] is False
+        actualizaciones = _actualizaciones_de_uniones(sentencias)
+        assert len(actualizaciones) == 1
+        assert "CASE" not in actualizaciones[0].upper()
+
+    def test_principio_y_final(self, client, capitulo_largo):
+        """
+        Test CP02_09.07: Sin 'despues_de' va al principio; detrás del último, al final
+        """
+        id_capitulo, ids = capitulo_largo
+        url = f"/api/contenidos/capitulo/{id_capitulo}/mover"
+
+        client.post(url, json={"id_contenido": ids[10]})
+        client.post(url, json={"id_contenido": ids[0], "despues_de": ids[59]})
+
+        orden = _orden(client, id_capitulo)
+        assert orden[0] == ids[10]
+        assert orden[-1] == ids[0]
+
+    def test_huecos_agotados(self, test_db_session, capitulo_largo):
+        """
+        Test CP02_09.08: Al agotar el hueco entre dos vecinos se renumera y el orden sigue siendo correcto
+        """
+        id_capitulo, ids = capitulo_largo
+        gestor = GestorContenido(test_db_session, MODELOS)
+        gestor.reordenar_contenidos(id_capitulo, ids)
+
+        # Cada bloque entra entre el primero y el último movido: el hueco se parte a la mitad cada vez
+        renumeraciones = 0
+        for movido in ids[2:20]:
+            resultado, error = gestor.mover_contenido(id_capitulo, movido, despues_de=ids[0])
+            assert error is None
+            renumeraciones += resultado["renumerado"]
+
+        assert renumeraciones == 1
+        esperado = [ids[0]] + list(reversed(ids[2:20])) + [ids[1]] + ids[20:]
+        contenidos, _ = gestor.listar_contenidos_de_capitulo(id_capitulo)
+        assert [c.id_contenido for c in contenidos] == esperado
+
+    def test_errores(self, client, capitulo_largo, contenido_texto):
+        """
+        Test CP02_09.09: Contenidos que no están en el capítulo o moverse detrás de sí mismo
+        """
+        id_capitulo, ids = capitulo_largo
+        url = f"/api/contenidos/capitulo/{id_capitulo}/mover"
+
+        assert client.post(url, json={"id_contenido": contenido_texto.id_contenido}).status_code == 400
+        assert client.post(url, json={"id_contenido": ids[0], "despues_de": contenido_texto.id_contenido}).status_code == 400
+        assert client.post(url, json={"id_contenido": ids[0], "despues_de": ids[0]}).status_code == 400
+        assert client.post("/api/contenidos/capitulo/no-existe/mover", json={"id_contenido": ids[0]}).status_code == 404
+
+    def test_requiere_permiso(self, capitulo_largo):
+        """
+        Test CP02_09.10: Reordenar exige el permiso capitulo · actualizar
+        """
+        id_capitulo, ids = capitulo_largo
+
+        with TestClient(api_main.app) as anonimo:
+            mover = anonimo.post(f"/api/contenidos/capitulo/{id_capitulo}/mover", json={"id_contenido": ids[0]})
+            reordenar = anonimo.put(f"/api/contenidos/capitulo/{id_capitulo}/orden", json={"ids": ids})
+
+        assert mover.status_code == 401
+        assert reordenar.status_code == 401
+
+
+class TestCP02_09_Concurrencia:
+    """Varios editores moviendo bloques a la vez"""
+
+    def test_orden_consistente(self, capitulo_largo):
+        """
+        Test CP02_09.11: Tras movimientos concurrentes el capítulo conserva todos sus bloques sin empates
+        """
+        from dependencies import SessionLocal
+
+        id_capitulo, ids = capitulo_largo
+        errores = []
+
+        def editor(desplazamiento):
+            for i in range(15):
+                sesion = SessionLocal()
+                try:
+                    movido = ids[(desplazamiento + 7 * i) % 60]
+                    delante = ids[(desplazamiento + 7 * i + 31) % 60]
+                    _, error = GestorContenido(sesion, MODELOS).mover_contenido(id_capitulo, movido, despues_de=delante)
+                    if error:
+                        errores.append(error)
+                finally:
+                    sesion.close()
+
+        hilos = [threading.Thread(target=editor, args=(d,)) for d in (0, 3, 5)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        sesion = SessionLocal()
+        try:
+            filas = GestorContenido(sesion, MODELOS)._ordenes(id_capitulo)
+        finally:
+            sesion.close()
+        assert errores == []
+        assert sorted(id_c for id_c, _ in filas) == sorted(ids)
+        assert len({orden for _, orden in filas}) == 60
+
+
+pytestmark = [
+    pytest.mark.cp02_09,
+    pytest.mark.integration
+]
@@ -0,0 +1,360 @@
+"""
+CP02_10 — Versiones publicadas de un capítulo
+==============================================
+
+Casos de prueba para POST /api/capitulos/{id}/publicar, GET /api/capitulos/{id}/publicado,
+el historial de versiones y su restauración, y el paquete publicacion_capitulos
+
+Cobertura:
+- Pasar un capítulo a PUBLICADO compila una versión con la forma de /completo
+- La lectura envía los bytes guardados (gzip o sin comprimir) sin consultar los contenidos
+- Republicar sin cambios no crea versión; con cambios crea la siguiente
+- Restaurar una versión antigua crea una nueva con sus mismos bytes
+- Capítulos sin publicar, 304 y permisos
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import main as api_main
+from db.contenido.models import Contenido, Capitulo, UnionCapituloContenido, PublicacionCapitulo
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "publicacion_capitulos"))
+from publicacion_capitulos import GestorPublicacion, GestorPublicacionAsync, compilar, comprimir
+
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Contenido': Contenido,
+    'UnionCapituloContenido': UnionCapituloContenido,
+    'PublicacionCapitulo': PublicacionCapitulo
+}
+
+
+@pytest.fixture
+def capitulo_con_bloques(client, capitulo_borrador):
+    """Capítulo en BORRADOR con tres bloques de texto."""
+    id_capitulo = capitulo_borrador.id_capitulo
+    bloques = [{"tipo": "texto", "tema": "T", "cuerpo_texto": f"Bloque {i} — ñandú"} for i in range(3)]
+    response = client.post("/api/contenidos/importar", json={"id_capitulo": id_capitulo, "bloques": bloques})
+    assert response.status_code == 201
+    return id_capitulo, response.json()["ids"]
+
+
+def _publicar(client, id_capitulo):
+    return client.post(f"/api/capitulos/{id_capitulo}/publicar")
+
+
+@pytest.fixture
+def publicacion_fallida(monkeypatch):
+    """GestorPublicacionAsync.publicar falla siempre."""
+    async def publicar(self, id_capitulo):
+        return None, "Error al publicar el capítulo: disco lleno"
+
+    monkeypatch.setattr(GestorPublicacionAsync, "publicar", publicar)
+
+
+class TestCP02_10_Publicar:
+    """Compilación de la versión publicada"""
+
+    def test_pasar_a_publicado(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.01: PUT con estado PUBLICADO crea la versión 1 con la forma de /completo
+        """
+        id_capitulo, ids = capitulo_con_bloques
+
+        response = client.put(f"/api/capitulos/{id_capitulo}", json={"estado": "PUBLICADO"})
+
+        assert response.status_code == 200
+        assert response.headers["x-version-publicacion"] == "1"
+        publicado = client.get(f"/api/capitulos/{id_capitulo}/publicado")
+        completo = client.get(f"/api/capitulos/{id_capitulo}/completo").json()
+        assert publicado.status_code == 200
+        assert publicado.headers["x-version-publicacion"] == "1"
+        paquete = publicado.json()
+        assert [c["id_contenido"] for c in paquete["contenidos"]] == ids
+        assert paquete["contenidos"][0]["cuerpo_texto"] == "Bloque 0 — ñandú"
+        for campo in ("id_capitulo", "titulo", "numero", "estado", "introduccion"):
+            assert paquete[campo] == completo[campo]
+
+    def test_publicar_desde_borrador(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.02: POST /publicar cambia el estado y responde con la versión creada
+        """
+        id_capitulo, _ = capitulo_con_bloques
+
+        response = _publicar(client, id_capitulo)
+
+        assert response.status_code == 201
+        assert response.json()["version"] == 1
+        assert response.json()["nueva"] is True
+        assert client.get(f"/api/capitulos/{id_capitulo}").json()["estado"] == "PUBLICADO"
+
+    def test_republicar(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.03: Sin cambios no se crea versión; tras editar un bloque, sí
+        """
+        id_capitulo, ids = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+
+        igual = _publicar(client, id_capitulo)
+        client.post(f"/api/contenidos/capitulo/{id_capitulo}/mover", json={"id_contenido": ids[2]})
+        cambiado = _publicar(client, id_capitulo)
+
+        assert igual.status_code == 200
+        assert igual.json()["version"] == 1
+        assert igual.json()["nueva"] is False
+        assert cambiado.status_code == 201
+        assert cambiado.json()["version"] == 2
+        paquete = client.get(f"/api/capitulos/{id_capitulo}/publicado").json()
+        assert [c["id_contenido"] for c in paquete["contenidos"]] == [ids[2], ids[0], ids[1]]
+
+    def test_lectores_no_ven_cambios_sin_publicar(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.04: Los cambios posteriores no llegan a los lectores hasta republicar
+        """
+        id_capitulo, ids = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+
+        client.delete(f"/api/contenidos/{ids[0]}")
+
+        paquete = client.get(f"/api/capitulos/{id_capitulo}/publicado").json()
+        assert [c["id_contenido"] for c in paquete["contenidos"]] == ids
+
+
+class TestCP02_10_Lectura:
+    """GET /api/capitulos/{id}/publicado"""
+
+    def test_codificaciones(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.05: Se envía la versión gzip guardada o el JSON sin comprimir según Accept-Encoding
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+        url = f"/api/capitulos/{id_capitulo}/publicado"
+
+        comprimido = client.get(url, headers={"Accept-Encoding": "gzip"})
+        sin_comprimir = client.get(url, headers={"Accept-Encoding": "identity"})
+
+        assert comprimido.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in comprimido.headers["vary"]
+        assert "content-encoding" not in sin_comprimir.headers
+        assert comprimido.content == sin_comprimir.content
+        assert comprimido.headers["etag"] == sin_comprimir.headers["etag"]
+
+    def test_sin_consultar_contenidos(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.06: La lectura no toca contenidos ni uniones
+        """
+        from dependencies import async_engine
+
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+        sentencias = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement.lower())
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", registrar)
+        try:
+            response = client.get(f"/api/capitulos/{id_capitulo}/publicado")
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", registrar)
+
+        assert response.status_code == 200
+        assert sentencias
+        assert not [s for s in sentencias if "contenidos" in s or "union_capitulo_contenido" in s]
+
+    def test_no_modificado(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.07: If-None-Match con el ETag vigente responde 304
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+        url = f"/api/capitulos/{id_capitulo}/publicado"
+        etag = client.get(url).headers["etag"]
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_sin_publicar(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.08: 404 si nunca se publicó o si se archivó después de publicarlo
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        url = f"/api/capitulos/{id_capitulo}/publicado"
+
+        assert client.get(url).status_code == 404
+        _publicar(client, id_capitulo)
+        assert client.get(url).status_code == 200
+        client.put(f"/api/capitulos/{id_capitulo}", json={"estado": "ARCHIVADO"})
+        assert client.get(url).status_code == 404
+        assert client.get("/api/capitulos/no-existe/publicado").status_code == 404
+
+
+class TestCP02_10_Versiones:
+    """Historial y restauración"""
+
+    def test_restaurar(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.09: Restaurar la versión 1 crea la 3 con sus mismos bytes
+        """
+        id_capitulo, ids = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+        v1 = client.get(f"/api/capitulos/{id_capitulo}/publicado").content
+        client.put(f"/api/capitulos/{id_capitulo}", json={"titulo": "Otro título"})
+        _publicar(client, id_capitulo)
+
+        response = client.post(f"/api/capitulos/{id_capitulo}/publicaciones/1/restaurar")
+
+        assert response.status_code == 201
+        assert (response.json()["version"], response.json()["origen"]) == (3, 1)
+        assert client.get(f"/api/capitulos/{id_capitulo}/publicado").content == v1
+        versiones = client.get(f"/api/capitulos/{id_capitulo}/publicaciones").json()
+        assert [(v["version"], v["vigente"]) for v in versiones] == [(3, True), (2, False), (1, False)]
+        assert versiones[0]["huella"] == versiones[2]["huella"]
+        assert versiones[0]["tamano_gzip"] < versiones[0]["tamano"]
+
+    def test_leer_version(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.10: Una versión antigua se puede leer y se cachea como inmutable
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+        client.put(f"/api/capitulos/{id_capitulo}", json={"titulo": "Otro título"})
+        _publicar(client, id_capitulo)
+
+        response = client.get(f"/api/capitulos/{id_capitulo}/publicaciones/1")
+
+        assert response.status_code == 200
+        assert response.json()["titulo"] == "Capítulo de Prueba - Borrador"
+        assert "immutable" in response.headers["cache-control"]
+        assert client.get(f"/api/capitulos/{id_capitulo}/publicaciones/9").status_code == 404
+        assert client.post(f"/api/capitulos/{id_capitulo}/publicaciones/9/restaurar").status_code == 404
+
+    def test_restaurar_vigente(self, client, capitulo_con_bloques):
+        """
+        Test CP02_10.11: Restaurar una versión idéntica a la vigente no crea otra
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+
+        response = client.post(f"/api/capitulos/{id_capitulo}/publicaciones/1/restaurar")
+
+        assert response.status_code == 200
+        assert response.json()["nueva"] is False
+
+    def test_eliminar_capitulo(self, client, test_db_session, capitulo_con_bloques):
+        """
+        Test CP02_10.12: Al eliminar el capítulo se eliminan sus versiones
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+
+        assert client.delete(f"/api/capitulos/{id_capitulo}").status_code == 204
+        assert test_db_session.query(PublicacionCapitulo).filter_by(id_capitulo=id_capitulo).count() == 0
+
+    def test_requiere_permiso(self, capitulo_con_bloques, client):
+        """
+        Test CP02_10.13: Publicar y ver el historial exigen capitulo · actualizar; leer la vigente no
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        _publicar(client, id_capitulo)
+
+        with TestClient(api_main.app) as anonimo:
+            assert anonimo.post(f"/api/capitulos/{id_capitulo}/publicar").status_code == 401
+            assert anonimo.get(f"/api/capitulos/{id_capitulo}/publicaciones").status_code == 401
+            assert anonimo.get(f"/api/capitulos/{id_capitulo}/publicaciones/1").status_code == 401
+            assert anonimo.get(f"/api/capitulos/{id_capitulo}/publicado").status_code == 200
+
+    def test_crear_publicado(self, client, sample_capitulo_data):
+        """
+        Test CP02_10.14: POST con estado PUBLICADO también crea la versión 1
+        """
+        response = client.post("/api/capitulos/", json={**sample_capitulo_data, "estado": "PUBLICADO"})
+
+        assert response.status_code == 201
+        assert response.headers["x-version-publicacion"] == "1"
+        id_capitulo = response.json()["id_capitulo"]
+        assert client.get(f"/api/capitulos/{id_capitulo}/publicado").status_code == 200
+
+    @pytest.mark.parametrize("publicar", [
+        lambda client, id_capitulo: client.put(f"/api/capitulos/{id_capitulo}", json={"estado": "PUBLICADO", "titulo": "Otro"}),
+        _publicar,
+    ])
+    def test_fallo_deshace_el_estado(self, client, capitulo_con_bloques, publicacion_fallida, publicar):
+        """
+        Test CP02_10.15: Si la publicación falla, el capítulo vuelve a BORRADOR con sus datos
+        """
+        id_capitulo, _ = capitulo_con_bloques
+        antes = client.get(f"/api/capitulos/{id_capitulo}").json()
+
+        response = publicar(client, id_capitulo)
+
+        assert response.status_code == 500
+        despues = client.get(f"/api/capitulos/{id_capitulo}").json()
+        assert despues["estado"] == "BORRADOR"
+        assert despues["titulo"] == antes["titulo"]
+
+    def test_fallo_al_crear_publicado(self, client, test_db_session, sample_capitulo_data, publicacion_fallida):
+        """
+        Test CP02_10.16: Si la publicación falla, el capítulo creado como PUBLICADO no queda
+        """
+        response = client.post("/api/capitulos/", json={**sample_capitulo_data, "estado": "PUBLICADO"})
+
+        assert response.status_code == 500
+        assert test_db_session.query(Capitulo).filter_by(numero=sample_capitulo_data["numero"]).count() == 0
+
+
+class TestGestorPublicacion:
+    """Paquete publicacion_capitulos"""
+
+    def test_compilar_determinista(self, test_db_session, capitulo_con_bloques):
+        """Mismo capítulo, mismos bytes (también en gzip)"""
+        id_capitulo, _ = capitulo_con_bloques
+        capitulo = test_db_session.get(Capitulo, id_capitulo)
+
+        primero = compilar(capitulo, [])
+        segundo = compilar(capitulo, [])
+
+        assert primero == segundo
+        assert comprimir(primero)["gzip"] == comprimir(segundo)["gzip"]
+        assert json.loads(gzip.decompress(comprimir(primero)["gzip"]))["id_capitulo"] == id_capitulo
+
+    def test_sin_brotli_se_envia_gzip(self, test_db_session, capitulo_con_bloques):
+        """Si la versión no tiene Brotli guardado, se elige la siguiente codificación aceptada"""
+        id_capitulo, _ = capitulo_con_bloques
+        test_db_session.query(Capitulo).filter_by(id_capitulo=id_capitulo).update({"estado": "PUBLICADO"})
+        test_db_session.commit()
+        gestor = GestorPublicacion(test_db_session, MODELOS)
+        gestor.publicar(id_capitulo)
+        test_db_session.query(PublicacionCapitulo).update({"cuerpo_br": None})
+        test_db_session.commit()
+
+        (cuerpo, codificacion), error = gestor.obtener_cuerpo(id_capitulo, 1, ["br", "gzip"])
+        (solo_br, codificacion_br), _ = gestor.obtener_cuerpo(id_capitulo, 1, ["br"])
+
+        assert error is None
+        assert codificacion == "gzip"
+        assert gzip.decompress(cuerpo) == solo_br
+        assert codificacion_br == "identity"
+
+    def test_no_publicado(self, test_db_session, capitulo_con_bloques):
+        """publicar() exige que el capítulo esté PUBLICADO"""
+        id_capitulo, _ = capitulo_con_bloques
+
+        resultado, error = GestorPublicacion(test_db_session, MODELOS).publicar(id_capitulo)
+
+        assert resultado is None
+        assert "no está publicado" in error
+
+
+pytestmark = [
+    pytest.mark.cp02_10,
+    pytest.mark.integration
+]
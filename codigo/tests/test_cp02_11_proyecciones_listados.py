@@ -0,0 +1,239 @@
+"""
+CP02_11 — Proyecciones de los listados
+======================================
+
+Casos de prueba para fields= y view=summary en GET /api/capitulos/ y
+GET /api/contenidos/
+
+Cobertura:
+- Solo se devuelven los campos pedidos (el identificador siempre)
+- Las columnas no pedidas no se leen de la base de datos (load_only)
+- Paginación por cursor y skip con proyección
+- Campos o vistas no válidos
+"""
+
+import pytest
+from sqlalchemy import event, inspect
+
+from api.dependencies import async_engine
+from db.contenido.models import (
+    Contenido, Texto, Imagen, Video, Objeto3D, Capitulo, UnionCapituloContenido
+)
+from gestor_capitulo import GestorCapitulo
+from gestor_contenido import GestorContenido
+
+
+MODELOS = {
+    'Contenido': Contenido,
+    'Texto': Texto,
+    'Imagen': Imagen,
+    'Video': Video,
+    'Objeto3D': Objeto3D,
+    'Capitulo': Capitulo,
+    'UnionCapituloContenido': UnionCapituloContenido
+}
+
+
+def _crear_capitulos(session, cantidad):
+    for numero in range(1, cantidad + 1):
+        session.add(Capitulo(
+            titulo=f"Capítulo {numero}",
+            numero=numero,
+            tema="Biología",
+            introduccion="Introducción larga. " * 100,
+            estado="PUBLICADO"
+        ))
+    session.commit()
+
+
+def _recorrer(client, url, **params):
+    """Sigue X-Next-Cursor hasta la última página y devuelve todas las filas."""
+    filas, paginas = [], 0
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        filas.extend(response.json())
+        paginas += 1
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return filas, paginas
+        params["cursor"] = cursor
+
+
+@pytest.fixture
+def textos(test_db_session):
+    """Tres textos con un cuerpo largo."""
+    for i in range(3):
+        test_db_session.add(Texto(tema=f"Tema {i}", cuerpo_texto="Mitocondria. " * 500))
+    test_db_session.commit()
+
+
+@pytest.fixture
+def sentencias():
+    """SELECT emitidos por la API durante el test."""
+    registradas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        registradas.append(statement)
+
+    engine = async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", registrar)
+    yield registradas
+    event.remove(engine, "before_cursor_execute", registrar)
+
+
+class TestCP02_11_Capitulos:
+    """GET /api/capitulos/ con proyección"""
+
+    def test_vista_resumen(self, client, test_db_session):
+        """
+        Test CP02_11.01: view=summary devuelve solo los campos del selector
+        """
+        _crear_capitulos(test_db_session, 3)
+
+        response = client.get("/api/capitulos/", params={"view": "summary"})
+
+        assert response.status_code == 200
+        capitulos = response.json()
+        assert [c["numero"] for c in capitulos] == [1, 2, 3]
+        assert set(capitulos[0]) == {"id_capitulo", "numero", "titulo", "tema", "estado"}
+
+    def test_fields(self, client, capitulo_borrador, sentencias):
+        """
+        Test CP02_11.02: fields= devuelve esos campos y el id, sin leer introduccion
+        """
+        response = client.get("/api/capitulos/", params={"fields": "titulo"})
+
+        assert response.status_code == 200
+        assert response.json() == [{"id_capitulo": capitulo_borrador.id_capitulo, "titulo": capitulo_borrador.titulo}]
+        select = next(s for s in sentencias if "FROM capitulos" in s)
+        assert "introduccion" not in select
+
+    def test_cursor_con_fields(self, client, test_db_session):
+        """
+        Test CP02_11.03: La paginación por cursor funciona aunque no se pida 'numero'
+        """
+        _crear_capitulos(test_db_session, 5)
+
+        filas, paginas = _recorrer(client, "/api/capitulos/", limit=2, fields="titulo")
+
+        assert paginas == 3
+        assert [f["titulo"] for f in filas] == [f"Capítulo {n}" for n in range(1, 6)]
+        assert all(set(f) == {"id_capitulo", "titulo"} for f in filas)
+
+    def test_skip_con_vista_resumen(self, client, test_db_session):
+        """
+        Test CP02_11.04: skip/limit también admite la vista resumida
+        """
+        _crear_capitulos(test_db_session, 4)
+
+        capitulos = client.get("/api/capitulos/", params={"skip": 2, "view": "summary"}).json()
+
+        assert [c["numero"] for c in capitulos] == [3, 4]
+        assert "introduccion" not in capitulos[0]
+
+    def test_sin_proyeccion(self, client, capitulo_borrador):
+        """
+        Test CP02_11.05: Sin fields ni view (o con view=full) el listado no cambia
+        """
+        completo = client.get("/api/capitulos/").json()
+
+        assert completo == client.get("/api/capitulos/", params={"view": "full"}).json()
+        assert completo[0]["introduccion"] == capitulo_borrador.introduccion
+
+
+class TestCP02_11_Contenidos:
+    """GET /api/contenidos/ con proyección"""
+
+    def test_vista_resumen_sin_cuerpo(self, client, textos, sentencias):
+        """
+        Test CP02_11.06: view=summary no lee ni envía cuerpo_texto
+        """
+        response = client.get("/api/contenidos/", params={"view": "summary"})
+
+        assert response.status_code == 200
+        contenidos = response.json()
+        assert len(contenidos) == 3
+        assert set(contenidos[0]) == {"id_contenido", "tipo", "tema"}
+        select = next(s for s in sentencias if "FROM contenidos" in s)
+        assert "cuerpo_texto" not in select
+        assert len(response.content) < 500
+
+    def test_fields_con_filtro(self, client, textos):
+        """
+        Test CP02_11.07: fields= se combina con los filtros y las fechas se serializan
+        """
+        contenidos = client.get("/api/contenidos/", params={"fields": "tema,fecha_creacion", "tema": "Tema 1"}).json()
+
+        assert len(contenidos) == 1
+        assert set(contenidos[0]) == {"id_contenido", "tema", "fecha_creacion"}
+        assert contenidos[0]["tema"] == "Tema 1"
+
+    def test_cursor_con_vista_resumen(self, client, textos):
+        """
+        Test CP02_11.08: El cursor se calcula con columnas que no se devuelven
+        """
+        filas, paginas = _recorrer(client, "/api/contenidos/", limit=2, view="summary")
+
+        assert paginas == 2
+        assert len({f["id_contenido"] for f in filas}) == 3
+
+
+class TestCP02_11_Validaciones:
+    """Parámetros no válidos"""
+
+    @pytest.mark.parametrize("params", [
+        {"fields": "titulo,contrasena"},
+        {"fields": " , "},
+        {"fields": "titulo", "view": "summary"},
+    ])
+    def test_fields_no_validos(self, client, params):
+        """
+        Test CP02_11.09: Campos desconocidos, vacíos o combinados con view=summary → 400
+        """
+        response = client.get("/api/capitulos/", params=params)
+
+        assert response.status_code == 400
+
+    def test_vista_desconocida(self, client):
+        """
+        Test CP02_11.10: Una vista que no es full ni summary → 422
+        """
+        assert client.get("/api/contenidos/", params={"view": "mini"}).status_code == 422
+
+
+class TestCP02_11_Gestores:
+    """load_only en los gestores"""
+
+    def test_capitulos_sin_cargar(self, test_db_session):
+        """
+        Test CP02_11.11: Las columnas no pedidas quedan sin cargar
+        """
+        _crear_capitulos(test_db_session, 2)
+        test_db_session.expunge_all()
+
+        capitulos = GestorCapitulo(test_db_session, Capitulo).listar_capitulos(campos=["titulo"])
+
+        assert {"introduccion", "tema", "estado"} <= inspect(capitulos[0]).unloaded
+        assert "titulo" not in inspect(capitulos[0]).unloaded
+
+    def test_contenidos_por_cursor_cargan_el_cursor(self, test_db_session, textos):
+        """
+        Test CP02_11.12: Por cursor se cargan también fecha_creacion e id_contenido
+        """
+        test_db_session.expunge_all()
+
+        (contenidos, _), error = GestorContenido(test_db_session, MODELOS).listar_contenidos_por_cursor(
+            limit=2, campos=["tema"]
+        )
+
+        assert error is None
+        sin_cargar = inspect(contenidos[0]).unloaded
+        assert "cuerpo_texto" in sin_cargar
+        assert not {"fecha_creacion", "id_contenido", "tema"} & sin_cargar
+
+
+pytestmark = [
+    pytest.mark.cp02_11,
+    pytest.mark.integration
+]
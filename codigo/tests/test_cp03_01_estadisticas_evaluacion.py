@@ -0,0 +1,214 @@
+"""
+CP03_01 — Estadísticas de evaluación
+=====================================
+
+Casos de prueba para POST /api/evaluaciones/intentos/{id}/calificar,
+GET /api/evaluaciones/{id}/estadisticas, POST /api/evaluaciones/{id}/recalificar
+y POST /api/evaluaciones/{id}/estadisticas/reconstruir
+
+Cobertura:
+- Distribución, tasa de aprobación, dificultad, discriminación y frecuencia de opciones
+- El resumen se actualiza al completar cada intento y coincide con una reconstrucción
+- Volver a calificar un intento o recalificar la evaluación no duplica aportes
+- El panel no lee la tabla respuestas
+"""
+
+import pytest
+from sqlalchemy import event
+
+from db.evaluaciones.models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta, TipoPregunta
+)
+from dependencies import evaluaciones_async_engine
+
+
+@pytest.fixture
+def evaluacion_calificada(client, test_evaluaciones_session):
+    """
+    Evaluación de dos preguntas de opción múltiple (A correcta) y un ensayo,
+    con cuatro intentos calificados a través de la API:
+        est-1: A, A -> 100 %   est-2: A, B -> 50 %
+        est-3: B, B -> 0 %     est-4: A, B -> 50 %
+    """
+    sesion = test_evaluaciones_session
+    evaluacion = Evaluacion(
+        id_capitulo="cap-1", titulo="Célula", id_docente_creador="doc-1",
+        puntos_totales=10.0, calificacion_minima_aprobacion=60.0
+    )
+    for orden in (1, 2):
+        pregunta = Pregunta(tipo=TipoPregunta.OPCION_MULTIPLE, enunciado=f"Pregunta {orden}", orden=orden, puntos=1.0)
+        pregunta.opciones = [
+            Opcion(texto="A", es_correcta=True, orden=1),
+            Opcion(texto="B", es_correcta=False, orden=2),
+        ]
+        evaluacion.preguntas.append(pregunta)
+    evaluacion.preguntas.append(
+        Pregunta(tipo=TipoPregunta.ENSAYO, enunciado="Ensayo", orden=3, puntos=0.0)
+    )
+    sesion.add(evaluacion)
+    sesion.commit()
+
+    elecciones = {"est-1": (0, 0), "est-2": (0, 1), "est-3": (1, 1), "est-4": (0, 1)}
+    intentos = {}
+    for estudiante, (primera, segunda) in elecciones.items():
+        intento = Intento(
+            id_evaluacion=evaluacion.id_evaluacion, id_estudiante=estudiante,
+            numero_intento=1, puntos_totales=10.0
+        )
+        for pregunta, eleccion in zip(evaluacion.preguntas, (primera, segunda)):
+            intento.respuestas.append(Respuesta(
+                id_pregunta=pregunta.id_pregunta,
+                id_opcion_seleccionada=pregunta.opciones[eleccion].id_opcion
+            ))
+        sesion.add(intento)
+        sesion.commit()
+        intentos[estudiante] = intento.id_intento
+
+    for id_intento in intentos.values():
+        response = client.post(f"/api/evaluaciones/intentos/{id_intento}/calificar")
+        assert response.status_code == 200
+
+    return evaluacion, intentos
+
+
+class TestCP03_01_Calificar:
+    """Calificación a través de la API"""
+
+    def test_calificar_intento(self, client, evaluacion_calificada):
+        """
+        Test CP03_01.01: Volver a calificar devuelve el intento completado y su nota
+        """
+        _, intentos = evaluacion_calificada
+
+        response = client.post(f"/api/evaluaciones/intentos/{intentos['est-1']}/calificar")
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["estado"] == "completado"
+        assert datos["porcentaje"] == 100.0
+        assert datos["puntos_obtenidos"] == 10.0
+        assert datos["aprobado"] is True
+
+    def test_calificar_intento_inexistente(self, client, test_evaluaciones_session):
+        """
+        Test CP03_01.02: Un intento inexistente devuelve 404
+        """
+        response = client.post("/api/evaluaciones/intentos/no-existe/calificar")
+
+        assert response.status_code == 404
+
+
+class TestCP03_01_Estadisticas:
+    """Estadísticas leídas del resumen materializado"""
+
+    def test_resumen_general(self, client, evaluacion_calificada):
+        """
+        Test CP03_01.03: Intentos, aprobados, media y distribución
+        """
+        evaluacion, _ = evaluacion_calificada
+
+        response = client.get(f"/api/evaluaciones/{evaluacion.id_evaluacion}/estadisticas")
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["intentos"] == 4
+        assert datos["aprobados"] == 1
+        assert datos["tasa_aprobacion"] == 0.25
+        assert datos["porcentaje_medio"] == 50.0
+        distribucion = {tramo["desde"]: tramo["intentos"] for tramo in datos["distribucion"]}
+        assert distribucion[0.0] == 1
+        assert distribucion[50.0] == 2
+        assert distribucion[90.0] == 1
+        assert sum(distribucion.values()) == 4
+
+    def test_preguntas_y_opciones(self, client, evaluacion_calificada):
+        """
+        Test CP03_01.04: Dificultad, discriminación y frecuencia de cada opción
+        """
+        evaluacion, _ = evaluacion_calificada
+
+        preguntas = client.get(f"/api/evaluaciones/{evaluacion.id_evaluacion}/estadisticas").json()["preguntas"]
+
+        primera, segunda, ensayo = preguntas
+        assert primera["dificultad"] == 0.75
+        assert segunda["dificultad"] == 0.25
+        assert primera["discriminacion"] == pytest.approx(0.8165, abs=1e-3)
+        assert segunda["discriminacion"] > 0
+        assert [(o["texto"], o["selecciones"], o["frecuencia"]) for o in primera["opciones"]] == [
+            ("A", 3, 0.75), ("B", 1, 0.25)
+        ]
+        assert ensayo["dificultad"] is None and ensayo["discriminacion"] is None
+
+    def test_incremental_coincide_con_reconstruccion(self, client, evaluacion_calificada):
+        """
+        Test CP03_01.05: Reconstruir el resumen no cambia las estadísticas
+        """
+        evaluacion, intentos = evaluacion_calificada
+        url = f"/api/evaluaciones/{evaluacion.id_evaluacion}/estadisticas"
+        # Volver a calificar un intento completado no debe contarlo dos veces
+        client.post(f"/api/evaluaciones/intentos/{intentos['est-2']}/calificar")
+        incremental = client.get(url).json()
+
+        response = client.post(f"{url}/reconstruir")
+
+        assert response.status_code == 200
+        assert response.json()["intentos"] == 4
+        assert client.get(url).json() == incremental
+
+    def test_panel_no_lee_respuestas(self, client, evaluacion_calificada):
+        """
+        Test CP03_01.06: Las estadísticas no consultan la tabla respuestas
+        """
+        evaluacion, _ = evaluacion_calificada
+        sentencias = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        motor = evaluaciones_async_engine.sync_engine
+        event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            client.get(f"/api/evaluaciones/{evaluacion.id_evaluacion}/estadisticas")
+        finally:
+            event.remove(motor, "before_cursor_execute", registrar)
+
+        assert sentencias
+        assert not any(" respuestas" in sentencia for sentencia in sentencias)
+
+    def test_evaluacion_inexistente(self, client, test_evaluaciones_session):
+        """
+        Test CP03_01.07: Una evaluación inexistente devuelve 404
+        """
+        response = client.get("/api/evaluaciones/no-existe/estadisticas")
+
+        assert response.status_code == 404
+
+
+class TestCP03_01_Recalificar:
+    """Recalificación tras cambiar la clave"""
+
+    def test_recalificar_actualiza_estadisticas(self, client, evaluacion_calificada, test_evaluaciones_session):
+        """
+        Test CP03_01.08: Al corregir la clave cambian las notas y el resumen
+        """
+        evaluacion, _ = evaluacion_calificada
+        segunda = test_evaluaciones_session.get(Pregunta, evaluacion.preguntas[1].id_pregunta)
+        segunda.opciones[0].es_correcta, segunda.opciones[1].es_correcta = False, True
+        test_evaluaciones_session.commit()
+
+        response = client.post(f"/api/evaluaciones/{evaluacion.id_evaluacion}/recalificar")
+
+        assert response.status_code == 200
+        assert response.json()["intentos"] == 4
+        datos = client.get(f"/api/evaluaciones/{evaluacion.id_evaluacion}/estadisticas").json()
+        # est-1: 50 %, est-2: 100 %, est-3: 50 %, est-4: 100 %
+        assert datos["intentos"] == 4
+        assert datos["aprobados"] == 2
+        assert datos["porcentaje_medio"] == 75.0
+        assert datos["preguntas"][1]["dificultad"] == 0.75
+
+
+pytestmark = [
+    pytest.mark.cp03_01,
+    pytest.mark.integration
+]
@@ -0,0 +1,319 @@
+"""
+CP03_02 — Guardado continuo de respuestas
+==========================================
+
+Casos de prueba para PUT /api/evaluaciones/intentos/{id}/respuestas
+y POST /api/evaluaciones/intentos/{id}/entregar
+
+Cobertura:
+- Las respuestas se aceptan en el buffer y se escriben por tamaño, por tiempo o al entregar
+- Varios guardados de la misma pregunta dejan una sola fila con el último valor
+- tiempo_transcurrido_segundos se queda con el mayor valor recibido
+- Entregar o calificar espera a los volcados en vuelo del intento
+- Intento inexistente, intento no en progreso y preguntas u opciones ajenas
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from db.evaluaciones.models import (
+    Evaluacion, Pregunta, Opcion, Intento, Respuesta, TipoPregunta, EstadoIntento
+)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "gestor_respuestas"))
+from gestor_respuestas import buffer_respuestas
+
+
+@pytest.fixture
+def buffer_vacio(monkeypatch):
+    """Buffer del proceso sin cambios pendientes y sin volcados automáticos."""
+    buffer_respuestas.terminar(*buffer_respuestas.extraer())
+    monkeypatch.setattr(buffer_respuestas, "max_pendientes", 1000)
+    monkeypatch.setattr(buffer_respuestas, "intervalo_segundos", 3600)
+    yield buffer_respuestas
+    buffer_respuestas.terminar(*buffer_respuestas.extraer())
+
+
+@pytest.fixture
+def intento(test_evaluaciones_session, buffer_vacio):
+    """Intento en progreso de una evaluación con dos preguntas (A correcta) y una respuesta corta."""
+    sesion = test_evaluaciones_session
+    evaluacion = Evaluacion(
+        id_capitulo="cap-1", titulo="Célula", id_docente_creador="doc-1",
+        puntos_totales=10.0, calificacion_minima_aprobacion=60.0
+    )
+    for orden in (1, 2):
+        pregunta = Pregunta(tipo=TipoPregunta.OPCION_MULTIPLE, enunciado=f"Pregunta {orden}", orden=orden, puntos=1.0)
+        pregunta.opciones = [
+            Opcion(texto="A", es_correcta=True, orden=1),
+            Opcion(texto="B", es_correcta=False, orden=2),
+        ]
+        evaluacion.preguntas.append(pregunta)
+    evaluacion.preguntas.append(Pregunta(
+        tipo=TipoPregunta.RESPUESTA_CORTA, enunciado="Unidad de la vida", orden=3,
+        puntos=1.0, respuesta_correcta_texto="Célula"
+    ))
+    sesion.add(evaluacion)
+    sesion.commit()
+
+    intento = Intento(
+        id_evaluacion=evaluacion.id_evaluacion, id_estudiante="est-1",
+        numero_intento=1, puntos_totales=10.0
+    )
+    sesion.add(intento)
+    sesion.commit()
+    return intento
+
+
+def _respuesta(pregunta, opcion=None, texto=None):
+    return {
+        "id_pregunta": pregunta.id_pregunta,
+        "id_opcion_seleccionada": pregunta.opciones[opcion].id_opcion if opcion is not None else None,
+        "respuesta_texto": texto,
+    }
+
+
+def _guardadas(sesion, intento):
+    sesion.expire_all()
+    return sesion.execute(
+        select(Respuesta.id_pregunta, Respuesta.id_opcion_seleccionada, Respuesta.respuesta_texto)
+        .where(Respuesta.id_intento == intento.id_intento)
+    ).all()
+
+
+class TestCP03_02_Buffer:
+    """Las respuestas se acumulan y se escriben en bloque"""
+
+    def test_guardar_acepta_sin_escribir(self, client, intento, test_evaluaciones_session):
+        """
+        Test CP03_02.01: Un guardado queda pendiente en el buffer
+        """
+        primera, segunda, _ = intento.evaluacion.preguntas
+
+        response = client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0), _respuesta(segunda, 1)]}
+        )
+
+        assert response.status_code == 202
+        assert response.json() == {
+            "id_intento": intento.id_intento, "aceptadas": 2, "pendientes": 2, "volcadas": 0
+        }
+        assert _guardadas(test_evaluaciones_session, intento) == []
+
+    def test_volcado_por_tamano(self, client, intento, buffer_vacio, test_evaluaciones_session, monkeypatch):
+        """
+        Test CP03_02.02: Al llenarse el buffer se escribe todo lo pendiente
+        """
+        monkeypatch.setattr(buffer_vacio, "max_pendientes", 2)
+        primera, segunda, _ = intento.evaluacion.preguntas
+        url = f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas"
+
+        assert client.put(url, json={"respuestas": [_respuesta(primera, 0)]}).json()["volcadas"] == 0
+        datos = client.put(url, json={"respuestas": [_respuesta(segunda, 1)]}).json()
+
+        assert datos["volcadas"] == 2
+        assert datos["pendientes"] == 0
+        assert len(_guardadas(test_evaluaciones_session, intento)) == 2
+
+    def test_volcado_por_tiempo(self, client, intento, buffer_vacio, test_evaluaciones_session, monkeypatch):
+        """
+        Test CP03_02.03: Un cambio pendiente más antiguo que el intervalo provoca el volcado
+        """
+        monkeypatch.setattr(buffer_vacio, "intervalo_segundos", 0)
+        primera = intento.evaluacion.preguntas[0]
+
+        datos = client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0)]}
+        ).json()
+
+        assert datos["volcadas"] == 1
+        assert len(_guardadas(test_evaluaciones_session, intento)) == 1
+
+
+class TestCP03_02_Upsert:
+    """Una fila por (intento, pregunta) con el último valor"""
+
+    def test_ultimo_valor_en_buffer(self, client, intento, test_evaluaciones_session):
+        """
+        Test CP03_02.04: Dos guardados de la misma pregunta se funden en el buffer
+        """
+        primera = intento.evaluacion.preguntas[0]
+        url = f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas"
+        client.put(url, json={"respuestas": [_respuesta(primera, 1)]})
+
+        datos = client.put(url, json={"respuestas": [_respuesta(primera, 0)]}).json()
+
+        assert datos["pendientes"] == 1
+        client.post(f"/api/evaluaciones/intentos/{intento.id_intento}/entregar")
+        assert _guardadas(test_evaluaciones_session, intento) == [
+            (primera.id_pregunta, primera.opciones[0].id_opcion, None)
+        ]
+
+    def test_actualiza_la_fila_existente(self, client, intento, buffer_vacio, test_evaluaciones_session, monkeypatch):
+        """
+        Test CP03_02.05: Un volcado posterior actualiza la respuesta ya escrita
+        """
+        monkeypatch.setattr(buffer_vacio, "max_pendientes", 1)
+        corta = intento.evaluacion.preguntas[2]
+        url = f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas"
+        client.put(url, json={"respuestas": [_respuesta(corta, texto="Celu")]})
+
+        client.put(url, json={"respuestas": [_respuesta(corta, texto="Célula")]})
+
+        assert _guardadas(test_evaluaciones_session, intento) == [(corta.id_pregunta, None, "Célula")]
+
+    def test_tiempo_transcurrido_se_queda_con_el_mayor(self, client, intento, buffer_vacio, test_evaluaciones_session, monkeypatch):
+        """
+        Test CP03_02.06: Un tiempo menor que llega tarde no hace retroceder el contador
+        """
+        monkeypatch.setattr(buffer_vacio, "max_pendientes", 1)
+        primera = intento.evaluacion.preguntas[0]
+        url = f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas"
+
+        client.put(url, json={"respuestas": [_respuesta(primera, 1)], "tiempo_transcurrido_segundos": 30})
+        client.put(url, json={"respuestas": [_respuesta(primera, 0)], "tiempo_transcurrido_segundos": 20})
+
+        test_evaluaciones_session.expire_all()
+        assert test_evaluaciones_session.get(Intento, intento.id_intento).tiempo_transcurrido_segundos == 30
+
+
+class TestCP03_02_Entregar:
+    """Entrega y calificación con las respuestas pendientes"""
+
+    def test_entregar_vuelca_y_califica(self, client, intento, test_evaluaciones_session):
+        """
+        Test CP03_02.07: Al entregar se escriben las respuestas pendientes y las del cuerpo
+        """
+        primera, segunda, corta = intento.evaluacion.preguntas
+        client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0), _respuesta(segunda, 1)]}
+        )
+
+        response = client.post(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/entregar",
+            json={"respuestas": [_respuesta(corta, texto="célula")]}
+        )
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["estado"] == "completado"
+        assert datos["porcentaje"] == pytest.approx(66.67)
+        assert datos["aprobado"] is True
+        assert len(_guardadas(test_evaluaciones_session, intento)) == 3
+        assert buffer_respuestas.pendientes == 0
+
+    def test_calificar_cuenta_las_pendientes(self, client, intento):
+        """
+        Test CP03_02.08: Calificar un intento en progreso vuelca antes su buffer
+        """
+        primera, segunda, _ = intento.evaluacion.preguntas
+        client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0), _respuesta(segunda, 0)]}
+        )
+
+        datos = client.post(f"/api/evaluaciones/intentos/{intento.id_intento}/calificar").json()
+
+        assert datos["porcentaje"] == pytest.approx(66.67)
+
+    def test_guardar_tras_entregar(self, client, intento):
+        """
+        Test CP03_02.09: Un intento entregado ya no acepta respuestas
+        """
+        primera = intento.evaluacion.preguntas[0]
+        client.post(f"/api/evaluaciones/intentos/{intento.id_intento}/entregar")
+
+        response = client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0)]}
+        )
+
+        assert response.status_code == 409
+
+    @pytest.mark.parametrize("accion", ["entregar", "calificar"])
+    def test_espera_volcados_en_vuelo(self, client, intento, buffer_vacio, accion):
+        """
+        Test CP03_02.13: Entregar o calificar espera al volcado de otra petición
+        que lleva respuestas del intento (aquí falla y las devuelve al buffer)
+        """
+        primera, segunda, _ = intento.evaluacion.preguntas
+        client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": [_respuesta(primera, 0), _respuesta(segunda, 0)]}
+        )
+        en_vuelo = buffer_vacio.extraer()
+        assert buffer_vacio.en_vuelo(intento.id_intento)
+
+        def volcado_fallido():
+            time.sleep(0.2)
+            buffer_vacio.devolver(*en_vuelo)
+            buffer_vacio.terminar(*en_vuelo)
+
+        hilo = threading.Thread(target=volcado_fallido)
+        hilo.start()
+        datos = client.post(f"/api/evaluaciones/intentos/{intento.id_intento}/{accion}").json()
+        hilo.join()
+
+        assert datos["porcentaje"] == pytest.approx(66.67)
+        assert not buffer_vacio.en_vuelo(intento.id_intento)
+        assert buffer_vacio.pendientes == 0
+
+
+class TestCP03_02_Validacion:
+    """Errores de validación"""
+
+    def test_intento_inexistente(self, client, test_evaluaciones_session, buffer_vacio):
+        """
+        Test CP03_02.10: Un intento inexistente devuelve 404
+        """
+        response = client.put(
+            "/api/evaluaciones/intentos/no-existe/respuestas",
+            json={"respuestas": [{"id_pregunta": "p"}]}
+        )
+
+        assert response.status_code == 404
+
+    def test_intento_abandonado(self, client, intento, test_evaluaciones_session):
+        """
+        Test CP03_02.11: Un intento que no está en progreso devuelve 409
+        """
+        intento.estado = EstadoIntento.ABANDONADO
+        test_evaluaciones_session.commit()
+
+        response = client.put(
+            f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas",
+            json={"respuestas": []}
+        )
+
+        assert response.status_code == 409
+
+    def test_pregunta_u_opcion_ajena(self, client, intento):
+        """
+        Test CP03_02.12: Preguntas u opciones de otra evaluación/pregunta devuelven 400
+        """
+        primera, segunda, _ = intento.evaluacion.preguntas
+        url = f"/api/evaluaciones/intentos/{intento.id_intento}/respuestas"
+
+        ajena = client.put(url, json={"respuestas": [{"id_pregunta": "otra"}]})
+        cruzada = client.put(url, json={"respuestas": [{
+            "id_pregunta": primera.id_pregunta,
+            "id_opcion_seleccionada": segunda.opciones[0].id_opcion
+        }]})
+
+        assert ajena.status_code == 400
+        assert cruzada.status_code == 400
+        assert buffer_respuestas.pendientes == 0
+
+
+pytestmark = [
+    pytest.mark.cp03_02,
+    pytest.mark.integration
+]
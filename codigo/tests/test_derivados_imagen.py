@@ -0,0 +1,209 @@
+"""
+Tests de los Derivados de Imagen
+================================
+Versiones responsive (JPEG/PNG, WebP, AVIF) y marcador de las imágenes del
+almacén de medios, generados en un pool de procesos, y su uso desde la API.
+"""
+
+import asyncio
+import base64
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "almacen_medios"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "derivados_imagen"))
+
+from almacen_medios import AlmacenLocal
+from derivados_imagen import ProcesadorImagenes, generar_derivados, ANCHOS, FORMATOS
+
+
+def _imagen(ancho=1200, alto=800, modo="RGB", formato="JPEG", orientacion=None) -> bytes:
+    imagen = Image.new(modo, (ancho, alto), (30, 120, 200, 128)[:len(modo)])
+    salida = io.BytesIO()
+    opciones = {}
+    if orientacion:
+        exif = Image.Exif()
+        exif[0x0112] = orientacion
+        opciones["exif"] = exif
+    imagen.save(salida, formato, **opciones)
+    return salida.getvalue()
+
+
+def _guardar(almacen, datos: bytes, nombre: str) -> str:
+    return almacen.guardar(iter([datos]), nombre)["clave"]
+
+
+@pytest.fixture
+def ruta_jpeg(tmp_path):
+    ruta = tmp_path / "celula.jpg"
+    ruta.write_bytes(_imagen())
+    return str(ruta)
+
+
+@pytest.fixture(scope="module")
+def procesador(tmp_path_factory):
+    """Un solo pool para todo el módulo: arrancar procesos con spawn es lento."""
+    almacen = AlmacenLocal(tmp_path_factory.mktemp("medios"), url_base="/media")
+    procesador = ProcesadorImagenes(almacen, procesos=1)
+    yield procesador
+    procesador.cerrar()
+
+
+class TestGenerarDerivados:
+    """generar_derivados, en el propio proceso"""
+
+    def test_anchos_y_formatos(self, ruta_jpeg):
+        resultado = generar_derivados(ruta_jpeg)
+
+        assert (resultado["ancho"], resultado["alto"]) == (1200, 800)
+        # Sin ampliar: 1600 se queda en el ancho del original
+        anchos = sorted({d["ancho"] for d in resultado["derivados"]})
+        assert anchos == [320, 640, 1024, 1200]
+        assert len(resultado["derivados"]) == 4 * (1 + len(FORMATOS))
+        for derivado in resultado["derivados"]:
+            assert derivado["alto"] == round(800 * derivado["ancho"] / 1200)
+            with Image.open(io.BytesIO(derivado["datos"])) as imagen:
+                assert imagen.size == (derivado["ancho"], derivado["alto"])
+                assert imagen.format.lower() == derivado["formato"]
+
+    def test_marcador(self, ruta_jpeg):
+        marcador = generar_derivados(ruta_jpeg)["marcador"]
+
+        prefijo = "data:image/webp;base64,"
+        assert marcador.startswith(prefijo)
+        with Image.open(io.BytesIO(base64.b64decode(marcador[len(prefijo):]))) as imagen:
+            assert imagen.width == 16
+        assert len(marcador) < 1000
+
+    def test_transparencia_en_png(self, tmp_path):
+        ruta = tmp_path / "logo.png"
+        ruta.write_bytes(_imagen(400, 400, "RGBA", "PNG"))
+
+        formatos = {d["formato"] for d in generar_derivados(str(ruta), anchos=(320,))["derivados"]}
+
+        assert formatos == {"png", *FORMATOS}
+
+    def test_formato_no_disponible(self, ruta_jpeg, monkeypatch):
+        import derivados_imagen
+        monkeypatch.setattr(derivados_imagen, "formato_disponible", lambda formato: formato != "avif")
+
+        formatos = {d["formato"] for d in generar_derivados(ruta_jpeg, anchos=(320,), formatos=("webp", "avif"))["derivados"]}
+
+        assert formatos == {"jpeg", "webp"}
+
+    def test_orientacion_exif(self, tmp_path):
+        ruta = tmp_path / "movil.jpg"
+        ruta.write_bytes(_imagen(800, 600, orientacion=6))
+
+        resultado = generar_derivados(str(ruta), anchos=(320,), formatos=())
+
+        assert (resultado["ancho"], resultado["alto"]) == (600, 800)
+        assert (resultado["derivados"][0]["ancho"], resultado["derivados"][0]["alto"]) == (320, 427)
+
+    def test_no_es_imagen(self, tmp_path):
+        ruta = tmp_path / "falsa.png"
+        ruta.write_bytes(b"\x89PNG\r\n\x1a\n" + b"pixeles" * 10)
+
+        with pytest.raises(ValueError):
+            generar_derivados(str(ruta))
+
+
+class TestProcesadorImagenes:
+    """Generación en el pool de procesos y guardado en el almacén"""
+
+    def test_procesar(self, procesador):
+        clave = _guardar(procesador.almacen, _imagen(), "celula.jpg")
+
+        resultado, error = procesador.procesar(clave)
+
+        assert error is None
+        assert len(resultado["derivados"]) == len(ANCHOS) * (1 + len(FORMATOS))
+        sha256 = clave.split("/")[1].split(".")[0]
+        for derivado in resultado["derivados"]:
+            derivada = procesador.almacen.clave_de_url(derivado["url"])
+            assert derivada.startswith(f"{sha256[:2]}/{sha256}-{derivado['ancho']}w.")
+            assert procesador.almacen.ruta(derivada).stat().st_size == derivado["tamano"]
+            assert "datos" not in derivado
+
+    def test_procesar_async(self, procesador):
+        clave = _guardar(procesador.almacen, _imagen(500, 500), "cuadrada.jpg")
+
+        resultado, error = asyncio.run(procesador.procesar_async(clave))
+
+        assert error is None
+        assert (resultado["ancho"], resultado["alto"]) == (500, 500)
+
+    def test_errores(self, procesador):
+        clave = _guardar(procesador.almacen, b"no es una imagen", "rota.png")
+
+        resultado, error = procesador.procesar(clave)
+        assert resultado is None
+        assert error.startswith("No es una imagen válida")
+
+        resultado, error = procesador.procesar("ab/" + "ab" * 32 + ".jpg")
+        assert resultado is None
+        assert "no está en el almacén" in error
+
+
+# ===== API =====
+
+class TestEndpoints:
+    """Derivados tras POST /api/contenidos/subir y POST /api/contenidos/{id}/derivados"""
+
+    def test_subir_imagen_genera_derivados(self, client):
+        response = client.post(
+            "/api/contenidos/subir",
+            data={"tipo": "imagen", "tema": "Célula"},
+            files={"archivo": ("celula.jpg", _imagen(), "image/jpeg")}
+        )
+        assert response.status_code == 201
+
+        # TestClient espera a las tareas de fondo
+        contenido = client.get(f"/api/contenidos/{response.json()['id_contenido']}").json()
+        assert (contenido["ancho"], contenido["alto"]) == (1200, 800)
+        assert contenido["marcador"].startswith("data:image/webp;base64,")
+        avif = [d for d in contenido["derivados"] if d["formato"] == "avif"]
+        assert [d["ancho"] for d in avif] == [320, 640, 1024, 1200]
+        assert client.get(avif[0]["url"]).headers["content-type"] == "image/avif"
+
+    def test_regenerar(self, client):
+        medio = client.post("/api/medios/?nombre=celula.png", content=_imagen(700, 350, formato="PNG")).json()
+        creado = client.post(
+            "/api/contenidos/", json={"tipo": "imagen", "tema": "Célula", "url_archivo": medio["url"], "formato": "png"}
+        ).json()
+
+        response = client.post(f"/api/contenidos/{creado['id_contenido']}/derivados")
+
+        assert response.status_code == 200
+        assert {d["formato"] for d in response.json()["derivados"]} == {"jpeg", "webp", "avif"}
+        assert max(d["ancho"] for d in response.json()["derivados"]) == 700
+
+    def test_regenerar_no_es_imagen_del_almacen(self, client, contenido_texto):
+        externa = client.post(
+            "/api/contenidos/", json={"tipo": "imagen", "tema": "Célula", "url_archivo": "https://otro/c.png", "formato": "png"}
+        ).json()
+
+        assert client.post(f"/api/contenidos/{contenido_texto.id_contenido}/derivados").status_code == 400
+        assert client.post(f"/api/contenidos/{externa['id_contenido']}/derivados").status_code == 400
+        assert client.post("/api/contenidos/no-existe/derivados").status_code == 404
+
+    def test_imagen_no_valida(self, client):
+        response = client.post(
+            "/api/contenidos/subir",
+            data={"tipo": "imagen", "tema": "Célula"},
+            files={"archivo": ("rota.png", b"no es una imagen", "image/png")}
+        )
+        assert response.status_code == 201
+        assert response.json()["derivados"] is None
+
+        regenerar = client.post(f"/api/contenidos/{response.json()['id_contenido']}/derivados")
+        assert regenerar.status_code == 400
+
+
+pytestmark = [
+    pytest.mark.integration
+]
@@ -0,0 +1,108 @@
+"""
+Tests de Métricas por Petición
+===============================
+Middleware de instrumentación y exportación en formato Prometheus (/metrics).
+"""
+
+import re
+
+import pytest
+
+from api import metricas
+
+
+def _valor(texto, patron):
+    """Devuelve el valor numérico de la primera línea que coincide con el patrón."""
+    for linea in texto.splitlines():
+        if not linea.startswith("#") and re.search(patron, linea):
+            return float(linea.rsplit(" ", 1)[1])
+    return None
+
+
+class TestExportacion:
+    """Formato de texto de Prometheus"""
+
+    def test_histograma(self):
+        histograma = metricas.Histograma("prueba_segundos", "Prueba", ("ruta",), (0.1, 1.0))
+        histograma.observar(("/a",), 0.05)
+        histograma.observar(("/a",), 0.5)
+
+        lineas = list(histograma.exportar())
+
+        assert 'prueba_segundos_bucket{ruta="/a",le="0.1"} 1' in lineas
+        assert 'prueba_segundos_bucket{ruta="/a",le="1"} 2' in lineas
+        assert 'prueba_segundos_bucket{ruta="/a",le="+Inf"} 2' in lineas
+        assert 'prueba_segundos_count{ruta="/a"} 2' in lineas
+
+    def test_etiquetas_escapadas(self):
+        contador = metricas.Contador("prueba_total", "Prueba", ("ruta",))
+        contador.incrementar(('/a"b',))
+
+        assert list(contador.exportar()) == ['prueba_total{ruta="/a\\"b"} 1']
+
+
+class TestMiddleware:
+    """Métricas registradas por ruta"""
+
+    def test_endpoint_metrics(self, client):
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE libro_http_duracion_segundos histogram" in response.text
+
+    def test_plantilla_de_ruta(self, client, capitulo_publicado):
+        client.get(f"/api/capitulos/{capitulo_publicado.id_capitulo}")
+
+        texto = client.get("/metrics").text
+
+        assert 'ruta="/api/capitulos/{capitulo_id}"' in texto
+        assert capitulo_publicado.id_capitulo not in texto
+
+    def test_ruta_con_path_una_sola_serie(self, client):
+        urls = [client.post(f"/api/medios/?nombre={nombre}", content=nombre.encode()).json()["url"] for nombre in ("a.txt", "b.txt")]
+        assert urls[0].split("/")[2] != urls[1].split("/")[2]
+        for url in urls:
+            assert client.get(url).status_code == 200
+
+        texto = client.get("/metrics").text
+
+        series = {
+            re.search(r'ruta="([^"]*)"', linea).group(1)
+            for linea in texto.splitlines()
+            if linea.startswith('libro_http_peticiones_total{metodo="GET",ruta="/media')
+        }
+        assert series == {"/media/{clave:path}"}
+
+    def test_cuenta_sentencias_sql(self, client, capitulo_con_contenido):
+        url = f"/api/contenidos/capitulo/{capitulo_con_contenido.id_capitulo}"
+        serie = r'libro_sql_sentencias_por_peticion_(sum|count)\{metodo="GET",ruta="/api/contenidos/capitulo/\{id_capitulo\}"\}'
+        texto = client.get("/metrics").text
+        suma_antes = _valor(texto, serie.replace("(sum|count)", "sum")) or 0
+        peticiones_antes = _valor(texto, serie.replace("(sum|count)", "count")) or 0
+
+        client.get(url)
+
+        texto = client.get("/metrics").text
+        assert _valor(texto, serie.replace("(sum|count)", "count")) == peticiones_antes + 1
+        assert _valor(texto, serie.replace("(sum|count)", "sum")) > suma_antes
+
+    def test_filas_y_bytes(self, client, capitulo_con_contenido):
+        client.get(f"/api/capitulos/{capitulo_con_contenido.id_capitulo}/completo")
+
+        texto = client.get("/metrics").text
+        ruta = r'\{metodo="GET",ruta="/api/capitulos/\{capitulo_id\}/completo"\}'
+        assert _valor(texto, r"libro_orm_filas_por_peticion_sum" + ruta) >= 2
+        assert _valor(texto, r"libro_http_respuesta_bytes_sum" + ruta) > 0
+
+    def test_ruta_inexistente_agrupada(self, client):
+        client.get("/no/existe/12345")
+
+        texto = client.get("/metrics").text
+        assert 'ruta="sin_ruta",estado="404"' in texto
+        assert "/no/existe/12345" not in texto
+
+
+pytestmark = [
+    pytest.mark.unit
+]
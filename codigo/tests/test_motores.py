@@ -0,0 +1,94 @@
+"""
+Tests del Registro de Motores
+==============================
+Un engine por base de datos y proceso, configuración del pool por entorno,
+PRAGMAs de SQLite y estadísticas de espera del pool.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from db.motores import RegistroMotores, configuracion_pool, registro
+
+
+@pytest.fixture
+def registro_local():
+    """Registro aislado que se cierra al terminar el test."""
+    local = RegistroMotores()
+    yield local
+    local.cerrar_todos()
+
+
+class TestRegistroMotores:
+    """Comportamiento del registro"""
+
+    def test_mismo_engine_por_nombre(self, registro_local, tmp_path):
+        url = f"sqlite:///{tmp_path / 'a.db'}"
+
+        assert registro_local.obtener("contenido", url) is registro_local.obtener("contenido", url)
+
+    def test_otra_url_con_el_mismo_nombre(self, registro_local, tmp_path):
+        registro_local.obtener("contenido", f"sqlite:///{tmp_path / 'a.db'}")
+
+        with pytest.raises(ValueError):
+            registro_local.obtener("contenido", f"sqlite:///{tmp_path / 'b.db'}")
+
+    def test_api_usa_el_registro(self):
+        from api.dependencies import engine, async_engine
+
+        assert registro.motores["contenido"] is engine
+        assert registro.motores["contenido_async"] is async_engine
+
+    def test_configuracion_por_entorno(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "7")
+        monkeypatch.setenv("DB_USUARIOS_POOL_SIZE", "3")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+        assert configuracion_pool("contenido")["pool_size"] == 7
+        assert configuracion_pool("usuarios")["pool_size"] == 3
+        assert configuracion_pool("usuarios")["pool_pre_ping"] is False
+
+    def test_pragmas_sqlite(self, registro_local, tmp_path, monkeypatch):
+        monkeypatch.setenv("SQLITE_SYNCHRONOUS", "OFF")
+        motor = registro_local.obtener("contenido", f"sqlite:///{tmp_path / 'a.db'}")
+
+        with motor.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 0
+
+
+class TestEstadisticasPool:
+    """Contadores del pool"""
+
+    def test_timeout_registrado(self, registro_local, tmp_path, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "1")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DB_POOL_TIMEOUT", "0.05")
+        motor = registro_local.obtener("contenido", f"sqlite:///{tmp_path / 'a.db'}")
+
+        with motor.connect():
+            with pytest.raises(PoolTimeoutError):
+                motor.connect()
+
+        datos = registro_local.estadisticas()["contenido"]
+        assert datos["esperas"]["timeouts"] == 1
+        assert datos["esperas"]["peticiones"] == 2
+        assert datos["esperas"]["espera_max_ms"] >= 50
+        assert datos["checkouts"] == 1
+        assert datos["en_uso"] == 0
+
+    def test_endpoint_admin(self, client):
+        client.get("/api/capitulos/")
+
+        response = client.get("/api/admin/pool")
+
+        assert response.status_code == 200
+        datos = response.json()
+        assert datos["contenido_async"]["checkouts"] >= 1
+        assert "esperas" in datos["contenido_async"]
+
+
+pytestmark = [
+    pytest.mark.unit
+]
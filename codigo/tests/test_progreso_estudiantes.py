@@ -0,0 +1,286 @@
+"""
+Tests del Progreso de Estudiantes
+==================================
+capitulos_completados, progreso_general y ultimo_capitulo_visto calculados
+cruzando las BD de contenido, usuarios y evaluaciones: reconstrucción
+completa por lotes y recálculo por eventos al completar intentos.
+"""
+
+import asyncio
+import sys
+from contextlib import suppress
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "paquetes" / "progreso_estudiantes"))
+
+from db.contenido.models import Capitulo
+from db.evaluaciones.models import Evaluacion, Intento, EstadoIntento
+from db.usuarios.models import Estudiante, Usuario, TipoUsuario
+import progreso_estudiantes
+from progreso_estudiantes import GestorProgreso, estudiantes_pendientes, instalar_progreso_incremental
+
+
+MODELOS = {
+    'Capitulo': Capitulo,
+    'Evaluacion': Evaluacion,
+    'Intento': Intento,
+    'Estudiante': Estudiante
+}
+
+
+def _sesion(metadata):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+@pytest.fixture
+def bases():
+    """Las tres BD en memoria: (contenido, usuarios, evaluaciones)."""
+    sesiones = (_sesion(Capitulo.metadata), _sesion(Estudiante.metadata), _sesion(Evaluacion.metadata))
+    yield sesiones
+    for sesion in sesiones:
+        engine = sesion.get_bind()
+        sesion.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def libro(bases):
+    """
+    Capítulos 1 y 2 publicados (el 2 con dos evaluaciones), el 3 en borrador
+    y el 4 publicado sin evaluaciones activas.
+    """
+    contenido, _, evaluaciones = bases
+    capitulos = [
+        Capitulo(numero=n, titulo=f"Capítulo {n}", tema="Biología", estado=estado)
+        for n, estado in ((1, "PUBLICADO"), (2, "PUBLICADO"), (3, "BORRADOR"), (4, "PUBLICADO"))
+    ]
+    contenido.add_all(capitulos)
+    contenido.commit()
+
+    def evaluacion(capitulo, activa=True):
+        return Evaluacion(
+            id_capitulo=capitulo.id_capitulo, titulo="Evaluación", id_docente_creador="doc-1", activa=activa
+        )
+
+    lista = {
+        "c1": evaluacion(capitulos[0]),
+        "c2a": evaluacion(capitulos[1]),
+        "c2b": evaluacion(capitulos[1]),
+        "c3": evaluacion(capitulos[2]),
+        "c4": evaluacion(capitulos[3], activa=False),
+    }
+    evaluaciones.add_all(lista.values())
+    evaluaciones.commit()
+    return capitulos, lista
+
+
+def _estudiantes(usuarios, n):
+    estudiantes = [Estudiante(id_usuario=f"usr-{i}") for i in range(n)]
+    usuarios.add_all(estudiantes)
+    usuarios.commit()
+    return estudiantes
+
+
+def _intento(evaluaciones, estudiante, evaluacion, aprobado=True, minutos=0, estado=EstadoIntento.COMPLETADO):
+    intento = Intento(
+        id_evaluacion=evaluacion.id_evaluacion, id_estudiante=estudiante.id_estudiante,
+        numero_intento=1, puntos_totales=100.0, estado=estado, aprobado=aprobado,
+        fecha_inicio=datetime(2025, 1, 1) + timedelta(minutes=minutos)
+    )
+    evaluaciones.add(intento)
+    evaluaciones.commit()
+    return intento
+
+
+class TestReconstruccionCompleta:
+    """recalcular_todos"""
+
+    def test_calculo_del_progreso(self, bases, libro):
+        contenido, usuarios, evaluaciones = bases
+        capitulos, lista = libro
+        ana, beto, carla = _estudiantes(usuarios, 3)
+        # Ana: capítulo 1 completo; del 2 solo una evaluación; el 3 no cuenta (borrador)
+        _intento(evaluaciones, ana, lista["c1"], minutos=1)
+        _intento(evaluaciones, ana, lista["c2a"], minutos=2)
+        _intento(evaluaciones, ana, lista["c3"], minutos=3)
+        # Beto: capítulos 1 y 2 completos; un suspenso no cuenta
+        _intento(evaluaciones, beto, lista["c1"], aprobado=False, minutos=1)
+        _intento(evaluaciones, beto, lista["c1"], minutos=2)
+        _intento(evaluaciones, beto, lista["c2a"], minutos=3)
+        _intento(evaluaciones, beto, lista["c2b"], minutos=4)
+
+        resultado, error = GestorProgreso(contenido, usuarios, evaluaciones, MODELOS).recalcular_todos()
+
+        assert error is None
+        assert resultado == {"estudiantes": 3, "actualizados": 2}
+        usuarios.expire_all()
+        assert (ana.capitulos_completados, ana.progreso_general) == (1, 50)
+        assert ana.ultimo_capitulo_visto == capitulos[2].id_capitulo
+        assert (beto.capitulos_completados, beto.progreso_general) == (2, 100)
+        assert beto.ultimo_capitulo_visto == capitulos[1].id_capitulo
+        assert (carla.capitulos_completados, carla.progreso_general, carla.ultimo_capitulo_visto) == (0, 0, None)
+
+    def test_solo_escribe_lo_que_cambia(self, bases, libro):
+        contenido, usuarios, evaluaciones = bases
+        _, lista = libro
+        ana, _ = _estudiantes(usuarios, 2)
+        _intento(evaluaciones, ana, lista["c1"])
+        gestor = GestorProgreso(contenido, usuarios, evaluaciones, MODELOS)
+        gestor.recalcular_todos()
+
+        resultado, _ = gestor.recalcular_todos()
+
+        assert resultado == {"estudiantes": 2, "actualizados": 0}
+
+    def test_consultas_por_lote_no_por_estudiante(self, bases, libro, monkeypatch):
+        contenido, usuarios, evaluaciones = bases
+        _, lista = libro
+        monkeypatch.setattr(progreso_estudiantes, "TAMANO_LOTE", 10)
+        for estudiante in _estudiantes(usuarios, 25):
+            _intento(evaluaciones, estudiante, lista["c1"])
+
+        sentencias = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        motores = [sesion.get_bind() for sesion in bases]
+        for motor in motores:
+            event.listen(motor, "before_cursor_execute", registrar)
+        try:
+            resultado, _ = GestorProgreso(contenido, usuarios, evaluaciones, MODELOS).recalcular_todos()
+        finally:
+            for motor in motores:
+                event.remove(motor, "before_cursor_execute", registrar)
+
+        assert resultado == {"estudiantes": 25, "actualizados": 25}
+        # 3 lotes + la consulta vacía final; capítulos evaluables una sola vez
+        assert sum(1 for s in sentencias if s.startswith("SELECT estudiantes.id_estudiante \nFROM")) == 4
+        assert sum(1 for s in sentencias if "FROM capitulos" in s) == 1
+        assert sum(1 for s in sentencias if s.startswith("UPDATE estudiantes")) == 3
+
+
+class TestPorEventos:
+    """instalar_progreso_incremental + procesar_pendientes"""
+
+    @pytest.fixture(autouse=True)
+    def cola_vacia(self):
+        instalar_progreso_incremental(MODELOS)
+        estudiantes_pendientes.extraer()
+        yield
+        estudiantes_pendientes.extraer()
+
+    def test_completar_intento_encola_al_estudiante(self, bases, libro):
+        contenido, usuarios, evaluaciones = bases
+        _, lista = libro
+        ana, = _estudiantes(usuarios, 1)
+        intento = _intento(evaluaciones, ana, lista["c1"], estado=EstadoIntento.EN_PROGRESO)
+        assert len(estudiantes_pendientes) == 0
+
+        intento.estado = EstadoIntento.COMPLETADO
+        evaluaciones.commit()
+
+        assert len(estudiantes_pendientes) == 1
+        resultado, error = GestorProgreso(contenido, usuarios, evaluaciones, MODELOS).procesar_pendientes()
+        assert error is None
+        assert resultado == {"estudiantes": 1, "actualizados": 1}
+        assert len(estudiantes_pendientes) == 0
+        usuarios.expire_all()
+        assert ana.capitulos_completados == 1
+
+    def test_rollback_no_encola(self, bases, libro):
+        _, usuarios, evaluaciones = bases
+        _, lista = libro
+        ana, = _estudiantes(usuarios, 1)
+        intento = _intento(evaluaciones, ana, lista["c1"], estado=EstadoIntento.EN_PROGRESO)
+
+        intento.estado = EstadoIntento.COMPLETADO
+        evaluaciones.flush()
+        evaluaciones.rollback()
+
+        assert len(estudiantes_pendientes) == 0
+
+    def test_error_devuelve_a_la_cola(self, bases, libro):
+        contenido, usuarios, evaluaciones = bases
+        estudiantes_pendientes.agregar("est-1")
+        usuarios.get_bind().dispose()
+        usuarios.bind = create_engine("sqlite://")  # sin tablas
+
+        resultado, error = GestorProgreso(contenido, usuarios, evaluaciones, MODELOS).procesar_pendientes()
+
+        assert resultado is None
+        assert "Error al recalcular el progreso" in error
+        assert len(estudiantes_pendientes) == 1
+
+
+
+class TestTareaPeriodica:
+    """progreso_periodico de la API, con las sesiones de la API"""
+
+    @pytest.fixture
+    def estudiante_api(self, test_db_session, test_evaluaciones_session):
+        """Estudiante de la BD de usuarios de la API con un intento aprobado, ya encolado."""
+        from dependencies import UsuariosSessionLocal
+
+        capitulo = Capitulo(numero=1, titulo="Capítulo 1", tema="Biología", estado="PUBLICADO")
+        test_db_session.add(capitulo)
+        test_db_session.commit()
+        usuarios = UsuariosSessionLocal()
+        usuarios.add(Usuario(
+            id_usuario="usr-progreso", email="progreso@test.com", password_hash="-",
+            nombre="Ana", apellido="Test", tipo_usuario=TipoUsuario.ESTUDIANTE
+        ))
+        estudiante = Estudiante(id_usuario="usr-progreso")
+        usuarios.add(estudiante)
+        usuarios.commit()
+        evaluacion = Evaluacion(id_capitulo=capitulo.id_capitulo, titulo="Evaluación", id_docente_creador="doc-1")
+        test_evaluaciones_session.add(evaluacion)
+        test_evaluaciones_session.commit()
+        _intento(test_evaluaciones_session, estudiante, evaluacion)
+        estudiantes_pendientes.extraer()
+        estudiantes_pendientes.agregar(estudiante.id_estudiante)
+        try:
+            yield usuarios, estudiante
+        finally:
+            estudiantes_pendientes.extraer()
+            usuarios.delete(estudiante)
+            usuarios.query(Usuario).filter_by(id_usuario="usr-progreso").delete()
+            usuarios.commit()
+            usuarios.close()
+
+    def test_recalcula_con_los_motores_de_la_api(self, estudiante_api, monkeypatch):
+        import main as api_main
+        usuarios, estudiante = estudiante_api
+        monkeypatch.setattr(api_main, "PROGRESO_INTERVALO_SEGUNDOS", 0.01)
+
+        async def esperar_recalculo():
+            tarea = asyncio.create_task(api_main.progreso_periodico())
+            try:
+                for _ in range(200):
+                    await asyncio.sleep(0.01)
+                    usuarios.expire_all()
+                    if estudiante.progreso_general:
+                        return
+            finally:
+                tarea.cancel()
+                with suppress(asyncio.CancelledError):
+                    await tarea
+
+        asyncio.run(esperar_recalculo())
+
+        assert (estudiante.capitulos_completados, estudiante.progreso_general) == (1, 100)
+        assert len(estudiantes_pendientes) == 0
+
+
+
+pytestmark = [
+    pytest.mark.unit
+]
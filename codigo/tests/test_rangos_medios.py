@@ -0,0 +1,150 @@
+"""
+Tests de Rangos en /media
+=========================
+Respuestas 206 Partial Content, If-Range y envío por mmap o zerocopy de los
+archivos del almacén local.
+"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from api.rangos import RangoNoSatisfacible, RespuestaArchivo, TAMANO_TROZO, interpretar_rango
+
+
+VIDEO = bytes(range(256)) * 12000  # ~3 MB: varios trozos del mmap
+
+
+@pytest.fixture
+def video(client):
+    """URL de un vídeo subido al almacén local."""
+    response = client.post("/api/medios/?nombre=mitosis.mp4", content=VIDEO)
+    assert response.status_code == 201
+    return response.json()["url"]
+
+
+class TestInterpretarRango:
+    """Cabecera Range"""
+
+    @pytest.mark.parametrize("cabecera,rango", [
+        ("bytes=0-99", (0, 100)),
+        ("bytes=100-", (100, 1000)),
+        ("bytes=-10", (990, 1000)),
+        ("bytes=900-5000", (900, 1000)),
+        ("bytes=-5000", (0, 1000)),
+    ])
+    def test_rangos(self, cabecera, rango):
+        assert interpretar_rango(cabecera, 1000) == rango
+
+    @pytest.mark.parametrize("cabecera", [None, "", "items=0-1", "bytes=abc", "bytes=5-3", "bytes=0-1,5-6", "bytes=-"])
+    def test_se_ignora(self, cabecera):
+        assert interpretar_rango(cabecera, 1000) is None
+
+    @pytest.mark.parametrize("cabecera", ["bytes=1000-", "bytes=-0"])
+    def test_no_satisfacible(self, cabecera):
+        with pytest.raises(RangoNoSatisfacible):
+            interpretar_rango(cabecera, 1000)
+
+
+class TestDescarga:
+    """GET y HEAD /media/{clave}"""
+
+    def test_completo(self, client, video):
+        response = client.get(video)
+
+        assert response.status_code == 200
+        assert response.content == VIDEO
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["etag"] == f'"{hashlib.sha256(VIDEO).hexdigest()}"'
+
+    def test_rango(self, client, video):
+        response = client.get(video, headers={"Range": "bytes=1000-2999999"})
+
+        assert response.status_code == 206
+        assert response.content == VIDEO[1000:3000000]
+        assert response.headers["content-range"] == f"bytes 1000-2999999/{len(VIDEO)}"
+        assert response.headers["content-length"] == str(3000000 - 1000)
+
+    def test_sufijo(self, client, video):
+        response = client.get(video, headers={"Range": "bytes=-100"})
+
+        assert response.status_code == 206
+        assert response.content == VIDEO[-100:]
+
+    def test_no_satisfacible(self, client, video):
+        response = client.get(video, headers={"Range": f"bytes={len(VIDEO)}-"})
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(VIDEO)}"
+
+    def test_if_range(self, client, video):
+        etag = client.head(video).headers["etag"]
+
+        vigente = client.get(video, headers={"Range": "bytes=0-9", "If-Range": etag})
+        cambiado = client.get(video, headers={"Range": "bytes=0-9", "If-Range": '"otro"'})
+
+        assert vigente.status_code == 206
+        assert vigente.content == VIDEO[:10]
+        assert cambiado.status_code == 200
+        assert cambiado.content == VIDEO
+
+    def test_if_none_match(self, client, video):
+        etag = client.head(video).headers["etag"]
+
+        assert client.get(video, headers={"If-None-Match": etag}).status_code == 304
+
+    def test_head(self, client, video):
+        response = client.head(video, headers={"Range": "bytes=0-9"})
+
+        assert response.status_code == 206
+        assert response.headers["content-length"] == "10"
+        assert response.content == b""
+
+
+class TestEnvio:
+    """RespuestaArchivo como aplicación ASGI"""
+
+    def _llamar(self, respuesta, extensiones=None):
+        mensajes = []
+
+        async def recibir():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def enviar(mensaje):
+            mensajes.append(mensaje)
+
+        scope = {"type": "http", "method": "GET", "extensions": extensiones or {}}
+        asyncio.run(respuesta(scope, recibir, enviar))
+        return mensajes
+
+    def test_mmap_por_trozos(self, tmp_path):
+        ruta = tmp_path / "video.mp4"
+        ruta.write_bytes(VIDEO)
+
+        mensajes = self._llamar(RespuestaArchivo(ruta, len(VIDEO), (10, len(VIDEO))))
+
+        cuerpos = [m for m in mensajes if m["type"] == "http.response.body"]
+        assert mensajes[0]["status"] == 206
+        assert len(cuerpos) == -(-(len(VIDEO) - 10) // TAMANO_TROZO)
+        assert b"".join(m["body"] for m in cuerpos) == VIDEO[10:]
+        assert [m["more_body"] for m in cuerpos][-1] is False
+
+    def test_zerocopy(self, tmp_path):
+        ruta = tmp_path / "video.mp4"
+        ruta.write_bytes(VIDEO)
+
+        mensajes = self._llamar(
+            RespuestaArchivo(ruta, len(VIDEO), (100, 200)),
+            extensiones={"http.response.zerocopy": {}}
+        )
+
+        assert mensajes[1]["type"] == "http.response.zerocopy"
+        assert (mensajes[1]["offset"], mensajes[1]["count"]) == (100, 100)
+        assert mensajes[1]["file"].closed
+
+
+pytestmark = [
+    pytest.mark.integration
+]